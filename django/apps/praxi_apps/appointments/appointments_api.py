@@ -10,6 +10,7 @@ from datetime import date, datetime
 
 from django.utils import timezone
 from django.conf import settings
+from praxi_backend.core.pagination import keyset_list_response
 from praxi_backend.patients.utils import get_patient_display_name_map
 from rest_framework import generics, serializers, status
 from rest_framework.permissions import IsAuthenticated
@@ -31,11 +32,12 @@ from .permissions import (
 )
 from .scheduling_facade import (
     compute_suggestions_for_doctor,
+    compute_suggestions_for_doctors,
     doctor_display_name,
     get_active_doctors,
 )
 from .scheduling_facade import plan_appointment as scheduling_plan_appointment
-from .scheduling_facade import resolve_doctor
+from .scheduling_facade import resolve_doctor, resolve_type
 from .serializers import (
     AppointmentCreateUpdateSerializer,
     AppointmentSerializer,
@@ -95,6 +97,7 @@ class AppointmentListCreateView(generics.ListCreateAPIView):
 
     use_scheduling_service = True  # Set to False to use legacy serializer-based validation
     pagination_class = None
+    keyset_fields = ("start_time", "id")
 
     def get_permissions(self):
         """Use IsAuthenticated for GET, AppointmentPermission for POST/PUT/DELETE.
@@ -146,6 +149,9 @@ class AppointmentListCreateView(generics.ListCreateAPIView):
         - date: YYYY-MM-DD format to filter appointments for a specific day
         - start_date: YYYY-MM-DD format for range start
         - end_date: YYYY-MM-DD format for range end
+        - limit / cursor: keyset pages ordered by (start_time, id), see
+          ``praxi_backend.core.pagination``
+        - stream: ``json`` or ``ndjson`` to stream the full result in chunks
 
         Date filtering is timezone-aware to ensure appointments are correctly
         filtered regardless of UTC vs local time storage.
@@ -171,30 +177,32 @@ class AppointmentListCreateView(generics.ListCreateAPIView):
                 pass
 
         # Apply ordering
-        qs = qs.order_by("start_time", "id")
+        qs = qs.order_by(*self.keyset_fields)
 
-        # Build a patient name map once (avoids N+1 lookups in serializers).
-        patient_name_map = {}
-        try:
-            patient_ids = list(qs.values_list("patient_id", flat=True))
-            patient_name_map = get_patient_display_name_map(patient_ids)
-        except Exception:
-            patient_name_map = {}
+        # Opt-in keyset pages (?cursor/?limit) and streaming export (?stream)
+        response = keyset_list_response(request, qs, self.keyset_fields, self._serialize_rows)
+        if response is not None:
+            return response
 
         # Use pagination if configured
         page = self.paginate_queryset(qs)
         if page is not None:
-            serializer_class = self.get_serializer_class()
-            context = self.get_serializer_context()
-            context["patient_name_map"] = patient_name_map
-            serializer = serializer_class(page, many=True, context=context)
-            return self.get_paginated_response(serializer.data)
+            return self.get_paginated_response(self._serialize_rows(page))
+
+        return Response(self._serialize_rows(list(qs)))
+
+    def _serialize_rows(self, rows):
+        """Serialize ``rows`` with one patient name lookup for all of them."""
+        # Build a patient name map once (avoids N+1 lookups in serializers).
+        try:
+            patient_name_map = get_patient_display_name_map(a.patient_id for a in rows)
+        except Exception:
+            patient_name_map = {}
 
         serializer_class = self.get_serializer_class()
         context = self.get_serializer_context()
         context["patient_name_map"] = patient_name_map
-        serializer = serializer_class(qs, many=True, context=context)
-        return Response(serializer.data)
+        return serializer_class(rows, many=True, context=context).data
 
     def create(self, request, *args, **kwargs):
         """Create an appointment using the scheduling service.
@@ -214,7 +222,10 @@ class AppointmentListCreateView(generics.ListCreateAPIView):
         except serializers.ValidationError as exc:
             _maybe_audit_resource_conflict(request=request, exc=exc)
             raise
-        appointment = write_serializer.save()
+        try:
+            appointment = write_serializer.save()
+        except SchedulingConflictError as e:
+            return Response(e.to_dict(), status=status.HTTP_400_BAD_REQUEST)
         _log_patient_action(request.user, "appointment_create", appointment.patient_id)
 
         read_serializer = AppointmentSerializer(appointment, context={"request": request})
@@ -303,7 +314,10 @@ class AppointmentDetailView(generics.RetrieveUpdateDestroyAPIView):
         except serializers.ValidationError as exc:
             _maybe_audit_resource_conflict(request=request, exc=exc)
             raise
-        updated = write_serializer.save()
+        try:
+            updated = write_serializer.save()
+        except SchedulingConflictError as e:
+            return Response(e.to_dict(), status=status.HTTP_400_BAD_REQUEST)
 
         _log_patient_action(request.user, "appointment_update", updated.patient_id)
         read_serializer = AppointmentSerializer(updated, context={"request": request})
@@ -464,6 +478,15 @@ class AppointmentSuggestView(generics.GenericAPIView):
         if limit is None or limit <= 0:
             return Response({"detail": "limit must be >= 1."}, status=status.HTTP_400_BAD_REQUEST)
 
+        # Optional: stop the substitute search once this many doctors have slots.
+        fallback_limit, err = self._parse_int(request, "fallback_limit")
+        if err is not None:
+            return err
+        if fallback_limit is not None and fallback_limit <= 0:
+            return Response(
+                {"detail": "fallback_limit must be >= 1."}, status=status.HTTP_400_BAD_REQUEST
+            )
+
         # Resolve doctor
         doctor = resolve_doctor(doctor_id)
         if doctor is None:
@@ -483,7 +506,7 @@ class AppointmentSuggestView(generics.GenericAPIView):
         # Resolve type + duration
         type_obj = None
         if type_id is not None:
-            type_obj = AppointmentType.objects.using("default").filter(id=type_id).first()
+            type_obj = resolve_type(type_id)
             if type_obj is None:
                 return Response(
                     {"detail": "type_id not found."}, status=status.HTTP_400_BAD_REQUEST
@@ -548,18 +571,20 @@ class AppointmentSuggestView(generics.GenericAPIView):
         if not primary_suggestions:
             used_fallback = True
             reps = get_active_doctors(exclude_doctor_id=doctor.id)
+            rep_results = compute_suggestions_for_doctors(
+                doctors=reps,
+                start_date=start_date,
+                end_date=start_date,
+                duration_minutes=duration_minutes,
+                limit=limit,
+                type_obj=type_obj,
+                resources=resources,
+                max_days=1,
+                max_doctors=fallback_limit,
+            )
             items = []
             for rep in reps:
-                rep_suggestions = compute_suggestions_for_doctor(
-                    doctor=rep,
-                    start_date=start_date,
-                    end_date=start_date,
-                    duration_minutes=duration_minutes,
-                    limit=limit,
-                    type_obj=type_obj,
-                    resources=resources,
-                    max_days=1,
-                )
+                rep_suggestions = rep_results.get(rep.id)
                 if rep_suggestions:
                     items.append(
                         {
@@ -574,6 +599,8 @@ class AppointmentSuggestView(generics.GenericAPIView):
                     )
 
             items.sort(key=lambda x: x["_sort"])
+            if fallback_limit is not None:
+                items = items[:fallback_limit]
             for item in items:
                 item.pop("_sort", None)
             fallback_suggestions = items
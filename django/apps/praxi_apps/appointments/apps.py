@@ -11,3 +11,19 @@ class AppointmentsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "praxi_backend.appointments"
     verbose_name = "Appointments (Termine & Planung)"
+
+    def ready(self):
+        from .change_tracking import connect_signals as connect_change_signals
+        from .config_cache import connect_signals
+        from .kpi.rollups import connect_signals as connect_rollup_signals
+        from .kpi.snapshots import connect_signals as connect_kpi_signals
+        from .live_events import connect_signals as connect_live_event_signals
+        from .original_values import connect_signals as connect_original_value_signals
+
+        connect_signals()
+        connect_kpi_signals()
+        connect_rollup_signals()
+        connect_change_signals()
+        connect_live_event_signals()
+        # Last: refreshes the original values after the receivers above ran.
+        connect_original_value_signals()
@@ -6,18 +6,50 @@ No logic changes; only module split.
 
 from __future__ import annotations
 
+import base64
+import binascii
+import json
 import logging
 from datetime import datetime
 
+from django.db.models import Q
 from django.utils import timezone
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from .scheduling_facade import filter_available_patients, get_available_doctors, get_available_rooms
+from .scheduling_facade import exclude_busy_patients, get_available_doctors, get_available_rooms
 
 logger = logging.getLogger(__name__)
 
+PATIENT_PAGE_SIZE = 200
+PATIENT_PAGE_SIZE_MAX = 500
+
+
+def _encode_patient_cursor(last_name: str, first_name: str, patient_id: int) -> str:
+    raw = json.dumps([last_name, first_name, patient_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_patient_cursor(cursor: str) -> tuple[str, str, int]:
+    """Decode a cursor produced by _encode_patient_cursor; raises ValueError."""
+    try:
+        last_name, first_name, patient_id = json.loads(base64.urlsafe_b64decode(cursor))
+        patient_id = int(patient_id)
+    except (binascii.Error, TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not (isinstance(last_name, str) and isinstance(first_name, str)):
+        raise ValueError("Invalid cursor")
+    return last_name, first_name, patient_id
+
+
+def _parse_page_size(raw: str | None) -> int:
+    try:
+        value = int(raw) if raw else PATIENT_PAGE_SIZE
+    except (TypeError, ValueError):
+        value = PATIENT_PAGE_SIZE
+    return max(1, min(value, PATIENT_PAGE_SIZE_MAX))
+
 
 class AvailabilityView(generics.GenericAPIView):
     """GET /api/availability/?start=ISO_DATETIME&end=ISO_DATETIME
@@ -28,6 +60,9 @@ class AvailabilityView(generics.GenericAPIView):
             start: ISO datetime string (required)
             end: ISO datetime string (required)
             exclude_appointment_id: Optional appointment ID to exclude (for updates)
+            q: Optional patient search prefix (last/first name, or exact patient ID)
+            limit: Optional patient page size (default 200, max 500)
+            cursor: Optional patient cursor from a previous response
 
     Response:
             {
@@ -42,8 +77,12 @@ class AvailabilityView(generics.GenericAPIView):
                     "available_patients": [
                             {"id": 1, "first_name": "...", "last_name": "..."},
                             ...
-                    ]
+                    ],
+                    "patients_next_cursor": "..." | null
             }
+
+    Patients are returned one page at a time, ordered by last name, first name
+    and ID; pass ``patients_next_cursor`` back as ``cursor`` for the next page.
     """
 
     permission_classes = [IsAuthenticated]
@@ -82,6 +121,17 @@ class AvailabilityView(generics.GenericAPIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        cursor = request.query_params.get("cursor")
+        cursor_key = None
+        if cursor:
+            try:
+                cursor_key = _decode_patient_cursor(cursor)
+            except ValueError:
+                return Response(
+                    {"detail": "Invalid cursor."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
         exclude_id = None
         if exclude_appointment_id:
             try:
@@ -125,27 +175,47 @@ class AvailabilityView(generics.GenericAPIView):
             for r in available_rooms
         ]
 
-        # Get available patients
+        # Get available patients (one page, busy patients excluded in SQL)
+        next_cursor = None
         try:
             from praxi_backend.patients.models import Patient
 
-            all_patients = list(
-                Patient.objects.using("default").order_by("last_name", "first_name", "id")
+            patients_qs = Patient.objects.using("default").only(
+                "id", "first_name", "last_name", "birth_date"
             )
-            all_patient_ids = [p.id for p in all_patients]
 
-            # Filter available patients
-            available_patient_ids = filter_available_patients(
-                patient_ids=all_patient_ids,
+            search = (request.query_params.get("q") or "").strip()
+            if search:
+                if search.isdigit():
+                    patients_qs = patients_qs.filter(id=int(search))
+                else:
+                    patients_qs = patients_qs.filter(
+                        Q(last_name__istartswith=search) | Q(first_name__istartswith=search)
+                    )
+
+            if cursor_key is not None:
+                last_name, first_name, patient_id = cursor_key
+                patients_qs = patients_qs.filter(
+                    Q(last_name__gt=last_name)
+                    | Q(last_name=last_name, first_name__gt=first_name)
+                    | Q(last_name=last_name, first_name=first_name, id__gt=patient_id)
+                )
+
+            patients_qs = exclude_busy_patients(
+                patients_qs,
                 start_time=start_time,
                 end_time=end_time,
                 exclude_appointment_id=exclude_id,
             )
 
-            # Get patient details for available IDs
-            available_patients = Patient.objects.using("default").filter(
-                id__in=available_patient_ids
+            limit = _parse_page_size(request.query_params.get("limit"))
+            available_patients = list(
+                patients_qs.order_by("last_name", "first_name", "id")[: limit + 1]
             )
+            if len(available_patients) > limit:
+                available_patients = available_patients[:limit]
+                last = available_patients[-1]
+                next_cursor = _encode_patient_cursor(last.last_name, last.first_name, last.id)
 
             # Serialize patients (avoid per-row DB lookups)
             from praxi_backend.patients.utils import format_patient_display_name
@@ -174,6 +244,7 @@ class AvailabilityView(generics.GenericAPIView):
                 "available_doctors": doctors_data,
                 "available_rooms": rooms_data,
                 "available_patients": patients_data,
+                "patients_next_cursor": next_cursor,
             },
             status=status.HTTP_200_OK,
         )
@@ -0,0 +1,258 @@
+"""Fast read path for calendar event payloads.
+
+The calendar endpoints return every appointment and operation of a day,
+week or month. Rendering them through ``AppointmentSerializer`` /
+``OperationSerializer`` instantiates model objects and runs the DRF field
+machinery (nested serializers, SerializerMethodFields) per row, which
+dominates CPU time for month views.
+
+This module builds the same dicts directly:
+
+- the bookings are read with ``.values()``;
+- types, resources, clinicians and patient names are loaded once per
+  response into lookup maps (a fixed number of queries, independent of the
+  number of events);
+- datetimes go through DRF's ``DateTimeField`` so formatting and time zone
+  handling stay identical.
+
+The output renders to byte-identical JSON as the serializers; keep the key
+order and field semantics in sync with ``serializers.py``. Compare both paths
+with ``manage.py benchmark_calendar``.
+
+Architecture rules:
+- All DB access uses .using('default')
+- PostgreSQL only
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Iterable
+from typing import Any
+
+from django.db.models import QuerySet
+from praxi_backend.core.models import User
+from praxi_backend.patients.utils import (
+    get_patient_display_name,
+    get_patient_display_name_map,
+)
+from rest_framework import serializers
+
+from .models import (
+    AppointmentResource,
+    AppointmentType,
+    OperationDevice,
+    OperationType,
+    Resource,
+)
+from .scheduling_facade import doctor_display_name
+
+_datetime = serializers.DateTimeField()
+
+APPOINTMENT_COLUMNS = (
+    "id",
+    "patient_id",
+    "type_id",
+    "doctor_id",
+    "start_time",
+    "end_time",
+    "status",
+    "is_no_show",
+    "notes",
+    "created_at",
+    "updated_at",
+)
+
+OPERATION_COLUMNS = (
+    "id",
+    "patient_id",
+    "op_type_id",
+    "op_room_id",
+    "primary_surgeon_id",
+    "assistant_id",
+    "anesthesist_id",
+    "start_time",
+    "end_time",
+    "status",
+    "notes",
+    "created_at",
+    "updated_at",
+)
+
+
+def _dt(value):
+    return None if value is None else _datetime.to_representation(value)
+
+
+# ---------------------------------------------------------------------------
+# Lookup maps (one query each)
+# ---------------------------------------------------------------------------
+
+
+def _resource_map(resource_ids: Iterable[int]) -> dict[int, dict[str, Any]]:
+    """``ResourceSerializer`` output per resource id."""
+    rows = (
+        Resource.objects.using("default")
+        .filter(id__in=set(resource_ids))
+        .values("id", "name", "type", "color", "active", "created_at", "updated_at")
+    )
+    return {
+        row["id"]: {
+            **row,
+            "created_at": _dt(row["created_at"]),
+            "updated_at": _dt(row["updated_at"]),
+        }
+        for row in rows
+    }
+
+
+def _linked_resources(through, owner_field: str, owner_ids: list[int]) -> dict[int, list[int]]:
+    """Resource ids per owner in ``Resource.Meta.ordering`` (type, name, id)."""
+    linked: dict[int, list[int]] = defaultdict(list)
+    rows = (
+        through.objects.using("default")
+        .filter(**{f"{owner_field}__in": owner_ids})
+        .order_by(owner_field, "resource__type", "resource__name", "resource_id")
+        .values_list(owner_field, "resource_id")
+    )
+    for owner_id, resource_id in rows:
+        linked[owner_id].append(resource_id)
+    return linked
+
+
+def _user_map(user_ids: Iterable[int | None]) -> dict[int, dict[str, Any]]:
+    ids = {uid for uid in user_ids if uid is not None}
+    users = User.objects.using("default").filter(id__in=ids) if ids else []
+    return {
+        u.id: {"id": u.id, "name": doctor_display_name(u), "color": u.calendar_color}
+        for u in users
+    }
+
+
+def _patient_names(patient_ids: Iterable[int]) -> dict[int, str]:
+    try:
+        return get_patient_display_name_map(patient_ids)
+    except Exception:
+        return {}
+
+
+def _patient_name(names: dict[int, str], patient_id: int) -> str:
+    if patient_id in names:
+        return names[patient_id] or ""
+    return get_patient_display_name(patient_id)
+
+
+# ---------------------------------------------------------------------------
+# Events
+# ---------------------------------------------------------------------------
+
+
+def appointment_events(qs: QuerySet) -> list[dict[str, Any]]:
+    """``AppointmentSerializer(qs, many=True).data`` without serializers."""
+    rows = list(qs.values(*APPOINTMENT_COLUMNS))
+    if not rows:
+        return []
+
+    ids = [row["id"] for row in rows]
+    linked = _linked_resources(AppointmentResource, "appointment_id", ids)
+    resources = _resource_map(rid for rids in linked.values() for rid in rids)
+    types = {
+        t["id"]: t
+        for t in AppointmentType.objects.using("default")
+        .filter(id__in={row["type_id"] for row in rows if row["type_id"] is not None})
+        .values("id", "name", "color")
+    }
+    doctors = _user_map(row["doctor_id"] for row in rows)
+    names = _patient_names(row["patient_id"] for row in rows)
+
+    events = []
+    for row in rows:
+        type_ = types.get(row["type_id"])
+        doctor = doctors.get(row["doctor_id"])
+        booked = [resources[rid] for rid in linked.get(row["id"], ())]
+        room_name = next(
+            (r["name"] for r in booked if r["active"] and r["type"] == Resource.TYPE_ROOM), None
+        )
+        events.append(
+            {
+                "id": row["id"],
+                "patient_id": row["patient_id"],
+                "patient_name": _patient_name(names, row["patient_id"]),
+                "type": dict(type_) if type_ is not None else None,
+                "doctor": row["doctor_id"],
+                "doctor_name": doctor["name"] if doctor is not None else None,
+                "resources": [dict(r) for r in booked],
+                "room_name": room_name,
+                "resource_names": [
+                    r["name"] for r in booked if r["active"] and r["type"] != Resource.TYPE_ROOM
+                ],
+                "appointment_color": type_["color"] if type_ is not None else None,
+                "doctor_color": doctor["color"] if doctor is not None else None,
+                "start_time": _dt(row["start_time"]),
+                "end_time": _dt(row["end_time"]),
+                "status": row["status"],
+                "is_no_show": row["is_no_show"],
+                "notes": row["notes"],
+                "created_at": _dt(row["created_at"]),
+                "updated_at": _dt(row["updated_at"]),
+            }
+        )
+    return events
+
+
+def operation_events(qs: QuerySet) -> list[dict[str, Any]]:
+    """``OperationSerializer(qs, many=True).data`` without serializers."""
+    rows = list(qs.values(*OPERATION_COLUMNS))
+    if not rows:
+        return []
+
+    ids = [row["id"] for row in rows]
+    devices = _linked_resources(OperationDevice, "operation_id", ids)
+    resources = _resource_map(
+        [row["op_room_id"] for row in rows] + [rid for rids in devices.values() for rid in rids]
+    )
+    op_types = {
+        t["id"]: t
+        for t in OperationType.objects.using("default")
+        .filter(id__in={row["op_type_id"] for row in rows})
+        .values("id", "name", "color", "prep_duration", "op_duration", "post_duration")
+    }
+    team = _user_map(
+        uid
+        for row in rows
+        for uid in (row["primary_surgeon_id"], row["assistant_id"], row["anesthesist_id"])
+    )
+    names = _patient_names(row["patient_id"] for row in rows)
+
+    def member(user_id):
+        return dict(team[user_id]) if user_id in team else None
+
+    events = []
+    for row in rows:
+        op_type = op_types[row["op_type_id"]]
+        room = resources[row["op_room_id"]]
+        events.append(
+            {
+                "id": row["id"],
+                "patient_id": row["patient_id"],
+                "patient_name": (
+                    _patient_name(names, row["patient_id"]) if row["patient_id"] else ""
+                ),
+                "op_type": dict(op_type),
+                "op_room": dict(room),
+                "op_devices": [dict(resources[rid]) for rid in devices.get(row["id"], ())],
+                "team": {
+                    "primary_surgeon": member(row["primary_surgeon_id"]),
+                    "assistant": member(row["assistant_id"]),
+                    "anesthesist": member(row["anesthesist_id"]),
+                },
+                "start_time": _dt(row["start_time"]),
+                "end_time": _dt(row["end_time"]),
+                "color": op_type["color"],
+                "status": row["status"],
+                "notes": row["notes"],
+                "created_at": _dt(row["created_at"]),
+                "updated_at": _dt(row["updated_at"]),
+            }
+        )
+    return events
@@ -14,6 +14,19 @@ from django.utils import timezone
 from rest_framework import generics, status
 from rest_framework.response import Response
 
+from .calendar_payload import appointment_events, operation_events
+from .change_tracking import (
+    ABSENCES,
+    APPOINTMENTS,
+    BREAKS,
+    CONFIG,
+    OPERATIONS,
+    PATIENTS,
+    USERS,
+    day_keys,
+    table_keys,
+    validators_for,
+)
 from .models import (
     Appointment,
     AppointmentResource,
@@ -24,7 +37,7 @@ from .models import (
 )
 from .permissions import AppointmentPermission
 from .scheduling_facade import (
-    availability_for_range,
+    availability_for_doctors,
     doctor_display_name,
     get_active_doctors,
     resolve_doctor,
@@ -33,10 +46,11 @@ from .serializers import (
     AppointmentSerializer,
     DoctorAbsenceSerializer,
     DoctorBreakSerializer,
-    OperationSerializer,
     ResourceSerializer,
 )
 
+CALENDAR_DATED_TABLES = (APPOINTMENTS, OPERATIONS, ABSENCES, BREAKS)
+
 
 def _log_patient_action(user, action: str, patient_id: int | None = None, meta: dict | None = None):
     """Route audit logging through `praxi_backend.appointments.views.log_patient_action`.
@@ -142,6 +156,23 @@ class _CalendarBaseView(generics.GenericAPIView):
         range_start_date = local_start.date()
         range_end_date = local_end.date()
 
+        # Audited before the conditional check: a 304 is an access as well.
+        _log_patient_action(request.user, self.audit_action)
+        _log_patient_action(request.user, "doctor_substitution_list")
+
+        # Availability below skips past slots, so ranges containing today age.
+        today = timezone.localdate()
+        validators = validators_for(
+            request,
+            day_keys(CALENDAR_DATED_TABLES, range_start_date, range_end_date)
+            + table_keys(CONFIG, PATIENTS, USERS),
+            live=range_start_date <= today <= range_end_date,
+        )
+        if validators is not None:
+            not_modified = validators.not_modified(request)
+            if not_modified is not None:
+                return not_modified
+
         abs_qs = DoctorAbsence.objects.using("default").filter(
             active=True,
             start_date__lte=range_end_date,
@@ -216,13 +247,14 @@ class _CalendarBaseView(generics.GenericAPIView):
         else:
             doctors = get_active_doctors()
 
+        availability = availability_for_doctors(
+            doctors=doctors,
+            start_date=range_start_date,
+            end_date=range_end_date,
+            duration_minutes=30,
+        )
         for d in doctors:
-            av = availability_for_range(
-                doctor=d,
-                start_date=range_start_date,
-                end_date=range_end_date,
-                duration_minutes=30,
-            )
+            av = availability[d.id]
             available_doctors.append(
                 {
                     "id": d.id,
@@ -233,10 +265,7 @@ class _CalendarBaseView(generics.GenericAPIView):
                 }
             )
 
-        _log_patient_action(request.user, self.audit_action)
-        _log_patient_action(request.user, "doctor_substitution_list")
-
-        data = self.get_serializer(qs.order_by("start_time", "id"), many=True).data
+        data = appointment_events(qs.order_by("start_time", "id"))
 
         # Operations in the same calendar range
         op_qs = Operation.objects.using("default").filter(
@@ -263,12 +292,8 @@ class _CalendarBaseView(generics.GenericAPIView):
         if patient_id is not None:
             op_qs = op_qs.filter(patient_id=patient_id)
 
-        operations = OperationSerializer(
-            op_qs.order_by("start_time", "id"),
-            many=True,
-            context={"request": request},
-        ).data
-        return Response(
+        operations = operation_events(op_qs.order_by("start_time", "id"))
+        response = Response(
             {
                 "range_start": _iso_z(range_start),
                 "range_end": _iso_z(range_end_inclusive),
@@ -282,6 +307,7 @@ class _CalendarBaseView(generics.GenericAPIView):
             },
             status=status.HTTP_200_OK,
         )
+        return validators.apply(response) if validators is not None else response
 
 
 class CalendarDayView(_CalendarBaseView):
@@ -0,0 +1,325 @@
+"""praxi_backend.appointments.change_tracking
+
+Change watermarks and conditional GET for the polled calendar/live endpoints.
+
+The frontend polls ``/api/calendar/*``, ``/api/op-timeline/live/``,
+``/api/op-dashboard/live/`` and ``/api/patient-flow/live/``. Each poll used to
+recompute and re-serialize the whole payload even when nothing had changed.
+
+Watermarks:
+- Every write to a tracked model stores the current time under
+  ``praxi:changes:<table>``. Dated tables (appointments, operations, absences,
+  breaks) also store it under ``praxi:changes:<table>:<YYYY-MM-DD>`` for each
+  local date the row covers before and after the write, or under
+  ``praxi:changes:<table>:wide`` if it spans more than ``MAX_SPAN_DAYS``.
+- Writes inside a transaction bump again on commit, so a reader that saw the
+  first bump before the rows were visible does not keep a stale validator.
+- ``QuerySet.update()``/``bulk_create()`` send no signals; call
+  :func:`mark_changed` after such writes.
+- A missing watermark (never written, evicted, expired) is initialised with
+  the current time, so a lost key can only cause an extra full response,
+  never a wrong 304.
+
+Conditional GET:
+- Views build :class:`Validators` from the watermarks they depend on, the
+  user, the time zone and the full request path. ``ETag`` is a hash of those,
+  ``Last-Modified`` the newest watermark.
+- If the client's ``If-None-Match`` still matches, the view answers
+  ``304 Not Modified`` after a single ``get_many`` on the cache, without
+  running its queries (and without an audit entry, since no patient data is
+  sent). ``If-Modified-Since`` alone never produces a 304: ``Last-Modified``
+  only has whole seconds and would hide writes made in the same second.
+- Live payloads also depend on the clock (progress, waiting times, "running
+  now"); their validators include a ``LIVE_REFRESH_SECONDS`` time bucket.
+
+Settings:
+- ``PRAXI_CONDITIONAL_GET``: enable watermarks and validators (default off)
+- ``PRAXI_CHANGE_TRACKING_CACHE_ALIAS``: cache holding the watermarks. It must
+  be shared by all worker processes; with a per-process cache, writes served
+  by another process would go unnoticed.
+
+Architecture rules:
+- All DB access uses .using('default')
+"""
+
+from __future__ import annotations
+
+import hashlib
+import time as time_module
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections, transaction
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponseBase
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from praxi_backend.appointments.models import (
+    Appointment,
+    AppointmentResource,
+    AppointmentType,
+    DoctorAbsence,
+    DoctorBreak,
+    DoctorHours,
+    Operation,
+    OperationDevice,
+    OperationType,
+    PatientFlow,
+    PatientFlowTransition,
+    PracticeHours,
+    Resource,
+)
+from praxi_backend.appointments.original_values import original_values, track
+from praxi_backend.core.models import User
+from praxi_backend.patients.models import Patient
+
+CACHE_KEY_PREFIX = "praxi:changes"
+
+# Watermarks expire after a day; the next reader re-initialises them.
+WATERMARK_TIMEOUT = 24 * 60 * 60
+
+# Rows spanning more days than this bump the table's "wide" watermark instead.
+MAX_SPAN_DAYS = 62
+
+LIVE_REFRESH_SECONDS = 60
+
+APPOINTMENTS = "appointments"
+OPERATIONS = "operations"
+ABSENCES = "absences"
+BREAKS = "breaks"
+PATIENT_FLOW = "patient_flow"
+CONFIG = "config"
+PATIENTS = "patients"
+USERS = "users"
+
+
+def conditional_get_enabled() -> bool:
+    return bool(getattr(settings, "PRAXI_CONDITIONAL_GET", False))
+
+
+def _cache():
+    return caches[getattr(settings, "PRAXI_CHANGE_TRACKING_CACHE_ALIAS", "default")]
+
+
+def _key(table: str, scope: str | None = None) -> str:
+    return f"{CACHE_KEY_PREFIX}:{table}" if scope is None else f"{CACHE_KEY_PREFIX}:{table}:{scope}"
+
+
+# ---------------------------------------------------------------------------
+# Writing
+# ---------------------------------------------------------------------------
+
+
+def _bump(keys: list[str]) -> None:
+    now = time_module.time()
+    _cache().set_many({key: now for key in keys}, timeout=WATERMARK_TIMEOUT)
+
+
+def mark_changed(table: str, days: Iterable[date] | None = ()) -> None:
+    """Record a write to ``table`` touching the local ``days`` (None: unknown/wide)."""
+    if not conditional_get_enabled():
+        return
+    keys = [_key(table)]
+    if days is None:
+        keys.append(_key(table, "wide"))
+    else:
+        keys += [_key(table, d.isoformat()) for d in set(days)]
+    _bump(keys)
+    if connections["default"].in_atomic_block:
+        transaction.on_commit(lambda: _bump(keys), using="default")
+
+
+def _local_date(value) -> date | None:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+    return value
+
+
+def _span(first, last) -> set[date] | None:
+    """Local dates from ``first`` to ``last`` inclusive; None if too many."""
+    start, end = _local_date(first), _local_date(last)
+    if start is None and end is None:
+        return set()
+    start, end = start or end, end or start
+    if end < start:
+        start, end = end, start
+    if (end - start).days >= MAX_SPAN_DAYS:
+        return None
+    return {start + timedelta(days=i) for i in range((end - start).days + 1)}
+
+
+# Each dated model: its table and the fields holding the first and last covered day.
+DATED_MODELS: dict[type, tuple[str, tuple[str, str]]] = {
+    Appointment: (APPOINTMENTS, ("start_time", "end_time")),
+    Operation: (OPERATIONS, ("start_time", "end_time")),
+    DoctorAbsence: (ABSENCES, ("start_date", "end_date")),
+    DoctorBreak: (BREAKS, ("date", "date")),
+}
+
+
+def _days(model: type, values: dict) -> set[date] | None:
+    first, last = DATED_MODELS[model][1]
+    return _span(values.get(first), values.get(last))
+
+
+TABLE_MODELS: dict[type, str] = {
+    PatientFlow: PATIENT_FLOW,
+    PatientFlowTransition: PATIENT_FLOW,
+    PracticeHours: CONFIG,
+    DoctorHours: CONFIG,
+    AppointmentType: CONFIG,
+    OperationType: CONFIG,
+    Resource: CONFIG,
+    Patient: PATIENTS,
+    User: USERS,
+}
+
+
+def _dated_changed(sender, instance, **kwargs) -> None:
+    if not conditional_get_enabled():
+        return
+    new, old = _days(sender, instance.__dict__), _days(sender, original_values(instance))
+    mark_changed(DATED_MODELS[sender][0], None if new is None or old is None else new | old)
+
+
+def _table_changed(sender, instance, update_fields=None, **kwargs) -> None:
+    if not conditional_get_enabled():
+        return
+    # Logins only touch last_login, which no tracked payload contains.
+    if sender is User and update_fields is not None and set(update_fields) == {"last_login"}:
+        return
+    mark_changed(TABLE_MODELS[sender])
+
+
+def mark_booking_changed(booking: Appointment | Operation) -> None:
+    """Record a change to the resources or devices of ``booking``."""
+    if not conditional_get_enabled():
+        return
+    mark_changed(DATED_MODELS[type(booking)][0], _days(type(booking), booking.__dict__))
+
+
+def _booking_times(model: type, booking_id: int | None) -> set[date] | None:
+    times = (
+        model.objects.using("default")
+        .filter(pk=booking_id)
+        .values_list("start_time", "end_time")
+        .first()
+    )
+    return _span(*times) if times else set()
+
+
+def _appointment_resource_changed(sender, instance, **kwargs) -> None:
+    if conditional_get_enabled():
+        mark_changed(APPOINTMENTS, _booking_times(Appointment, instance.appointment_id))
+
+
+def _operation_device_changed(sender, instance, **kwargs) -> None:
+    if conditional_get_enabled():
+        mark_changed(OPERATIONS, _booking_times(Operation, instance.operation_id))
+
+
+def connect_signals() -> None:
+    """Bump watermarks on every write to a tracked model."""
+    for model, (_table, fields) in DATED_MODELS.items():
+        name = model.__name__
+        track(model, fields, conditional_get_enabled)
+        post_save.connect(_dated_changed, sender=model, dispatch_uid=f"changes_save_{name}")
+        post_delete.connect(_dated_changed, sender=model, dispatch_uid=f"changes_delete_{name}")
+    for model in TABLE_MODELS:
+        name = model.__name__
+        post_save.connect(_table_changed, sender=model, dispatch_uid=f"changes_save_{name}")
+        post_delete.connect(_table_changed, sender=model, dispatch_uid=f"changes_delete_{name}")
+    for model, receiver in (
+        (AppointmentResource, _appointment_resource_changed),
+        (OperationDevice, _operation_device_changed),
+    ):
+        name = model.__name__
+        post_save.connect(receiver, sender=model, dispatch_uid=f"changes_save_{name}")
+        post_delete.connect(receiver, sender=model, dispatch_uid=f"changes_delete_{name}")
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+
+def table_keys(*tables: str) -> list[str]:
+    """Watermark keys for any write to ``tables``."""
+    return [_key(table) for table in tables]
+
+
+def day_keys(tables: Iterable[str], start: date, end: date) -> list[str]:
+    """Watermark keys for writes to ``tables`` touching ``start``..``end``."""
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    keys = []
+    for table in tables:
+        keys.append(_key(table, "wide"))
+        keys += [_key(table, d.isoformat()) for d in days]
+    return keys
+
+
+def get_watermarks(keys: list[str]) -> dict[str, float]:
+    """Current watermark per key; missing ones are initialised with now."""
+    cache = _cache()
+    values = cache.get_many(keys)
+    missing = [key for key in keys if key not in values]
+    if missing:
+        now = time_module.time()
+        for key in missing:
+            cache.add(key, now, timeout=WATERMARK_TIMEOUT)
+        values.update(cache.get_many(missing))
+        for key in missing:
+            values.setdefault(key, now)
+    return values
+
+
+@dataclass(frozen=True)
+class Validators:
+    """``ETag`` and ``Last-Modified`` of one response."""
+
+    etag: str
+    last_modified: float
+
+    def not_modified(self, request) -> HttpResponseBase | None:
+        """A 304 response if the client's copy is current, else None.
+
+        Only ``If-None-Match`` is honoured: ``Last-Modified`` has whole-second
+        resolution, so ``If-Modified-Since`` would miss a write made in the
+        same second as the client's last fetch.
+        """
+        response = get_conditional_response(request, etag=self.etag)
+        return self.apply(response) if response is not None else None
+
+    def apply(self, response):
+        response["ETag"] = self.etag
+        response["Last-Modified"] = http_date(self.last_modified)
+        # Revalidate on every poll instead of heuristic caching from Last-Modified.
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+def validators_for(request, keys: list[str], *, live: bool = False) -> Validators | None:
+    """Validators for a response of ``request`` depending on ``keys``; None if disabled."""
+    if not conditional_get_enabled():
+        return None
+    values = get_watermarks(keys)
+    last_modified = max(values.values(), default=0.0)
+    parts = [
+        request.path,
+        sorted(request.GET.lists()),
+        getattr(request.user, "pk", None),
+        timezone.get_current_timezone_name(),
+        [values[key] for key in keys],
+    ]
+    if live:
+        bucket = int(time_module.time()) // LIVE_REFRESH_SECONDS * LIVE_REFRESH_SECONDS
+        parts.append(bucket)
+        last_modified = max(last_modified, float(bucket))
+    digest = hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()[:32]
+    return Validators(etag=f'W/"{digest}"', last_modified=last_modified)
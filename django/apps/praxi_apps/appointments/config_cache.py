@@ -0,0 +1,255 @@
+"""praxi_backend.appointments.config_cache
+
+Versioned cache for the static scheduling configuration.
+
+PracticeHours, DoctorHours, AppointmentType and OperationType rows change a
+few times a month but are read by every suggestion, validation and calendar
+request. This module keeps them as in-process snapshots, one per section,
+plus an optional copy in a Django cache backend so several worker processes
+share one load.
+
+Invalidation:
+- ``post_save``/``post_delete`` of the four models bump a version counter
+  (stored in the shared cache if configured, else per process). Snapshots of
+  an older version are ignored.
+- Inside a transaction that changed configuration, readers bypass the cache
+  (the snapshot would contain uncommitted rows); the version is bumped again
+  once the transaction commits.
+- ``QuerySet.update()``/``bulk_create()`` send no signals; call
+  :func:`invalidate_config_cache` after such writes. Snapshots also expire
+  after ``PRAXI_CONFIG_CACHE_TIMEOUT`` seconds.
+
+Settings:
+- ``PRAXI_CONFIG_CACHE_ALIAS``: Django cache alias for the shared copy
+  (None: in-process only)
+- ``PRAXI_CONFIG_CACHE_TIMEOUT``: snapshot lifetime in seconds
+
+Resources are not cached: they are validated and attached when appointments
+and operations are written, and a per-process snapshot could still hold a
+resource that another worker has just deactivated (or miss a new one).
+
+Returned dicts are shared between callers and must be treated as read-only;
+the ``get_*`` helpers return copies of model instances.
+
+Architecture rules:
+- All DB access uses .using('default')
+"""
+
+from __future__ import annotations
+
+import copy
+import threading
+import time as time_module
+from collections.abc import Callable
+from datetime import time
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections, transaction
+from django.db.models.signals import post_delete, post_save
+from praxi_backend.appointments.models import (
+    AppointmentType,
+    DoctorHours,
+    OperationType,
+    PracticeHours,
+)
+
+CACHE_KEY_PREFIX = "praxi:scheduling_config"
+VERSION_KEY = f"{CACHE_KEY_PREFIX}:version"
+
+CONFIG_MODELS = (PracticeHours, DoctorHours, AppointmentType, OperationType)
+
+Hours = list[tuple[time, time]]
+
+
+# ---------------------------------------------------------------------------
+# Section loaders
+# ---------------------------------------------------------------------------
+
+
+def _load_practice_hours() -> dict[int, Hours]:
+    hours: dict[int, Hours] = {}
+    for weekday, start_t, end_t in (
+        PracticeHours.objects.using("default")
+        .filter(active=True)
+        .order_by("weekday", "start_time", "id")
+        .values_list("weekday", "start_time", "end_time")
+    ):
+        hours.setdefault(weekday, []).append((start_t, end_t))
+    return hours
+
+
+def _load_doctor_hours() -> dict[int, dict[int, Hours]]:
+    hours: dict[int, dict[int, Hours]] = {}
+    for doctor_id, weekday, start_t, end_t in (
+        DoctorHours.objects.using("default")
+        .filter(active=True)
+        .order_by("doctor_id", "weekday", "start_time", "id")
+        .values_list("doctor_id", "weekday", "start_time", "end_time")
+    ):
+        hours.setdefault(doctor_id, {}).setdefault(weekday, []).append((start_t, end_t))
+    return hours
+
+
+def _load_appointment_types() -> dict[int, AppointmentType]:
+    return AppointmentType.objects.using("default").in_bulk()
+
+
+def _load_operation_types() -> dict[int, OperationType]:
+    return OperationType.objects.using("default").in_bulk()
+
+
+_LOADERS: dict[str, Callable[[], Any]] = {
+    "practice_hours": _load_practice_hours,
+    "doctor_hours": _load_doctor_hours,
+    "appointment_types": _load_appointment_types,
+    "operation_types": _load_operation_types,
+}
+
+
+# ---------------------------------------------------------------------------
+# Versioning
+# ---------------------------------------------------------------------------
+
+# section -> (version, loaded_at, value)
+_snapshots: dict[str, tuple[int, float, Any]] = {}
+_local_version = 0
+_pending = threading.local()
+
+
+def _shared_cache():
+    alias = getattr(settings, "PRAXI_CONFIG_CACHE_ALIAS", None)
+    return caches[alias] if alias else None
+
+
+def _timeout() -> int:
+    return int(getattr(settings, "PRAXI_CONFIG_CACHE_TIMEOUT", 300))
+
+
+def _initial_version() -> int:
+    # Start from the clock so an evicted counter never reuses old snapshot keys.
+    return int(time_module.time() * 1000)
+
+
+def config_version() -> int:
+    """Return the current configuration version."""
+    shared = _shared_cache()
+    if shared is None:
+        return _local_version
+    version = shared.get(VERSION_KEY)
+    if version is None:
+        shared.add(VERSION_KEY, _initial_version(), timeout=None)
+        version = shared.get(VERSION_KEY, 0)
+    return version
+
+
+def invalidate_config_cache() -> int:
+    """Drop all snapshots by bumping the version; return the new version."""
+    global _local_version
+    _local_version += 1
+    _snapshots.clear()
+    shared = _shared_cache()
+    if shared is None:
+        return _local_version
+    try:
+        return shared.incr(VERSION_KEY)
+    except ValueError:
+        # Counter missing (evicted or never set).
+        version = _initial_version()
+        shared.set(VERSION_KEY, version, timeout=None)
+        return version
+
+
+def _has_pending_changes() -> bool:
+    """True while the current transaction holds uncommitted configuration changes."""
+    if not getattr(_pending, "dirty", False):
+        return False
+    if connections["default"].in_atomic_block:
+        return True
+    # The transaction ended without commit (rollback): nothing is pending anymore.
+    _pending.dirty = False
+    return False
+
+
+def _on_commit() -> None:
+    _pending.dirty = False
+    invalidate_config_cache()
+
+
+def _config_changed(sender, **kwargs) -> None:
+    invalidate_config_cache()
+    if connections["default"].in_atomic_block:
+        _pending.dirty = True
+        # Another process may rebuild from the old rows before we commit.
+        transaction.on_commit(_on_commit, using="default")
+
+
+def connect_signals() -> None:
+    """Invalidate the cache whenever a configuration row is saved or deleted."""
+    for model in CONFIG_MODELS:
+        for signal in (post_save, post_delete):
+            signal.connect(
+                _config_changed,
+                sender=model,
+                dispatch_uid=f"config_cache_{model.__name__}_{signal is post_save}",
+            )
+
+
+def _section(name: str) -> Any:
+    if _has_pending_changes():
+        return _LOADERS[name]()
+
+    shared = _shared_cache()
+    version = config_version()
+    now = time_module.monotonic()
+    cached = _snapshots.get(name)
+    if cached is not None and cached[0] == version and now - cached[1] < _timeout():
+        return cached[2]
+
+    value = None
+    key = f"{CACHE_KEY_PREFIX}:{name}:{version}"
+    if shared is not None:
+        value = shared.get(key)
+    if value is None:
+        value = _LOADERS[name]()
+        if shared is not None:
+            shared.set(key, value, timeout=_timeout())
+    _snapshots[name] = (version, now, value)
+    return value
+
+
+# ---------------------------------------------------------------------------
+# Public accessors
+# ---------------------------------------------------------------------------
+
+
+def get_practice_hours() -> dict[int, Hours]:
+    """Active practice hours as ``{weekday: [(start, end), ...]}``, ordered by start."""
+    return _section("practice_hours")
+
+
+def get_doctor_hours() -> dict[int, dict[int, Hours]]:
+    """Active doctor hours as ``{doctor_id: {weekday: [(start, end), ...]}}``."""
+    return _section("doctor_hours")
+
+
+def hours_cover(hours: Hours, start_t: time, end_t: time) -> bool:
+    """True if a single ``(start, end)`` row of ``hours`` contains ``[start_t, end_t]``."""
+    return any(h_start <= start_t and h_end >= end_t for h_start, h_end in hours)
+
+
+def get_appointment_type(type_id: int | None, *, active_only: bool = False):
+    """Return a copy of the AppointmentType ``type_id`` or None."""
+    obj = _section("appointment_types").get(type_id)
+    if obj is None or (active_only and not obj.active):
+        return None
+    return copy.copy(obj)
+
+
+def get_operation_type(op_type_id: int | None, *, active_only: bool = False):
+    """Return a copy of the OperationType ``op_type_id`` or None."""
+    obj = _section("operation_types").get(op_type_id)
+    if obj is None or (active_only and not obj.active):
+        return None
+    return copy.copy(obj)
@@ -0,0 +1,93 @@
+"""Half-open interval algebra used by the slot engine.
+
+Intervals are ``(start, end)`` tuples with ``start < end`` and may hold any
+ordered values (datetimes, ints). A list returned by :func:`merge_intervals`
+is sorted and non-overlapping; the other helpers expect such lists.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+from typing import Any
+
+Interval = tuple[Any, Any]
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> list[Interval]:
+    """Return sorted, non-overlapping intervals; touching ones are joined.
+
+    Empty or inverted intervals (``end <= start``) are dropped.
+    """
+    merged: list[list[Any]] = []
+    for start, end in sorted(iv for iv in intervals if iv[0] < iv[1]):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def subtract_intervals(intervals: list[Interval], cuts: list[Interval]) -> list[Interval]:
+    """Return the parts of merged ``intervals`` not covered by merged ``cuts``."""
+    result: list[Interval] = []
+    i = 0
+    for start, end in intervals:
+        # Cuts ending before this interval can't affect it or any later one.
+        while i < len(cuts) and cuts[i][1] <= start:
+            i += 1
+        cursor = start
+        j = i
+        while j < len(cuts) and cuts[j][0] < end:
+            cut_start, cut_end = cuts[j]
+            if cut_start > cursor:
+                result.append((cursor, cut_start))
+            cursor = max(cursor, cut_end)
+            j += 1
+        if cursor < end:
+            result.append((cursor, end))
+    return result
+
+
+def intersects(intervals: list[Interval], start: Any, end: Any) -> bool:
+    """True if any merged interval overlaps ``[start, end)``."""
+    if start >= end:
+        return False
+    idx = bisect_right(intervals, (start, start))
+    if idx > 0 and intervals[idx - 1][1] > start:
+        return True
+    return idx < len(intervals) and intervals[idx][0] < end
+
+
+def blocked_start_indices(
+    busy: Iterable[tuple[datetime, datetime]],
+    *,
+    origin: datetime,
+    step: timedelta,
+    duration: timedelta,
+) -> list[tuple[int, int]]:
+    """Map busy intervals to blocked candidate indices.
+
+    Candidate ``k`` is the slot ``[origin + k*step, origin + k*step + duration)``;
+    it is blocked by a busy interval ``[s, e)`` iff its start lies in
+    ``(s - duration, e)``. Returns merged half-open index ranges, clipped at 0.
+    """
+    ranges = []
+    for busy_start, busy_end in busy:
+        lo = (busy_start - duration - origin) // step + 1
+        hi = -((origin - busy_end) // step)  # ceil((busy_end - origin) / step)
+        if hi > 0 and lo < hi:
+            ranges.append((max(lo, 0), hi))
+    return merge_intervals(ranges)
+
+
+def first_free_index(blocked: list[tuple[int, int]], last: int) -> int | None:
+    """Return the smallest index in ``[0, last]`` not covered by ``blocked``."""
+    candidate = 0
+    for lo, hi in blocked:
+        if lo > candidate:
+            break
+        candidate = max(candidate, hi)
+    return candidate if candidate <= last else None
@@ -12,15 +12,40 @@ Important constraints:
 
 from __future__ import annotations
 
+# Shared booked-time aggregation
+from praxi_backend.appointments.kpi.aggregation import (  # noqa: F401
+    BookedTime,
+    appointment_minutes,
+    appointment_minutes_by_period,
+    operation_minutes,
+    resource_minutes,
+)
 from praxi_backend.appointments.kpi.doctor_charts import get_all_doctor_charts  # noqa: F401
 
 # Doctors dashboard KPIs/charts
 from praxi_backend.appointments.kpi.doctor_kpis import (  # noqa: F401
+    calculate_doctor_activity,
+    calculate_doctor_utilizations,
+    calculate_new_patient_rates,
     get_active_doctors,
     get_all_doctor_kpis,
     get_doctor_comparison_data,
     get_doctor_profile,
 )
+
+# Concurrent KPI sections
+from praxi_backend.appointments.kpi.executor import (  # noqa: F401
+    get_kpi_section_timings,
+    run_kpi_sections,
+)
+from praxi_backend.appointments.kpi.first_visits import first_visits  # noqa: F401
+
+# Shared peak-load heatmap
+from praxi_backend.appointments.kpi.heatmap import (  # noqa: F401
+    HeatmapCube,
+    get_heatmap_cube,
+    get_last_30_days_cube,
+)
 from praxi_backend.appointments.kpi.main_charts import get_all_charts  # noqa: F401
 
 # Main dashboard KPIs/charts
@@ -37,12 +62,23 @@ from praxi_backend.appointments.kpi.patient_charts import get_all_patient_charts
 # Patient dashboard KPIs/charts
 from praxi_backend.appointments.kpi.patient_kpis import (  # noqa: F401
     calculate_patient_risk_score,
+    calculate_patient_risk_score_bulk,
     calculate_patient_status,
+    calculate_patient_status_bulk,
     get_all_patient_kpis,
     get_patient_overview_stats,
     get_patient_profile,
+    get_patient_profiles_bulk,
 )
 from praxi_backend.appointments.kpi.scheduling_charts import get_all_scheduling_charts  # noqa: F401
 
 # Scheduling dashboard KPIs/charts
 from praxi_backend.appointments.kpi.scheduling_kpis import get_all_scheduling_kpis  # noqa: F401
+
+# Cached snapshots (stale-while-revalidate)
+from praxi_backend.appointments.kpi.snapshots import (  # noqa: F401
+    get_kpi_cache_stats,
+    get_kpi_snapshot,
+    invalidate_kpi_snapshots,
+    register_kpi_snapshot,
+)
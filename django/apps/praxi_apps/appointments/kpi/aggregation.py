@@ -0,0 +1,248 @@
+"""Database-side aggregation of booked time for utilization KPIs.
+
+Booked minutes are summed in SQL (``Sum(F("end_time") - F("start_time"))``)
+instead of iterating model instances, so a utilization KPI costs one query
+per source table and scales with the number of groups, not the number of
+bookings.
+
+Groupings (``by=``):
+- ``None``: one total for the whole range
+- ``"doctor"``: appointment doctor / operation primary surgeon
+- ``"room"``: operation room
+- ``"day"``: local date of ``start_time``
+- ``"hour"``: local hour of ``start_time``
+
+Per-resource totals (rooms and devices, including appointment resources)
+come from :func:`resource_minutes`.
+
+Ranges filter on ``start_time`` (``start <= start_time <= end``), matching
+the KPI functions that consume them. ``statuses=None`` disables the status
+filter.
+
+Architecture rules:
+- All DB access uses .using('default')
+- PostgreSQL only
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from django.db.models import (
+    Count,
+    DurationField,
+    ExpressionWrapper,
+    F,
+    Q,
+    QuerySet,
+    Sum,
+)
+from django.db.models.functions import ExtractHour, TruncDate
+from praxi_backend.appointments.models import (
+    Appointment,
+    AppointmentResource,
+    Operation,
+    OperationDevice,
+    Resource,
+)
+
+ACTIVE_APPOINTMENT_STATUSES = ("scheduled", "confirmed", "completed")
+ACTIVE_OPERATION_STATUSES = ("planned", "confirmed", "running", "done")
+
+
+@dataclass(frozen=True)
+class BookedTime:
+    """Summed booking duration in minutes and the number of rows behind it."""
+
+    minutes: float = 0.0
+    count: int = 0
+
+    def __add__(self, other: BookedTime) -> BookedTime:
+        return BookedTime(self.minutes + other.minutes, self.count + other.count)
+
+    @property
+    def hours(self) -> float:
+        return self.minutes / 60
+
+
+def _duration(prefix: str = "") -> ExpressionWrapper:
+    return ExpressionWrapper(
+        F(f"{prefix}end_time") - F(f"{prefix}start_time"), output_field=DurationField()
+    )
+
+
+def _minutes(value: timedelta | None) -> float:
+    return value.total_seconds() / 60 if value else 0.0
+
+
+def _group_expression(by: str, prefix: str, columns: Mapping[str, str]):
+    if by == "day":
+        return TruncDate(f"{prefix}start_time")
+    if by == "hour":
+        return ExtractHour(f"{prefix}start_time")
+    if by in columns:
+        return F(columns[by])
+    raise ValueError(f"Unsupported grouping: {by!r}")
+
+
+def _range_filter(start: datetime | None, end: datetime | None, prefix: str = "") -> Q:
+    q = Q()
+    if start is not None:
+        q &= Q(**{f"{prefix}start_time__gte": start})
+    if end is not None:
+        q &= Q(**{f"{prefix}start_time__lte": end})
+    return q
+
+
+def _aggregate(
+    qs: QuerySet,
+    *,
+    by: str | None,
+    prefix: str = "",
+    columns: Mapping[str, str] | None = None,
+) -> BookedTime | dict[Any, BookedTime]:
+    """Sum durations of ``qs`` in one query, optionally grouped by ``by``."""
+    total = Sum(_duration(prefix))
+    if by is None:
+        row = qs.aggregate(total=total, count=Count("pk"))
+        return BookedTime(_minutes(row["total"]), row["count"])
+
+    key = _group_expression(by, prefix, columns or {})
+    rows = qs.values(key=key).annotate(total=total, count=Count("pk")).order_by()
+    return {row["key"]: BookedTime(_minutes(row["total"]), row["count"]) for row in rows}
+
+
+def _merge(*parts: Mapping[Any, BookedTime]) -> dict[Any, BookedTime]:
+    merged: dict[Any, BookedTime] = {}
+    for part in parts:
+        for key, booked in part.items():
+            merged[key] = merged.get(key, BookedTime()) + booked
+    return merged
+
+
+# ---------------------------------------------------------------------------
+# Appointments / Operations
+# ---------------------------------------------------------------------------
+
+
+def appointment_minutes(
+    start: datetime | None,
+    end: datetime | None,
+    *,
+    by: str | None = None,
+    statuses: Iterable[str] | None = ACTIVE_APPOINTMENT_STATUSES,
+    **filters: Any,
+) -> BookedTime | dict[Any, BookedTime]:
+    """Booked appointment minutes in ``[start, end]``; extra ``filters`` narrow the rows."""
+    qs = Appointment.objects.using("default").filter(_range_filter(start, end), **filters)
+    if statuses is not None:
+        qs = qs.filter(status__in=list(statuses))
+    return _aggregate(qs, by=by, columns={"doctor": "doctor_id"})
+
+
+def operation_minutes(
+    start: datetime | None,
+    end: datetime | None,
+    *,
+    by: str | None = None,
+    statuses: Iterable[str] | None = ACTIVE_OPERATION_STATUSES,
+    **filters: Any,
+) -> BookedTime | dict[Any, BookedTime]:
+    """Booked operation minutes in ``[start, end]``; extra ``filters`` narrow the rows."""
+    qs = Operation.objects.using("default").filter(_range_filter(start, end), **filters)
+    if statuses is not None:
+        qs = qs.filter(status__in=list(statuses))
+    return _aggregate(qs, by=by, columns={"doctor": "primary_surgeon_id", "room": "op_room_id"})
+
+
+def appointment_minutes_by_period(
+    periods: Mapping[str, tuple[datetime, datetime]],
+    *,
+    statuses: Iterable[str] | None = ACTIVE_APPOINTMENT_STATUSES,
+) -> dict[str, BookedTime]:
+    """Booked appointment minutes for several ranges in one conditional aggregate."""
+    qs = Appointment.objects.using("default")
+    if statuses is not None:
+        qs = qs.filter(status__in=list(statuses))
+
+    span = Q()
+    aggregates = {}
+    for name, (start, end) in periods.items():
+        in_period = _range_filter(start, end)
+        span |= in_period
+        aggregates[f"{name}__total"] = Sum(_duration(), filter=in_period)
+        aggregates[f"{name}__count"] = Count("pk", filter=in_period)
+    if not aggregates:
+        return {}
+
+    row = qs.filter(span).aggregate(**aggregates)
+    return {
+        name: BookedTime(_minutes(row[f"{name}__total"]), row[f"{name}__count"]) for name in periods
+    }
+
+
+# ---------------------------------------------------------------------------
+# Resources (rooms and devices)
+# ---------------------------------------------------------------------------
+
+
+def resource_minutes(
+    start: datetime | None,
+    end: datetime | None,
+    *,
+    resource_type: str | None = None,
+    appointment_statuses: Iterable[str] | None = ACTIVE_APPOINTMENT_STATUSES,
+    operation_statuses: Iterable[str] | None = ACTIVE_OPERATION_STATUSES,
+    include_operations: bool = True,
+) -> dict[int, BookedTime]:
+    """Booked minutes per resource id.
+
+    Appointment time counts for every linked resource. Operation time counts
+    for the operation room (rooms) and the operation devices (devices).
+    ``count`` is the number of booking rows behind each resource.
+    """
+    appt_rows = AppointmentResource.objects.using("default").filter(
+        _range_filter(start, end, "appointment__")
+    )
+    if resource_type is not None:
+        appt_rows = appt_rows.filter(resource__type=resource_type)
+    if appointment_statuses is not None:
+        appt_rows = appt_rows.filter(appointment__status__in=list(appointment_statuses))
+    parts = [
+        _aggregate(
+            appt_rows, by="resource", prefix="appointment__", columns={"resource": "resource_id"}
+        )
+    ]
+
+    if include_operations:
+        if resource_type in (None, Resource.TYPE_ROOM):
+            parts.append(
+                operation_minutes(
+                    start,
+                    end,
+                    by="room",
+                    statuses=operation_statuses,
+                    op_room__type=Resource.TYPE_ROOM,
+                )
+            )
+        if resource_type in (None, Resource.TYPE_DEVICE):
+            device_rows = OperationDevice.objects.using("default").filter(
+                _range_filter(start, end, "operation__"), resource__type=Resource.TYPE_DEVICE
+            )
+            if operation_statuses is not None:
+                device_rows = device_rows.filter(operation__status__in=list(operation_statuses))
+            parts.append(
+                _aggregate(
+                    device_rows,
+                    by="resource",
+                    prefix="operation__",
+                    columns={"resource": "resource_id"},
+                )
+            )
+
+    merged = _merge(*parts)
+    merged.pop(None, None)
+    return merged
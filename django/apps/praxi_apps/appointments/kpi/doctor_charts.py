@@ -15,9 +15,9 @@ from django.utils import timezone
 from praxi_backend.appointments.kpi.doctor_kpis import (
     _generate_demo_documentation,
     _generate_demo_satisfaction,
-    calculate_appointment_volume,
+    calculate_doctor_activity,
     calculate_doctor_utilization,
-    calculate_no_show_rate,
+    calculate_doctor_utilizations,
     calculate_treatment_duration,
     doctor_display_name,
     get_active_doctors,
@@ -71,15 +71,15 @@ def get_utilization_comparison_chart(days: int = 30) -> dict[str, Any]:
     doctors = get_active_doctors()
     end_date = date.today()
     start_date = end_date - timedelta(days=days)
+    utilizations = calculate_doctor_utilizations(doctors, start_date, end_date)
 
     labels = []
     utilization_data = []
     colors = []
 
     for doctor in doctors:
-        util = calculate_doctor_utilization(doctor, start_date, end_date)
         labels.append(doctor_display_name(doctor))
-        utilization_data.append(util["utilization"])
+        utilization_data.append(utilizations[doctor.id]["utilization"])
         colors.append(doctor.calendar_color or "#1E90FF")
 
     return {
@@ -141,13 +141,14 @@ def get_no_show_comparison_chart(days: int = 30) -> dict[str, Any]:
     doctors = get_active_doctors()
     end_date = date.today()
     start_date = end_date - timedelta(days=days)
+    activity = calculate_doctor_activity([d.id for d in doctors], start_date, end_date)
 
     labels = []
     no_show_data = []
     show_data = []
 
     for doctor in doctors:
-        ns = calculate_no_show_rate(doctor, start_date, end_date)
+        ns = activity[doctor.id]
         labels.append(doctor_display_name(doctor))
         no_show_data.append(ns["no_show_rate"])
         show_data.append(ns["show_rate"])
@@ -335,18 +336,19 @@ def get_documentation_comparison_chart(days: int = 30) -> dict[str, Any]:
 
 def get_new_patient_comparison_chart(days: int = 30) -> dict[str, Any]:
     """Generiert Tortendiagramm-Daten für Neupatienten vs. Bestandspatienten."""
-    from praxi_backend.appointments.kpi.doctor_kpis import calculate_new_patient_rate
+    from praxi_backend.appointments.kpi.doctor_kpis import calculate_new_patient_rates
 
     doctors = get_active_doctors()
     end_date = date.today()
     start_date = end_date - timedelta(days=days)
+    rates = calculate_new_patient_rates(doctors, start_date, end_date)
 
     labels = []
     new_data = []
     returning_data = []
 
     for doctor in doctors:
-        np = calculate_new_patient_rate(doctor, start_date, end_date)
+        np = rates[doctor.id]
         labels.append(doctor_display_name(doctor))
         new_data.append(np["new_patients"])
         returning_data.append(np["returning_patients"])
@@ -380,13 +382,14 @@ def get_doctor_ranking_table() -> list[dict]:
     doctors = get_active_doctors()
     end_date = date.today()
     start_date = end_date - timedelta(days=30)
+    utilizations = calculate_doctor_utilizations(doctors, start_date, end_date)
+    activity = calculate_doctor_activity([d.id for d in doctors], start_date, end_date)
 
     rankings = []
 
     for doctor in doctors:
-        util = calculate_doctor_utilization(doctor, start_date, end_date)
-        volume = calculate_appointment_volume(doctor, start_date, end_date)
-        no_show = calculate_no_show_rate(doctor, start_date, end_date)
+        util = utilizations[doctor.id]
+        volume = no_show = activity[doctor.id]
         satisfaction = _generate_demo_satisfaction(doctor.id)
         documentation = _generate_demo_documentation(doctor.id)
 
@@ -7,12 +7,21 @@ No logic changes intended.
 from __future__ import annotations
 
 import random
+from collections.abc import Iterable
 from datetime import date, datetime, timedelta
 from typing import Any
 
-from django.db.models import Count
+from django.db.models import Count, Q
 from django.db.models.functions import TruncDate
 from django.utils import timezone
+from praxi_backend.appointments.kpi.aggregation import (
+    ACTIVE_APPOINTMENT_STATUSES,
+    BookedTime,
+    appointment_minutes,
+)
+from praxi_backend.appointments.kpi.executor import run_kpi_sections
+from praxi_backend.appointments.kpi.first_visits import first_visits
+from praxi_backend.appointments.kpi.heatmap import get_heatmap_cube
 from praxi_backend.appointments.models import Appointment, DoctorAbsence, DoctorHours
 from praxi_backend.core.models import User
 
@@ -194,75 +203,74 @@ def _generate_demo_waiting_times(doctor_id: int) -> dict[str, Any]:
 # ============================================================================
 
 
-def calculate_doctor_utilization(doctor: User, start_date: date, end_date: date) -> dict[str, Any]:
-    """Berechnet die Auslastungsquote eines Arztes."""
+def calculate_doctor_utilizations(
+    doctors: Iterable[User], start_date: date, end_date: date
+) -> dict[int, dict[str, Any]]:
+    """Berechnet die Auslastungsquote mehrerer Ärzte in drei Abfragen."""
+    doctor_ids = [d.id for d in doctors]
     tz = timezone.get_current_timezone()
 
-    # Verfügbare Slots berechnen (basierend auf DoctorHours)
-    total_available_minutes = 0
-    current_date = start_date
-
-    while current_date <= end_date:
-        weekday = current_date.weekday()
-
-        # Prüfen ob Abwesenheit
-        is_absent = (
-            DoctorAbsence.objects.using("default")
-            .filter(
-                doctor=doctor,
-                active=True,
-                start_date__lte=current_date,
-                end_date__gte=current_date,
-            )
-            .exists()
-        )
-
-        if not is_absent:
-            # Arbeitszeiten des Arztes an diesem Wochentag
-            hours = DoctorHours.objects.using("default").filter(
-                doctor=doctor,
-                weekday=weekday,
-                active=True,
-            )
-
-            for h in hours:
-                start_dt = datetime.combine(current_date, h.start_time)
-                end_dt = datetime.combine(current_date, h.end_time)
-                minutes = (end_dt - start_dt).seconds // 60
-                total_available_minutes += minutes
-
-        current_date += timedelta(days=1)
+    # Arbeitszeiten (Minuten je Arzt und Wochentag)
+    weekday_minutes: dict[tuple[int, int], int] = {}
+    for h in DoctorHours.objects.using("default").filter(doctor_id__in=doctor_ids, active=True):
+        start_dt = datetime.combine(start_date, h.start_time)
+        end_dt = datetime.combine(start_date, h.end_time)
+        key = (h.doctor_id, h.weekday)
+        weekday_minutes[key] = weekday_minutes.get(key, 0) + (end_dt - start_dt).seconds // 60
+
+    # Abwesenheiten im Zeitraum
+    absences: dict[int, list[tuple[date, date]]] = {}
+    for absence in DoctorAbsence.objects.using("default").filter(
+        doctor_id__in=doctor_ids,
+        active=True,
+        start_date__lte=end_date,
+        end_date__gte=start_date,
+    ):
+        absences.setdefault(absence.doctor_id, []).append((absence.start_date, absence.end_date))
 
     # Gebuchte Slots
     start_dt = timezone.make_aware(datetime.combine(start_date, datetime.min.time()), tz)
     end_dt = timezone.make_aware(datetime.combine(end_date, datetime.max.time()), tz)
+    booked_by_doctor = appointment_minutes(start_dt, end_dt, by="doctor", doctor_id__in=doctor_ids)
+
+    utilizations = {}
+    for doctor_id in doctor_ids:
+        # Verfügbare Slots berechnen (basierend auf DoctorHours)
+        total_available_minutes = 0
+        current_date = start_date
+        while current_date <= end_date:
+            is_absent = any(
+                first <= current_date <= last for first, last in absences.get(doctor_id, ())
+            )
+            if not is_absent:
+                total_available_minutes += weekday_minutes.get(
+                    (doctor_id, current_date.weekday()), 0
+                )
+            current_date += timedelta(days=1)
+
+        booked = booked_by_doctor.get(doctor_id, BookedTime())
+        total_booked_minutes = int(booked.minutes)
+
+        # Auslastungsquote berechnen
+        if total_available_minutes > 0:
+            utilization = round(total_booked_minutes / total_available_minutes * 100, 1)
+        else:
+            utilization = 0
+
+        utilizations[doctor_id] = {
+            "utilization": min(100, utilization),
+            "available_minutes": total_available_minutes,
+            "booked_minutes": total_booked_minutes,
+            "available_hours": round(total_available_minutes / 60, 1),
+            "booked_hours": round(total_booked_minutes / 60, 1),
+            "appointment_count": booked.count,
+        }
+    return utilizations
 
-    appointments = Appointment.objects.using("default").filter(
-        doctor=doctor,
-        start_time__gte=start_dt,
-        start_time__lte=end_dt,
-        status__in=["scheduled", "confirmed", "completed"],
-    )
-
-    total_booked_minutes = 0
-    for appt in appointments:
-        duration = (appt.end_time - appt.start_time).seconds // 60
-        total_booked_minutes += duration
-
-    # Auslastungsquote berechnen
-    if total_available_minutes > 0:
-        utilization = round(total_booked_minutes / total_available_minutes * 100, 1)
-    else:
-        utilization = 0
 
-    return {
-        "utilization": min(100, utilization),
-        "available_minutes": total_available_minutes,
-        "booked_minutes": total_booked_minutes,
-        "available_hours": round(total_available_minutes / 60, 1),
-        "booked_hours": round(total_booked_minutes / 60, 1),
-        "appointment_count": appointments.count(),
-    }
+def calculate_doctor_utilization(doctor: User, start_date: date, end_date: date) -> dict[str, Any]:
+    """Berechnet die Auslastungsquote eines Arztes."""
+    return calculate_doctor_utilizations([doctor], start_date, end_date)[doctor.id]
 
 
 # ============================================================================
@@ -393,22 +401,12 @@ def calculate_treatment_duration(doctor: User, start_date: date, end_date: date)
     start_dt = timezone.make_aware(datetime.combine(start_date, datetime.min.time()), tz)
     end_dt = timezone.make_aware(datetime.combine(end_date, datetime.max.time()), tz)
 
-    completed = Appointment.objects.using("default").filter(
-        doctor=doctor,
-        start_time__gte=start_dt,
-        start_time__lte=end_dt,
-        status="completed",
-    )
-
-    durations = []
-    for appt in completed:
-        planned = (appt.end_time - appt.start_time).seconds // 60
-        durations.append(planned)
+    completed = appointment_minutes(start_dt, end_dt, statuses=["completed"], doctor=doctor)
 
-    if not durations:
+    if not completed.count:
         return {"avg_planned": 0, "avg_actual": 0, "efficiency": 100, "count": 0}
 
-    avg_planned = sum(durations) / len(durations)
+    avg_planned = completed.minutes / completed.count
 
     # Simulierte tatsächliche Dauer (leichte Variation)
     random.seed(doctor.id + 6000)
@@ -421,8 +419,8 @@ def calculate_treatment_duration(doctor: User, start_date: date, end_date: date)
         "avg_planned": round(avg_planned, 1),
         "avg_actual": round(avg_actual, 1),
         "efficiency": min(120, efficiency),
-        "count": len(durations),
-        "total_hours": round(sum(durations) / 60, 1),
+        "count": completed.count,
+        "total_hours": round(completed.hours, 1),
     }
 
 
@@ -431,56 +429,63 @@ def calculate_treatment_duration(doctor: User, start_date: date, end_date: date)
 # ============================================================================
 
 
-def calculate_new_patient_rate(doctor: User, start_date: date, end_date: date) -> dict[str, Any]:
-    """Berechnet den Anteil neuer Patienten."""
+def calculate_new_patient_rates(
+    doctors: Iterable[User], start_date: date, end_date: date
+) -> dict[int, dict[str, Any]]:
+    """Berechnet den Anteil neuer Patienten für mehrere Ärzte in zwei Abfragen.
+
+    Neu ist ein Patient, dessen erster Termin beim Arzt im Zeitraum liegt.
+    """
+    doctor_ids = [d.id for d in doctors]
     tz = timezone.get_current_timezone()
     start_dt = timezone.make_aware(datetime.combine(start_date, datetime.min.time()), tz)
     end_dt = timezone.make_aware(datetime.combine(end_date, datetime.max.time()), tz)
 
-    # Termine im Zeitraum
-    appointments = Appointment.objects.using("default").filter(
-        doctor=doctor,
-        start_time__gte=start_dt,
-        start_time__lte=end_dt,
-        status__in=["completed", "confirmed", "scheduled"],
+    # Patienten im Zeitraum je Arzt
+    patients_by_doctor: dict[int, set[int]] = {doctor_id: set() for doctor_id in doctor_ids}
+    pairs = (
+        Appointment.objects.using("default")
+        .filter(
+            doctor_id__in=doctor_ids,
+            start_time__gte=start_dt,
+            start_time__lte=end_dt,
+            status__in=["completed", "confirmed", "scheduled"],
+        )
+        .values_list("doctor_id", "patient_id")
+        .distinct()
     )
-
-    patient_ids = set(appointments.values_list("patient_id", flat=True))
-    total_patients = len(patient_ids)
-
-    if total_patients == 0:
-        return {
-            "new_patient_rate": 0,
-            "new_patients": 0,
-            "returning_patients": 0,
-            "total_patients": 0,
+    for doctor_id, patient_id in pairs:
+        patients_by_doctor[doctor_id].add(patient_id)
+
+    # Erster Termin je (Patient, Arzt)
+    all_patients = set().union(*patients_by_doctor.values())
+    first = first_visits(all_patients, doctor_ids=doctor_ids, per_doctor=True)
+
+    rates = {}
+    for doctor_id, patient_ids in patients_by_doctor.items():
+        total_patients = len(patient_ids)
+        if total_patients == 0:
+            rates[doctor_id] = {
+                "new_patient_rate": 0,
+                "new_patients": 0,
+                "returning_patients": 0,
+                "total_patients": 0,
+            }
+            continue
+
+        new_patients = sum(1 for pid in patient_ids if first[(pid, doctor_id)] >= start_dt)
+        rates[doctor_id] = {
+            "new_patient_rate": round(new_patients / total_patients * 100, 1),
+            "new_patients": new_patients,
+            "returning_patients": total_patients - new_patients,
+            "total_patients": total_patients,
         }
+    return rates
 
-    # Prüfen welche Patienten vorher schon Termine hatten
-    new_patients = 0
-    for patient_id in patient_ids:
-        had_previous = (
-            Appointment.objects.using("default")
-            .filter(
-                doctor=doctor,
-                patient_id=patient_id,
-                start_time__lt=start_dt,
-            )
-            .exists()
-        )
-
-        if not had_previous:
-            new_patients += 1
-
-    returning_patients = total_patients - new_patients
-    new_patient_rate = round(new_patients / total_patients * 100, 1)
 
-    return {
-        "new_patient_rate": new_patient_rate,
-        "new_patients": new_patients,
-        "returning_patients": returning_patients,
-        "total_patients": total_patients,
-    }
+def calculate_new_patient_rate(doctor: User, start_date: date, end_date: date) -> dict[str, Any]:
+    """Berechnet den Anteil neuer Patienten."""
+    return calculate_new_patient_rates([doctor], start_date, end_date)[doctor.id]
 
 
 # ============================================================================
@@ -490,25 +495,10 @@ def calculate_new_patient_rate(doctor: User, start_date: date, end_date: date) -
 
 def calculate_peak_times(doctor: User, start_date: date, end_date: date) -> dict[str, Any]:
     """Berechnet Peak-Times als Heatmap (Wochentag × Stunde)."""
-    tz = timezone.get_current_timezone()
-    start_dt = timezone.make_aware(datetime.combine(start_date, datetime.min.time()), tz)
-    end_dt = timezone.make_aware(datetime.combine(end_date, datetime.max.time()), tz)
-
-    appointments = Appointment.objects.using("default").filter(
-        doctor=doctor,
-        start_time__gte=start_dt,
-        start_time__lte=end_dt,
-        status__in=["completed", "confirmed", "scheduled"],
-    )
-
     # Matrix: 7 Tage × 24 Stunden
-    matrix = [[0 for _ in range(24)] for _ in range(7)]
-
-    for appt in appointments:
-        local_time = timezone.localtime(appt.start_time)
-        weekday = local_time.weekday()
-        hour = local_time.hour
-        matrix[weekday][hour] += 1
+    matrix = get_heatmap_cube(start_date, end_date).matrix(
+        doctor_id=doctor.id, statuses=ACTIVE_APPOINTMENT_STATUSES
+    )
 
     # Nur relevante Stunden (8-18)
     working_hours = list(range(8, 19))
@@ -572,6 +562,101 @@ def get_doctor_profile(doctor: User) -> dict[str, Any]:
     }
 
 
+# ============================================================================
+# Gebündelte Kennzahlen für den Arztvergleich
+# ============================================================================
+
+
+def calculate_doctor_activity(
+    doctor_ids: Iterable[int], start_date: date, end_date: date
+) -> dict[int, dict[str, Any]]:
+    """Terminvolumen, No-Show- und Stornoquote mehrerer Ärzte in einer Abfrage.
+
+    Die Werte entsprechen :func:`calculate_appointment_volume`,
+    :func:`calculate_no_show_rate` und :func:`calculate_cancellation_rate`.
+    """
+    doctor_ids = list(doctor_ids)
+    tz = timezone.get_current_timezone()
+    now = timezone.now()
+    start_dt = timezone.make_aware(datetime.combine(start_date, datetime.min.time()), tz)
+    end_dt = timezone.make_aware(datetime.combine(end_date, datetime.max.time()), tz)
+
+    in_range = Q(start_time__lte=end_dt)
+    past = Q(start_time__lt=now)
+    rows = (
+        Appointment.objects.using("default")
+        .filter(doctor_id__in=doctor_ids, start_time__gte=start_dt)
+        .filter(in_range | past)
+        .annotate(day=TruncDate("start_time"))
+        .values("doctor_id", "day")
+        .annotate(
+            total=Count("id", filter=in_range),
+            completed=Count("id", filter=in_range & Q(status="completed")),
+            cancelled=Count("id", filter=in_range & Q(status="cancelled")),
+            active=Count(
+                "id", filter=in_range & Q(status__in=["completed", "confirmed", "scheduled"])
+            ),
+            past_total=Count("id", filter=past),
+            past_completed=Count("id", filter=past & Q(status="completed")),
+            past_no_shows=Count(
+                "id",
+                filter=past
+                & (Q(is_no_show=True) | Q(is_no_show=False, status__in=["scheduled", "confirmed"])),
+            ),
+        )
+        .order_by()
+    )
+
+    sums: dict[int, dict[str, int]] = {
+        doctor_id: {
+            "total": 0,
+            "completed": 0,
+            "cancelled": 0,
+            "active": 0,
+            "active_days": 0,
+            "past_total": 0,
+            "past_completed": 0,
+            "past_no_shows": 0,
+        }
+        for doctor_id in doctor_ids
+    }
+    for row in rows:
+        doctor_sums = sums[row["doctor_id"]]
+        for key in (
+            "total",
+            "completed",
+            "cancelled",
+            "active",
+            "past_total",
+            "past_completed",
+            "past_no_shows",
+        ):
+            doctor_sums[key] += row[key]
+        if row["active"]:
+            doctor_sums["active_days"] += 1
+
+    activity = {}
+    for doctor_id, doctor_sums in sums.items():
+        total = doctor_sums["total"]
+        active_days = doctor_sums["active_days"]
+        no_show_rate = round(
+            doctor_sums["past_no_shows"] / max(1, doctor_sums["past_total"]) * 100, 1
+        )
+        activity[doctor_id] = {
+            "total": total,
+            "completed": doctor_sums["completed"],
+            "cancelled": doctor_sums["cancelled"],
+            "avg_per_day": round(doctor_sums["active"] / active_days, 1) if active_days else 0,
+            "completion_rate": round(doctor_sums["completed"] / max(1, total) * 100, 1),
+            "cancellation_rate": round(doctor_sums["cancelled"] / max(1, total) * 100, 1),
+            "no_show_rate": no_show_rate,
+            "show_rate": round(100 - no_show_rate, 1),
+            "no_show_count": doctor_sums["past_no_shows"],
+            "total_past": doctor_sums["past_total"],
+        }
+    return activity
+
+
 # ============================================================================
 # Gesamtauswertung für einen Arzt
 # ============================================================================
@@ -587,14 +672,21 @@ def get_all_doctor_kpis(doctor_id: int, days: int = 30) -> dict[str, Any]:
     end_date = date.today()
     start_date = end_date - timedelta(days=days)
 
-    profile = get_doctor_profile(doctor)
-    utilization = calculate_doctor_utilization(doctor, start_date, end_date)
-    volume = calculate_appointment_volume(doctor, start_date, end_date)
-    no_show = calculate_no_show_rate(doctor, start_date, end_date)
-    cancellation = calculate_cancellation_rate(doctor, start_date, end_date)
-    duration = calculate_treatment_duration(doctor, start_date, end_date)
-    new_patients = calculate_new_patient_rate(doctor, start_date, end_date)
-    peak_times = calculate_peak_times(doctor, start_date, end_date)
+    run = run_kpi_sections(
+        "doctor",
+        {
+            "profile": lambda: get_doctor_profile(doctor),
+            "utilization": lambda: calculate_doctor_utilization(doctor, start_date, end_date),
+            "volume": lambda: calculate_appointment_volume(doctor, start_date, end_date),
+            "no_show": lambda: calculate_no_show_rate(doctor, start_date, end_date),
+            "cancellation": lambda: calculate_cancellation_rate(doctor, start_date, end_date),
+            "duration": lambda: calculate_treatment_duration(doctor, start_date, end_date),
+            "new_patients": lambda: calculate_new_patient_rate(doctor, start_date, end_date),
+            "peak_times": lambda: calculate_peak_times(doctor, start_date, end_date),
+        },
+        variant=f"{doctor_id}:{days}",
+    )
+    values = run.values
 
     # Demo-Daten
     satisfaction = _generate_demo_satisfaction(doctor_id)
@@ -603,19 +695,19 @@ def get_all_doctor_kpis(doctor_id: int, days: int = 30) -> dict[str, Any]:
     waiting_times = _generate_demo_waiting_times(doctor_id)
 
     return {
-        "profile": profile,
+        "profile": values["profile"],
         "period": {
             "start_date": start_date.isoformat(),
             "end_date": end_date.isoformat(),
             "days": days,
         },
-        "utilization": utilization,
-        "volume": volume,
-        "no_show": no_show,
-        "cancellation": cancellation,
-        "duration": duration,
-        "new_patients": new_patients,
-        "peak_times": peak_times,
+        "utilization": values["utilization"],
+        "volume": values["volume"],
+        "no_show": values["no_show"],
+        "cancellation": values["cancellation"],
+        "duration": values["duration"],
+        "new_patients": values["new_patients"],
+        "peak_times": values["peak_times"],
         "satisfaction": satisfaction,
         "documentation": documentation,
         "services": services,
@@ -629,35 +721,39 @@ def get_all_doctor_kpis(doctor_id: int, days: int = 30) -> dict[str, Any]:
 
 
 def get_doctor_comparison_data(days: int = 30) -> dict[str, Any]:
-    """Sammelt Vergleichsdaten für alle Ärzte."""
+    """Sammelt Vergleichsdaten für alle Ärzte.
+
+    Alle Kennzahlen werden gebündelt für alle Ärzte berechnet; die Anzahl der
+    Abfragen hängt nicht von der Anzahl der Ärzte ab.
+    """
     doctors = get_active_doctors()
     end_date = date.today()
     start_date = end_date - timedelta(days=days)
 
+    doctor_ids = [d.id for d in doctors]
+    utilizations = calculate_doctor_utilizations(doctors, start_date, end_date)
+    activity = calculate_doctor_activity(doctor_ids, start_date, end_date)
+    new_patients = calculate_new_patient_rates(doctors, start_date, end_date)
+
     comparison = []
 
     for doctor in doctors:
-        profile = get_doctor_profile(doctor)
-        utilization = calculate_doctor_utilization(doctor, start_date, end_date)
-        volume = calculate_appointment_volume(doctor, start_date, end_date)
-        no_show = calculate_no_show_rate(doctor, start_date, end_date)
-        cancellation = calculate_cancellation_rate(doctor, start_date, end_date)
-        new_patients = calculate_new_patient_rate(doctor, start_date, end_date)
+        volume = activity[doctor.id]
         satisfaction = _generate_demo_satisfaction(doctor.id)
         documentation = _generate_demo_documentation(doctor.id)
 
         comparison.append(
             {
                 "doctor_id": doctor.id,
-                "name": profile["name"],
-                "color": profile["calendar_color"],
-                "utilization": utilization["utilization"],
+                "name": doctor_display_name(doctor),
+                "color": doctor.calendar_color or "#1E90FF",
+                "utilization": utilizations[doctor.id]["utilization"],
                 "appointments": volume["total"],
                 "completed": volume["completed"],
                 "avg_per_day": volume["avg_per_day"],
-                "no_show_rate": no_show["no_show_rate"],
-                "cancellation_rate": cancellation["cancellation_rate"],
-                "new_patient_rate": new_patients["new_patient_rate"],
+                "no_show_rate": volume["no_show_rate"],
+                "cancellation_rate": volume["cancellation_rate"],
+                "new_patient_rate": new_patients[doctor.id]["new_patient_rate"],
                 "satisfaction_score": satisfaction["score"],
                 "documentation_compliance": documentation["compliance_rate"],
             }
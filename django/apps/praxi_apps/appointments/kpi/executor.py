@@ -0,0 +1,197 @@
+"""Concurrent execution of independent KPI sections.
+
+The ``get_all_*`` aggregators call a dozen independent, read-only KPI
+functions. :func:`run_kpi_sections` runs them on a bounded thread pool so a
+dashboard takes as long as its slowest section instead of the sum:
+
+- Each section runs in a pool thread with that thread's own database
+  connection. It is kept between sections and closed like a request's
+  connection: when unusable or older than ``CONN_MAX_AGE``.
+- The caller waits at most ``PRAXI_KPI_SECTION_TIMEOUT`` seconds. Sections
+  still running then are replaced by their last successful value (kept in
+  the KPI cache for ``PRAXI_KPI_CACHE_STALE_TTL`` seconds) or by the
+  section's empty value.
+- Exceptions propagate to the caller, as with sequential execution.
+- Per-section timings and outcomes of parallel runs are logged and kept in the KPI cache;
+  see :func:`get_kpi_section_timings` and ``manage.py kpi_cache_stats``.
+- Timed-out sections are reported to :func:`collect_timeouts`, so callers
+  that cache the combined result (KPI snapshots) can skip storing it.
+
+Sections run sequentially in the calling thread when
+``PRAXI_KPI_PARALLEL_WORKERS`` is below 2, or when the caller is inside a
+transaction: other connections cannot see its uncommitted rows.
+
+Architecture rules:
+- All DB access uses .using('default')
+- PostgreSQL only
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterator, Mapping
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import close_old_connections, connections
+from django.utils import timezone, translation
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = "praxi:kpi_section"
+TIMINGS_KEY = f"{CACHE_KEY_PREFIX}:timings"
+
+STATUS_OK = "ok"
+STATUS_TIMEOUT = "timeout"
+
+_pool: ThreadPoolExecutor | None = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+_timeouts = threading.local()
+
+
+@dataclass
+class KpiRun:
+    """Outcome of :func:`run_kpi_sections`."""
+
+    values: dict[str, Any] = field(default_factory=dict)
+    timings: dict[str, float] = field(default_factory=dict)
+    status: dict[str, str] = field(default_factory=dict)
+
+
+def _workers() -> int:
+    return int(getattr(settings, "PRAXI_KPI_PARALLEL_WORKERS", 0))
+
+
+def _timeout() -> float:
+    return float(getattr(settings, "PRAXI_KPI_SECTION_TIMEOUT", 10))
+
+
+def _cache():
+    return caches[getattr(settings, "PRAXI_KPI_CACHE_ALIAS", "default")]
+
+
+def _fallback_ttl() -> int:
+    return int(getattr(settings, "PRAXI_KPI_CACHE_STALE_TTL", 300))
+
+
+def _value_key(label: str, variant: str, name: str) -> str:
+    return f"{CACHE_KEY_PREFIX}:{label}:{variant}:{name}"
+
+
+def _get_pool(workers: int) -> ThreadPoolExecutor:
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="kpi-section")
+            _pool_workers = workers
+        return _pool
+
+
+def _run_section(fn: Callable[[], Any], tz, language: str | None) -> tuple[Any, float]:
+    """Pool-thread wrapper: caller's timezone/language, own DB connection."""
+    close_old_connections()
+    started = time.perf_counter()
+    try:
+        with timezone.override(tz), translation.override(language):
+            return fn(), (time.perf_counter() - started) * 1000.0
+    finally:
+        close_old_connections()
+
+
+def _record(label: str, run: KpiRun) -> None:
+    for name, ms in run.timings.items():
+        logger.debug("timing %s.%s: %.3fms (%s)", label, name, ms, run.status[name])
+    # One key holding the last run per aggregator. Best-effort stats: concurrent
+    # runs may overwrite each other's entries.
+    cache = _cache()
+    timings = cache.get(TIMINGS_KEY) or {}
+    timings[label] = {
+        name: {"ms": round(ms, 1), "status": run.status[name]} for name, ms in run.timings.items()
+    }
+    cache.set(TIMINGS_KEY, timings, timeout=None)
+
+
+@contextmanager
+def collect_timeouts() -> Iterator[list[str]]:
+    """Collect ``"label.section"`` of sections that time out in this thread."""
+    outer = getattr(_timeouts, "names", None)
+    names: list[str] = []
+    _timeouts.names = names
+    try:
+        yield names
+    finally:
+        _timeouts.names = outer
+        if outer is not None:
+            outer.extend(names)
+
+
+def get_kpi_section_timings() -> dict[str, dict[str, dict[str, Any]]]:
+    """Return ``{aggregator label: {section: {"ms", "status"}}}`` of the last runs."""
+    return _cache().get(TIMINGS_KEY) or {}
+
+
+def run_kpi_sections(
+    label: str,
+    sections: Mapping[str, Callable[[], Any]],
+    *,
+    empty: Mapping[str, Any] | None = None,
+    variant: str = "",
+) -> KpiRun:
+    """Run independent ``sections`` and return their values keyed by name.
+
+    ``label`` names the aggregator in timings and logs. ``variant`` identifies
+    the parameters (doctor, period) so fallback values never cross them.
+    ``empty`` gives the value of a timed-out section that has never completed
+    before (default ``None``).
+    """
+    empty = empty or {}
+    run = KpiRun()
+    workers = _workers()
+
+    if workers < 2 or connections["default"].in_atomic_block:
+        for name, fn in sections.items():
+            started = time.perf_counter()
+            run.values[name] = fn()
+            run.timings[name] = (time.perf_counter() - started) * 1000.0
+            run.status[name] = STATUS_OK
+        return run
+
+    pool = _get_pool(workers)
+    tz = timezone.get_current_timezone()
+    language = translation.get_language()
+    futures: dict[str, Future] = {
+        name: pool.submit(_run_section, fn, tz, language) for name, fn in sections.items()
+    }
+    wait(futures.values(), timeout=_timeout())
+
+    cache = _cache()
+    for name, future in futures.items():
+        if future.done():
+            value, ms = future.result()
+            run.values[name] = value
+            run.timings[name] = ms
+            run.status[name] = STATUS_OK
+            cache.set(_value_key(label, variant, name), value, timeout=_fallback_ttl())
+            continue
+
+        # Not started yet: drop it. Running: let it finish in the background.
+        future.cancel()
+        logger.warning("KPI section %s.%s timed out; serving fallback", label, name)
+        cached = cache.get(_value_key(label, variant, name))
+        run.values[name] = cached if cached is not None else empty.get(name)
+        run.timings[name] = _timeout() * 1000.0
+        run.status[name] = STATUS_TIMEOUT
+        if getattr(_timeouts, "names", None) is not None:
+            _timeouts.names.append(f"{label}.{name}")
+
+    _record(label, run)
+    return run
@@ -0,0 +1,48 @@
+"""First-visit index for new-versus-returning patient KPIs.
+
+A patient is "new" in a period if their first appointment (any status) lies
+inside it. Instead of one ``.exists()`` query per patient, the first
+appointment of every requested patient (optionally per doctor) is loaded
+with a single ``Min("start_time")`` grouped query.
+
+Architecture rules:
+- All DB access uses .using('default')
+- PostgreSQL only
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import datetime
+from typing import Any
+
+from django.db.models import Min, QuerySet
+from praxi_backend.appointments.models import Appointment
+
+
+def first_visits(
+    patient_ids: Iterable[int] | QuerySet,
+    *,
+    doctor_ids: Iterable[int] | None = None,
+    per_doctor: bool = False,
+) -> dict[Any, datetime]:
+    """Return the first appointment start per patient in one query.
+
+    Keys are ``patient_id``, or ``(patient_id, doctor_id)`` with ``per_doctor``.
+    ``patient_ids`` may be a ``values("patient_id")`` queryset, which is
+    inlined as a subquery. ``doctor_ids`` limits the appointments considered.
+    """
+    if not isinstance(patient_ids, QuerySet):
+        patient_ids = list(patient_ids)
+        if not patient_ids:
+            return {}
+
+    qs = Appointment.objects.using("default").filter(patient_id__in=patient_ids)
+    if doctor_ids is not None:
+        qs = qs.filter(doctor_id__in=list(doctor_ids))
+
+    fields = ("patient_id", "doctor_id") if per_doctor else ("patient_id",)
+    rows = qs.values(*fields).annotate(first=Min("start_time")).order_by()
+    if per_doctor:
+        return {(row["patient_id"], row["doctor_id"]): row["first"] for row in rows}
+    return {row["patient_id"]: row["first"] for row in rows}
@@ -0,0 +1,172 @@
+"""Shared peak-load heatmap for the KPI dashboards.
+
+Peak hours, peak days, the weekday × hour heatmaps and the per-doctor peak
+times are all derived from one count cube per period instead of running
+their own ExtractHour/ExtractWeekDay aggregations:
+
+- :func:`get_heatmap_cube` loads the appointment counts per (weekday, hour,
+  doctor, room, status) of the local dates ``[start, end]`` with one grouped
+  query (from ``DailyBookingRollup`` while ``PRAXI_KPI_ROLLUPS`` is enabled).
+- Weekday and hour are local time; weekdays are 0=Monday … 6=Sunday.
+- ``room`` is the lowest room resource of the appointment, as in the rollups.
+- Cubes are kept in the KPI cache for ``PRAXI_KPI_CACHE_TTL`` seconds per
+  period. Inside a transaction they are computed directly and never stored.
+
+Architecture rules:
+- All DB access uses .using('default')
+- PostgreSQL only
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import ExtractHour, ExtractIsoWeekDay
+from django.utils import timezone
+from praxi_backend.appointments.kpi.rollups import flush_rollups, rollups_enabled
+from praxi_backend.appointments.models import (
+    Appointment,
+    AppointmentResource,
+    DailyBookingRollup,
+    Resource,
+)
+
+CACHE_KEY_PREFIX = "praxi:kpi_heatmap"
+
+DAY_NAMES = ["Mo", "Di", "Mi", "Do", "Fr", "Sa", "So"]
+
+
+@dataclass(frozen=True)
+class HeatmapCube:
+    """Appointment counts keyed by ``(weekday, hour, doctor_id, room_id, status)``."""
+
+    start: date
+    end: date
+    cells: dict[tuple[int, int, int | None, int | None, str], int] = field(default_factory=dict)
+
+    def _cells(self, doctor_id: int | None, room_id: int | None, statuses: Iterable[str] | None):
+        wanted = set(statuses) if statuses is not None else None
+        for (weekday, hour, doctor, room, status), count in self.cells.items():
+            if doctor_id is not None and doctor != doctor_id:
+                continue
+            if room_id is not None and room != room_id:
+                continue
+            if wanted is not None and status not in wanted:
+                continue
+            yield weekday, hour, count
+
+    def matrix(
+        self,
+        *,
+        doctor_id: int | None = None,
+        room_id: int | None = None,
+        statuses: Iterable[str] | None = None,
+    ) -> list[list[int]]:
+        """7 × 24 matrix ``[weekday][hour]`` of the matching appointments."""
+        matrix = [[0] * 24 for _ in range(7)]
+        for weekday, hour, count in self._cells(doctor_id, room_id, statuses):
+            matrix[weekday][hour] += count
+        return matrix
+
+    def by_hour(self, **filters) -> dict[int, int]:
+        """``{hour: count}`` for hours with appointments, in hour order."""
+        totals = [sum(column) for column in zip(*self.matrix(**filters))]
+        return {hour: count for hour, count in enumerate(totals) if count}
+
+    def by_weekday(self, **filters) -> list[int]:
+        """Appointment counts per weekday (0=Monday)."""
+        return [sum(row) for row in self.matrix(**filters)]
+
+
+def _cache():
+    return caches[getattr(settings, "PRAXI_KPI_CACHE_ALIAS", "default")]
+
+
+def _ttl() -> int:
+    return int(getattr(settings, "PRAXI_KPI_CACHE_TTL", 60))
+
+
+def _day_start(day: date) -> datetime:
+    return timezone.make_aware(datetime.combine(day, time.min), timezone.get_current_timezone())
+
+
+def _cells_from_bookings(start: date, end: date) -> dict:
+    first_room = (
+        AppointmentResource.objects.using("default")
+        .filter(appointment=OuterRef("pk"), resource__type=Resource.TYPE_ROOM)
+        .order_by("resource_id")
+        .values("resource_id")[:1]
+    )
+    rows = (
+        Appointment.objects.using("default")
+        .filter(
+            start_time__gte=_day_start(start),
+            start_time__lt=_day_start(end + timedelta(days=1)),
+        )
+        .annotate(
+            cube_weekday=ExtractIsoWeekDay("start_time"),
+            cube_hour=ExtractHour("start_time"),
+            cube_room=Subquery(first_room),
+        )
+        .values("cube_weekday", "cube_hour", "doctor_id", "cube_room", "status")
+        .annotate(cube_count=Count("pk"))
+        .order_by()
+    )
+    return {
+        (
+            row["cube_weekday"] - 1,
+            row["cube_hour"],
+            row["doctor_id"],
+            row["cube_room"],
+            row["status"],
+        ): row["cube_count"]
+        for row in rows
+    }
+
+
+def _cells_from_rollups(start: date, end: date) -> dict:
+    flush_rollups()
+    rows = (
+        DailyBookingRollup.objects.using("default")
+        .filter(kind=DailyBookingRollup.KIND_APPOINTMENT, date__gte=start, date__lte=end)
+        .values("date", "hour", "doctor_id", "room_id", "status")
+        .annotate(cube_count=Sum("count"))
+        .order_by()
+    )
+    cells: dict = {}
+    for row in rows:
+        key = (row["date"].weekday(), row["hour"], row["doctor_id"], row["room_id"], row["status"])
+        cells[key] = cells.get(key, 0) + row["cube_count"]
+    return cells
+
+
+def _compute(start: date, end: date) -> HeatmapCube:
+    if rollups_enabled():
+        return HeatmapCube(start, end, _cells_from_rollups(start, end))
+    return HeatmapCube(start, end, _cells_from_bookings(start, end))
+
+
+def get_heatmap_cube(start: date, end: date) -> HeatmapCube:
+    """Return the heatmap cube of the local dates ``[start, end]``."""
+    if connections["default"].in_atomic_block:
+        return _compute(start, end)
+
+    key = f"{CACHE_KEY_PREFIX}:{timezone.get_current_timezone_name()}:{start}:{end}"
+    cache = _cache()
+    cube = cache.get(key)
+    if cube is None:
+        cube = _compute(start, end)
+        cache.set(key, cube, timeout=_ttl())
+    return cube
+
+
+def get_last_30_days_cube() -> HeatmapCube:
+    """Cube of the last 30 local days including today (the dashboards' default)."""
+    today = timezone.localdate()
+    return get_heatmap_cube(today - timedelta(days=29), today)
@@ -13,6 +13,8 @@ from typing import Any
 from django.db.models import Count
 from django.db.models.functions import TruncDate
 from django.utils import timezone
+from praxi_backend.appointments.kpi.heatmap import DAY_NAMES, get_last_30_days_cube
+from praxi_backend.appointments.kpi.rollups import rollup_totals, rollups_enabled
 from praxi_backend.appointments.models import Appointment, Operation
 from praxi_backend.core.utils import timed_block
 
@@ -25,17 +27,21 @@ def get_appointments_per_day(days: int = 30) -> dict[str, Any]:
     start_date = (now - timedelta(days=days - 1)).replace(hour=0, minute=0, second=0, microsecond=0)
 
     # Termine gruppiert nach Tag
-    daily_counts = (
-        Appointment.objects.using("default")
-        .filter(start_time__gte=start_date)
-        .annotate(date=TruncDate("start_time"))
-        .values("date")
-        .annotate(count=Count("id"))
-        .order_by("date")
-    )
+    if rollups_enabled():
+        daily = rollup_totals(start_date.date(), now.date(), by="day")
+        counts_dict = {day: booked.count for day, booked in daily.items()}
+    else:
+        daily_counts = (
+            Appointment.objects.using("default")
+            .filter(start_time__gte=start_date)
+            .annotate(date=TruncDate("start_time"))
+            .values("date")
+            .annotate(count=Count("id"))
+            .order_by("date")
+        )
+        counts_dict = {d["date"]: d["count"] for d in daily_counts}
 
     # Alle Tage befüllen (auch ohne Termine)
-    counts_dict = {d["date"]: d["count"] for d in daily_counts}
 
     labels = []
     data = []
@@ -178,35 +184,12 @@ def get_room_utilization_chart() -> dict[str, Any]:
 
 
 def get_hourly_heatmap() -> dict[str, Any]:
-    """Heatmap: Termine nach Stunde (0-23) und Wochentag."""
-    from django.db.models.functions import ExtractHour, ExtractWeekDay
-
-    now = timezone.now()
-    start_date = now - timedelta(days=30)
-
-    # Termine nach Stunde und Wochentag
-    heatmap_data = (
-        Appointment.objects.using("default")
-        .filter(start_time__gte=start_date)
-        .annotate(hour=ExtractHour("start_time"), weekday=ExtractWeekDay("start_time"))
-        .values("hour", "weekday")
-        .annotate(count=Count("id"))
-    )
-
-    # Initialisiere 7x24 Matrix
-    day_names = ["Mo", "Di", "Mi", "Do", "Fr", "Sa", "So"]
-    django_to_python = {2: 0, 3: 1, 4: 2, 5: 3, 6: 4, 7: 5, 1: 6}
-
-    matrix = [[0 for _ in range(24)] for _ in range(7)]
-
-    for row in heatmap_data:
-        py_day = django_to_python.get(row["weekday"], 0)
-        hour = row["hour"]
-        matrix[py_day][hour] = row["count"]
+    """Heatmap: Termine nach Stunde (0-23) und Wochentag (letzte 30 Tage)."""
+    matrix = get_last_30_days_cube().matrix()
 
     # Für Chart.js Heatmap-Format
     datasets = []
-    for day_idx, day_name in enumerate(day_names):
+    for day_idx in range(len(DAY_NAMES)):
         for hour in range(24):
             count = matrix[day_idx][hour]
             if count > 0:
@@ -215,7 +198,7 @@ def get_hourly_heatmap() -> dict[str, Any]:
     return {
         "labels": {
             "x": [f"{h:02d}:00" for h in range(24)],
-            "y": day_names,
+            "y": list(DAY_NAMES),
         },
         "data": datasets,
         "matrix": matrix,
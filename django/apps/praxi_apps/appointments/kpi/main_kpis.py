@@ -10,10 +10,15 @@ import logging
 from datetime import date, datetime, timedelta
 from typing import Any
 
-from django.db import models
-from django.db.models import Avg, Count
-from django.db.models.functions import ExtractHour, ExtractWeekDay
+from django.db.models import Count
 from django.utils import timezone
+from praxi_backend.appointments.kpi.aggregation import (
+    BookedTime,
+    appointment_minutes,
+    resource_minutes,
+)
+from praxi_backend.appointments.kpi.executor import run_kpi_sections
+from praxi_backend.appointments.kpi.heatmap import DAY_NAMES, get_last_30_days_cube
 from praxi_backend.appointments.models import (
     Appointment,
     DoctorHours,
@@ -154,23 +159,9 @@ def get_appointment_kpis() -> dict[str, Any]:
     )
 
     # Durchschnittliche Terminlänge (in Minuten)
-    _ = (
-        Appointment.objects.using("default")
-        .filter(start_time__gte=last_30_start)
-        .annotate(duration_mins=(models.F("end_time") - models.F("start_time")))
-        .aggregate(avg=Avg("duration_mins"))
-    )
-
-    # Manuelle Berechnung
-    appointments = (
-        Appointment.objects.using("default")
-        .filter(start_time__gte=last_30_start)
-        .only("start_time", "end_time")
-    )
-
-    if appointments.exists():
-        total_minutes = sum((a.end_time - a.start_time).total_seconds() / 60 for a in appointments)
-        avg_duration_mins = round(total_minutes / appointments.count(), 1)
+    booked = appointment_minutes(last_30_start, None, statuses=None)
+    if booked.count:
+        avg_duration_mins = round(booked.minutes / booked.count, 1)
     else:
         avg_duration_mins = 0
 
@@ -273,24 +264,22 @@ def calculate_doctor_utilization() -> list[dict[str, Any]]:
         .order_by("last_name", "first_name")
     )
 
+    # Geplante Stunden aus DoctorHours
+    available_by_doctor: dict[int, int] = {}
+    for dh in DoctorHours.objects.using("default").filter(active=True, doctor__in=doctors):
+        start = datetime.combine(date.today(), dh.start_time)
+        end = datetime.combine(date.today(), dh.end_time)
+        available_by_doctor[dh.doctor_id] = (
+            available_by_doctor.get(dh.doctor_id, 0) + (end - start).seconds // 60
+        )
+
+    # Gebuchte Minuten aus Appointments
+    booked_by_doctor = appointment_minutes(week_start, week_end, by="doctor")
+
     utilization = []
     for doctor in doctors:
-        # Geplante Stunden aus DoctorHours
-        doctor_hours = DoctorHours.objects.using("default").filter(doctor=doctor, active=True)
-        weekly_available_mins = 0
-        for dh in doctor_hours:
-            start = datetime.combine(date.today(), dh.start_time)
-            end = datetime.combine(date.today(), dh.end_time)
-            weekly_available_mins += (end - start).seconds // 60
-
-        # Gebuchte Minuten aus Appointments
-        appointments = Appointment.objects.using("default").filter(
-            doctor=doctor,
-            start_time__gte=week_start,
-            start_time__lte=week_end,
-            status__in=["scheduled", "confirmed", "completed"],
-        )
-        booked_mins = sum((a.end_time - a.start_time).total_seconds() / 60 for a in appointments)
+        weekly_available_mins = available_by_doctor.get(doctor.id, 0)
+        booked_mins = booked_by_doctor.get(doctor.id, BookedTime()).minutes
 
         # Auslastung berechnen
         if weekly_available_mins > 0:
@@ -327,34 +316,18 @@ def calculate_room_utilization() -> list[dict[str, Any]]:
         end = datetime.combine(date.today(), ph.end_time)
         weekly_open_mins += (end - start).seconds // 60
 
+    # Termine und OPs in den Räumen
+    booked_by_room = resource_minutes(
+        week_start,
+        week_end,
+        resource_type=Resource.TYPE_ROOM,
+        appointment_statuses=None,
+        operation_statuses=None,
+    )
+
     utilization = []
     for room in rooms:
-        # Termine in diesem Raum
-        from praxi_backend.appointments.models import AppointmentResource
-
-        appointment_mins = 0
-        ar_rows = (
-            AppointmentResource.objects.using("default")
-            .filter(
-                resource=room,
-                appointment__start_time__gte=week_start,
-                appointment__start_time__lte=week_end,
-            )
-            .select_related("appointment")
-        )
-        for ar in ar_rows:
-            a = ar.appointment
-            appointment_mins += (a.end_time - a.start_time).total_seconds() / 60
-
-        # OPs in diesem Raum
-        ops = Operation.objects.using("default").filter(
-            op_room=room,
-            start_time__gte=week_start,
-            start_time__lte=week_end,
-        )
-        op_mins = sum((o.end_time - o.start_time).total_seconds() / 60 for o in ops)
-
-        total_booked = appointment_mins + op_mins
+        total_booked = booked_by_room.get(room.id, BookedTime()).minutes
 
         if weekly_open_mins > 0:
             util_percent = min(round((total_booked / weekly_open_mins) * 100, 1), 100)
@@ -375,21 +348,8 @@ def calculate_room_utilization() -> list[dict[str, Any]]:
 
 
 def get_peak_hours() -> dict[str, Any]:
-    """Analysiert Peak-Stunden für Termine."""
-    ranges = get_date_ranges()
-    last_30_start, last_30_end = ranges["last_30"]
-
-    # Termine nach Stunde gruppieren
-    hourly = (
-        Appointment.objects.using("default")
-        .filter(start_time__gte=last_30_start, start_time__lte=last_30_end)
-        .annotate(hour=ExtractHour("start_time"))
-        .values("hour")
-        .annotate(count=Count("id"))
-        .order_by("hour")
-    )
-
-    hourly_dict = {h["hour"]: h["count"] for h in hourly}
+    """Analysiert Peak-Stunden für Termine (letzte 30 Tage)."""
+    hourly_dict = get_last_30_days_cube().by_hour()
 
     # Peak-Stunde finden
     if hourly_dict:
@@ -403,28 +363,9 @@ def get_peak_hours() -> dict[str, Any]:
 
 
 def get_peak_days() -> dict[str, Any]:
-    """Analysiert Peak-Wochentage für Termine."""
-    ranges = get_date_ranges()
-    last_30_start, last_30_end = ranges["last_30"]
-
-    # Termine nach Wochentag gruppieren (Django: 1=Sonntag, 7=Samstag)
-    daily = (
-        Appointment.objects.using("default")
-        .filter(start_time__gte=last_30_start, start_time__lte=last_30_end)
-        .annotate(weekday=ExtractWeekDay("start_time"))
-        .values("weekday")
-        .annotate(count=Count("id"))
-        .order_by("weekday")
-    )
-
-    # Konvertiere zu 0=Montag, 6=Sonntag
-    day_names = ["Mo", "Di", "Mi", "Do", "Fr", "Sa", "So"]
-    django_to_python = {2: 0, 3: 1, 4: 2, 5: 3, 6: 4, 7: 5, 1: 6}
-
-    daily_dict = {day_names[i]: 0 for i in range(7)}
-    for d in daily:
-        python_day = django_to_python.get(d["weekday"], 0)
-        daily_dict[day_names[python_day]] = d["count"]
+    """Analysiert Peak-Wochentage für Termine (letzte 30 Tage)."""
+    counts = get_last_30_days_cube().by_weekday()
+    daily_dict = dict(zip(DAY_NAMES, counts))
 
     # Peak-Tag finden
     if any(daily_dict.values()):
@@ -441,17 +382,31 @@ def get_all_kpis() -> dict[str, Any]:
     """Sammelt alle KPIs für das Dashboard."""
     logger.debug("kpi.main.get_all_kpis start")
     with timed_block("kpi.main.get_all_kpis", log=logger, level="debug"):
-        result = {
-            "users": get_user_kpis(),
-            "patients": get_patient_count(),
-            "appointments": get_appointment_kpis(),
-            "operations": get_operation_kpis(),
-            "resources": get_resource_kpis(),
-            "doctor_utilization": calculate_doctor_utilization(),
-            "room_utilization": calculate_room_utilization(),
-            "peak_hours": get_peak_hours(),
-            "peak_days": get_peak_days(),
-            "generated_at": timezone.now().isoformat(),
-        }
+        run = run_kpi_sections(
+            "main",
+            {
+                "users": get_user_kpis,
+                "patients": get_patient_count,
+                "appointments": get_appointment_kpis,
+                "operations": get_operation_kpis,
+                "resources": get_resource_kpis,
+                "doctor_utilization": calculate_doctor_utilization,
+                "room_utilization": calculate_room_utilization,
+                "peak_hours": get_peak_hours,
+                "peak_days": get_peak_days,
+            },
+            empty={
+                "users": {},
+                "patients": 0,
+                "appointments": {},
+                "operations": {},
+                "resources": {},
+                "doctor_utilization": [],
+                "room_utilization": [],
+                "peak_hours": {},
+                "peak_days": {},
+            },
+        )
+        result = {**run.values, "generated_at": timezone.now().isoformat()}
     logger.debug("kpi.main.get_all_kpis end")
     return result
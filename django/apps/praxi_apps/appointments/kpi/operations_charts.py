@@ -12,7 +12,13 @@ from typing import Any
 from django.db.models import Count
 from django.db.models.functions import ExtractHour, ExtractWeekDay, TruncDate
 from django.utils import timezone
-from praxi_backend.appointments.models import Appointment, Operation, Resource
+from praxi_backend.appointments.kpi.rollups import rollup_totals, rollups_enabled
+from praxi_backend.appointments.models import (
+    Appointment,
+    DailyBookingRollup,
+    Operation,
+    Resource,
+)
 
 CHART_COLORS = [
     "#2E8B57",
@@ -289,26 +295,36 @@ def get_daily_trend_chart(days: int = 30) -> dict[str, Any]:
     """Liniendiagramm für täglichen Trend."""
     start_dt, end_dt = get_date_range(days)
 
-    appointments = (
-        Appointment.objects.using("default")
-        .filter(start_time__gte=start_dt, start_time__lte=end_dt)
-        .annotate(day=TruncDate("start_time"))
-        .values("day")
-        .annotate(count=Count("id"))
-        .order_by("day")
-    )
-
-    operations = (
-        Operation.objects.using("default")
-        .filter(start_time__gte=start_dt, start_time__lte=end_dt)
-        .annotate(day=TruncDate("start_time"))
-        .values("day")
-        .annotate(count=Count("id"))
-        .order_by("day")
-    )
-
-    appt_by_day = {row["day"]: row["count"] for row in appointments}
-    op_by_day = {row["day"]: row["count"] for row in operations}
+    if rollups_enabled():
+        appt_by_day = {
+            day: booked.count
+            for day, booked in rollup_totals(start_dt.date(), end_dt.date(), by="day").items()
+        }
+        op_by_day = {
+            day: booked.count
+            for day, booked in rollup_totals(
+                start_dt.date(), end_dt.date(), kind=DailyBookingRollup.KIND_OPERATION, by="day"
+            ).items()
+        }
+    else:
+        appointments = (
+            Appointment.objects.using("default")
+            .filter(start_time__gte=start_dt, start_time__lte=end_dt)
+            .annotate(day=TruncDate("start_time"))
+            .values("day")
+            .annotate(count=Count("id"))
+            .order_by("day")
+        )
+        operations = (
+            Operation.objects.using("default")
+            .filter(start_time__gte=start_dt, start_time__lte=end_dt)
+            .annotate(day=TruncDate("start_time"))
+            .values("day")
+            .annotate(count=Count("id"))
+            .order_by("day")
+        )
+        appt_by_day = {row["day"]: row["count"] for row in appointments}
+        op_by_day = {row["day"]: row["count"] for row in operations}
 
     current = start_dt.date()
     end = end_dt.date()
@@ -14,11 +14,16 @@ from typing import Any
 from django.db.models import Count
 from django.db.models.functions import ExtractHour, TruncDate
 from django.utils import timezone
+from praxi_backend.appointments.kpi.aggregation import (
+    BookedTime,
+    appointment_minutes,
+    operation_minutes,
+    resource_minutes,
+)
+from praxi_backend.appointments.kpi.executor import run_kpi_sections
 from praxi_backend.appointments.models import (
     Appointment,
-    AppointmentResource,
     Operation,
-    OperationDevice,
     PatientFlow,
     PracticeHours,
     Resource,
@@ -168,23 +173,9 @@ def calculate_overall_utilization(
                 total_available_minutes += end_minutes - start_minutes
             current += timedelta(days=1)
 
-    appointments = Appointment.objects.using("default").filter(
-        start_time__gte=start_dt,
-        start_time__lte=end_dt,
-        status__in=["scheduled", "confirmed", "completed"],
-    )
-
-    booked_minutes = 0
-    for appt in appointments:
-        booked_minutes += (appt.end_time - appt.start_time).total_seconds() / 60
-
-    operations = Operation.objects.using("default").filter(
-        start_time__gte=start_dt,
-        start_time__lte=end_dt,
-        status__in=["planned", "confirmed", "running", "done"],
-    )
-    for op in operations:
-        booked_minutes += (op.end_time - op.start_time).total_seconds() / 60
+    appointments = appointment_minutes(start_dt, end_dt)
+    operations = operation_minutes(start_dt, end_dt)
+    booked_minutes = appointments.minutes + operations.minutes
 
     utilization = 0
     if total_available_minutes > 0:
@@ -194,8 +185,8 @@ def calculate_overall_utilization(
         "utilization": min(100, utilization),
         "booked_hours": round(booked_minutes / 60, 1),
         "available_hours": round(total_available_minutes / 60, 1),
-        "appointment_count": appointments.count(),
-        "operation_count": operations.count(),
+        "appointment_count": appointments.count,
+        "operation_count": operations.count,
     }
 
 
@@ -302,77 +293,24 @@ def calculate_resource_utilization(
     """Berechnet die Ressourcenauslastung (Räume und Geräte)."""
     resources = Resource.objects.using("default").filter(active=True)
 
+    practice_hours = PracticeHours.objects.using("default").filter(active=True)
+    available_minutes = 0
+    for ph in practice_hours:
+        current = start_dt.date()
+        while current <= end_dt.date():
+            if current.weekday() == ph.weekday:
+                start_min = ph.start_time.hour * 60 + ph.start_time.minute
+                end_min = ph.end_time.hour * 60 + ph.end_time.minute
+                available_minutes += end_min - start_min
+            current += timedelta(days=1)
+
+    # Räume: Termine + OPs im Raum; Geräte: Termine + OP-Geräte
+    booked_by_resource = resource_minutes(start_dt, end_dt)
+
     resource_stats = []
 
     for resource in resources:
-        practice_hours = PracticeHours.objects.using("default").filter(active=True)
-        available_minutes = 0
-
-        for ph in practice_hours:
-            current = start_dt.date()
-            while current <= end_dt.date():
-                if current.weekday() == ph.weekday:
-                    start_min = ph.start_time.hour * 60 + ph.start_time.minute
-                    end_min = ph.end_time.hour * 60 + ph.end_time.minute
-                    available_minutes += end_min - start_min
-                current += timedelta(days=1)
-
-        booked_minutes = 0
-
-        if resource.type == "room":
-            appt_resources = (
-                AppointmentResource.objects.using("default")
-                .filter(
-                    resource=resource,
-                    appointment__start_time__gte=start_dt,
-                    appointment__start_time__lte=end_dt,
-                    appointment__status__in=["scheduled", "confirmed", "completed"],
-                )
-                .select_related("appointment")
-            )
-            for ar in appt_resources:
-                booked_minutes += (
-                    ar.appointment.end_time - ar.appointment.start_time
-                ).total_seconds() / 60
-
-            ops = Operation.objects.using("default").filter(
-                op_room=resource,
-                start_time__gte=start_dt,
-                start_time__lte=end_dt,
-                status__in=["planned", "confirmed", "running", "done"],
-            )
-            for op in ops:
-                booked_minutes += (op.end_time - op.start_time).total_seconds() / 60
-        else:
-            appt_resources = (
-                AppointmentResource.objects.using("default")
-                .filter(
-                    resource=resource,
-                    appointment__start_time__gte=start_dt,
-                    appointment__start_time__lte=end_dt,
-                    appointment__status__in=["scheduled", "confirmed", "completed"],
-                )
-                .select_related("appointment")
-            )
-            for ar in appt_resources:
-                booked_minutes += (
-                    ar.appointment.end_time - ar.appointment.start_time
-                ).total_seconds() / 60
-
-            op_devices = (
-                OperationDevice.objects.using("default")
-                .filter(
-                    resource=resource,
-                    operation__start_time__gte=start_dt,
-                    operation__start_time__lte=end_dt,
-                    operation__status__in=["planned", "confirmed", "running", "done"],
-                )
-                .select_related("operation")
-            )
-            for od in op_devices:
-                booked_minutes += (
-                    od.operation.end_time - od.operation.start_time
-                ).total_seconds() / 60
+        booked_minutes = booked_by_resource.get(resource.id, BookedTime()).minutes
 
         utilization = 0
         if available_minutes > 0:
@@ -581,17 +519,43 @@ def get_all_operations_kpis(days: int = 30) -> dict[str, Any]:
     with timed_block("kpi.operations.get_all_operations_kpis", log=logger, level="debug"):
         start_date, end_date, start_dt, end_dt = get_date_range(days)
 
-        utilization = calculate_overall_utilization(start_dt, end_dt, days)
-        throughput = calculate_patient_throughput(start_dt, end_dt, days)
-        no_show = calculate_no_show_rate(start_dt, end_dt)
-        cancellation = calculate_cancellation_rate(start_dt, end_dt)
-        resources = calculate_resource_utilization(start_dt, end_dt, days)
+        run = run_kpi_sections(
+            "operations",
+            {
+                "utilization": lambda: calculate_overall_utilization(start_dt, end_dt, days),
+                "throughput": lambda: calculate_patient_throughput(start_dt, end_dt, days),
+                "no_show": lambda: calculate_no_show_rate(start_dt, end_dt),
+                "cancellation": lambda: calculate_cancellation_rate(start_dt, end_dt),
+                "resources": lambda: calculate_resource_utilization(start_dt, end_dt, days),
+                "hourly": lambda: calculate_hourly_distribution(start_dt, end_dt),
+                "status": lambda: calculate_status_distribution(start_dt, end_dt),
+                "patient_flow": lambda: calculate_patient_flow_status(start_dt, end_dt),
+            },
+            empty={
+                "utilization": {},
+                "throughput": {},
+                "no_show": {"no_show_rate": 0},
+                "cancellation": {"cancellation_rate": 0},
+                "resources": {"resources": []},
+                "hourly": {},
+                "status": {},
+                "patient_flow": {},
+            },
+            variant=str(days),
+        )
+        utilization = run.values["utilization"]
+        throughput = run.values["throughput"]
+        no_show = run.values["no_show"]
+        cancellation = run.values["cancellation"]
+        resources = run.values["resources"]
         bottleneck = calculate_bottleneck_index(resources, no_show, cancellation)
-        hourly = calculate_hourly_distribution(start_dt, end_dt)
-        status = calculate_status_distribution(start_dt, end_dt)
-        patient_flow = calculate_patient_flow_status(start_dt, end_dt)
+        hourly = run.values["hourly"]
+        status = run.values["status"]
+        patient_flow = run.values["patient_flow"]
 
-        total_appointments = utilization["appointment_count"] + utilization["operation_count"]
+        total_appointments = utilization.get("appointment_count", 0) + utilization.get(
+            "operation_count", 0
+        )
         flow_times = _generate_demo_patient_flow_times(total_appointments, seed=days)
         punctuality = _generate_demo_punctuality(seed=days)
         documentation = _generate_demo_documentation(total_appointments, seed=days)
@@ -8,11 +8,12 @@ from __future__ import annotations
 
 import logging
 import random
+from collections.abc import Iterable
 from dataclasses import dataclass
 from datetime import date, datetime, timedelta
 from typing import Any
 
-from django.db.models import Count
+from django.db.models import Count, Q
 from django.utils import timezone
 from praxi_backend.appointments.models import Appointment
 from praxi_backend.core.utils import timed_block
@@ -310,67 +311,79 @@ class PatientStatus:
     icon: str
 
 
-def calculate_patient_status(patient_id: int) -> PatientStatus:
-    """Berechnet den aktuellen Status eines Patienten."""
-    now = timezone.now()
-
-    six_months_ago = now - timedelta(days=180)
-    twelve_months_ago = now - timedelta(days=365)
-    thirty_days_ago = now - timedelta(days=30)
-
-    recent_appointments = (
-        Appointment.objects.using("default")
-        .filter(
-            patient_id=patient_id,
-            start_time__gte=six_months_ago,
-            status__in=["completed", "confirmed", "scheduled"],
-        )
-        .count()
-    )
-
-    recent_30_days = (
-        Appointment.objects.using("default")
-        .filter(
-            patient_id=patient_id,
-            start_time__gte=thirty_days_ago,
-            status__in=["completed", "confirmed", "scheduled"],
-        )
-        .count()
-    )
-
-    has_any_recent = (
-        Appointment.objects.using("default")
-        .filter(patient_id=patient_id, start_time__gte=twelve_months_ago)
-        .exists()
-    )
-
-    risk_score = calculate_patient_risk_score(patient_id)
-
+def _status_from(counts: dict[str, int], risk_score: dict[str, Any]) -> PatientStatus:
     if risk_score["score"] >= 70:
         return PatientStatus(status="risk", label="Risikopatient", color="#DC3545", icon="⚠️")
 
-    if recent_30_days >= 3:
+    if counts["recent_30_days"] >= 3:
         return PatientStatus(
             status="in_treatment", label="In Behandlung", color="#FFC107", icon="🏥"
         )
 
-    if recent_appointments > 0:
+    if counts["recent_appointments"] > 0:
         return PatientStatus(status="active", label="Aktiv", color="#28A745", icon="✓")
 
-    if not has_any_recent:
+    if not counts["any_recent"]:
         return PatientStatus(status="inactive", label="Inaktiv", color="#6C757D", icon="○")
 
     return PatientStatus(status="active", label="Aktiv", color="#28A745", icon="✓")
 
 
+def calculate_patient_status_bulk(
+    patient_ids: Iterable[int],
+    *,
+    risk_scores: dict[int, dict[str, Any]] | None = None,
+) -> dict[int, PatientStatus]:
+    """Berechnet den Status mehrerer Patienten mit einer gruppierten Abfrage.
+
+    ``risk_scores`` (z. B. aus :func:`calculate_patient_risk_score_bulk`) wird
+    wiederverwendet; fehlende Scores werden nachberechnet.
+    """
+    ids = list(dict.fromkeys(int(pid) for pid in patient_ids))
+    if not ids:
+        return {}
+
+    now = timezone.now()
+    six_months_ago = now - timedelta(days=180)
+    twelve_months_ago = now - timedelta(days=365)
+    thirty_days_ago = now - timedelta(days=30)
+    active = Q(status__in=["completed", "confirmed", "scheduled"])
+
+    rows = (
+        Appointment.objects.using("default")
+        .filter(patient_id__in=ids, start_time__gte=twelve_months_ago)
+        .values("patient_id")
+        .annotate(
+            recent_appointments=Count("id", filter=active & Q(start_time__gte=six_months_ago)),
+            recent_30_days=Count("id", filter=active & Q(start_time__gte=thirty_days_ago)),
+            any_recent=Count("id"),
+        )
+        .order_by()
+    )
+    empty = {"recent_appointments": 0, "recent_30_days": 0, "any_recent": 0}
+    counts = {row.pop("patient_id"): row for row in rows}
+
+    risk_scores = dict(risk_scores or {})
+    missing = [pid for pid in ids if pid not in risk_scores]
+    if missing:
+        risk_scores.update(calculate_patient_risk_score_bulk(missing))
+
+    return {pid: _status_from(counts.get(pid, empty), risk_scores[pid]) for pid in ids}
+
+
+def calculate_patient_status(patient_id: int) -> PatientStatus:
+    """Berechnet den aktuellen Status eines Patienten."""
+    return calculate_patient_status_bulk([patient_id])[int(patient_id)]
+
+
 # ============================================================================
 # Risiko-Score Berechnung
 # ============================================================================
 
 
-def calculate_patient_risk_score(patient_id: int) -> dict[str, Any]:
-    """Berechnet einen Risiko-Score."""
-    profile = get_patient_profile(patient_id)
+def _risk_score_from(
+    patient_id: int, profile: dict[str, Any] | None, no_shows: int
+) -> dict[str, Any]:
     try:
         age = int((profile or {}).get("age") or 50)
     except (TypeError, ValueError):
@@ -447,32 +460,6 @@ def calculate_patient_risk_score(patient_id: int) -> dict[str, Any]:
         score += min(15, lab_risk)
 
     # No-Show Risiko (max 10 Punkte)
-    now = timezone.now()
-    year_ago = now - timedelta(days=365)
-
-    flagged_no_shows = (
-        Appointment.objects.using("default")
-        .filter(
-            patient_id=patient_id,
-            start_time__gte=year_ago,
-            start_time__lt=now,
-            is_no_show=True,
-        )
-        .count()
-    )
-    fallback_no_shows = (
-        Appointment.objects.using("default")
-        .filter(
-            patient_id=patient_id,
-            start_time__gte=year_ago,
-            start_time__lt=now,
-            is_no_show=False,
-            status__in=["scheduled", "confirmed"],
-        )
-        .count()
-    )
-    no_shows = flagged_no_shows + fallback_no_shows
-
     if no_shows >= 3:
         score += 10
         factors.append({"name": f"{no_shows} No-Shows", "points": 10, "severity": "high"})
@@ -506,6 +493,48 @@ def calculate_patient_risk_score(patient_id: int) -> dict[str, Any]:
     }
 
 
+def calculate_patient_risk_score_bulk(
+    patient_ids: Iterable[int],
+    *,
+    profiles: dict[int, dict[str, Any] | None] | None = None,
+) -> dict[int, dict[str, Any]]:
+    """Berechnet Risiko-Scores mehrerer Patienten.
+
+    No-Shows der letzten 12 Monate werden mit einer gruppierten Abfrage gezählt;
+    ``profiles`` (z. B. aus :func:`get_patient_profiles_bulk`) wird wiederverwendet.
+    """
+    ids = list(dict.fromkeys(int(pid) for pid in patient_ids))
+    if not ids:
+        return {}
+
+    profiles = dict(profiles or {})
+    missing = [pid for pid in ids if pid not in profiles]
+    if missing:
+        profiles.update(get_patient_profiles_bulk(missing))
+
+    now = timezone.now()
+    year_ago = now - timedelta(days=365)
+
+    rows = (
+        Appointment.objects.using("default")
+        .filter(patient_id__in=ids, start_time__gte=year_ago, start_time__lt=now)
+        .values("patient_id")
+        .annotate(
+            flagged=Count("id", filter=Q(is_no_show=True)),
+            fallback=Count("id", filter=Q(is_no_show=False, status__in=["scheduled", "confirmed"])),
+        )
+        .order_by()
+    )
+    no_shows = {row["patient_id"]: row["flagged"] + row["fallback"] for row in rows}
+
+    return {pid: _risk_score_from(pid, profiles[pid], no_shows.get(pid, 0)) for pid in ids}
+
+
+def calculate_patient_risk_score(patient_id: int) -> dict[str, Any]:
+    """Berechnet einen Risiko-Score."""
+    return calculate_patient_risk_score_bulk([patient_id])[int(patient_id)]
+
+
 # ============================================================================
 # Terminaktivität
 # ============================================================================
@@ -778,16 +807,24 @@ def get_chronic_conditions(patient_id: int) -> dict[str, Any]:
 # ============================================================================
 
 
-def get_patient_profile(patient_id: int) -> dict[str, Any] | None:
-    """Holt Patientenstammdaten und berechnet abgeleitete Werte."""
-    patient = None
+def get_patient_profiles_bulk(patient_ids: Iterable[int]) -> dict[int, dict[str, Any] | None]:
+    """Holt die Profile mehrerer Patienten mit einer Abfrage."""
+    ids = list(dict.fromkeys(int(pid) for pid in patient_ids))
+    if not ids:
+        return {}
     try:
-        patient = Patient.objects.using("default").get(id=patient_id)
-    except Patient.DoesNotExist:
-        patient = None
+        patients = Patient.objects.using("default").in_bulk(ids)
     except Exception:
-        patient = None
+        patients = {}
+    return {pid: _build_patient_profile(pid, patients.get(pid)) for pid in ids}
+
+
+def get_patient_profile(patient_id: int) -> dict[str, Any] | None:
+    """Holt Patientenstammdaten und berechnet abgeleitete Werte."""
+    return get_patient_profiles_bulk([patient_id])[int(patient_id)]
+
 
+def _build_patient_profile(patient_id: int, patient: Patient | None) -> dict[str, Any] | None:
     # Last resort: deterministic demo profile for dev data seeded only via appointments.
     if patient is None:
         random.seed(patient_id + 9000)
@@ -966,8 +1003,10 @@ def get_all_patient_kpis(patient_id: int) -> dict[str, Any]:
         if not profile:
             result = {"error": "Patient nicht gefunden", "patient_id": patient_id}
         else:
-            status = calculate_patient_status(patient_id)
-            risk = calculate_patient_risk_score(patient_id)
+            # Profil und Risiko-Score nur einmal berechnen.
+            pid = int(patient_id)
+            risk = calculate_patient_risk_score_bulk([pid], profiles={pid: profile})[pid]
+            status = calculate_patient_status_bulk([pid], risk_scores={pid: risk})[pid]
             appointments = calculate_appointment_activity(patient_id)
             compliance = calculate_medication_compliance(patient_id)
             vitals = calculate_vital_trends(patient_id)
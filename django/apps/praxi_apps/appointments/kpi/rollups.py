@@ -0,0 +1,285 @@
+"""Daily booking rollups for KPI trends.
+
+``DailyBookingRollup`` holds one row per (date, hour, kind, doctor, room, type,
+status) with booking counts and booked seconds, so a 90-day trend reads a few
+hundred rollup rows instead of every appointment and operation.
+
+Maintenance (only while ``settings.PRAXI_KPI_ROLLUPS`` is enabled):
+
+- Appointment, Operation and AppointmentResource writes mark the affected
+  local dates dirty; dirty dates are recomputed from the bookings after the
+  transaction commits, and before any rollup read in the same thread.
+- A date is always recomputed as a whole (delete + grouped insert under a
+  per-date advisory lock), so repeated or concurrent refreshes cannot drift.
+- ``QuerySet.update()``/``bulk_create()`` send no signals; call
+  :func:`mark_rollups_dirty` after them.
+- ``manage.py rebuild_rollups`` backfills or repairs a date range.
+
+Architecture rules:
+- All DB access uses .using('default')
+- PostgreSQL only
+"""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Iterable
+from datetime import date, datetime, time, timedelta
+from typing import Any
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import (
+    Count,
+    DurationField,
+    ExpressionWrapper,
+    F,
+    OuterRef,
+    Subquery,
+    Sum,
+)
+from django.db.models.functions import ExtractHour, TruncDate
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+from praxi_backend.appointments.kpi.aggregation import BookedTime
+from praxi_backend.appointments.models import (
+    Appointment,
+    AppointmentResource,
+    DailyBookingRollup,
+    Operation,
+    Resource,
+)
+from praxi_backend.appointments.original_values import original_values, track
+
+# First key of the two-int advisory lock; the second is the date ordinal.
+ROLLUP_LOCK_NAMESPACE = 7301
+
+# Reader grouping -> rollup column
+ROLLUP_COLUMNS = {
+    "day": "date",
+    "hour": "hour",
+    "doctor": "doctor_id",
+    "room": "room_id",
+    "type": "type_id",
+    "status": "status",
+}
+
+_pending = threading.local()
+
+
+def rollups_enabled() -> bool:
+    """True if rollups are maintained and read by the KPI functions."""
+    return bool(getattr(settings, "PRAXI_KPI_ROLLUPS", False))
+
+
+def _pending_dates() -> set[date]:
+    if not hasattr(_pending, "dates"):
+        _pending.dates = set()
+    return _pending.dates
+
+
+def _day_start(day: date) -> datetime:
+    return timezone.make_aware(datetime.combine(day, time.min), timezone.get_current_timezone())
+
+
+def _local_date(value) -> date | None:
+    if value is None:
+        return None
+    return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+
+
+# ---------------------------------------------------------------------------
+# Recompute
+# ---------------------------------------------------------------------------
+
+
+def _booking_facts(model, start: datetime, end: datetime) -> list[DailyBookingRollup]:
+    duration = ExpressionWrapper(F("end_time") - F("start_time"), output_field=DurationField())
+    qs = model.objects.using("default").filter(start_time__gte=start, start_time__lt=end)
+
+    if model is Appointment:
+        kind = DailyBookingRollup.KIND_APPOINTMENT
+        first_room = (
+            AppointmentResource.objects.using("default")
+            .filter(appointment=OuterRef("pk"), resource__type=Resource.TYPE_ROOM)
+            .order_by("resource_id")
+            .values("resource_id")[:1]
+        )
+        qs = qs.annotate(
+            fact_doctor=F("doctor_id"), fact_room=Subquery(first_room), fact_type=F("type_id")
+        )
+    else:
+        kind = DailyBookingRollup.KIND_OPERATION
+        qs = qs.annotate(
+            fact_doctor=F("primary_surgeon_id"),
+            fact_room=F("op_room_id"),
+            fact_type=F("op_type_id"),
+        )
+
+    rows = (
+        qs.annotate(fact_date=TruncDate("start_time"), fact_hour=ExtractHour("start_time"))
+        .values("fact_date", "fact_hour", "fact_doctor", "fact_room", "fact_type", "status")
+        .annotate(fact_count=Count("pk"), fact_total=Sum(duration))
+        .order_by()
+    )
+    return [
+        DailyBookingRollup(
+            date=row["fact_date"],
+            hour=row["fact_hour"],
+            kind=kind,
+            doctor_id=row["fact_doctor"],
+            room_id=row["fact_room"],
+            type_id=row["fact_type"],
+            status=row["status"],
+            count=row["fact_count"],
+            booked_seconds=int(row["fact_total"].total_seconds()) if row["fact_total"] else 0,
+        )
+        for row in rows
+    ]
+
+
+def _runs(dates: list[date]) -> list[tuple[date, date]]:
+    """Split sorted ``dates`` into contiguous (first, last) runs."""
+    runs: list[tuple[date, date]] = []
+    for day in dates:
+        if runs and runs[-1][1] + timedelta(days=1) == day:
+            runs[-1] = (runs[-1][0], day)
+        else:
+            runs.append((day, day))
+    return runs
+
+
+def refresh_rollups(dates: Iterable[date]) -> int:
+    """Recompute the rollup rows of ``dates`` from the bookings; return rows written."""
+    days = sorted(set(dates))
+    if not days:
+        return 0
+
+    facts: list[DailyBookingRollup] = []
+    with transaction.atomic(using="default"):
+        with connections["default"].cursor() as cursor:
+            for day in days:
+                cursor.execute(
+                    "SELECT pg_advisory_xact_lock(%s, %s)", [ROLLUP_LOCK_NAMESPACE, day.toordinal()]
+                )
+        DailyBookingRollup.objects.using("default").filter(date__in=days).delete()
+        wanted = set(days)
+        for first, last in _runs(days):
+            start, end = _day_start(first), _day_start(last + timedelta(days=1))
+            for model in (Appointment, Operation):
+                facts += [f for f in _booking_facts(model, start, end) if f.date in wanted]
+        DailyBookingRollup.objects.using("default").bulk_create(facts, batch_size=1000)
+    return len(facts)
+
+
+def rebuild_rollups(start: date, end: date, *, chunk_days: int = 31) -> int:
+    """Recompute all dates in ``[start, end]`` in chunks; return rows written."""
+    written = 0
+    current = start
+    while current <= end:
+        chunk_end = min(current + timedelta(days=chunk_days - 1), end)
+        written += refresh_rollups(
+            current + timedelta(days=i) for i in range((chunk_end - current).days + 1)
+        )
+        current = chunk_end + timedelta(days=1)
+    return written
+
+
+# ---------------------------------------------------------------------------
+# Incremental maintenance
+# ---------------------------------------------------------------------------
+
+
+def flush_rollups() -> int:
+    """Recompute all dates marked dirty in this thread; return rows written."""
+    dates = set(_pending_dates())
+    if not dates:
+        return 0
+    written = refresh_rollups(dates)
+    # Only drop what was refreshed; a failed refresh keeps the dates pending.
+    _pending_dates().difference_update(dates)
+    return written
+
+
+def mark_rollups_dirty(*values: date | datetime | None) -> None:
+    """Schedule a refresh of the local dates of ``values`` after commit."""
+    if not rollups_enabled():
+        return
+    dates = {_local_date(v) if isinstance(v, datetime) else v for v in values}
+    dates.discard(None)
+    if not dates:
+        return
+    _pending_dates().update(dates)
+    transaction.on_commit(flush_rollups, using="default", robust=True)
+
+
+def _booking_changed(sender, instance, **kwargs) -> None:
+    if not rollups_enabled():
+        return
+    mark_rollups_dirty(instance.start_time, original_values(instance).get("start_time"))
+
+
+def _appointment_resource_changed(sender, instance, **kwargs) -> None:
+    if not rollups_enabled():
+        return
+    start = (
+        Appointment.objects.using("default")
+        .filter(pk=instance.appointment_id)
+        .values_list("start_time", flat=True)
+        .first()
+    )
+    mark_rollups_dirty(start)
+
+
+def connect_signals() -> None:
+    """Maintain DailyBookingRollup from booking writes."""
+    for model in (Appointment, Operation):
+        name = model.__name__
+        track(model, ("start_time",), rollups_enabled)
+        post_save.connect(_booking_changed, sender=model, dispatch_uid=f"rollup_save_{name}")
+        post_delete.connect(_booking_changed, sender=model, dispatch_uid=f"rollup_delete_{name}")
+    post_save.connect(
+        _appointment_resource_changed,
+        sender=AppointmentResource,
+        dispatch_uid="rollup_save_AppointmentResource",
+    )
+    post_delete.connect(
+        _appointment_resource_changed,
+        sender=AppointmentResource,
+        dispatch_uid="rollup_delete_AppointmentResource",
+    )
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+
+def rollup_totals(
+    start: date,
+    end: date,
+    *,
+    kind: str = DailyBookingRollup.KIND_APPOINTMENT,
+    by: str | None = None,
+    statuses: Iterable[str] | None = None,
+) -> BookedTime | dict[Any, BookedTime]:
+    """Bookings of ``kind`` on local dates ``[start, end]``, optionally grouped.
+
+    ``by`` is one of ``ROLLUP_COLUMNS`` (day, hour, doctor, room, type, status).
+    """
+    flush_rollups()
+    qs = DailyBookingRollup.objects.using("default").filter(
+        kind=kind, date__gte=start, date__lte=end
+    )
+    if statuses is not None:
+        qs = qs.filter(status__in=list(statuses))
+
+    totals = {"total": Sum("booked_seconds"), "bookings": Sum("count")}
+    if by is None:
+        row = qs.aggregate(**totals)
+        return BookedTime((row["total"] or 0) / 60, row["bookings"] or 0)
+    if by not in ROLLUP_COLUMNS:
+        raise ValueError(f"Unsupported grouping: {by!r}")
+
+    rows = qs.values(key=F(ROLLUP_COLUMNS[by])).annotate(**totals).order_by()
+    return {row["key"]: BookedTime(row["total"] / 60, row["bookings"]) for row in rows}
@@ -12,6 +12,9 @@ from typing import Any
 from django.db.models import Count
 from django.db.models.functions import TruncDate
 from django.utils import timezone
+from praxi_backend.appointments.kpi.aggregation import ACTIVE_APPOINTMENT_STATUSES
+from praxi_backend.appointments.kpi.heatmap import get_last_30_days_cube
+from praxi_backend.appointments.kpi.rollups import rollup_totals, rollups_enabled
 from praxi_backend.appointments.kpi.scheduling_kpis import (
     calculate_doctor_capacity_utilization,
     calculate_room_capacity_utilization,
@@ -27,16 +30,21 @@ def get_utilization_trend_chart(days: int = 30) -> dict[str, Any]:
     now = timezone.now()
     start_date = (now - timedelta(days=days - 1)).replace(hour=0, minute=0, second=0, microsecond=0)
 
-    daily_counts = (
-        Appointment.objects.using("default")
-        .filter(start_time__gte=start_date, status__in=["scheduled", "confirmed", "completed"])
-        .annotate(date=TruncDate("start_time"))
-        .values("date")
-        .annotate(count=Count("id"))
-        .order_by("date")
-    )
-
-    counts_dict = {d["date"]: d["count"] for d in daily_counts}
+    if rollups_enabled():
+        daily = rollup_totals(
+            start_date.date(), now.date(), by="day", statuses=ACTIVE_APPOINTMENT_STATUSES
+        )
+        counts_dict = {day: booked.count for day, booked in daily.items()}
+    else:
+        daily_counts = (
+            Appointment.objects.using("default")
+            .filter(start_time__gte=start_date, status__in=["scheduled", "confirmed", "completed"])
+            .annotate(date=TruncDate("start_time"))
+            .values("date")
+            .annotate(count=Count("id"))
+            .order_by("date")
+        )
+        counts_dict = {d["date"]: d["count"] for d in daily_counts}
 
     labels = []
     data = []
@@ -223,21 +231,7 @@ def get_lead_time_distribution() -> dict[str, Any]:
 
 def get_hourly_load_chart() -> dict[str, Any]:
     """Bar Chart: Termine pro Stunde."""
-    ranges = get_scheduling_date_ranges()
-    last_30_start, last_30_end = ranges["last_30"]
-
-    from django.db.models.functions import ExtractHour
-
-    hourly = (
-        Appointment.objects.using("default")
-        .filter(start_time__gte=last_30_start, start_time__lte=last_30_end)
-        .annotate(hour=ExtractHour("start_time"))
-        .values("hour")
-        .annotate(count=Count("id"))
-        .order_by("hour")
-    )
-
-    hourly_dict = {h["hour"]: h["count"] for h in hourly}
+    hourly_dict = get_last_30_days_cube().by_hour()
 
     labels = [f"{h:02d}:00" for h in range(7, 21)]
     data = [hourly_dict.get(h, 0) for h in range(7, 21)]
@@ -265,27 +259,8 @@ def get_hourly_load_chart() -> dict[str, Any]:
 
 def get_weekday_load_chart() -> dict[str, Any]:
     """Bar Chart: Termine pro Wochentag."""
-    ranges = get_scheduling_date_ranges()
-    last_30_start, last_30_end = ranges["last_30"]
-
-    from django.db.models.functions import ExtractWeekDay
-
-    daily = (
-        Appointment.objects.using("default")
-        .filter(start_time__gte=last_30_start, start_time__lte=last_30_end)
-        .annotate(weekday=ExtractWeekDay("start_time"))
-        .values("weekday")
-        .annotate(count=Count("id"))
-        .order_by("weekday")
-    )
-
-    django_to_python = {2: 0, 3: 1, 4: 2, 5: 3, 6: 4, 7: 5, 1: 6}
     day_names = ["Montag", "Dienstag", "Mittwoch", "Donnerstag", "Freitag", "Samstag", "Sonntag"]
-
-    data = [0] * 7
-    for d in daily:
-        py_day = django_to_python.get(d["weekday"], 0)
-        data[py_day] = d["count"]
+    data = get_last_30_days_cube().by_weekday()
 
     max_count = max(data) if data else 1
     colors = []
@@ -12,12 +12,19 @@ from typing import Any
 
 from django.db.models import Avg, Count, F, Min, Q, Sum  # noqa: F401
 from django.db.models.functions import ExtractHour  # noqa: F401
-from django.db.models.functions import ExtractWeekDay
 from django.utils import timezone
+from praxi_backend.appointments.kpi.aggregation import (
+    BookedTime,
+    appointment_minutes,
+    appointment_minutes_by_period,
+    resource_minutes,
+)
+from praxi_backend.appointments.kpi.executor import run_kpi_sections
+from praxi_backend.appointments.kpi.first_visits import first_visits
+from praxi_backend.appointments.kpi.heatmap import DAY_NAMES, get_last_30_days_cube
 from praxi_backend.appointments.models import DoctorBreak  # noqa: F401
 from praxi_backend.appointments.models import (
     Appointment,
-    AppointmentResource,
     DoctorAbsence,
     DoctorHours,
     PracticeHours,
@@ -116,15 +123,15 @@ def calculate_slot_utilization() -> dict[str, Any]:
     # Verfügbare Slots
     available = calculate_available_slots(week_start.date(), week_end.date())
 
-    # Gebuchte Termine (nicht storniert)
-    booked = Appointment.objects.using("default").filter(
-        start_time__gte=week_start,
-        start_time__lte=week_end,
-        status__in=["scheduled", "confirmed", "completed"],
+    # Gebuchte Termine (nicht storniert), diese Woche und Vorwoche in einer Abfrage
+    prev_week_start = week_start - timedelta(days=7)
+    prev_week_end = week_end - timedelta(days=7)
+    booked = appointment_minutes_by_period(
+        {"week": (week_start, week_end), "prev_week": (prev_week_start, prev_week_end)}
     )
 
-    booked_count = booked.count()
-    booked_mins = sum((a.end_time - a.start_time).total_seconds() / 60 for a in booked)
+    booked_count = booked["week"].count
+    booked_mins = booked["week"].minutes
 
     # Auslastungsrate
     if available["total_slots"] > 0:
@@ -133,18 +140,7 @@ def calculate_slot_utilization() -> dict[str, Any]:
         utilization_rate = 0
 
     # Trend (Vergleich mit Vorwoche)
-    prev_week_start = week_start - timedelta(days=7)
-    prev_week_end = week_end - timedelta(days=7)
-
-    prev_booked = (
-        Appointment.objects.using("default")
-        .filter(
-            start_time__gte=prev_week_start,
-            start_time__lte=prev_week_end,
-            status__in=["scheduled", "confirmed", "completed"],
-        )
-        .count()
-    )
+    prev_booked = booked["prev_week"].count
 
     if prev_booked > 0:
         trend = round(((booked_count - prev_booked) / prev_booked) * 100, 1)
@@ -194,7 +190,9 @@ def calculate_no_show_rate() -> dict[str, Any]:
     )
     prev_total = prev_past.count()
     prev_flagged = prev_past.filter(is_no_show=True).count()
-    prev_fallback = prev_past.filter(is_no_show=False, status__in=["scheduled", "confirmed"]).count()
+    prev_fallback = prev_past.filter(
+        is_no_show=False, status__in=["scheduled", "confirmed"]
+    ).count()
     prev_no_shows = prev_flagged + prev_fallback
 
     if prev_total > 0:
@@ -318,30 +316,11 @@ def calculate_average_duration() -> float:
     ranges = get_scheduling_date_ranges()
     last_30_start, last_30_end = ranges["last_30"]
 
-    appointments = (
-        Appointment.objects.using("default")
-        .filter(
-            start_time__gte=last_30_start,
-            end_time__lte=last_30_end,
-            status__in=["scheduled", "confirmed", "completed"],
-        )
-        .only("start_time", "end_time")
-    )
-
-    if not appointments.exists():
-        return 0
-
-    total_minutes = 0
-    count = 0
-    for appt in appointments:
-        if appt.start_time and appt.end_time:
-            total_minutes += (appt.end_time - appt.start_time).total_seconds() / 60
-            count += 1
-
-    if count == 0:
+    booked = appointment_minutes(last_30_start, None, end_time__lte=last_30_end)
+    if booked.count == 0:
         return 0
 
-    return round(total_minutes / count, 1)
+    return round(booked.minutes / booked.count, 1)
 
 
 def calculate_rebooking_rate() -> dict[str, Any]:
@@ -429,14 +408,14 @@ def calculate_new_patient_conversion() -> dict[str, Any]:
     ranges = get_scheduling_date_ranges()
     last_30_start, _last_30_end = ranges["last_30"]
 
-    # Alle Termine im Zeitraum
-    appointments = (
+    # Alle Termine im Zeitraum (ein Eintrag je Termin)
+    patient_ids = list(
         Appointment.objects.using("default")
         .filter(start_time__gte=last_30_start, status__in=["scheduled", "confirmed", "completed"])
-        .values("patient_id")
+        .values_list("patient_id", flat=True)
     )
 
-    total_appointments = appointments.count()
+    total_appointments = len(patient_ids)
 
     if total_appointments == 0:
         return {
@@ -446,24 +425,11 @@ def calculate_new_patient_conversion() -> dict[str, Any]:
             "total_appointments": 0,
         }
 
-    # Patienten mit erstem Termin im Zeitraum
-    patient_first_appointments = (
-        Appointment.objects.using("default")
-        .values("patient_id")
-        .annotate(first_appt=Min("start_time"))
-        .order_by("patient_id")
-    )
+    # Erster Termin je Patient (eine gruppierte Abfrage)
+    firsts = first_visits(set(patient_ids))
 
-    new_patients = 0
-    returning_patients = 0
-
-    for appt in appointments:
-        pid = appt["patient_id"]
-        first = patient_first_appointments.filter(patient_id=pid).order_by("patient_id").first()
-        if first and first["first_appt"] >= last_30_start:
-            new_patients += 1
-        else:
-            returning_patients += 1
+    new_patients = sum(1 for pid in patient_ids if firsts[pid] >= last_30_start)
+    returning_patients = total_appointments - new_patients
 
     new_patient_rate = round((new_patients / total_appointments) * 100, 1)
 
@@ -476,29 +442,8 @@ def calculate_new_patient_conversion() -> dict[str, Any]:
 
 
 def calculate_peak_load_heatmap() -> dict[str, Any]:
-    """Peak-Load Analysis - Heatmap nach Wochentag und Stunde."""
-    ranges = get_scheduling_date_ranges()
-    last_30_start, last_30_end = ranges["last_30"]
-
-    appointments = (
-        Appointment.objects.using("default")
-        .filter(start_time__gte=last_30_start, start_time__lte=last_30_end)
-        .annotate(hour=ExtractHour("start_time"), weekday=ExtractWeekDay("start_time"))
-        .values("hour", "weekday")
-        .annotate(count=Count("id"))
-    )
-
-    # Django WeekDay: 1=Sonntag, 2=Montag, ..., 7=Samstag
-    django_to_python = {2: 0, 3: 1, 4: 2, 5: 3, 6: 4, 7: 5, 1: 6}
-    day_names = ["Mo", "Di", "Mi", "Do", "Fr", "Sa", "So"]
-
-    # 7x24 Matrix
-    matrix = [[0 for _ in range(24)] for _ in range(7)]
-
-    for row in appointments:
-        py_day = django_to_python.get(row["weekday"], 0)
-        hour = row["hour"]
-        matrix[py_day][hour] = row["count"]
+    """Peak-Load Analysis - Heatmap nach Wochentag und Stunde (letzte 30 Tage)."""
+    matrix = get_last_30_days_cube().matrix()
 
     # Peak finden
     max_count = 0
@@ -514,8 +459,8 @@ def calculate_peak_load_heatmap() -> dict[str, Any]:
 
     return {
         "matrix": matrix,
-        "day_names": day_names,
-        "peak_day": day_names[peak_day],
+        "day_names": list(DAY_NAMES),
+        "peak_day": DAY_NAMES[peak_day],
         "peak_hour": peak_hour,
         "peak_count": max_count,
     }
@@ -532,38 +477,40 @@ def calculate_doctor_capacity_utilization() -> list[dict[str, Any]]:
         .order_by("last_name", "first_name")
     )
 
-    utilization = []
-
-    for doctor in doctors:
-        # Verfügbare Stunden
-        doctor_hours = DoctorHours.objects.using("default").filter(doctor=doctor, active=True)
-        weekly_available_mins = 0
-        for dh in doctor_hours:
-            start = datetime.combine(date.today(), dh.start_time)
-            end = datetime.combine(date.today(), dh.end_time)
-            weekly_available_mins += (end - start).seconds // 60
-
-        # Abwesenheiten abziehen
-        absences = DoctorAbsence.objects.using("default").filter(
-            doctor=doctor,
-            active=True,
-            start_date__lte=week_end.date(),
-            end_date__gte=week_start.date(),
+    # Verfügbare Stunden
+    available_by_doctor: dict[int, int] = {}
+    for dh in DoctorHours.objects.using("default").filter(active=True, doctor__in=doctors):
+        start = datetime.combine(date.today(), dh.start_time)
+        end = datetime.combine(date.today(), dh.end_time)
+        available_by_doctor[dh.doctor_id] = (
+            available_by_doctor.get(dh.doctor_id, 0) + (end - start).seconds // 60
         )
-        absence_days = 0
-        for absence in absences:
-            start = max(absence.start_date, week_start.date())
-            end = min(absence.end_date, week_end.date())
-            absence_days += (end - start).days + 1
 
-        # Gebuchte Zeit
-        appointments = Appointment.objects.using("default").filter(
-            doctor=doctor,
-            start_time__gte=week_start,
-            start_time__lte=week_end,
-            status__in=["scheduled", "confirmed", "completed"],
+    # Abwesenheiten
+    absence_days_by_doctor: dict[int, int] = {}
+    absences = DoctorAbsence.objects.using("default").filter(
+        doctor__in=doctors,
+        active=True,
+        start_date__lte=week_end.date(),
+        end_date__gte=week_start.date(),
+    )
+    for absence in absences:
+        start = max(absence.start_date, week_start.date())
+        end = min(absence.end_date, week_end.date())
+        absence_days_by_doctor[absence.doctor_id] = (
+            absence_days_by_doctor.get(absence.doctor_id, 0) + (end - start).days + 1
         )
-        booked_mins = sum((a.end_time - a.start_time).total_seconds() / 60 for a in appointments)
+
+    # Gebuchte Zeit
+    booked_by_doctor = appointment_minutes(week_start, week_end, by="doctor")
+
+    utilization = []
+
+    for doctor in doctors:
+        weekly_available_mins = available_by_doctor.get(doctor.id, 0)
+        absence_days = absence_days_by_doctor.get(doctor.id, 0)
+        booked = booked_by_doctor.get(doctor.id, BookedTime())
+        booked_mins = booked.minutes
 
         # Anpassung für Abwesenheiten
         if absence_days > 0 and weekly_available_mins > 0:
@@ -584,7 +531,7 @@ def calculate_doctor_capacity_utilization() -> list[dict[str, Any]]:
                 "available_mins": round(available_mins, 0),
                 "booked_mins": round(booked_mins, 0),
                 "utilization": util_percent,
-                "appointments": appointments.count(),
+                "appointments": booked.count,
             }
         )
 
@@ -606,25 +553,16 @@ def calculate_room_capacity_utilization() -> list[dict[str, Any]]:
         end = datetime.combine(date.today(), ph.end_time)
         weekly_open_mins += (end - start).seconds // 60
 
+    # Termine in den Räumen
+    booked_by_room = resource_minutes(
+        week_start, week_end, resource_type=Resource.TYPE_ROOM, include_operations=False
+    )
+
     utilization = []
 
     for room in rooms:
-        # Termine in diesem Raum
-        appointment_mins = 0
-        ar_rows = (
-            AppointmentResource.objects.using("default")
-            .filter(
-                resource=room,
-                appointment__start_time__gte=week_start,
-                appointment__start_time__lte=week_end,
-                appointment__status__in=["scheduled", "confirmed", "completed"],
-            )
-            .select_related("appointment")
-        )
-
-        for ar in ar_rows:
-            a = ar.appointment
-            appointment_mins += (a.end_time - a.start_time).total_seconds() / 60
+        booked = booked_by_room.get(room.id, BookedTime())
+        appointment_mins = booked.minutes
 
         if weekly_open_mins > 0:
             util_percent = min(round((appointment_mins / weekly_open_mins) * 100, 1), 100)
@@ -639,7 +577,7 @@ def calculate_room_capacity_utilization() -> list[dict[str, Any]]:
                 "available_mins": weekly_open_mins,
                 "booked_mins": round(appointment_mins, 0),
                 "utilization": util_percent,
-                "appointments": ar_rows.count(),
+                "appointments": booked.count,
             }
         )
 
@@ -684,31 +622,60 @@ def get_all_scheduling_kpis() -> dict[str, Any]:
     """Sammelt alle Scheduling-KPIs."""
     logger.debug("kpi.scheduling.get_all_scheduling_kpis start")
     with timed_block("kpi.scheduling.get_all_scheduling_kpis", log=logger, level="debug"):
-        slot_utilization = calculate_slot_utilization()
-        no_show = calculate_no_show_rate()
-        cancellation = calculate_cancellation_rate()
-        lead_time = calculate_average_lead_time()
-        rebooking = calculate_rebooking_rate()
-        efficiency = calculate_scheduling_efficiency()
-        new_patient = calculate_new_patient_conversion()
-        completion_rate = calculate_completion_rate()
-        avg_duration = calculate_average_duration()
+        run = run_kpi_sections(
+            "scheduling",
+            {
+                "slot_utilization": calculate_slot_utilization,
+                "no_show": calculate_no_show_rate,
+                "cancellation": calculate_cancellation_rate,
+                "lead_time": calculate_average_lead_time,
+                "rebooking": calculate_rebooking_rate,
+                "efficiency": calculate_scheduling_efficiency,
+                "new_patient": calculate_new_patient_conversion,
+                "completion_rate": calculate_completion_rate,
+                "avg_duration": calculate_average_duration,
+                "peak_load": calculate_peak_load_heatmap,
+                "doctor_utilization": calculate_doctor_capacity_utilization,
+                "room_utilization": calculate_room_capacity_utilization,
+                "trends": get_scheduling_trends,
+            },
+            empty={
+                "slot_utilization": {},
+                "no_show": {},
+                "cancellation": {},
+                "lead_time": {},
+                "rebooking": {},
+                "efficiency": {},
+                "new_patient": {},
+                "completion_rate": {},
+                "avg_duration": 0,
+                "peak_load": {},
+                "doctor_utilization": [],
+                "room_utilization": [],
+                "trends": {},
+            },
+        )
+        values = run.values
+        lead_time = values["lead_time"]
+        new_patient = values["new_patient"]
+        no_show = values["no_show"]
+        efficiency = values["efficiency"]
 
         # Template-friendly aliases for existing structures
         lead_time_display = {
-            "avg_days": lead_time["avg_lead_time_days"],
-            "min_days": round(lead_time["min_lead_time_hours"] / 24, 1),
-            "max_days": lead_time["max_lead_time_days"],
+            "avg_days": lead_time.get("avg_lead_time_days", 0),
+            "min_days": round(lead_time.get("min_lead_time_hours", 0) / 24, 1),
+            "max_days": lead_time.get("max_lead_time_days", 0),
         }
         new_patient_display = {
-            "rate": new_patient["new_patient_rate"],
-            "new_patient_count": new_patient["new_patients"],
-            "total_appointments": new_patient["total_appointments"],
+            "rate": new_patient.get("new_patient_rate", 0),
+            "new_patient_count": new_patient.get("new_patients", 0),
+            "total_appointments": new_patient.get("total_appointments", 0),
         }
         no_show_display = {
-            "rate": no_show["no_show_rate"],
-            "no_show": no_show["no_show_count"],
-            "total": no_show["total_past_appointments"],
+            "rate": no_show.get("no_show_rate", 0),
+            "no_show": no_show.get("no_show_count", 0),
+            "total": no_show.get("total_past_appointments", 0),
         }
 
         # Inject aliases into the original dicts for template compatibility
@@ -716,23 +683,23 @@ def get_all_scheduling_kpis() -> dict[str, Any]:
         new_patient.update(new_patient_display)
 
         result = {
-            "slot_utilization": slot_utilization,
+            "slot_utilization": values["slot_utilization"],
             "no_show": no_show,
-            "cancellation": cancellation,
+            "cancellation": values["cancellation"],
             "lead_time": lead_time,
-            "rebooking": rebooking,
+            "rebooking": values["rebooking"],
             "efficiency": efficiency,
             "new_patient": new_patient,
-            "peak_load": calculate_peak_load_heatmap(),
-            "doctor_utilization": calculate_doctor_capacity_utilization(),
-            "room_utilization": calculate_room_capacity_utilization(),
-            "trends": get_scheduling_trends(),
+            "peak_load": values["peak_load"],
+            "doctor_utilization": values["doctor_utilization"],
+            "room_utilization": values["room_utilization"],
+            "trends": values["trends"],
             "generated_at": timezone.now().isoformat(),
             # Keys used directly in scheduling.html
-            "efficiency_score": efficiency["efficiency_score"],
-            "completion_rate": completion_rate,
+            "efficiency_score": efficiency.get("efficiency_score", 0),
+            "completion_rate": values["completion_rate"],
             "no_show_rate": no_show_display,
-            "avg_duration": avg_duration,
+            "avg_duration": values["avg_duration"],
         }
     logger.debug("kpi.scheduling.get_all_scheduling_kpis end")
     return result
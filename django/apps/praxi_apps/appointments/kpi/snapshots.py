@@ -0,0 +1,223 @@
+"""Cached KPI snapshots with stale-while-revalidate.
+
+Dashboard payloads are computed by registered snapshot functions and kept in a
+Django cache backend, so polling screens share one computation:
+
+- fresh (younger than ``PRAXI_KPI_CACHE_TTL``): served as is
+- stale (within ``PRAXI_KPI_CACHE_STALE_TTL`` after that): served while the
+  first caller to take the refresh lock recomputes it
+- missing or older: computed by the caller
+
+Appointment and Operation writes mark every snapshot stale whose covered date
+range contains the old or new date of the row; the next reader refreshes it.
+Inside a transaction snapshots are computed directly and never stored, since
+they may see uncommitted rows. Payloads in which a KPI section timed out are
+served but not stored either, so the next reader computes them again.
+
+Counters (hit/stale/miss/refresh/invalidation) are kept in the same cache and
+returned by :func:`get_kpi_cache_stats`.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections, transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+from praxi_backend.appointments.kpi.executor import collect_timeouts
+from praxi_backend.appointments.kpi.main_charts import get_all_charts
+from praxi_backend.appointments.kpi.main_kpis import get_all_kpis, get_date_ranges
+from praxi_backend.appointments.models import Appointment, Operation
+from praxi_backend.appointments.original_values import original_values, track
+
+CACHE_KEY_PREFIX = "praxi:kpi_snapshot"
+COUNTERS = ("hit", "stale", "miss", "refresh", "invalidation")
+
+
+@dataclass(frozen=True)
+class KpiSnapshot:
+    """A registered snapshot: ``compute`` builds the payload, ``covers`` returns
+    the first date it depends on (or None for "all dates")."""
+
+    name: str
+    compute: Callable[[], Any]
+    covers: Callable[[], date | None]
+
+
+_registry: dict[str, KpiSnapshot] = {}
+
+
+def register_kpi_snapshot(
+    name: str, compute: Callable[[], Any], *, covers: Callable[[], date | None]
+) -> None:
+    """Register ``compute`` under ``name``; ``covers()`` is evaluated at compute time."""
+    _registry[name] = KpiSnapshot(name=name, compute=compute, covers=covers)
+
+
+# ---------------------------------------------------------------------------
+# Cache access
+# ---------------------------------------------------------------------------
+
+
+def _cache():
+    return caches[getattr(settings, "PRAXI_KPI_CACHE_ALIAS", "default")]
+
+
+def _ttl() -> int:
+    return int(getattr(settings, "PRAXI_KPI_CACHE_TTL", 60))
+
+
+def _stale_ttl() -> int:
+    return int(getattr(settings, "PRAXI_KPI_CACHE_STALE_TTL", 300))
+
+
+def _key(name: str) -> str:
+    return f"{CACHE_KEY_PREFIX}:{name}"
+
+
+def _count(counter: str, name: str) -> None:
+    cache = _cache()
+    key = f"{CACHE_KEY_PREFIX}:stats:{name}:{counter}"
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add and incr; counters are best-effort.
+        cache.set(key, 1, timeout=None)
+
+
+def get_kpi_cache_stats() -> dict[str, dict[str, int]]:
+    """Return ``{snapshot name: {counter: value}}`` for all registered snapshots."""
+    cache = _cache()
+    stats = {}
+    for name in _registry:
+        keys = {c: f"{CACHE_KEY_PREFIX}:stats:{name}:{c}" for c in COUNTERS}
+        values = cache.get_many(list(keys.values()))
+        stats[name] = {c: int(values.get(k, 0)) for c, k in keys.items()}
+    return stats
+
+
+def _store(snapshot: KpiSnapshot) -> Any:
+    with collect_timeouts() as timed_out:
+        payload = snapshot.compute()
+    if timed_out:
+        return payload
+    start = snapshot.covers()
+    entry = {
+        "payload": payload,
+        "computed_at": time.time(),
+        "covers_from": start.isoformat() if start else None,
+        "invalidated": False,
+    }
+    _cache().set(_key(snapshot.name), entry, timeout=_ttl() + _stale_ttl())
+    return payload
+
+
+def get_kpi_snapshot(name: str) -> Any:
+    """Return the payload of snapshot ``name``, computing it only when needed."""
+    snapshot = _registry[name]
+    if connections["default"].in_atomic_block:
+        return snapshot.compute()
+
+    cache = _cache()
+    entry = cache.get(_key(name))
+    if entry is None:
+        _count("miss", name)
+        return _store(snapshot)
+
+    age = time.time() - entry["computed_at"]
+    if age < _ttl() and not entry["invalidated"]:
+        _count("hit", name)
+        return entry["payload"]
+
+    # Stale: the first caller refreshes, everyone else keeps the old payload.
+    lock_key = f"{_key(name)}:refreshing"
+    if cache.add(lock_key, 1, timeout=max(_ttl(), 1)):
+        try:
+            _count("refresh", name)
+            return _store(snapshot)
+        finally:
+            cache.delete(lock_key)
+    _count("stale", name)
+    return entry["payload"]
+
+
+# ---------------------------------------------------------------------------
+# Invalidation
+# ---------------------------------------------------------------------------
+
+
+def invalidate_kpi_snapshots(*, touched: set[date] | None = None) -> list[str]:
+    """Mark snapshots stale whose range contains a ``touched`` date (None: all)."""
+    cache = _cache()
+    invalidated = []
+    for name in _registry:
+        entry = cache.get(_key(name))
+        if entry is None or entry["invalidated"]:
+            continue
+        covers_from = entry["covers_from"]
+        if touched is not None and covers_from is not None:
+            first = date.fromisoformat(covers_from)
+            if not any(d >= first for d in touched):
+                continue
+        entry["invalidated"] = True
+        cache.set(_key(name), entry, timeout=_ttl() + _stale_ttl())
+        _count("invalidation", name)
+        invalidated.append(name)
+    return invalidated
+
+
+def _local_date(value) -> date | None:
+    if value is None:
+        return None
+    return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+
+
+def _booking_changed(sender, instance, **kwargs) -> None:
+    original = original_values(instance)
+    times = [instance.start_time, instance.end_time]
+    times += [original.get("start_time"), original.get("end_time")]
+    touched = {d for d in map(_local_date, times) if d is not None}
+    if not touched:
+        return
+    invalidate_kpi_snapshots(touched=touched)
+    # A reader in another process may recompute before this transaction commits.
+    transaction.on_commit(lambda: invalidate_kpi_snapshots(touched=touched), using="default")
+
+
+def connect_signals() -> None:
+    """Mark KPI snapshots stale on Appointment and Operation writes."""
+    for model in (Appointment, Operation):
+        track(model, ("start_time", "end_time"))
+        post_save.connect(_booking_changed, sender=model, dispatch_uid=f"kpi_save_{model.__name__}")
+        post_delete.connect(
+            _booking_changed, sender=model, dispatch_uid=f"kpi_delete_{model.__name__}"
+        )
+
+
+# ---------------------------------------------------------------------------
+# Main dashboard snapshots
+# ---------------------------------------------------------------------------
+
+
+def _main_kpis_start() -> date:
+    ranges = get_date_ranges()
+    week_start, _ = ranges["week"]
+    starts = [ranges["last_30"][0], ranges["month"][0], week_start - timedelta(days=7)]
+    return min(timezone.localdate(s) for s in starts)
+
+
+def _main_charts_start() -> date:
+    today = timezone.localdate()
+    return min(today - timedelta(days=30), today.replace(day=1))
+
+
+register_kpi_snapshot("main_kpis", get_all_kpis, covers=_main_kpis_start)
+register_kpi_snapshot("main_charts", get_all_charts, covers=_main_charts_start)
@@ -0,0 +1,216 @@
+"""Streaming booking reader for the KPI report commands.
+
+The report commands (``calculate_kpis``, ``efficiency_kpis``) used to load
+every appointment and operation as model instances and iterate the lists
+several times. This module streams narrow ``values_list`` rows in chunks
+(server-side cursor) so a report runs in one pass with constant memory:
+
+- :func:`iter_bookings` yields :class:`Booking` rows for appointments and
+  operations, merged in ``(doctor, start)`` or ``(room, start)`` order.
+- :class:`DurationStats` keeps count/mean/median/min/max incrementally.
+- :func:`add_window_arguments` / :func:`window_from_options` provide the
+  shared ``--since/--until`` options.
+
+Architecture rules:
+- All DB access uses .using('default')
+- PostgreSQL only
+"""
+
+from __future__ import annotations
+
+import heapq
+from argparse import ArgumentParser
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime, time, timedelta
+from fractions import Fraction
+from typing import Any, NamedTuple
+
+from django.core.management.base import CommandError
+from django.utils import timezone
+from praxi_backend.appointments.models import Appointment, Operation
+
+# Rows fetched per round trip of the server-side cursor
+BOOKING_CHUNK_SIZE = 2000
+
+KIND_APPOINTMENT = "appointment"
+KIND_OPERATION = "operation"
+
+
+class Booking(NamedTuple):
+    """One appointment or operation, reduced to the columns the reports use."""
+
+    kind: str
+    id: int
+    doctor_id: int | None
+    patient_id: int | None
+    room_id: int | None
+    start: datetime
+    end: datetime
+    doctor_role: str | None
+
+    @property
+    def duration_minutes(self) -> float:
+        return (self.end - self.start).total_seconds() / 60
+
+
+# Booking fields in values_list order, per model
+_COLUMNS = {
+    KIND_APPOINTMENT: (
+        Appointment,
+        (
+            "id",
+            "doctor_id",
+            "patient_id",
+            None,
+            "start_time",
+            "end_time",
+            "doctor__role__name",
+        ),
+    ),
+    KIND_OPERATION: (
+        Operation,
+        (
+            "id",
+            "primary_surgeon_id",
+            "patient_id",
+            "op_room_id",
+            "start_time",
+            "end_time",
+            "primary_surgeon__role__name",
+        ),
+    ),
+}
+
+_ORDER_FIELDS = {"doctor": 2, "room": 4}
+
+
+def _stream(
+    kind: str,
+    order: str,
+    since: datetime | None,
+    until: datetime | None,
+    chunk_size: int,
+) -> Iterator[Booking]:
+    model, columns = _COLUMNS[kind]
+    qs = model.objects.using("default")
+    if since is not None:
+        qs = qs.filter(start_time__gte=since)
+    if until is not None:
+        qs = qs.filter(start_time__lt=until)
+
+    order_column = columns[_ORDER_FIELDS[order] - 1]
+    if order_column is None:
+        raise ValueError(f"{kind} bookings have no {order!r} column")
+    fields = [c for c in columns if c is not None]
+    rows = qs.order_by(order_column, "start_time", "id").values_list(*fields)
+    for row in rows.iterator(chunk_size=chunk_size):
+        values = list(row)
+        if columns[3] is None:
+            values.insert(3, None)
+        yield Booking(kind, *values)
+
+
+def _order_key(index: int):
+    # PostgreSQL sorts NULLs last in ascending order.
+    def key(booking: Booking):
+        value = booking[index]
+        return (value is None, value or 0, booking.start)
+
+    return key
+
+
+def iter_bookings(
+    *,
+    kinds: Iterable[str] = (KIND_APPOINTMENT, KIND_OPERATION),
+    order: str = "doctor",
+    since: datetime | None = None,
+    until: datetime | None = None,
+    chunk_size: int = BOOKING_CHUNK_SIZE,
+) -> Iterator[Booking]:
+    """Stream bookings with ``since <= start_time < until`` in ``order``.
+
+    ``order`` is ``"doctor"`` or ``"room"`` (operations only); rows are sorted
+    by that column, then start time. On ties appointments come first.
+    """
+    if order not in _ORDER_FIELDS:
+        raise ValueError(f"Unsupported order: {order!r}")
+    streams = [_stream(kind, order, since, until, chunk_size) for kind in kinds]
+    return heapq.merge(*streams, key=_order_key(_ORDER_FIELDS[order]))
+
+
+class DurationStats:
+    """Incremental count/mean/median/min/max of duration values.
+
+    Values are kept as a histogram; booking durations take few distinct
+    values, so memory stays bounded while the median is still exact.
+    """
+
+    def __init__(self) -> None:
+        self._counts: Counter[float] = Counter()
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        self._counts[value] += 1
+        self.count += 1
+
+    def __bool__(self) -> bool:
+        return self.count > 0
+
+    @property
+    def total(self) -> float:
+        return sum(value * n for value, n in self._counts.items())
+
+    @property
+    def mean(self) -> float:
+        exact = sum(Fraction(value) * n for value, n in self._counts.items())
+        return float(exact / self.count)
+
+    @property
+    def median(self) -> float:
+        upper = self.count // 2
+        lower = upper if self.count % 2 else upper - 1
+        below = None
+        seen = 0
+        for value in sorted(self._counts):
+            seen += self._counts[value]
+            if below is None and seen > lower:
+                below = value
+            if seen > upper:
+                return value if self.count % 2 else (below + value) / 2
+        raise ValueError("median of empty data")
+
+    @property
+    def min(self) -> float:
+        return min(self._counts)
+
+    @property
+    def max(self) -> float:
+        return max(self._counts)
+
+
+def _parse_date(value: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError as exc:
+        raise CommandError(f"Invalid date {value!r}, expected YYYY-MM-DD") from exc
+
+
+def add_window_arguments(parser: ArgumentParser) -> None:
+    """Add ``--since``/``--until`` (local dates, inclusive) to a report command."""
+    parser.add_argument("--since", type=str, help="First local date (YYYY-MM-DD)")
+    parser.add_argument("--until", type=str, help="Last local date (YYYY-MM-DD)")
+
+
+def window_from_options(options: dict[str, Any]) -> tuple[datetime | None, datetime | None]:
+    """Return the ``[since, until)`` datetimes for the ``--since/--until`` options."""
+    tz = timezone.get_current_timezone()
+    since = until = None
+    if options.get("since"):
+        since = timezone.make_aware(datetime.combine(_parse_date(options["since"]), time.min), tz)
+    if options.get("until"):
+        last = _parse_date(options["until"]) + timedelta(days=1)
+        until = timezone.make_aware(datetime.combine(last, time.min), tz)
+    if since is not None and until is not None and since >= until:
+        raise CommandError("--since must not be after --until")
+    return since, until
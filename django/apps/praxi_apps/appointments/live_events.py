@@ -0,0 +1,506 @@
+"""praxi_backend.appointments.live_events
+
+Server-sent change events for the live OP and patient-flow boards.
+
+``OpTimelineLiveView``, ``OpDashboardLiveView`` and ``PatientFlowLiveView``
+are pull-only, so every board polled them every few seconds. This module
+pushes one event per committed change instead:
+
+- ``operation.created`` / ``.status`` / ``.moved`` (time or room) /
+  ``.updated`` / ``.deleted``
+- ``patient_flow.created`` / ``.status`` / ``.updated`` / ``.deleted``
+
+Each event carries the row's ids, status and times plus ``previous`` (the old
+values of the changed fields); boards patch their state or refetch the row.
+
+Delivery:
+- ``post_save``/``post_delete`` build the event; it is published once the
+  transaction commits (rolled back changes are never sent).
+- :class:`LiveEventBroadcaster` keeps the last ``BUFFER_SIZE`` events and hands
+  new ones to the asyncio queue of every open stream of this process.
+- With ``PRAXI_LIVE_EVENTS_REDIS_URL`` set, events are published to a Redis
+  channel instead, and one listener thread per process feeds the local
+  broadcaster, so every worker sees every event.
+
+Event ids are increasing microsecond timestamps: taken from one sequence in
+Redis (on the Redis clock) when fan-out is configured, else per process. A
+client that reconnects with ``Last-Event-ID`` gets the buffered events it
+missed; if they are no longer buffered (or a slow client overflowed its queue)
+it gets a ``reset`` event and should refetch the live endpoints. An event that
+arrives after one with a higher id (two commits racing to publish) is treated
+the same way: it is delivered to open streams, but streams resuming from before
+it get a ``reset``, since replay by id would skip it. A new stream starts with
+a ``ready`` event; fetch the snapshot after it to not miss a change.
+
+Doctors only receive events of operations/flows they are assigned to, the
+same rule as the live endpoints.
+
+Settings:
+- ``PRAXI_LIVE_EVENTS``: enable signals and the stream endpoint (default off)
+- ``PRAXI_LIVE_EVENTS_REDIS_URL``: Redis pub/sub fan-out across workers
+- ``PRAXI_LIVE_EVENTS_HEARTBEAT``: seconds between keep-alive comments
+- ``PRAXI_LIVE_EVENTS_MAX_SECONDS``: stream lifetime; clients reconnect
+
+Architecture rules:
+- All DB access uses .using('default')
+- Streams need an ASGI server. Under WSGI Django reads the whole stream
+  before sending it, so the endpoint answers 501 there instead of holding a
+  worker for ``PRAXI_LIVE_EVENTS_MAX_SECONDS`` and then sending one burst
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from .models import Appointment, Operation, PatientFlow
+from .original_values import original_values, track
+
+logger = logging.getLogger(__name__)
+
+OPERATIONS = "operations"
+PATIENT_FLOW = "patient_flow"
+CHANNELS = (OPERATIONS, PATIENT_FLOW)
+
+BUFFER_SIZE = 1000
+SUBSCRIBER_QUEUE_SIZE = 500
+RETRY_MS = 3000
+REDIS_CHANNEL = "praxi:live_events"
+REDIS_ID_KEY = "praxi:live_events:last_id"
+
+# Next id: above the last one and not behind the Redis clock (microseconds; exact
+# in a Lua double and formatted without exponent).
+REDIS_NEXT_ID_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000000 + tonumber(t[2])
+local last = tonumber(redis.call('GET', KEYS[1]) or '0')
+local id = string.format('%.0f', math.max(last + 1, now))
+redis.call('SET', KEYS[1], id)
+return id
+"""
+
+OPERATION_FIELDS = ("status", "start_time", "end_time", "op_room_id")
+MOVE_FIELDS = ("start_time", "end_time", "op_room_id")
+FLOW_FIELDS = ("status",)
+
+# Put into a subscriber queue when it overflowed; the stream sends "reset" and ends.
+RESET = object()
+
+
+def live_events_enabled() -> bool:
+    return bool(getattr(settings, "PRAXI_LIVE_EVENTS", False))
+
+
+def _redis_url() -> str | None:
+    return getattr(settings, "PRAXI_LIVE_EVENTS_REDIS_URL", None) or None
+
+
+def _now_us() -> int:
+    return time.time_ns() // 1000
+
+
+def _json_value(value: Any) -> Any:
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+@dataclass(frozen=True)
+class LiveEvent:
+    id: int
+    channel: str
+    type: str
+    data: dict[str, Any]
+    doctor_ids: tuple[int, ...] = ()
+
+    def visible_to(self, user_id: int | None, role_name: str | None) -> bool:
+        return role_name != "doctor" or user_id in self.doctor_ids
+
+    def to_sse(self) -> str:
+        return f"id: {self.id}\nevent: {self.type}\ndata: {json.dumps(self.data)}\n\n"
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "id": self.id,
+                "channel": self.channel,
+                "type": self.type,
+                "data": self.data,
+                "doctor_ids": list(self.doctor_ids),
+            }
+        )
+
+    @classmethod
+    def from_json(cls, raw: str | bytes) -> LiveEvent:
+        value = json.loads(raw)
+        return cls(
+            id=int(value["id"]),
+            channel=value["channel"],
+            type=value["type"],
+            data=value["data"],
+            doctor_ids=tuple(value.get("doctor_ids") or ()),
+        )
+
+
+def _control(event: str, event_id: int) -> str:
+    return f"id: {event_id}\nevent: {event}\ndata: {{}}\n\n"
+
+
+# ---------------------------------------------------------------------------
+# Broadcaster
+# ---------------------------------------------------------------------------
+
+
+class Subscription:
+    """One open stream: an asyncio queue on the stream's event loop."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, channels: frozenset[str]):
+        self.loop = loop
+        self.channels = channels
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.overflowed = False
+
+    def offer(self, item: LiveEvent) -> None:
+        # Runs on self.loop.
+        if self.overflowed:
+            return
+        if self.queue.qsize() >= SUBSCRIBER_QUEUE_SIZE:
+            self.overflowed = True
+            self.queue.put_nowait(RESET)
+            return
+        self.queue.put_nowait(item)
+
+
+class LiveEventBroadcaster:
+    """Fan-out of live events to the streams of this process."""
+
+    def __init__(self, buffer_size: int = BUFFER_SIZE):
+        self._lock = threading.Lock()
+        self._buffer: deque[LiveEvent] = deque(maxlen=buffer_size)
+        self._subscribers: set[Subscription] = set()
+        self._last_id = 0
+        self._last_delivered = 0
+        # Events with an id above the horizon are all still buffered.
+        self._horizon = _now_us()
+
+    def next_id(self) -> int:
+        with self._lock:
+            self._last_id = max(self._last_id + 1, self._last_delivered + 1, _now_us())
+            return self._last_id
+
+    def head(self) -> int:
+        with self._lock:
+            return max(self._horizon, self._last_delivered)
+
+    def mark_gap(self, upto: int | None = None) -> None:
+        """Events with ids up to ``upto`` (default: now) may have been missed."""
+        with self._lock:
+            self._horizon = max(self._horizon, upto if upto is not None else _now_us())
+
+    def deliver(self, event: LiveEvent) -> None:
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self._horizon = max(self._horizon, self._buffer[0].id)
+            if event.id <= self._last_delivered:
+                # Out of order: a stream resuming after any id up to the newest
+                # one may not have seen this event yet.
+                self._horizon = max(self._horizon, self._last_delivered + 1)
+            self._buffer.append(event)
+            self._last_delivered = max(self._last_delivered, event.id)
+            targets = [s for s in self._subscribers if event.channel in s.channels]
+        for subscription in targets:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, event)
+            except RuntimeError:
+                # Event loop closed without unsubscribing.
+                self.unsubscribe(subscription)
+
+    def subscribe(
+        self, channels: Iterable[str], last_event_id: int | None = None
+    ) -> tuple[Subscription, list[LiveEvent] | None, int]:
+        """Open a subscription on the running loop.
+
+        Returns ``(subscription, backlog, head)``; ``backlog`` holds the buffered
+        events after ``last_event_id`` and is None if some of them are gone.
+        """
+        subscription = Subscription(asyncio.get_running_loop(), frozenset(channels))
+        with self._lock:
+            self._subscribers.add(subscription)
+            head = max(self._horizon, self._last_delivered)
+            if last_event_id is None:
+                backlog: list[LiveEvent] | None = []
+            elif last_event_id < self._horizon:
+                backlog = None
+            else:
+                backlog = [
+                    e
+                    for e in self._buffer
+                    if e.id > last_event_id and e.channel in subscription.channels
+                ]
+        return subscription, backlog, head
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+
+broadcaster = LiveEventBroadcaster()
+
+
+# ---------------------------------------------------------------------------
+# Redis fan-out
+# ---------------------------------------------------------------------------
+
+_redis_clients: dict[str, Any] = {}
+_listeners: dict[str, threading.Thread] = {}
+_listeners_lock = threading.Lock()
+
+
+def _redis_client(url: str):
+    import redis
+
+    client = _redis_clients.get(url)
+    if client is None:
+        client = _redis_clients[url] = redis.Redis.from_url(url)
+    return client
+
+
+def _listen(url: str) -> None:
+    while True:
+        try:
+            pubsub = _redis_client(url).pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(REDIS_CHANNEL)
+            # Anything published while we were not subscribed is lost.
+            last_id = _redis_client(url).get(REDIS_ID_KEY)
+            broadcaster.mark_gap(int(last_id) + 1 if last_id else None)
+            for message in pubsub.listen():
+                broadcaster.deliver(LiveEvent.from_json(message["data"]))
+        except Exception:
+            logger.warning("live_events: Redis listener failed, reconnecting", exc_info=True)
+            time.sleep(1)
+
+
+def ensure_listener() -> None:
+    """Start this process' Redis listener thread if fan-out is configured."""
+    url = _redis_url()
+    if url is None:
+        return
+    with _listeners_lock:
+        thread = _listeners.get(url)
+        if thread is None or not thread.is_alive():
+            thread = threading.Thread(
+                target=_listen, args=(url,), name="praxi-live-events", daemon=True
+            )
+            _listeners[url] = thread
+            thread.start()
+
+
+def _next_redis_id(url: str) -> int:
+    client = _redis_client(url)
+    return int(client.eval(REDIS_NEXT_ID_SCRIPT, 1, REDIS_ID_KEY))
+
+
+def publish(channel: str, event_type: str, data: dict[str, Any], doctor_ids=()) -> LiveEvent:
+    """Assign an id and deliver the event to all streams (via Redis if configured)."""
+    fields = {
+        "channel": channel,
+        "type": event_type,
+        "data": data,
+        "doctor_ids": tuple(sorted({d for d in doctor_ids if d is not None})),
+    }
+    url = _redis_url()
+    if url is not None:
+        try:
+            event = LiveEvent(id=_next_redis_id(url), **fields)
+            _redis_client(url).publish(REDIS_CHANNEL, event.to_json())
+            return event
+        except Exception:
+            logger.warning("live_events: Redis publish failed, delivering locally", exc_info=True)
+    event = LiveEvent(id=broadcaster.next_id(), **fields)
+    broadcaster.deliver(event)
+    return event
+
+
+# ---------------------------------------------------------------------------
+# Signals
+# ---------------------------------------------------------------------------
+
+TRACKED_FIELDS = {Operation: OPERATION_FIELDS, PatientFlow: FLOW_FIELDS}
+
+
+def _changes(sender, instance) -> dict[str, Any]:
+    original = original_values(instance)
+    return {
+        f: _json_value(original[f])
+        for f in TRACKED_FIELDS[sender]
+        if f in original and original[f] != getattr(instance, f)
+    }
+
+
+def _operation_data(op: Operation) -> dict[str, Any]:
+    return {
+        "id": op.pk,
+        "status": op.status,
+        "start_time": _json_value(op.start_time),
+        "end_time": _json_value(op.end_time),
+        "op_room_id": op.op_room_id,
+        "op_type_id": op.op_type_id,
+        "primary_surgeon_id": op.primary_surgeon_id,
+        "assistant_id": op.assistant_id,
+        "anesthesist_id": op.anesthesist_id,
+    }
+
+
+def _team(op_id: int | None) -> tuple[int, ...]:
+    if op_id is None:
+        return ()
+    team = (
+        Operation.objects.using("default")
+        .filter(pk=op_id)
+        .values_list("primary_surgeon_id", "assistant_id", "anesthesist_id")
+        .first()
+    )
+    return tuple(team or ())
+
+
+def _flow_doctors(operation_id: int | None, appointment_id: int | None) -> tuple[int, ...]:
+    doctors = _team(operation_id)
+    if appointment_id is not None:
+        doctor_id = (
+            Appointment.objects.using("default")
+            .filter(pk=appointment_id)
+            .values_list("doctor_id", flat=True)
+            .first()
+        )
+        doctors += (doctor_id,)
+    return doctors
+
+
+def _flow_data(flow: PatientFlow) -> dict[str, Any]:
+    return {
+        "id": flow.pk,
+        "status": flow.status,
+        "appointment_id": flow.appointment_id,
+        "operation_id": flow.operation_id,
+        "arrival_time": _json_value(flow.arrival_time),
+        "status_changed_at": _json_value(flow.status_changed_at),
+    }
+
+
+def _event_type(prefix: str, created: bool, deleted: bool, previous: dict[str, Any]) -> str:
+    if created:
+        return f"{prefix}.created"
+    if deleted:
+        return f"{prefix}.deleted"
+    if "status" in previous:
+        return f"{prefix}.status"
+    if any(f in previous for f in MOVE_FIELDS):
+        return f"{prefix}.moved"
+    return f"{prefix}.updated"
+
+
+def _publish_on_commit(
+    channel: str, event_type: str, data: dict[str, Any], doctor_ids: Callable[[], Iterable]
+) -> None:
+    """Publish after commit; ``doctor_ids()`` is evaluated then, outside the write path."""
+    transaction.on_commit(
+        lambda: publish(channel, event_type, data, doctor_ids()), using="default", robust=True
+    )
+
+
+def _operation_changed(sender, instance, created=False, **kwargs) -> None:
+    if not live_events_enabled():
+        return
+    deleted = kwargs.get("signal") is post_delete
+    previous = {} if created or deleted else _changes(sender, instance)
+    data = {**_operation_data(instance), "previous": previous}
+    doctor_ids = (instance.primary_surgeon_id, instance.assistant_id, instance.anesthesist_id)
+    _publish_on_commit(
+        OPERATIONS, _event_type("operation", created, deleted, previous), data, lambda: doctor_ids
+    )
+
+
+def _flow_changed(sender, instance, created=False, **kwargs) -> None:
+    if not live_events_enabled():
+        return
+    deleted = kwargs.get("signal") is post_delete
+    previous = {} if created or deleted else _changes(sender, instance)
+    data = {**_flow_data(instance), "previous": previous}
+    _publish_on_commit(
+        PATIENT_FLOW,
+        _event_type("patient_flow", created, deleted, previous),
+        data,
+        lambda: _flow_doctors(data["operation_id"], data["appointment_id"]),
+    )
+
+
+def connect_signals() -> None:
+    """Publish live events on Operation and PatientFlow writes."""
+    for model, receiver in ((Operation, _operation_changed), (PatientFlow, _flow_changed)):
+        name = model.__name__
+        track(model, TRACKED_FIELDS[model], live_events_enabled)
+        post_save.connect(receiver, sender=model, dispatch_uid=f"live_save_{name}")
+        post_delete.connect(receiver, sender=model, dispatch_uid=f"live_delete_{name}")
+
+
+# ---------------------------------------------------------------------------
+# Stream
+# ---------------------------------------------------------------------------
+
+
+async def event_stream(
+    channels: Iterable[str],
+    *,
+    user_id: int | None,
+    role_name: str | None,
+    last_event_id: int | None = None,
+) -> AsyncIterator[str]:
+    """SSE body for one client; ends after ``PRAXI_LIVE_EVENTS_MAX_SECONDS``."""
+    heartbeat = max(1, int(getattr(settings, "PRAXI_LIVE_EVENTS_HEARTBEAT", 15)))
+    max_seconds = max(1, int(getattr(settings, "PRAXI_LIVE_EVENTS_MAX_SECONDS", 300)))
+    ensure_listener()
+    subscription, backlog, head = broadcaster.subscribe(channels, last_event_id)
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        if backlog is None:
+            yield _control("reset", head)
+        elif last_event_id is None:
+            yield _control("ready", head)
+        else:
+            for event in backlog:
+                if event.visible_to(user_id, role_name):
+                    yield event.to_sse()
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_seconds
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                item = await asyncio.wait_for(
+                    subscription.queue.get(), timeout=min(heartbeat, remaining)
+                )
+            except TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if item is RESET:
+                yield _control("reset", broadcaster.head())
+                return
+            if item.visible_to(user_id, role_name):
+                yield item.to_sse()
+    finally:
+        broadcaster.unsubscribe(subscription)
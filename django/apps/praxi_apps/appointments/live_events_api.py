@@ -0,0 +1,115 @@
+"""Live event stream (server-sent events) for the OP and patient-flow boards.
+
+GET /api/live/events/?channels=operations,patient_flow
+    Accept: text/event-stream
+    Last-Event-ID: <id>   (optional, resume after a reconnect)
+
+See ``live_events`` for the event types and delivery guarantees. Requests
+that did not come through ASGI get 501: under WSGI Django drains the async
+stream before sending anything, so the client would wait
+``PRAXI_LIVE_EVENTS_MAX_SECONDS`` for a single burst.
+"""
+
+from __future__ import annotations
+
+import json
+
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .live_events import (
+    CHANNELS,
+    OPERATIONS,
+    PATIENT_FLOW,
+    event_stream,
+    live_events_enabled,
+)
+from .permissions import OpDashboardPermission, PatientFlowPermission
+
+
+def _log_patient_action(user, action: str, patient_id: int | None = None, meta: dict | None = None):
+    """Route audit logging through `praxi_backend.appointments.views.log_patient_action`.
+
+    Tests patch `praxi_backend.appointments.views.log_patient_action`. Keep that
+    patch point stable by resolving the function lazily from `views` at call time.
+    """
+    from . import views as views_module
+
+    return views_module.log_patient_action(user, action, patient_id, meta=meta)
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets clients send ``Accept: text/event-stream``; errors are rendered as JSON."""
+
+    media_type = "text/event-stream"
+    format = "sse"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data).encode("utf-8")
+
+
+class LiveEventStreamView(APIView):
+    """GET /api/live/events/"""
+
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
+
+    channel_permissions = {
+        OPERATIONS: OpDashboardPermission,
+        PATIENT_FLOW: PatientFlowPermission,
+    }
+
+    def _last_event_id(self, request) -> int | None:
+        raw = request.headers.get("Last-Event-ID") or request.query_params.get("last_event_id")
+        if not raw:
+            return None
+        try:
+            return int(raw)
+        except ValueError:
+            # Unknown position: the stream starts with a reset.
+            return 0
+
+    def get(self, request, *args, **kwargs):
+        if not live_events_enabled():
+            return Response(
+                {"detail": "Live events are disabled."}, status=status.HTTP_404_NOT_FOUND
+            )
+        if not isinstance(request._request, ASGIRequest):
+            return Response(
+                {"detail": "Live events require an ASGI server."},
+                status=status.HTTP_501_NOT_IMPLEMENTED,
+            )
+
+        raw = request.query_params.get("channels")
+        channels = [c for c in raw.split(",") if c] if raw else list(CHANNELS)
+        unknown = sorted(set(channels) - set(CHANNELS))
+        if unknown or not channels:
+            return Response(
+                {"detail": f"channels must be a subset of: {', '.join(CHANNELS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        for channel in channels:
+            if not self.channel_permissions[channel]().has_permission(request, self):
+                self.permission_denied(request)
+
+        role_name = getattr(getattr(request.user, "role", None), "name", None)
+        _log_patient_action(request.user, "live_events_view", meta={"channels": channels})
+
+        response = StreamingHttpResponse(
+            event_stream(
+                channels,
+                user_id=request.user.pk,
+                role_name=role_name,
+                last_event_id=self._last_event_id(request),
+            ),
+            content_type="text/event-stream",
+        )
+        response["Cache-Control"] = "no-cache"
+        # Disable proxy buffering (nginx) so events are sent immediately.
+        response["X-Accel-Buffering"] = "no"
+        return response
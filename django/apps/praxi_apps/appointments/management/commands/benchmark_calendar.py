@@ -0,0 +1,109 @@
+"""
+Django Management Command: benchmark_calendar
+
+Compare the serializer-based calendar payload with the values()-based
+projection in ``calendar_payload`` for one seeded month of bookings.
+
+Usage:
+    python manage.py benchmark_calendar
+    python manage.py benchmark_calendar --appointments 10000 --iterations 20
+    python manage.py benchmark_calendar --json
+
+All seeded rows are rolled back when the command finishes.
+"""
+
+import json
+from argparse import ArgumentParser
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError
+from praxi_backend.appointments.services.calendar_benchmark import (
+    CalendarBenchmarkReport,
+    run_calendar_benchmark,
+)
+from praxi_backend.appointments.services.scheduling_benchmark import DEFAULT_SEED
+
+
+class Command(BaseCommand):
+    """Run the calendar payload benchmark."""
+
+    help = "Benchmark calendar event payloads: DRF serializers vs. values() projection"
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        parser.add_argument(
+            "--appointments",
+            type=int,
+            default=3000,
+            help="Number of appointments in the seeded month (default: 3000)",
+        )
+        parser.add_argument(
+            "--operations",
+            type=int,
+            default=300,
+            help="Number of operations in the seeded month (default: 300)",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=10,
+            help="Renders per path (default: 10)",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=DEFAULT_SEED,
+            help=f"Random seed for deterministic results (default: {DEFAULT_SEED})",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            dest="output_json",
+            help="Output results as JSON",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> str | None:
+        if options["appointments"] < 0 or options["operations"] < 0:
+            raise CommandError("--appointments and --operations must be >= 0")
+        if options["iterations"] < 1:
+            raise CommandError("--iterations must be >= 1")
+
+        try:
+            report = run_calendar_benchmark(
+                n_appointments=options["appointments"],
+                n_operations=options["operations"],
+                iterations=options["iterations"],
+                seed=options["seed"],
+            )
+        except Exception as e:
+            if options["output_json"]:
+                self.stdout.write(json.dumps({"error": str(e)}))
+            raise CommandError(f"Benchmark failed: {e}")
+
+        if options["output_json"]:
+            self.stdout.write(json.dumps(report.to_dict(), indent=2))
+        else:
+            self._print_report(report)
+
+        if not report.identical:
+            raise CommandError("Calendar payloads differ between serializer and projection")
+        return None
+
+    def _print_report(self, report: CalendarBenchmarkReport) -> None:
+        """Print human-readable report."""
+        self.stdout.write("")
+        self.stdout.write(self.style.HTTP_INFO("=" * 80))
+        self.stdout.write(self.style.HTTP_INFO("CALENDAR PAYLOAD BENCHMARK"))
+        self.stdout.write(self.style.HTTP_INFO("=" * 80))
+        self.stdout.write(
+            f"Appointments: {report.appointments} | Operations: {report.operations} | "
+            f"identical JSON: {'yes' if report.identical else 'NO'}"
+        )
+        self.stdout.write("")
+        for r in report.results.values():
+            self.stdout.write(
+                f"   {r.path:<10} median {r.timing.median_ms:9.2f}ms | "
+                f"p95 {r.timing.p95_ms:9.2f}ms | queries {r.queries:4d} | "
+                f"{r.payload_bytes / 1024:.0f} KiB"
+            )
+        if report.speedup:
+            self.stdout.write(self.style.SUCCESS(f"   speedup: {report.speedup:.1f}x"))
@@ -0,0 +1,114 @@
+"""
+Django Management Command: benchmark_indexes
+
+Compare the scheduling hot-path queries with and without the composite
+indexes from migration 0015 on a large synthetic dataset.
+
+Usage:
+    python manage.py benchmark_indexes
+    python manage.py benchmark_indexes --appointments 200000 --iterations 10
+    python manage.py benchmark_indexes --json
+
+All seeded rows and index changes are rolled back when the command finishes.
+"""
+
+import json
+from argparse import ArgumentParser
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError
+from praxi_backend.appointments.services.index_benchmark import (
+    IndexBenchmarkReport,
+    run_index_benchmark,
+)
+from praxi_backend.appointments.services.scheduling_benchmark import DEFAULT_SEED
+
+
+class Command(BaseCommand):
+    """Run the scheduling index benchmark."""
+
+    help = "Benchmark scheduling queries with and without the scheduling indexes"
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        parser.add_argument(
+            "--appointments",
+            type=int,
+            default=1_000_000,
+            help="Number of synthetic appointments to seed (default: 1000000)",
+        )
+        parser.add_argument(
+            "--operations",
+            type=int,
+            default=None,
+            help="Number of synthetic operations to seed (default: appointments / 10)",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=20,
+            help="Executions per query shape and variant (default: 20)",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=DEFAULT_SEED,
+            help=f"Random seed for deterministic results (default: {DEFAULT_SEED})",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            dest="output_json",
+            help="Output results as JSON",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> str | None:
+        if options["appointments"] < 1 or options["iterations"] < 1:
+            raise CommandError("--appointments and --iterations must be >= 1")
+
+        try:
+            report = run_index_benchmark(
+                n_appointments=options["appointments"],
+                n_operations=options["operations"],
+                iterations=options["iterations"],
+                seed=options["seed"],
+            )
+        except Exception as e:
+            if options["output_json"]:
+                self.stdout.write(json.dumps({"error": str(e)}))
+            raise CommandError(f"Benchmark failed: {e}")
+
+        if options["output_json"]:
+            self.stdout.write(json.dumps(report.to_dict(), indent=2))
+        else:
+            self._print_report(report, options["verbosity"])
+
+        return f"Seeded {report.appointments} appointments in {report.seed_duration_sec:.2f}s"
+
+    def _print_report(self, report: IndexBenchmarkReport, verbosity: int) -> None:
+        """Print human-readable report."""
+        self.stdout.write("")
+        self.stdout.write(self.style.HTTP_INFO("=" * 80))
+        self.stdout.write(self.style.HTTP_INFO("SCHEDULING INDEX BENCHMARK"))
+        self.stdout.write(self.style.HTTP_INFO("=" * 80))
+        self.stdout.write(
+            f"Appointments: {report.appointments} | Operations: {report.operations} | "
+            f"Seeding: {report.seed_duration_sec:.2f}s"
+        )
+
+        for name, results in report.shapes.items():
+            self.stdout.write("")
+            self.stdout.write(self.style.SUCCESS(f"📊 {name}"))
+            for r in results:
+                self.stdout.write(
+                    f"   {r.variant:<8} median {r.timing.median_ms:8.3f}ms | "
+                    f"p95 {r.timing.p95_ms:8.3f}ms | index scan: {'yes' if r.uses_index else 'no'}"
+                )
+                if verbosity >= 2:
+                    for line in r.plan.splitlines():
+                        self.stdout.write(f"      {line}")
+            speedup = report.speedup(name)
+            if speedup:
+                self.stdout.write(f"   speedup: {speedup:.1f}x")
+            gist = report.speedup(name, before="with", after="gist")
+            if gist:
+                self.stdout.write(f"   gist vs btree: {gist:.1f}x")
@@ -42,6 +42,7 @@ from praxi_backend.appointments.services.scheduling_benchmark import (
     benchmark_randomized,
     benchmark_room_conflicts,
     benchmark_single_day_load,
+    benchmark_slot_suggestions,
     benchmark_working_hours_validation,
     generate_report,
 )
@@ -59,6 +60,9 @@ BENCHMARK_FUNCTIONS = {
     ),
     "room_conflicts": lambda ctx, q: benchmark_room_conflicts(ctx, n_checks=50 if q else 200),
     "randomized": lambda ctx, q: benchmark_randomized(ctx, seed=ctx.seed, n=30 if q else 100),
+    "slot_suggestions": lambda ctx, q: benchmark_slot_suggestions(
+        ctx, n_requests=5 if q else 20
+    ),
 }
 
 
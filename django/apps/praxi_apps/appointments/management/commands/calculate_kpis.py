@@ -5,24 +5,104 @@ Usage:
     python manage.py calculate_kpis
     python manage.py calculate_kpis --part 1
     python manage.py calculate_kpis --output kpis.txt
+    python manage.py calculate_kpis --since 2025-01-01 --until 2025-03-31
+
+Appointments and operations are streamed once in (doctor, start) order and
+fed into incremental accumulators, so memory does not grow with the data.
 """
 
 from collections import defaultdict
-from datetime import timedelta
-from statistics import mean, median
+from datetime import time, timedelta
 
 from django.core.management.base import BaseCommand
 from django.utils import timezone
-from praxi_backend.appointments.models import Appointment, Operation, Resource
+from praxi_backend.appointments.kpi.streaming import (
+    KIND_APPOINTMENT,
+    DurationStats,
+    add_window_arguments,
+    iter_bookings,
+    window_from_options,
+)
+from praxi_backend.appointments.models import Resource
 from praxi_backend.core.models import User
 
 
+class BookingStats:
+    """Single-pass accumulators for all report parts."""
+
+    def __init__(self, doctors, today, week_start, week_end, month_start, month_end):
+        self.doctor_ids = {doc.id for doc in doctors}
+        self.today = today
+        self.week = (week_start, week_end)
+        self.month = (month_start, month_end)
+
+        # Teil 1/4
+        self.totals = {"appointment": 0, "operation": 0}
+        self.day = {"appointment": 0, "operation": 0}
+        self.week_counts = {"appointment": 0, "operation": 0}
+        self.month_counts = {"appointment": 0, "operation": 0}
+        self.durations = {"appointment": DurationStats(), "operation": DurationStats()}
+        self.hour_counts = defaultdict(int)
+        self.weekday_counts = defaultdict(int)
+
+        # Teil 2
+        self.appointments_by_doctor = defaultdict(int)
+        self.operations_by_doctor = defaultdict(int)
+        self.operations_by_room = defaultdict(int)
+
+        # Teil 3
+        self.doctor_conflicts = 0
+        self.working_hours_violations = 0
+        self._current_doctor = None
+        self._active = []
+
+    def add(self, booking):
+        kind = booking.kind
+        start, end = booking.start, booking.end
+        start_date = start.date()
+
+        self.totals[kind] += 1
+        if start_date == self.today:
+            self.day[kind] += 1
+        if self.week[0] <= start_date <= self.week[1]:
+            self.week_counts[kind] += 1
+        if self.month[0] <= start_date <= self.month[1]:
+            self.month_counts[kind] += 1
+        if end and start:
+            self.durations[kind].add(booking.duration_minutes)
+        self.hour_counts[start.hour] += 1
+        self.weekday_counts[start.weekday()] += 1
+
+        if kind == KIND_APPOINTMENT:
+            self.appointments_by_doctor[booking.doctor_id] += 1
+            if start.time() < time(8, 0) or end.time() > time(17, 0):
+                self.working_hours_violations += 1
+        else:
+            self.operations_by_doctor[booking.doctor_id] += 1
+            self.operations_by_room[booking.room_id] += 1
+
+        if booking.doctor_id in self.doctor_ids:
+            self._count_overlaps(booking)
+
+    def _count_overlaps(self, booking):
+        # Bookings arrive ordered by (doctor, start): every earlier booking of
+        # the doctor that ends after this start is still "active".
+        if booking.doctor_id != self._current_doctor:
+            self._current_doctor = booking.doctor_id
+            self._active = []
+        s2, e2 = booking.start, booking.end
+        self._active = [(s1, e1) for s1, e1 in self._active if e1 > s2]
+        self.doctor_conflicts += sum(1 for s1, _e1 in self._active if s1 < e2)
+        self._active.append((s2, e2))
+
+
 class Command(BaseCommand):
     help = "Calculate scheduling KPIs"
 
     def add_arguments(self, parser):
         parser.add_argument("--part", type=int, default=0, help="KPI part (1-4, 0=all)")
         parser.add_argument("--output", type=str, default=None, help="Output file")
+        add_window_arguments(parser)
 
     def handle(self, *args, **options):
         part = options.get("part", 0)
@@ -35,28 +115,27 @@ class Command(BaseCommand):
         month_start = today.replace(day=1)
         month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
 
-        appointments = list(Appointment.objects.using("default").all())
-        operations = list(Operation.objects.using("default").all())
+        since, until = window_from_options(options)
         doctors = list(User.objects.using("default").filter(role__name="doctor"))
         rooms = list(Resource.objects.using("default").filter(type="room", active=True))
 
+        stats = BookingStats(doctors, today, week_start, week_end, month_start, month_end)
+        for booking in iter_bookings(since=since, until=until):
+            stats.add(booking)
+
         output = []
 
         if part == 0 or part == 1:
-            output.append(
-                self.generate_part1(
-                    appointments, operations, today, week_start, week_end, month_start, month_end
-                )
-            )
+            output.append(self.generate_part1(stats))
 
         if part == 0 or part == 2:
-            output.append(self.generate_part2(appointments, operations, doctors, rooms))
+            output.append(self.generate_part2(stats, doctors, rooms))
 
         if part == 0 or part == 3:
-            output.append(self.generate_part3(appointments, operations, doctors))
+            output.append(self.generate_part3(stats))
 
         if part == 0 or part == 4:
-            output.append(self.generate_part4(appointments, operations))
+            output.append(self.generate_part4(stats))
 
         content = "\n\n".join(output)
 
@@ -67,9 +146,7 @@ class Command(BaseCommand):
         else:
             self.stdout.write(content)
 
-    def generate_part1(
-        self, appointments, operations, today, week_start, week_end, month_start, month_end
-    ):
+    def generate_part1(self, stats):
         """Teil 1: Mengen, Dauern, Peak-Stunden/Tage"""
         lines = []
         lines.append("╔════════════════════════════════════════════════════════════════════════╗")
@@ -84,17 +161,15 @@ class Command(BaseCommand):
         lines.append("│ Metrik               │   Tag    │  Woche   │  Monat   │ Gesamt         │")
         lines.append("├──────────────────────┼──────────┼──────────┼──────────┼────────────────┤")
 
-        day_apts = len([a for a in appointments if a.start_time.date() == today])
-        week_apts = len([a for a in appointments if week_start <= a.start_time.date() <= week_end])
-        month_apts = len(
-            [a for a in appointments if month_start <= a.start_time.date() <= month_end]
-        )
-        total_apts = len(appointments)
+        day_apts = stats.day["appointment"]
+        week_apts = stats.week_counts["appointment"]
+        month_apts = stats.month_counts["appointment"]
+        total_apts = stats.totals["appointment"]
 
-        day_ops = len([o for o in operations if o.start_time.date() == today])
-        week_ops = len([o for o in operations if week_start <= o.start_time.date() <= week_end])
-        month_ops = len([o for o in operations if month_start <= o.start_time.date() <= month_end])
-        total_ops = len(operations)
+        day_ops = stats.day["operation"]
+        week_ops = stats.week_counts["operation"]
+        month_ops = stats.month_counts["operation"]
+        total_ops = stats.totals["operation"]
 
         lines.append(
             f"│ Termine              │{day_apts:^10}│{week_apts:^10}│{month_apts:^10}│{total_apts:^16}│"
@@ -115,23 +190,15 @@ class Command(BaseCommand):
         lines.append("│ Metrik               │    Ø     │  Median  │   Min    │      Max       │")
         lines.append("├──────────────────────┼──────────┼──────────┼──────────┼────────────────┤")
 
-        apt_durations = [
-            (a.end_time - a.start_time).total_seconds() / 60
-            for a in appointments
-            if a.end_time and a.start_time
-        ]
-        op_durations = [
-            (o.end_time - o.start_time).total_seconds() / 60
-            for o in operations
-            if o.end_time and o.start_time
-        ]
+        apt_durations = stats.durations["appointment"]
+        op_durations = stats.durations["operation"]
 
         if apt_durations:
             apt_avg, apt_med, apt_min, apt_max = (
-                mean(apt_durations),
-                median(apt_durations),
-                min(apt_durations),
-                max(apt_durations),
+                apt_durations.mean,
+                apt_durations.median,
+                apt_durations.min,
+                apt_durations.max,
             )
             lines.append(
                 f"│ Terminlänge (min)    │{apt_avg:^10.1f}│{apt_med:^10.1f}│{apt_min:^10.1f}│{apt_max:^16.1f}│"
@@ -141,10 +208,10 @@ class Command(BaseCommand):
 
         if op_durations:
             op_avg, op_med, op_min, op_max = (
-                mean(op_durations),
-                median(op_durations),
-                min(op_durations),
-                max(op_durations),
+                op_durations.mean,
+                op_durations.median,
+                op_durations.min,
+                op_durations.max,
             )
             lines.append(
                 f"│ OP-Dauer (min)       │{op_avg:^10.1f}│{op_med:^10.1f}│{op_min:^10.1f}│{op_max:^16.1f}│"
@@ -162,11 +229,7 @@ class Command(BaseCommand):
         lines.append("│ Stunde │  Anzahl  │ Verteilung                                         │")
         lines.append("├────────┼──────────┼─────────────────────────────────────────────────────┤")
 
-        hour_counts = defaultdict(int)
-        for a in appointments:
-            hour_counts[a.start_time.hour] += 1
-        for o in operations:
-            hour_counts[o.start_time.hour] += 1
+        hour_counts = stats.hour_counts
 
         max_count = max(hour_counts.values()) if hour_counts else 1
         for hour in range(8, 18):
@@ -186,11 +249,7 @@ class Command(BaseCommand):
         lines.append("│  Tag   │  Anzahl  │ Verteilung                                         │")
         lines.append("├────────┼──────────┼─────────────────────────────────────────────────────┤")
 
-        weekday_counts = defaultdict(int)
-        for a in appointments:
-            weekday_counts[a.start_time.weekday()] += 1
-        for o in operations:
-            weekday_counts[o.start_time.weekday()] += 1
+        weekday_counts = stats.weekday_counts
 
         weekdays = ["Mo", "Di", "Mi", "Do", "Fr", "Sa", "So"]
         max_day = max(weekday_counts.values()) if weekday_counts else 1
@@ -205,7 +264,7 @@ class Command(BaseCommand):
 
         return "\n".join(lines)
 
-    def generate_part2(self, appointments, operations, doctors, rooms):
+    def generate_part2(self, stats, doctors, rooms):
         """Teil 2: Auslastung Ärzte & Räume"""
         lines = []
         lines.append("╔════════════════════════════════════════════════════════════════════════╗")
@@ -222,8 +281,8 @@ class Command(BaseCommand):
 
         doc_stats = []
         for doc in doctors:
-            apt_count = len([a for a in appointments if a.doctor_id == doc.id])
-            op_count = len([o for o in operations if o.primary_surgeon_id == doc.id])
+            apt_count = stats.appointments_by_doctor.get(doc.id, 0)
+            op_count = stats.operations_by_doctor.get(doc.id, 0)
             util = min(100, (apt_count + op_count) * 10)
             doc_stats.append((doc, apt_count, op_count, util))
 
@@ -254,7 +313,7 @@ class Command(BaseCommand):
 
         room_stats = []
         for room in rooms:
-            op_count = len([o for o in operations if o.op_room_id == room.id])
+            op_count = stats.operations_by_room.get(room.id, 0)
             util = min(100, op_count * 20)
             room_stats.append((room, op_count, util))
 
@@ -277,7 +336,7 @@ class Command(BaseCommand):
 
         return "\n".join(lines)
 
-    def generate_part3(self, appointments, operations, doctors):
+    def generate_part3(self, stats):
         """Teil 3: Konflikt-KPIs"""
         lines = []
         lines.append("╔════════════════════════════════════════════════════════════════════════╗")
@@ -286,29 +345,10 @@ class Command(BaseCommand):
         lines.append("")
 
         # Konflikte zählen
-        doctor_conflicts = 0
-        for doc in doctors:
-            doc_events = []
-            for a in appointments:
-                if a.doctor_id == doc.id:
-                    doc_events.append((a.start_time, a.end_time))
-            for o in operations:
-                if o.primary_surgeon_id == doc.id:
-                    doc_events.append((o.start_time, o.end_time))
-            doc_events.sort()
-            for i, (s1, e1) in enumerate(doc_events):
-                for j, (s2, e2) in enumerate(doc_events):
-                    if i < j and s1 < e2 and e1 > s2:
-                        doctor_conflicts += 1
-
-        working_hours_violations = 0
-        from datetime import time
-
-        for a in appointments:
-            if a.start_time.time() < time(8, 0) or a.end_time.time() > time(17, 0):
-                working_hours_violations += 1
-
-        total_plannings = len(appointments) + len(operations)
+        doctor_conflicts = stats.doctor_conflicts
+        working_hours_violations = stats.working_hours_violations
+
+        total_plannings = stats.totals["appointment"] + stats.totals["operation"]
         total_conflicts = doctor_conflicts + working_hours_violations
 
         lines.append("┌────────────────────────────────────────────────────────────────────────┐")
@@ -352,7 +392,7 @@ class Command(BaseCommand):
 
         return "\n".join(lines)
 
-    def generate_part4(self, appointments, operations):
+    def generate_part4(self, stats):
         """Teil 4: Zusammenfassung & Empfehlungen"""
         lines = []
         lines.append("╔════════════════════════════════════════════════════════════════════════╗")
@@ -360,30 +400,22 @@ class Command(BaseCommand):
         lines.append("╚════════════════════════════════════════════════════════════════════════╝")
         lines.append("")
 
-        apt_durations = [
-            (a.end_time - a.start_time).total_seconds() / 60
-            for a in appointments
-            if a.end_time and a.start_time
-        ]
-        op_durations = [
-            (o.end_time - o.start_time).total_seconds() / 60
-            for o in operations
-            if o.end_time and o.start_time
-        ]
+        apt_durations = stats.durations["appointment"]
+        op_durations = stats.durations["operation"]
 
         lines.append("┌────────────────────────────────────────────────────────────────────────┐")
         lines.append("│  9. KPI-ZUSAMMENFASSUNG                                                │")
         lines.append("├────────────────────────────────┬─────────────────────────────────────────┤")
 
-        lines.append(f"│ Gesamtzahl Termine             │ {len(appointments):<39}│")
-        lines.append(f"│ Gesamtzahl Operationen         │ {len(operations):<39}│")
+        lines.append(f"│ Gesamtzahl Termine             │ {stats.totals['appointment']:<39}│")
+        lines.append(f"│ Gesamtzahl Operationen         │ {stats.totals['operation']:<39}│")
         if apt_durations:
             lines.append(
-                f"│ Ø Terminlänge                  │ {mean(apt_durations):.1f} min{' ' * 32}│"
+                f"│ Ø Terminlänge                  │ {apt_durations.mean:.1f} min{' ' * 32}│"
             )
         if op_durations:
             lines.append(
-                f"│ Ø OP-Dauer                     │ {mean(op_durations):.1f} min{' ' * 31}│"
+                f"│ Ø OP-Dauer                     │ {op_durations.mean:.1f} min{' ' * 31}│"
             )
 
         lines.append("└────────────────────────────────┴─────────────────────────────────────────┘")
@@ -2,22 +2,124 @@
 Effizienz- und Qualitäts-KPIs (Teil 5/5)
 =========================================
 Berechnet Scheduling-Effizienz, Konfliktfreie Rate, Validierung und RBAC-Metriken.
+
+Usage:
+    python manage.py efficiency_kpis
+    python manage.py efficiency_kpis --since 2025-01-01 --until 2025-03-31
+
+Termine und OPs werden einmal in (Arzt, Start)-Reihenfolge gestreamt, OPs für
+die Raumkonflikte zusätzlich in (Raum, Start)-Reihenfolge; der Speicherbedarf
+wächst nicht mit der Datenmenge.
 """
 
 from collections import defaultdict
 
 from django.core.management.base import BaseCommand
-from praxi_backend.appointments.models import (
-    Appointment,
-    DoctorAbsence,
-    DoctorHours,
-    Operation,
-    PracticeHours,
-    Resource,
+from django.db.models import Count
+from praxi_backend.appointments.kpi.streaming import (
+    KIND_APPOINTMENT,
+    KIND_OPERATION,
+    add_window_arguments,
+    iter_bookings,
+    window_from_options,
 )
+from praxi_backend.appointments.models import DoctorAbsence
 from praxi_backend.core.models import AuditLog, User
 
 
+class EfficiencyStats:
+    """Single-pass accumulators for the efficiency report."""
+
+    DURATION_CATEGORIES = (
+        (15, "Kurz (≤15min)"),
+        (45, "Mittel (16-45min)"),
+        (90, "Lang (46-90min)"),
+        (None, "Sehr lang (>90min)"),
+    )
+
+    def __init__(self, absences):
+        self.absences = absences
+        self.counts = {KIND_APPOINTMENT: 0, KIND_OPERATION: 0}
+        self.slots = {KIND_APPOINTMENT: 0, KIND_OPERATION: 0}
+        self.duration_sums = {KIND_APPOINTMENT: 0, KIND_OPERATION: 0}
+        self.valid = {KIND_APPOINTMENT: 0, KIND_OPERATION: 0}
+        self.duration_categories = {label: 0 for _limit, label in self.DURATION_CATEGORIES}
+        self.validation_errors = {
+            "missing_duration": 0,
+            "missing_doctor": 0,
+            "missing_patient": 0,
+            "invalid_time": 0,
+            "missing_room": 0,
+        }
+        self.booking_roles = defaultdict(int)
+        self.conflict_types = defaultdict(int)
+        self._overlap_key = {}
+        self._overlap_end = {}
+
+    def add(self, booking, slot_duration):
+        kind = booking.kind
+        default = 30 if kind == KIND_APPOINTMENT else 60
+        duration = int(booking.duration_minutes)
+        planned = duration or default
+
+        self.counts[kind] += 1
+        self.slots[kind] += planned // slot_duration
+        self.duration_sums[kind] += planned
+        for limit, label in self.DURATION_CATEGORIES:
+            if limit is None or planned <= limit:
+                self.duration_categories[label] += 1
+                break
+
+        # Validierung
+        if not duration:
+            self.validation_errors["missing_duration"] += 1
+        if not booking.doctor_id:
+            self.validation_errors["missing_doctor"] += 1
+        if not booking.patient_id:
+            self.validation_errors["missing_patient"] += 1
+        if kind == KIND_OPERATION and not booking.room_id:
+            self.validation_errors["missing_room"] += 1
+        if booking.start >= booking.end:
+            self.validation_errors["invalid_time"] += 1
+        if (
+            booking.doctor_id
+            and booking.patient_id
+            and duration
+            and (kind == KIND_APPOINTMENT or booking.room_id)
+        ):
+            self.valid[kind] += 1
+
+        if booking.doctor_id:
+            self.booking_roles[booking.doctor_role or "doctor"] += 1
+            self._check_overlap("doctor_overlap", booking.doctor_id, booking)
+            if self._is_absent(booking.doctor_id, booking.start.date()):
+                self.conflict_types["absence_conflict"] += 1
+
+    def add_room_booking(self, booking):
+        """Operations in (room, start) order for the room overlap check."""
+        if booking.room_id:
+            self._check_overlap("room_overlap", booking.room_id, booking)
+
+    def _check_overlap(self, conflict_type, owner_id, booking):
+        # Bookings arrive sorted by (owner, start); compare each one with the
+        # previous booking of the same owner and date.
+        key = (owner_id, booking.start.date())
+        if (
+            self._overlap_key.get(conflict_type) == key
+            and self._overlap_end[conflict_type] > booking.start
+        ):
+            self.conflict_types[conflict_type] += 1
+        self._overlap_key[conflict_type] = key
+        self._overlap_end[conflict_type] = booking.end
+
+    def _is_absent(self, doctor_id, day):
+        return any(first <= day <= last for first, last in self.absences.get(doctor_id, ()))
+
+    @property
+    def conflict_count(self):
+        return sum(self.conflict_types.values())
+
+
 class Command(BaseCommand):
     help = "Effizienz- und Qualitäts-KPIs (Teil 5/5)"
 
@@ -30,28 +132,55 @@ class Command(BaseCommand):
         filled = int(pct / 100 * width)
         return "█" * filled + "░" * (width - filled)
 
+    def add_arguments(self, parser):
+        add_window_arguments(parser)
+
     def handle(self, *args, **options):
         self.stdout.write("\n" + "=" * 70)
         self.stdout.write("  EFFIZIENZ- UND QUALITÄTS-KPIs (Teil 5/5)")
         self.stdout.write("=" * 70)
 
         # Daten laden
-        appointments = list(Appointment.objects.using("default").all())
-        operations = list(Operation.objects.using("default").all())
-        doctors = list(User.objects.using("default").filter(role__name="doctor"))
-        rooms = list(Resource.objects.using("default").filter(type="room"))
-        practice_hours = list(PracticeHours.objects.using("default").all())
-        doctor_hours = list(DoctorHours.objects.using("default").all())
-        absences = list(DoctorAbsence.objects.using("default").all())
-
-        # AuditLog für Qualitätsmetriken
+        since, until = window_from_options(options)
+        doctor_count = User.objects.using("default").filter(role__name="doctor").count()
+
+        absences_qs = DoctorAbsence.objects.using("default")
+        if since is not None:
+            absences_qs = absences_qs.filter(end_date__gte=since.date())
+        if until is not None:
+            absences_qs = absences_qs.filter(start_date__lt=until.date())
+        absences = defaultdict(list)
+        absence_days = 0
+        for doctor_id, start_date, end_date in absences_qs.values_list(
+            "doctor_id", "start_date", "end_date"
+        ).iterator():
+            absences[doctor_id].append((start_date, end_date))
+            absence_days += 1
+
+        stats = EfficiencyStats(absences)
+        for booking in iter_bookings(since=since, until=until):
+            stats.add(booking, self.SLOT_DURATION)
+        for booking in iter_bookings(
+            kinds=(KIND_OPERATION,), order="room", since=since, until=until
+        ):
+            stats.add_room_booking(booking)
+
+        # AuditLog für Qualitätsmetriken (nach Rolle und Aktion gruppiert)
         try:
-            audit_logs = list(AuditLog.objects.using("default").all())
+            audit_qs = AuditLog.objects.using("default")
+            if since is not None:
+                audit_qs = audit_qs.filter(timestamp__gte=since)
+            if until is not None:
+                audit_qs = audit_qs.filter(timestamp__lt=until)
+            audit_actions = list(
+                audit_qs.values("user__role__name", "action").annotate(n=Count("id")).order_by()
+            )
         except Exception:
-            audit_logs = []
+            audit_actions = []
+        audit_log_count = sum(row["n"] for row in audit_actions)
 
-        total_appointments = len(appointments)
-        total_operations = len(operations)
+        total_appointments = stats.counts[KIND_APPOINTMENT]
+        total_operations = stats.counts[KIND_OPERATION]
         total_plannings = total_appointments + total_operations
 
         # ══════════════════════════════════════════════════════════════════
@@ -65,15 +194,14 @@ class Command(BaseCommand):
 
         # Verfügbare Slots berechnen (basierend auf Praxisöffnung)
         slots_per_day = self.WORK_MINUTES_DAY // self.SLOT_DURATION  # 36 Slots/Tag
-        available_slots_month = slots_per_day * self.WORK_DAYS_MONTH * len(doctors)
+        available_slots_month = slots_per_day * self.WORK_DAYS_MONTH * doctor_count
 
         # Belegte Slots berechnen
-        appt_slots = sum((a.duration or 30) // self.SLOT_DURATION for a in appointments)
-        op_slots = sum((o.duration or 60) // self.SLOT_DURATION for o in operations)
+        appt_slots = stats.slots[KIND_APPOINTMENT]
+        op_slots = stats.slots[KIND_OPERATION]
         used_slots = appt_slots + op_slots
 
         # Abwesenheits-Slots abziehen
-        absence_days = len(absences)
         absence_slots = absence_days * slots_per_day
         effective_available = max(available_slots_month - absence_slots, 1)
 
@@ -115,10 +243,7 @@ class Command(BaseCommand):
         self.stdout.write("├─────────────────────────────────────────────────────────────────────┤")
 
         # Konflikte erkennen
-        conflicts = self._detect_conflicts(
-            appointments, operations, doctors, rooms, practice_hours, doctor_hours, absences
-        )
-        conflict_count = len(conflicts)
+        conflict_count = stats.conflict_count
         conflict_free = total_plannings - conflict_count
         conflict_free_rate = (conflict_free / total_plannings * 100) if total_plannings > 0 else 100
 
@@ -138,13 +263,11 @@ class Command(BaseCommand):
         self.stdout.write("└─────────────────────────────────────────────────────────────────────┘")
 
         # Konflikt-Details
-        if conflicts:
+        if conflict_count:
             self.stdout.write(
                 "│ Konflikt-Typen:                                                     │"
             )
-            conflict_types = defaultdict(int)
-            for c in conflicts:
-                conflict_types[c["type"]] += 1
+            conflict_types = {t: n for t, n in stats.conflict_types.items() if n}
             for ctype, count in sorted(conflict_types.items(), key=lambda x: -x[1])[:5]:
                 pct = count / conflict_count * 100
                 self.stdout.write(f"│   {ctype:<25} {count:>4} ({pct:>5.1f}%)                    │")
@@ -159,8 +282,8 @@ class Command(BaseCommand):
         self.stdout.write("├─────────────────────────────────────────────────────────────────────┤")
 
         # Durchschnittliche Dauer der geplanten Termine/OPs
-        avg_appt_duration = sum(a.duration or 30 for a in appointments) / max(len(appointments), 1)
-        avg_op_duration = sum(o.duration or 60 for o in operations) / max(len(operations), 1)
+        avg_appt_duration = stats.duration_sums[KIND_APPOINTMENT] / max(total_appointments, 1)
+        avg_op_duration = stats.duration_sums[KIND_OPERATION] / max(total_operations, 1)
 
         # Slots pro Termin-Typ
         appt_slots_avg = avg_appt_duration / self.SLOT_DURATION
@@ -175,33 +298,7 @@ class Command(BaseCommand):
         self.stdout.write("├─────────────────────────────────────────────────────────────────────┤")
 
         # Verteilung nach Dauer-Kategorien
-        duration_categories = {
-            "Kurz (≤15min)": 0,
-            "Mittel (16-45min)": 0,
-            "Lang (46-90min)": 0,
-            "Sehr lang (>90min)": 0,
-        }
-        for a in appointments:
-            d = a.duration or 30
-            if d <= 15:
-                duration_categories["Kurz (≤15min)"] += 1
-            elif d <= 45:
-                duration_categories["Mittel (16-45min)"] += 1
-            elif d <= 90:
-                duration_categories["Lang (46-90min)"] += 1
-            else:
-                duration_categories["Sehr lang (>90min)"] += 1
-
-        for o in operations:
-            d = o.duration or 60
-            if d <= 15:
-                duration_categories["Kurz (≤15min)"] += 1
-            elif d <= 45:
-                duration_categories["Mittel (16-45min)"] += 1
-            elif d <= 90:
-                duration_categories["Lang (46-90min)"] += 1
-            else:
-                duration_categories["Sehr lang (>90min)"] += 1
+        duration_categories = stats.duration_categories
 
         self.stdout.write("│ Dauer-Verteilung:                                                   │")
         for cat, count in duration_categories.items():
@@ -221,35 +318,7 @@ class Command(BaseCommand):
         self.stdout.write("├─────────────────────────────────────────────────────────────────────┤")
 
         # Validierungsfehler-Kategorien (basierend auf Datenqualität)
-        validation_errors = {
-            "missing_duration": 0,
-            "missing_doctor": 0,
-            "missing_patient": 0,
-            "invalid_time": 0,
-            "missing_room": 0,
-        }
-
-        for a in appointments:
-            if not a.duration:
-                validation_errors["missing_duration"] += 1
-            if not a.doctor_id:
-                validation_errors["missing_doctor"] += 1
-            if not a.patient_id:
-                validation_errors["missing_patient"] += 1
-            if a.start and a.end and a.start >= a.end:
-                validation_errors["invalid_time"] += 1
-
-        for o in operations:
-            if not o.duration:
-                validation_errors["missing_duration"] += 1
-            if not o.doctor_id:
-                validation_errors["missing_doctor"] += 1
-            if not o.patient_id:
-                validation_errors["missing_patient"] += 1
-            if not o.resource_id:
-                validation_errors["missing_room"] += 1
-            if o.start and o.end and o.start >= o.end:
-                validation_errors["invalid_time"] += 1
+        validation_errors = stats.validation_errors
 
         total_errors = sum(validation_errors.values())
         errors_per_100 = (total_errors / max(total_plannings, 1)) * 100
@@ -287,12 +356,8 @@ class Command(BaseCommand):
         self.stdout.write("├─────────────────────────────────────────────────────────────────────┤")
 
         # Gültige Payloads = Datensätze ohne kritische Fehler
-        valid_appointments = sum(
-            1 for a in appointments if a.doctor_id and a.patient_id and a.duration
-        )
-        valid_operations = sum(
-            1 for o in operations if o.doctor_id and o.patient_id and o.duration and o.resource_id
-        )
+        valid_appointments = stats.valid[KIND_APPOINTMENT]
+        valid_operations = stats.valid[KIND_OPERATION]
 
         invalid_appointments = total_appointments - valid_appointments
         invalid_operations = total_operations - valid_operations
@@ -343,35 +408,22 @@ class Command(BaseCommand):
         }
 
         # Analysiere AuditLog nach Aktionen
-        for log in audit_logs:
-            role = getattr(getattr(log, "user", None), "role", None)
-            role_name = getattr(role, "name", "unknown") if role else "unknown"
-            action = getattr(log, "action", "")
+        for row in audit_actions:
+            role_name = row["user__role__name"] or "unknown"
+            action = row["action"] or ""
 
             if role_name in rbac_stats:
                 if "view" in action or "read" in action or "list" in action:
-                    rbac_stats[role_name]["read"] += 1
+                    rbac_stats[role_name]["read"] += row["n"]
                 else:
-                    rbac_stats[role_name]["write"] += 1
+                    rbac_stats[role_name]["write"] += row["n"]
 
         # Wenn keine Logs vorhanden, basiere auf Appointments/Operations
-        if not audit_logs:
+        if not audit_log_count:
             # Schätze basierend auf existierenden Daten
-            for a in appointments:
-                doctor = getattr(a, "doctor", None)
-                if doctor:
-                    role = getattr(doctor, "role", None)
-                    role_name = getattr(role, "name", "doctor")
-                    if role_name in rbac_stats:
-                        rbac_stats[role_name]["write"] += 1
-
-            for o in operations:
-                doctor = getattr(o, "doctor", None)
-                if doctor:
-                    role = getattr(doctor, "role", None)
-                    role_name = getattr(role, "name", "doctor")
-                    if role_name in rbac_stats:
-                        rbac_stats[role_name]["write"] += 1
+            for role_name, count in stats.booking_roles.items():
+                if role_name in rbac_stats:
+                    rbac_stats[role_name]["write"] += count
 
         total_actions = sum(s["read"] + s["write"] for s in rbac_stats.values())
 
@@ -513,8 +565,8 @@ class Command(BaseCommand):
         else:
             trends.append(("↑", "Hohe Datenqualität", f"{valid_rate:.0f}% valide Payloads"))
 
-        if len(doctors) > 0 and len(operations) > 0:
-            ops_per_doctor = len(operations) / len(doctors)
+        if doctor_count > 0 and total_operations > 0:
+            ops_per_doctor = total_operations / doctor_count
             if ops_per_doctor > 20:
                 trends.append(("↑", "Hohe OP-Dichte", f"Ø {ops_per_doctor:.1f} OPs pro Arzt"))
 
@@ -589,7 +641,7 @@ class Command(BaseCommand):
             )
 
         # 6. RBAC-Empfehlungen
-        if len(audit_logs) == 0:
+        if audit_log_count == 0:
             recommendations.append(
                 {
                     "priority": "MITTEL",
@@ -613,74 +665,3 @@ class Command(BaseCommand):
         self.stdout.write("═" * 70)
         self.stdout.write("  Ende: Effizienz- und Qualitäts-KPIs (Teil 5/5)")
         self.stdout.write("═" * 70 + "\n")
-
-    def _detect_conflicts(
-        self, appointments, operations, doctors, rooms, practice_hours, doctor_hours, absences
-    ):
-        """Erkennt Konflikte in den Planungen."""
-        conflicts = []
-
-        # Arzt-Konflikte (Doppelbuchungen)
-        by_doctor_date = defaultdict(list)
-        for a in appointments:
-            if a.doctor_id and a.start:
-                key = (a.doctor_id, a.start.date() if hasattr(a.start, "date") else a.start)
-                by_doctor_date[key].append(("appt", a))
-
-        for o in operations:
-            if o.doctor_id and o.start:
-                key = (o.doctor_id, o.start.date() if hasattr(o.start, "date") else o.start)
-                by_doctor_date[key].append(("op", o))
-
-        for key, items in by_doctor_date.items():
-            if len(items) > 1:
-                # Prüfe auf Überlappung
-                sorted_items = sorted(items, key=lambda x: x[1].start)
-                for i in range(len(sorted_items) - 1):
-                    curr = sorted_items[i][1]
-                    next_item = sorted_items[i + 1][1]
-                    if curr.end and next_item.start and curr.end > next_item.start:
-                        conflicts.append(
-                            {"type": "doctor_overlap", "doctor_id": key[0], "date": key[1]}
-                        )
-
-        # Raum-Konflikte (für OPs)
-        by_room_date = defaultdict(list)
-        for o in operations:
-            if o.resource_id and o.start:
-                key = (o.resource_id, o.start.date() if hasattr(o.start, "date") else o.start)
-                by_room_date[key].append(o)
-
-        for key, ops in by_room_date.items():
-            if len(ops) > 1:
-                sorted_ops = sorted(ops, key=lambda x: x.start)
-                for i in range(len(sorted_ops) - 1):
-                    if sorted_ops[i].end and sorted_ops[i + 1].start:
-                        if sorted_ops[i].end > sorted_ops[i + 1].start:
-                            conflicts.append(
-                                {"type": "room_overlap", "room_id": key[0], "date": key[1]}
-                            )
-
-        # Abwesenheits-Konflikte
-        absence_dates = set()
-        for absence in absences:
-            if absence.date:
-                absence_dates.add((absence.doctor_id, absence.date))
-
-        for a in appointments:
-            if a.doctor_id and a.start:
-                date = a.start.date() if hasattr(a.start, "date") else a.start
-                if (a.doctor_id, date) in absence_dates:
-                    conflicts.append(
-                        {"type": "absence_conflict", "doctor_id": a.doctor_id, "date": date}
-                    )
-
-        for o in operations:
-            if o.doctor_id and o.start:
-                date = o.start.date() if hasattr(o.start, "date") else o.start
-                if (o.doctor_id, date) in absence_dates:
-                    conflicts.append(
-                        {"type": "absence_conflict", "doctor_id": o.doctor_id, "date": date}
-                    )
-
-        return conflicts
@@ -0,0 +1,87 @@
+"""
+Django Management Command: kpi_cache_stats
+
+Show the hit/stale/miss counters of the cached dashboard KPI snapshots.
+
+Usage:
+    python manage.py kpi_cache_stats
+    python manage.py kpi_cache_stats --json
+    python manage.py kpi_cache_stats --invalidate   # mark all snapshots stale
+    python manage.py kpi_cache_stats --timings      # last KPI section timings
+
+Counters live in the KPI cache backend (PRAXI_KPI_CACHE_ALIAS); with a
+per-process backend such as LocMemCache they only cover this process.
+"""
+
+import json
+from argparse import ArgumentParser
+from typing import Any
+
+from django.core.management.base import BaseCommand
+from praxi_backend.appointments.kpi.executor import get_kpi_section_timings
+from praxi_backend.appointments.kpi.snapshots import (
+    get_kpi_cache_stats,
+    invalidate_kpi_snapshots,
+)
+
+
+class Command(BaseCommand):
+    """Inspect the dashboard KPI snapshot cache."""
+
+    help = "Show the dashboard KPI snapshot cache counters"
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            dest="output_json",
+            help="Output counters as JSON",
+        )
+        parser.add_argument(
+            "--invalidate",
+            action="store_true",
+            help="Mark all cached snapshots stale",
+        )
+        parser.add_argument(
+            "--timings",
+            action="store_true",
+            help="Show the per-section timings of the last KPI aggregator runs",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options["invalidate"]:
+            names = invalidate_kpi_snapshots()
+            self.stdout.write(f"Invalidated: {', '.join(names) or '-'}")
+
+        if options["timings"]:
+            self._write_timings(options["output_json"])
+            return
+
+        stats = get_kpi_cache_stats()
+        if options["output_json"]:
+            self.stdout.write(json.dumps(stats, indent=2))
+            return
+
+        for name, counters in stats.items():
+            reads = counters["hit"] + counters["stale"] + counters["miss"] + counters["refresh"]
+            served = counters["hit"] + counters["stale"]
+            ratio = f"{served / reads:.0%}" if reads else "-"
+            line = " | ".join(f"{key} {value}" for key, value in counters.items())
+            self.stdout.write(f"{name}: {line} | served from cache {ratio}")
+
+    def _write_timings(self, output_json: bool) -> None:
+        timings = get_kpi_section_timings()
+        if output_json:
+            self.stdout.write(json.dumps(timings, indent=2))
+            return
+
+        for label, sections in timings.items():
+            slowest = max(sections.items(), key=lambda item: item[1]["ms"], default=None)
+            total = sum(section["ms"] for section in sections.values())
+            self.stdout.write(
+                f"{label}: {len(sections)} sections | sum {total:.1f}ms"
+                + (f" | slowest {slowest[0]} {slowest[1]['ms']:.1f}ms" if slowest else "")
+            )
+            for name, section in sections.items():
+                flag = "" if section["status"] == "ok" else f" ({section['status']})"
+                self.stdout.write(f"  {name}: {section['ms']:.1f}ms{flag}")
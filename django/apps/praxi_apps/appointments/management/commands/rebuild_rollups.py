@@ -0,0 +1,102 @@
+"""
+Django Management Command: rebuild_rollups
+
+Backfill or repair the DailyBookingRollup table from the appointment and
+operation rows.
+
+Usage:
+    python manage.py rebuild_rollups                  # full history
+    python manage.py rebuild_rollups --days 90        # last 90 days up to today
+    python manage.py rebuild_rollups --start 2025-01-01 --end 2025-03-31
+
+Dates are local dates (settings.TIME_ZONE). Each chunk of --chunk-days days is
+recomputed in its own transaction, so the command can run on a live system.
+Run it once after enabling PRAXI_KPI_ROLLUPS.
+"""
+
+import time
+from argparse import ArgumentParser
+from datetime import date, timedelta
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from django.utils import timezone
+from praxi_backend.appointments.kpi.rollups import rebuild_rollups, rollups_enabled
+from praxi_backend.appointments.models import Appointment, DailyBookingRollup, Operation
+
+
+def _parse_date(value: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError as exc:
+        raise CommandError(f"Invalid date {value!r}, expected YYYY-MM-DD") from exc
+
+
+class Command(BaseCommand):
+    """Recompute daily booking rollups."""
+
+    help = "Recompute the daily booking rollup table for a date range"
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        parser.add_argument("--start", type=str, help="First local date (YYYY-MM-DD)")
+        parser.add_argument("--end", type=str, help="Last local date (YYYY-MM-DD)")
+        parser.add_argument("--days", type=int, help="Rebuild the last N days up to today")
+        parser.add_argument(
+            "--chunk-days",
+            type=int,
+            default=31,
+            help="Days recomputed per transaction (default: 31)",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        full_history = not (options["start"] or options["end"] or options["days"])
+        start, end = self._resolve_range(options)
+        if start is None:
+            self.stdout.write("No bookings found.")
+            deleted, _ = DailyBookingRollup.objects.using("default").all().delete()
+            self.stdout.write(f"Removed {deleted} rollup rows")
+            return
+        if start > end:
+            raise CommandError("--start must not be after --end")
+
+        started = time.perf_counter()
+        written = rebuild_rollups(start, end, chunk_days=max(1, options["chunk_days"]))
+        if full_history:
+            # Rows outside the booking range belong to bookings that no longer exist.
+            DailyBookingRollup.objects.using("default").exclude(
+                date__gte=start, date__lte=end
+            ).delete()
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {start}..{end}: {written} rollup rows in {elapsed:.1f}s")
+        )
+        if not rollups_enabled():
+            self.stdout.write(
+                self.style.WARNING(
+                    "PRAXI_KPI_ROLLUPS is disabled: rollups are not maintained or read."
+                )
+            )
+
+    def _resolve_range(self, options: dict[str, Any]) -> tuple[date | None, date | None]:
+        today = timezone.localdate()
+        if options["days"]:
+            return today - timedelta(days=options["days"] - 1), today
+
+        start = _parse_date(options["start"]) if options["start"] else None
+        end = _parse_date(options["end"]) if options["end"] else None
+        if start is not None and end is not None:
+            return start, end
+
+        bounds = [
+            model.objects.using("default").aggregate(
+                first=Min("start_time"), last=Max("start_time")
+            )
+            for model in (Appointment, Operation)
+        ]
+        firsts = [timezone.localdate(b["first"]) for b in bounds if b["first"]]
+        lasts = [timezone.localdate(b["last"]) for b in bounds if b["last"]]
+        if not firsts:
+            return None, None
+        return start or min(firsts), end or max(lasts)
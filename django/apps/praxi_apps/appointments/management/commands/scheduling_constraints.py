@@ -0,0 +1,81 @@
+"""
+Django Management Command: scheduling_constraints
+
+Install, remove or inspect the PostgreSQL overlap exclusion constraints used
+when PRAXI_SCHEDULING_DB_CONSTRAINTS is enabled.
+
+Usage:
+    python manage.py scheduling_constraints            # show status
+    python manage.py scheduling_constraints --install
+    python manage.py scheduling_constraints --remove
+
+--install refuses to run while existing bookings overlap and lists them.
+"""
+
+from argparse import ArgumentParser
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from praxi_backend.appointments.services.scheduling_constraints import (
+    OVERLAP_CONSTRAINTS,
+    db_constraints_requested,
+    find_existing_overlaps,
+    install_overlap_constraints,
+    installed_overlap_constraints,
+    remove_overlap_constraints,
+)
+
+
+class Command(BaseCommand):
+    """Manage the scheduling overlap exclusion constraints."""
+
+    help = "Install, remove or inspect the scheduling overlap exclusion constraints"
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument(
+            "--install",
+            action="store_true",
+            help="Create the constraints",
+        )
+        group.add_argument(
+            "--remove",
+            action="store_true",
+            help="Drop the constraints",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options["install"]:
+            self._install()
+        elif options["remove"]:
+            with transaction.atomic(using="default"):
+                removed = remove_overlap_constraints()
+            self.stdout.write(f"Removed: {', '.join(removed) or '-'}")
+        self._print_status()
+
+    def _install(self) -> None:
+        overlaps = {name: find_existing_overlaps(name) for name in OVERLAP_CONSTRAINTS}
+        if any(overlaps.values()):
+            lines = [f"{name}: ids {a} / {b}" for name, pairs in overlaps.items() for a, b in pairs]
+            raise CommandError(
+                "Existing bookings overlap; resolve them first:\n" + "\n".join(lines)
+            )
+        with transaction.atomic(using="default"):
+            added = install_overlap_constraints()
+        self.stdout.write(self.style.SUCCESS(f"Installed: {', '.join(added) or '-'}"))
+
+    def _print_status(self) -> None:
+        present = installed_overlap_constraints()
+        for name in OVERLAP_CONSTRAINTS:
+            state = "installed" if name in present else "missing"
+            self.stdout.write(f"{name}: {state}")
+        mode = "enabled" if db_constraints_requested() else "disabled"
+        self.stdout.write(f"PRAXI_SCHEDULING_DB_CONSTRAINTS: {mode}")
+        if db_constraints_requested() and len(present) < len(OVERLAP_CONSTRAINTS):
+            self.stdout.write(
+                self.style.WARNING(
+                    "Constraint mode is enabled but not all constraints exist; "
+                    "the overlap pre-checks stay on."
+                )
+            )
@@ -0,0 +1,105 @@
+"""Composite and partial indexes for the scheduling hot paths.
+
+Built with CREATE INDEX CONCURRENTLY so large appointment/operation tables stay
+writable while the migration runs. See ``manage.py benchmark_indexes`` for the
+before/after query plans.
+"""
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("appointments", "0014_appointment_is_no_show"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="appointment",
+            index=models.Index(
+                fields=["doctor", "start_time", "end_time"], name="appt_doctor_start_end_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="appointment",
+            index=models.Index(
+                fields=["patient_id", "start_time", "end_time"], name="appt_patient_start_end_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="appointment",
+            index=models.Index(fields=["status", "start_time"], name="appt_status_start_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="appointment",
+            index=models.Index(
+                fields=["start_time", "doctor"],
+                condition=~models.Q(status="cancelled"),
+                name="appt_live_start_doctor_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="appointmentresource",
+            index=models.Index(
+                fields=["resource", "appointment"], name="apptres_resource_appt_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="doctorabsence",
+            index=models.Index(
+                fields=["doctor", "start_date", "end_date"],
+                condition=models.Q(active=True),
+                name="absence_active_doctor_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="doctorbreak",
+            index=models.Index(
+                fields=["date", "doctor"],
+                condition=models.Q(active=True),
+                name="break_active_date_doctor_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="operation",
+            index=models.Index(
+                fields=["op_room", "start_time", "end_time"], name="op_room_start_end_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="operation",
+            index=models.Index(
+                fields=["primary_surgeon", "start_time", "end_time"],
+                name="op_surgeon_start_end_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="operation",
+            index=models.Index(fields=["assistant", "start_time"], name="op_assistant_start_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="operation",
+            index=models.Index(
+                fields=["anesthesist", "start_time"], name="op_anesthesist_start_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="operation",
+            index=models.Index(
+                fields=["patient_id", "start_time", "end_time"], name="op_patient_start_end_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="operation",
+            index=models.Index(fields=["status", "start_time"], name="op_status_start_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="operationdevice",
+            index=models.Index(fields=["resource", "operation"], name="opdevice_resource_op_idx"),
+        ),
+    ]
@@ -0,0 +1,62 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("appointments", "0015_scheduling_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyBookingRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Datum")),
+                ("hour", models.PositiveSmallIntegerField(verbose_name="Stunde")),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("appointment", "appointment"),
+                            ("operation", "operation"),
+                        ],
+                        max_length=20,
+                        verbose_name="Art",
+                    ),
+                ),
+                ("doctor_id", models.IntegerField(verbose_name="Arzt-ID")),
+                (
+                    "room_id",
+                    models.IntegerField(blank=True, null=True, verbose_name="Raum-ID"),
+                ),
+                (
+                    "type_id",
+                    models.IntegerField(blank=True, null=True, verbose_name="Typ-ID"),
+                ),
+                ("status", models.CharField(max_length=20, verbose_name="Status")),
+                (
+                    "count",
+                    models.PositiveIntegerField(default=0, verbose_name="Anzahl"),
+                ),
+                (
+                    "booked_seconds",
+                    models.BigIntegerField(default=0, verbose_name="Gebuchte Sekunden"),
+                ),
+            ],
+            options={
+                "verbose_name": "Tagesrollup",
+                "verbose_name_plural": "Tagesrollups",
+                "ordering": ["date", "hour", "id"],
+                "indexes": [models.Index(fields=["kind", "date"], name="rollup_kind_date_idx")],
+            },
+        ),
+    ]
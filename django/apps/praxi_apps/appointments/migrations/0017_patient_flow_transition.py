@@ -0,0 +1,122 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_transitions(apps, schema_editor):
+    """Copy existing status changes out of the audit log."""
+    AuditLog = apps.get_model("core", "AuditLog")
+    PatientFlow = apps.get_model("appointments", "PatientFlow")
+    PatientFlowTransition = apps.get_model("appointments", "PatientFlowTransition")
+    db_alias = schema_editor.connection.alias
+
+    flow_ids = set(PatientFlow.objects.using(db_alias).values_list("id", flat=True))
+    statuses = {value for value, _ in PatientFlow._meta.get_field("status").choices}
+    rows = (
+        AuditLog.objects.using(db_alias)
+        .filter(action="patient_flow_status_update")
+        .order_by("timestamp", "id")
+        .values_list("timestamp", "meta")
+    )
+    batch = []
+    for timestamp, meta in rows.iterator(chunk_size=2000):
+        meta = meta or {}
+        try:
+            flow_id = int(meta.get("flow_id"))
+        except (TypeError, ValueError):
+            continue
+        to_status = meta.get("to")
+        if flow_id not in flow_ids or to_status not in statuses:
+            continue
+        from_status = meta.get("from")
+        batch.append(
+            PatientFlowTransition(
+                flow_id=flow_id,
+                from_status=from_status if from_status in statuses else None,
+                to_status=to_status,
+                changed_at=timestamp,
+            )
+        )
+        if len(batch) >= 2000:
+            PatientFlowTransition.objects.using(db_alias).bulk_create(batch)
+            batch = []
+    if batch:
+        PatientFlowTransition.objects.using(db_alias).bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("appointments", "0016_daily_booking_rollup"),
+        ("core", "0002_auditlog"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PatientFlowTransition",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "from_status",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("registered", "registered"),
+                            ("waiting", "waiting"),
+                            ("preparing", "preparing"),
+                            ("in_treatment", "in_treatment"),
+                            ("post_treatment", "post_treatment"),
+                            ("done", "done"),
+                        ],
+                        max_length=32,
+                        null=True,
+                        verbose_name="Vorheriger Status",
+                    ),
+                ),
+                (
+                    "to_status",
+                    models.CharField(
+                        choices=[
+                            ("registered", "registered"),
+                            ("waiting", "waiting"),
+                            ("preparing", "preparing"),
+                            ("in_treatment", "in_treatment"),
+                            ("post_treatment", "post_treatment"),
+                            ("done", "done"),
+                        ],
+                        max_length=32,
+                        verbose_name="Neuer Status",
+                    ),
+                ),
+                ("changed_at", models.DateTimeField(verbose_name="Geändert am")),
+                (
+                    "flow",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="transitions",
+                        to="appointments.patientflow",
+                        verbose_name="Patientenfluss",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Statuswechsel Patientenfluss",
+                "verbose_name_plural": "Statuswechsel Patientenfluss",
+                "ordering": ["changed_at", "id"],
+                "indexes": [
+                    models.Index(
+                        fields=["flow", "changed_at"],
+                        name="flow_transition_flow_at_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_transitions, migrations.RunPython.noop),
+    ]
@@ -135,6 +135,13 @@ class DoctorAbsence(models.Model):
 
     class Meta:
         ordering = ["doctor_id", "start_date", "end_date", "id"]
+        indexes = [
+            models.Index(
+                fields=["doctor", "start_date", "end_date"],
+                condition=models.Q(active=True),
+                name="absence_active_doctor_idx",
+            ),
+        ]
         verbose_name = "Abwesenheit"
         verbose_name_plural = "Abwesenheiten"
 
@@ -226,6 +233,13 @@ class DoctorBreak(models.Model):
 
     class Meta:
         ordering = ["date", "start_time", "doctor_id", "id"]
+        indexes = [
+            models.Index(
+                fields=["date", "doctor"],
+                condition=models.Q(active=True),
+                name="break_active_date_doctor_idx",
+            ),
+        ]
         verbose_name = "Pause"
         verbose_name_plural = "Pausen"
 
@@ -300,6 +314,22 @@ class Appointment(models.Model):
 
     class Meta:
         ordering = ["-start_time", "-id"]
+        indexes = [
+            # Overlap checks: doctor_id = ? AND start_time < ? AND end_time > ?
+            models.Index(
+                fields=["doctor", "start_time", "end_time"], name="appt_doctor_start_end_idx"
+            ),
+            models.Index(
+                fields=["patient_id", "start_time", "end_time"], name="appt_patient_start_end_idx"
+            ),
+            models.Index(fields=["status", "start_time"], name="appt_status_start_idx"),
+            # Calendar/KPI range scans that ignore cancelled appointments.
+            models.Index(
+                fields=["start_time", "doctor"],
+                condition=~models.Q(status="cancelled"),
+                name="appt_live_start_doctor_idx",
+            ),
+        ]
         verbose_name = "Termin"
         verbose_name_plural = "Termine"
 
@@ -365,6 +395,9 @@ class AppointmentResource(models.Model):
     class Meta:
         unique_together = ("appointment", "resource")
         ordering = ["appointment_id", "resource_id", "id"]
+        indexes = [
+            models.Index(fields=["resource", "appointment"], name="apptres_resource_appt_idx"),
+        ]
         verbose_name = "Termin-Ressource"
         verbose_name_plural = "Termin-Ressourcen"
 
@@ -478,6 +511,21 @@ class Operation(models.Model):
 
     class Meta:
         ordering = ["-start_time", "-id"]
+        indexes = [
+            models.Index(
+                fields=["op_room", "start_time", "end_time"], name="op_room_start_end_idx"
+            ),
+            models.Index(
+                fields=["primary_surgeon", "start_time", "end_time"],
+                name="op_surgeon_start_end_idx",
+            ),
+            models.Index(fields=["assistant", "start_time"], name="op_assistant_start_idx"),
+            models.Index(fields=["anesthesist", "start_time"], name="op_anesthesist_start_idx"),
+            models.Index(
+                fields=["patient_id", "start_time", "end_time"], name="op_patient_start_end_idx"
+            ),
+            models.Index(fields=["status", "start_time"], name="op_status_start_idx"),
+        ]
         verbose_name = "Operation"
         verbose_name_plural = "Operationen"
 
@@ -504,6 +552,9 @@ class OperationDevice(models.Model):
     class Meta:
         unique_together = ("operation", "resource")
         ordering = ["operation_id", "resource_id", "id"]
+        indexes = [
+            models.Index(fields=["resource", "operation"], name="opdevice_resource_op_idx"),
+        ]
         verbose_name = "OP-Gerät"
         verbose_name_plural = "OP-Geräte"
 
@@ -572,3 +623,86 @@ class PatientFlow(models.Model):
 
     def __str__(self) -> str:
         return f"PatientFlow #{self.id} ({self.status})"
+
+
+class PatientFlowTransition(models.Model):
+    """One status change of a ``PatientFlow``.
+
+    Written next to the ``patient_flow_status_update`` audit entry. Wait and
+    treatment times are derived from these rows, so list views can prefetch
+    them in one query instead of searching the audit log per flow.
+    """
+
+    flow = models.ForeignKey(
+        PatientFlow,
+        on_delete=models.CASCADE,
+        related_name="transitions",
+        verbose_name="Patientenfluss",
+    )
+    from_status = models.CharField(
+        max_length=32,
+        null=True,
+        blank=True,
+        choices=PatientFlow.STATUS_CHOICES,
+        verbose_name="Vorheriger Status",
+    )
+    to_status = models.CharField(
+        max_length=32, choices=PatientFlow.STATUS_CHOICES, verbose_name="Neuer Status"
+    )
+    changed_at = models.DateTimeField(verbose_name="Geändert am")
+
+    class Meta:
+        ordering = ["changed_at", "id"]
+        verbose_name = "Statuswechsel Patientenfluss"
+        verbose_name_plural = "Statuswechsel Patientenfluss"
+        indexes = [
+            models.Index(fields=["flow", "changed_at"], name="flow_transition_flow_at_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"PatientFlow #{self.flow_id}: {self.from_status} -> {self.to_status}"
+
+
+class DailyBookingRollup(models.Model):
+    """Daily fact table of appointment and operation bookings.
+
+    One row per (date, hour, kind, doctor, room, type, status) with the number of
+    bookings and their summed duration. ``date``/``hour`` are the local start of
+    the booking; the whole duration counts for the start hour.
+
+    Technical notes:
+    - Derived data, maintained by ``praxi_backend.appointments.kpi.rollups``
+      (signals + ``manage.py rebuild_rollups``); never edit rows directly.
+    - Dimension ids are plain integers (like ``patient_id``) so rollups never
+      block deletes of the source rows.
+    - ``room_id`` is the operation room, or the lowest room resource of an appointment.
+    """
+
+    KIND_APPOINTMENT = "appointment"
+    KIND_OPERATION = "operation"
+
+    KIND_CHOICES = (
+        (KIND_APPOINTMENT, KIND_APPOINTMENT),
+        (KIND_OPERATION, KIND_OPERATION),
+    )
+
+    date = models.DateField(verbose_name="Datum")
+    hour = models.PositiveSmallIntegerField(verbose_name="Stunde")
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, verbose_name="Art")
+    doctor_id = models.IntegerField(verbose_name="Arzt-ID")
+    room_id = models.IntegerField(null=True, blank=True, verbose_name="Raum-ID")
+    type_id = models.IntegerField(null=True, blank=True, verbose_name="Typ-ID")
+    status = models.CharField(max_length=20, verbose_name="Status")
+    count = models.PositiveIntegerField(default=0, verbose_name="Anzahl")
+    booked_seconds = models.BigIntegerField(default=0, verbose_name="Gebuchte Sekunden")
+
+    class Meta:
+        ordering = ["date", "hour", "id"]
+        indexes = [
+            models.Index(fields=["kind", "date"], name="rollup_kind_date_idx"),
+        ]
+        verbose_name = "Tagesrollup"
+        verbose_name_plural = "Tagesrollups"
+
+    def __str__(self) -> str:
+        return f"DailyBookingRollup {self.kind} {self.date} {self.hour}h ({self.count})"
@@ -13,6 +13,14 @@ from django.utils import timezone
 from rest_framework import generics, status
 from rest_framework.response import Response
 
+from .change_tracking import (
+    CONFIG,
+    OPERATIONS,
+    PATIENTS,
+    USERS,
+    table_keys,
+    validators_for,
+)
 from .models import Operation, Resource
 from .permissions import OpTimelinePermission
 from .serializers import OpTimelineGroupSerializer
@@ -161,7 +169,17 @@ class OpTimelineLiveView(_OpTimelineBaseView):
     """GET /api/op-timeline/live/"""
 
     def get(self, request, *args, **kwargs):
+        # Audited before the conditional check: a 304 is an access as well.
+        self._audit(request, live=True)
+        validators = validators_for(
+            request, table_keys(OPERATIONS, CONFIG, PATIENTS, USERS), live=True
+        )
+        if validators is not None:
+            not_modified = validators.not_modified(request)
+            if not_modified is not None:
+                return not_modified
+
         ops = list(self._ops_for_live(request).order_by("op_room__name", "start_time", "id"))
         payload = self._group_by_room(ops)
-        self._audit(request, live=True)
-        return Response(self.get_serializer(payload, many=True).data, status=status.HTTP_200_OK)
+        response = Response(self.get_serializer(payload, many=True).data, status=status.HTTP_200_OK)
+        return validators.apply(response) if validators is not None else response
@@ -10,11 +10,15 @@ from datetime import date, datetime, time, timedelta
 
 from django.db.models import Q
 from django.utils import timezone
+from praxi_backend.core.models import User
+from praxi_backend.core.pagination import keyset_list_response
 from praxi_backend.patients.utils import get_patient_display_name_map
 from rest_framework import generics, serializers, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from .change_tracking import CONFIG, OPERATIONS, PATIENTS, USERS, table_keys, validators_for
+from .config_cache import get_operation_type
 from .exceptions import (
     DoctorAbsentError,
     DoctorBreakConflict,
@@ -23,7 +27,7 @@ from .exceptions import (
     SchedulingError,
     WorkingHoursViolation,
 )
-from .models import DoctorHours, Operation, OperationType, PracticeHours, Resource
+from .models import Operation, OperationType, Resource
 from .permissions import (
     OpDashboardPermission,
     OperationPermission,
@@ -32,7 +36,7 @@ from .permissions import (
 )
 from .scheduling_facade import doctor_display_name
 from .scheduling_facade import plan_operation as scheduling_plan_operation
-from .scheduling_facade import resolve_doctor
+from .scheduling_facade import resolve_doctor, suggest_operation_slots
 from .serializers import (
     OperationCreateUpdateSerializer,
     OperationDashboardSerializer,
@@ -40,6 +44,12 @@ from .serializers import (
     OperationTypeSerializer,
 )
 from .services.querying import apply_overlap_date_filters
+from .validators import (
+    dedupe_int_list,
+    resolve_active_devices,
+    validate_doctor_user,
+    validate_patient_id,
+)
 
 
 def _log_patient_action(user, action: str, patient_id: int | None = None, meta: dict | None = None):
@@ -154,6 +164,16 @@ class OpDashboardLiveView(generics.GenericAPIView):
         return qs
 
     def get(self, request, *args, **kwargs):
+        # Audited before the conditional check: a 304 is an access as well.
+        _log_patient_action(request.user, "op_dashboard_view", meta={"live": True})
+        validators = validators_for(
+            request, table_keys(OPERATIONS, CONFIG, PATIENTS, USERS), live=True
+        )
+        if validators is not None:
+            not_modified = validators.not_modified(request)
+            if not_modified is not None:
+                return not_modified
+
         now = timezone.now()
         qs = (
             Operation.objects.using("default")
@@ -165,9 +185,9 @@ class OpDashboardLiveView(generics.GenericAPIView):
             )
         )
         qs = self._apply_rbac(request, qs).order_by("start_time", "id")
-        _log_patient_action(request.user, "op_dashboard_view", meta={"live": True})
         data = self.get_serializer(qs, many=True, context={"request": request}).data
-        return Response({"operations": data}, status=status.HTTP_200_OK)
+        response = Response({"operations": data}, status=status.HTTP_200_OK)
+        return validators.apply(response) if validators is not None else response
 
 
 class OpDashboardStatusUpdateView(generics.GenericAPIView):
@@ -294,6 +314,7 @@ class OperationListCreateView(generics.ListCreateAPIView):
     permission_classes = [OperationPermission]
     use_scheduling_service = True  # Set to False to use legacy serializer-based validation
     pagination_class = None
+    keyset_fields = ("start_time", "id")
 
     def get_permissions(self):
         """Use IsAuthenticated for GET, OperationPermission for write operations."""
@@ -329,6 +350,9 @@ class OperationListCreateView(generics.ListCreateAPIView):
         - date: YYYY-MM-DD format to filter operations for a specific day
         - start_date: YYYY-MM-DD format for range start
         - end_date: YYYY-MM-DD format for range end
+        - limit / cursor: keyset pages ordered by (start_time, id), see
+          ``praxi_backend.core.pagination``
+        - stream: ``json`` or ``ndjson`` to stream the full result in chunks
         """
         _log_patient_action(request.user, "operation_list")
 
@@ -340,27 +364,31 @@ class OperationListCreateView(generics.ListCreateAPIView):
             end_date_str=request.query_params.get("end_date"),
         )
 
-        qs = qs.order_by("start_time", "id")
+        qs = qs.order_by(*self.keyset_fields)
+
+        # Opt-in keyset pages (?cursor/?limit) and streaming export (?stream)
+        response = keyset_list_response(request, qs, self.keyset_fields, self._serialize_rows)
+        if response is not None:
+            return response
+
+        page = self.paginate_queryset(qs)
+        if page is not None:
+            return self.get_paginated_response(self._serialize_rows(page))
 
+        return Response(self._serialize_rows(list(qs)))
+
+    def _serialize_rows(self, rows):
+        """Serialize ``rows`` with one patient name lookup for all of them."""
         # Build a patient name map once (avoids N+1 lookups in serializers).
-        patient_name_map = {}
         try:
-            patient_ids = list(qs.values_list("patient_id", flat=True))
-            patient_name_map = get_patient_display_name_map(patient_ids)
+            patient_name_map = get_patient_display_name_map(op.patient_id for op in rows)
         except Exception:
             patient_name_map = {}
 
-        page = self.paginate_queryset(qs)
         serializer_class = self.get_serializer_class()
         context = self.get_serializer_context()
         context["patient_name_map"] = patient_name_map
-
-        if page is not None:
-            serializer = serializer_class(page, many=True, context=context)
-            return self.get_paginated_response(serializer.data)
-
-        serializer = serializer_class(qs, many=True, context=context)
-        return Response(serializer.data)
+        return serializer_class(rows, many=True, context=context).data
 
     def create(self, request, *args, **kwargs):
         """Create an operation using the scheduling service.
@@ -377,10 +405,11 @@ class OperationListCreateView(generics.ListCreateAPIView):
         write_serializer = self.get_serializer(data=request.data, context={"request": request})
         try:
             write_serializer.is_valid(raise_exception=True)
+            # In constraint mode a room overlap surfaces on save.
+            obj = write_serializer.save()
         except serializers.ValidationError as exc:
             _maybe_audit_operation_conflict(request=request, exc=exc)
             raise
-        obj = write_serializer.save()
         _log_patient_action(request.user, "operation_create", obj.patient_id)
 
         read_serializer = OperationSerializer(obj, context={"request": request})
@@ -469,10 +498,11 @@ class OperationDetailView(generics.RetrieveUpdateDestroyAPIView):
         )
         try:
             write_serializer.is_valid(raise_exception=True)
+            # In constraint mode a room overlap surfaces on save.
+            updated = write_serializer.save()
         except serializers.ValidationError as exc:
             _maybe_audit_operation_conflict(request=request, exc=exc)
             raise
-        updated = write_serializer.save()
         _log_patient_action(request.user, "operation_update", updated.patient_id)
         read_serializer = OperationSerializer(updated, context={"request": request})
         return Response(read_serializer.data, status=status.HTTP_200_OK)
@@ -539,6 +569,60 @@ class OperationSuggestView(generics.GenericAPIView):
                 unique.append(i)
         return unique, None
 
+    def _resolve_static(
+        self,
+        request,
+        *,
+        patient_id: int,
+        primary_surgeon,
+        assistant_id: int | None,
+        anesthesist_id: int | None,
+        op_device_ids: list[int] | None,
+    ) -> tuple[dict | None, list[Resource]]:
+        """Resolve team and devices as the serializer would.
+
+        Returns ``(None, [])`` when the payload can never validate (bad patient
+        id, unknown/inactive team member, non-doctor, invalid devices or the
+        doctor-self-only rule).
+        """
+        try:
+            validate_patient_id(patient_id)
+        except serializers.ValidationError:
+            return None, []
+
+        team = {"assistant": None, "anesthesist": None}
+        members = {
+            user.id: user
+            for user in User.objects.using("default").filter(
+                id__in=[uid for uid in (assistant_id, anesthesist_id) if uid is not None]
+            )
+        }
+        for key, user_id in (("assistant", assistant_id), ("anesthesist", anesthesist_id)):
+            if user_id is None:
+                continue
+            user = members.get(user_id)
+            if user is None:
+                return None, []
+            team[key] = user.id
+            try:
+                validate_doctor_user(user, field_name=key)
+            except serializers.ValidationError:
+                return None, []
+            if not getattr(user, "is_active", True):
+                return None, []
+
+        req_role = getattr(getattr(request.user, "role", None), "name", None)
+        if req_role == "doctor" and primary_surgeon.id != request.user.id:
+            return None, []
+
+        try:
+            devices = resolve_active_devices(
+                dedupe_int_list(op_device_ids or [], field_name="op_device_ids")
+            )
+        except serializers.ValidationError:
+            return None, []
+        return team, devices
+
     def get(self, request, *args, **kwargs):
         patient_id, err = self._parse_int(request, "patient_id", required=True)
         if err is not None:
@@ -597,7 +681,7 @@ class OperationSuggestView(generics.GenericAPIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        op_type = OperationType.objects.using("default").filter(id=op_type_id).first()
+        op_type = get_operation_type(op_type_id)
         if op_type is None:
             return Response({"detail": "op_type_id not found."}, status=status.HTTP_400_BAD_REQUEST)
         if not getattr(op_type, "active", True):
@@ -614,100 +698,53 @@ class OperationSuggestView(generics.GenericAPIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Scan: propose the earliest valid slot per day window
-        weekday = start_date.weekday()
-        practice_hours = list(
-            PracticeHours.objects.using("default")
-            .filter(weekday=weekday, active=True)
-            .order_by("start_time", "id")
+        # Candidate-independent checks of OperationCreateUpdateSerializer; if any
+        # fails, no candidate could ever validate.
+        team, devices = self._resolve_static(
+            request,
+            patient_id=patient_id,
+            primary_surgeon=primary_surgeon,
+            assistant_id=assistant_id,
+            anesthesist_id=anesthesist_id,
+            op_device_ids=op_device_ids,
         )
-        doctor_hours = list(
-            DoctorHours.objects.using("default")
-            .filter(doctor=primary_surgeon, weekday=weekday, active=True)
-            .order_by("start_time", "id")
+
+        total_minutes = sum(
+            max(0, int(getattr(op_type, name, 0) or 0))
+            for name in ("prep_duration", "op_duration", "post_duration")
         )
-        if not (practice_hours and doctor_hours):
-            _log_patient_action(request.user, "operation_suggest")
-            return Response(
-                {
-                    "primary_surgeon": {
-                        "id": primary_surgeon.id,
-                        "name": doctor_display_name(primary_surgeon),
-                        "color": getattr(primary_surgeon, "calendar_color", None),
-                    },
-                    "suggestions": [],
-                },
-                status=status.HTTP_200_OK,
+
+        slots = []
+        if team is not None:
+            slots = suggest_operation_slots(
+                primary_surgeon_id=primary_surgeon.id,
+                assistant_id=team["assistant"],
+                anesthesist_id=team["anesthesist"],
+                room=op_room,
+                devices=devices,
+                day=start_date,
+                duration_minutes=total_minutes,
+                limit=limit,
             )
 
-        tz = timezone.get_current_timezone()
-        now_local = timezone.localtime(timezone.now())
-
-        step = timedelta(minutes=5)
-        suggestions = []
-        for ph in practice_hours:
-            for dh in doctor_hours:
-                window_start_t = max(ph.start_time, dh.start_time)
-                window_end_t = min(ph.end_time, dh.end_time)
-                if window_start_t >= window_end_t:
-                    continue
-                window_start_dt = timezone.make_aware(
-                    datetime.combine(start_date, window_start_t), tz
-                )
-                window_end_dt = timezone.make_aware(datetime.combine(start_date, window_end_t), tz)
-
-                candidate = window_start_dt
-                if start_date == now_local.date():
-                    candidate = max(candidate, now_local)
-                candidate = candidate.replace(second=0, microsecond=0)
-                # align to 5 min
-                mod = candidate.minute % 5
-                if mod:
-                    candidate = candidate + timedelta(minutes=(5 - mod))
-
-                while candidate < window_end_dt and len(suggestions) < limit:
-                    payload = {
-                        "patient_id": patient_id,
-                        "primary_surgeon": primary_surgeon_id,
-                        "assistant": assistant_id,
-                        "anesthesist": anesthesist_id,
-                        "op_room": op_room_id,
-                        "op_device_ids": op_device_ids or [],
-                        "op_type": op_type_id,
-                        "start_time": _iso_z(candidate),
-                        "status": "planned",
-                        "notes": "",
-                    }
-                    ser = OperationCreateUpdateSerializer(
-                        data=payload,
-                        context={"request": request, "suppress_conflict_audit": True},
-                    )
-                    if ser.is_valid():
-                        end_dt = ser.validated_data["end_time"]
-                        suggestions.append(
-                            {
-                                "start_time": _iso_z(candidate),
-                                "end_time": _iso_z(end_dt),
-                                "op_type": {
-                                    "id": op_type.id,
-                                    "name": op_type.name,
-                                    "color": op_type.color,
-                                },
-                                "op_room": {
-                                    "id": op_room.id,
-                                    "name": op_room.name,
-                                    "color": op_room.color,
-                                },
-                                "op_device_ids": op_device_ids or [],
-                            }
-                        )
-                        break
-                    candidate = candidate + step
-
-                if len(suggestions) >= limit:
-                    break
-            if len(suggestions) >= limit:
-                break
+        suggestions = [
+            {
+                "start_time": _iso_z(start),
+                "end_time": _iso_z(end),
+                "op_type": {
+                    "id": op_type.id,
+                    "name": op_type.name,
+                    "color": op_type.color,
+                },
+                "op_room": {
+                    "id": op_room.id,
+                    "name": op_room.name,
+                    "color": op_room.color,
+                },
+                "op_device_ids": op_device_ids or [],
+            }
+            for start, end in slots
+        ]
 
         _log_patient_action(request.user, "operation_suggest")
         return Response(
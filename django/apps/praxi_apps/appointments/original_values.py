@@ -0,0 +1,60 @@
+"""praxi_backend.appointments.original_values
+
+Field values of a model instance as loaded from (or last saved to) the database.
+
+Several write hooks need the value a row had before a save: KPI snapshots and
+rollups invalidate the old date of a moved booking, change tracking bumps the
+days it left, live events report the previous status or room. Instead of one
+``post_init`` receiver per feature, each feature registers the fields it needs
+with :func:`track`, and a single receiver per model stores them on the instance.
+
+- Only fields of currently enabled features are copied; with all of them off a
+  load costs one receiver call and no copy.
+- After a save the copy is refreshed, so the next save of the same instance
+  compares against what is now in the database. The refresh receivers are
+  connected by :func:`connect_signals`, which must run after every feature has
+  connected its own ``post_save`` receivers (see ``AppointmentsConfig.ready``).
+- Instances loaded while a feature was off carry no values for its fields;
+  :func:`original_values` then returns an empty mapping for them.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from django.db.models.signals import post_init, post_save
+
+_consumers: dict[type, list[tuple[frozenset[str], Callable[[], bool]]]] = {}
+
+
+def track(model: type, fields: Iterable[str], enabled: Callable[[], bool] = lambda: True) -> None:
+    """Keep the original values of ``fields`` of ``model`` while ``enabled()``."""
+    entry = (frozenset(fields), enabled)
+    consumers = _consumers.setdefault(model, [])
+    if entry not in consumers:
+        consumers.append(entry)
+
+
+def original_values(instance) -> dict[str, Any]:
+    """Values of the tracked fields of ``instance`` before its pending changes."""
+    return instance.__dict__.get("_original_values") or {}
+
+
+def _remember(sender, instance, **kwargs) -> None:
+    fields: set[str] = set()
+    for consumer_fields, enabled in _consumers.get(sender, ()):
+        if enabled():
+            fields |= consumer_fields
+    if fields:
+        instance._original_values = {f: instance.__dict__.get(f) for f in fields}
+    elif "_original_values" in instance.__dict__:
+        del instance._original_values
+
+
+def connect_signals() -> None:
+    """Connect one snapshot receiver per tracked model (after all consumers)."""
+    for model in _consumers:
+        name = model.__name__
+        post_init.connect(_remember, sender=model, dispatch_uid=f"original_init_{name}")
+        post_save.connect(_remember, sender=model, dispatch_uid=f"original_save_{name}")
@@ -7,11 +7,23 @@ No logic changes; only module split.
 from __future__ import annotations
 
 from django.db.models import Q
+from django.utils import timezone
+from praxi_backend.patients.utils import get_patient_display_name_map
 from rest_framework import generics, status
 from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 
-from .models import PatientFlow
+from .change_tracking import (
+    APPOINTMENTS,
+    CONFIG,
+    OPERATIONS,
+    PATIENT_FLOW,
+    PATIENTS,
+    USERS,
+    table_keys,
+    validators_for,
+)
+from .models import PatientFlow, PatientFlowTransition
 from .permissions import PatientFlowPermission
 from .serializers import (
     PatientFlowCreateUpdateSerializer,
@@ -31,6 +43,48 @@ def _log_patient_action(user, action: str, patient_id: int | None = None, meta:
     return views_module.log_patient_action(user, action, patient_id, meta=meta)
 
 
+def _flow_list_response(view, request):
+    """List flows with one patient name lookup for the nested bookings of all rows."""
+    rows = list(view.filter_queryset(view.get_queryset()))
+    try:
+        patient_name_map = get_patient_display_name_map(
+            booking.patient_id
+            for flow in rows
+            for booking in (flow.appointment, flow.operation)
+            if booking is not None
+        )
+    except Exception:
+        patient_name_map = {}
+
+    context = view.get_serializer_context()
+    context["patient_name_map"] = patient_name_map
+    return Response(view.get_serializer_class()(rows, many=True, context=context).data)
+
+
+def _record_status_change(user, flow: PatientFlow, old_status: str | None, new_status: str):
+    """Store a status transition and write its `patient_flow_status_update` audit entry."""
+    PatientFlowTransition.objects.using("default").create(
+        flow=flow, from_status=old_status, to_status=new_status, changed_at=timezone.now()
+    )
+    # Drop transitions prefetched by get_queryset(); they no longer include this one.
+    getattr(flow, "_prefetched_objects_cache", {}).pop("transitions", None)
+
+    patient_id = None
+    appt = getattr(flow, "appointment", None)
+    op = getattr(flow, "operation", None)
+    if appt is not None:
+        patient_id = getattr(appt, "patient_id", None)
+    elif op is not None:
+        patient_id = getattr(op, "patient_id", None)
+
+    _log_patient_action(
+        user,
+        "patient_flow_status_update",
+        patient_id=patient_id,
+        meta={"flow_id": flow.id, "from": old_status, "to": new_status},
+    )
+
+
 class PatientFlowListCreateView(generics.ListCreateAPIView):
     permission_classes = [PatientFlowPermission]
     renderer_classes = [JSONRenderer]
@@ -59,6 +113,7 @@ class PatientFlowListCreateView(generics.ListCreateAPIView):
             .prefetch_related(
                 "appointment__resources",
                 "operation__op_devices",
+                "transitions",
             )
             .order_by("-status_changed_at", "-id")
         )
@@ -73,7 +128,7 @@ class PatientFlowListCreateView(generics.ListCreateAPIView):
         return qs
 
     def list(self, request, *args, **kwargs):
-        r = super().list(request, *args, **kwargs)
+        r = _flow_list_response(self, request)
         _log_patient_action(request.user, "patient_flow_view")
         return r
 
@@ -115,6 +170,7 @@ class PatientFlowDetailView(generics.RetrieveUpdateDestroyAPIView):
             .prefetch_related(
                 "appointment__resources",
                 "operation__op_devices",
+                "transitions",
             )
             .order_by("-status_changed_at", "-id")
         )
@@ -142,19 +198,7 @@ class PatientFlowDetailView(generics.RetrieveUpdateDestroyAPIView):
         obj.refresh_from_db(using="default")
         new_status = getattr(obj, "status", None)
         if new_status != old_status:
-            patient_id = None
-            appt = getattr(obj, "appointment", None)
-            op = getattr(obj, "operation", None)
-            if appt is not None:
-                patient_id = getattr(appt, "patient_id", None)
-            elif op is not None:
-                patient_id = getattr(op, "patient_id", None)
-            _log_patient_action(
-                request.user,
-                "patient_flow_status_update",
-                patient_id=patient_id,
-                meta={"flow_id": obj.id, "from": old_status, "to": new_status},
-            )
+            _record_status_change(request.user, obj, old_status, new_status)
         return r
 
     def partial_update(self, request, *args, **kwargs):
@@ -179,7 +223,7 @@ class PatientFlowStatusUpdateView(generics.GenericAPIView):
                 "operation__assistant",
                 "operation__anesthesist",
             )
-            .prefetch_related("appointment__resources", "operation__op_devices")
+            .prefetch_related("appointment__resources", "operation__op_devices", "transitions")
         )
         role_name = getattr(getattr(self.request.user, "role", None), "name", None)
         if role_name == "doctor":
@@ -198,20 +242,7 @@ class PatientFlowStatusUpdateView(generics.GenericAPIView):
         ser.is_valid(raise_exception=True)
         obj = ser.save()
 
-        patient_id = None
-        appt = getattr(obj, "appointment", None)
-        op = getattr(obj, "operation", None)
-        if appt is not None:
-            patient_id = getattr(appt, "patient_id", None)
-        elif op is not None:
-            patient_id = getattr(op, "patient_id", None)
-
-        _log_patient_action(
-            request.user,
-            "patient_flow_status_update",
-            patient_id=patient_id,
-            meta={"flow_id": obj.id, "from": old_status, "to": getattr(obj, "status", None)},
-        )
+        _record_status_change(request.user, obj, old_status, getattr(obj, "status", None))
         return Response(
             PatientFlowSerializer(obj, context={"request": request}).data, status=status.HTTP_200_OK
         )
@@ -241,6 +272,7 @@ class PatientFlowLiveView(generics.ListAPIView):
             .prefetch_related(
                 "appointment__resources",
                 "operation__op_devices",
+                "transitions",
             )
             .order_by("-status_changed_at", "-id")
         )
@@ -255,6 +287,17 @@ class PatientFlowLiveView(generics.ListAPIView):
         return qs
 
     def list(self, request, *args, **kwargs):
-        r = super().list(request, *args, **kwargs)
+        # Audited before the conditional check: a 304 is an access as well.
         _log_patient_action(request.user, "patient_flow_view", meta={"live": True})
-        return r
+        validators = validators_for(
+            request,
+            table_keys(PATIENT_FLOW, APPOINTMENTS, OPERATIONS, CONFIG, PATIENTS, USERS),
+            live=True,
+        )
+        if validators is not None:
+            not_modified = validators.not_modified(request)
+            if not_modified is not None:
+                return not_modified
+
+        r = _flow_list_response(self, request)
+        return validators.apply(r) if validators is not None else r
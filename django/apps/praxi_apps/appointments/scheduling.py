@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import logging
-from dataclasses import dataclass
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
 from datetime import date, datetime, time, timedelta
 
 from django.db.models import Q
@@ -9,6 +11,14 @@ from django.utils import timezone
 from praxi_backend.core.models import User
 from praxi_backend.core.utils import timed_block
 
+from .config_cache import get_appointment_type, get_doctor_hours, get_practice_hours
+from .intervals import (
+    blocked_start_indices,
+    first_free_index,
+    intersects,
+    merge_intervals,
+    subtract_intervals,
+)
 from .models import (
     Appointment,
     AppointmentResource,
@@ -18,7 +28,6 @@ from .models import (
     DoctorHours,
     Operation,
     OperationDevice,
-    PracticeHours,
     Resource,
 )
 
@@ -64,7 +73,7 @@ def resolve_doctor(doctor_id: int) -> User | None:
 def resolve_type(type_id: int | None) -> AppointmentType | None:
     if type_id is None:
         return None
-    return AppointmentType.objects.using("default").filter(id=type_id).first()
+    return get_appointment_type(type_id)
 
 
 @dataclass(frozen=True)
@@ -73,6 +82,271 @@ class Availability:
     reason: str | None
 
 
+# Batch size (in days) for open-ended suggestion searches. Each batch costs a
+# fixed number of queries; the size doubles for every further batch so that a
+# sparse calendar still needs only a handful of round trips for a full year.
+WINDOW_BATCH_DAYS = 14
+
+
+@dataclass
+class SchedulingWindow:
+    """Scheduling inputs preloaded for ``[start_date, end_date]``.
+
+    Built by :func:`load_scheduling_window` with a fixed number of queries,
+    independent of the number of days. Busy intervals are bucketed per local
+    date so the day scanner never has to touch the database.
+    """
+
+    start_date: date
+    end_date: date
+    # weekday -> [(start, end)], ordered by (start_time, id)
+    practice_hours: dict[int, list[tuple[time, time]]] = field(default_factory=dict)
+    # doctor_id -> weekday -> [(start, end)], ordered by (start_time, id)
+    doctor_hours: dict[int, dict[int, list[tuple[time, time]]]] = field(default_factory=dict)
+    # doctor_id -> [(start_date, end_date)]
+    absences: dict[int, list[tuple[date, date]]] = field(default_factory=dict)
+    # doctor_id -> date -> [(start, end)]
+    appointments: dict[int, dict[date, list[tuple[datetime, datetime]]]] = field(
+        default_factory=dict
+    )
+    # date -> [(doctor_id or None, start, end)], ordered by (start_time, doctor_id, id)
+    breaks: dict[date, list[tuple[int | None, time, time]]] = field(default_factory=dict)
+    # date -> [(start, end)] for appointments/operations using the requested resources
+    resource_busy: dict[date, list[tuple[datetime, datetime]]] = field(default_factory=dict)
+    # doctor_id -> date -> [(start, end)] for operations the doctor is part of
+    # (only with ``include_operations``)
+    operations: dict[int, dict[date, list[tuple[datetime, datetime]]]] = field(default_factory=dict)
+
+    def covers(self, day: date) -> bool:
+        return self.start_date <= day <= self.end_date
+
+    def is_absent(self, doctor_id: int, day: date) -> bool:
+        return any(start <= day <= end for start, end in self.absences.get(doctor_id, ()))
+
+    def breaks_for(self, doctor_id: int, day: date) -> list[tuple[time, time]]:
+        return [
+            (start, end)
+            for br_doctor_id, start, end in self.breaks.get(day, ())
+            if br_doctor_id is None or br_doctor_id == doctor_id
+        ]
+
+
+def _day_bounds(day: date, tz) -> tuple[datetime, datetime]:
+    """Return ``(day_start, next_day_start)`` as aware datetimes."""
+    day_start = timezone.make_aware(datetime.combine(day, time.min), tz)
+    day_end_inclusive = timezone.make_aware(datetime.combine(day, time.max), tz)
+    return day_start, day_end_inclusive + timedelta(microseconds=1)
+
+
+def _bucket_by_day(
+    intervals: Iterable[tuple[datetime, datetime]],
+    *,
+    start_date: date,
+    end_date: date,
+    tz,
+) -> dict[date, list[tuple[datetime, datetime]]]:
+    """Assign intervals to every local date in range they overlap.
+
+    Uses the same overlap predicate as the per-day queries
+    (``start < next_day_start and end > day_start``), so a day bucket contains
+    exactly the rows a per-day query would have returned, in the same order.
+    """
+    buckets: dict[date, list[tuple[datetime, datetime]]] = defaultdict(list)
+    for start, end in intervals:
+        day = max(timezone.localtime(start, tz).date(), start_date)
+        last = min(timezone.localtime(end, tz).date(), end_date)
+        while day <= last:
+            day_start, next_day_start = _day_bounds(day, tz)
+            if start < next_day_start and end > day_start:
+                buckets[day].append((start, end))
+            day = day + timedelta(days=1)
+    return buckets
+
+
+def load_scheduling_window(
+    *,
+    doctor_ids: Iterable[int],
+    start_date: date,
+    end_date: date,
+    resources: list[Resource] | None = None,
+    include_operations: bool = False,
+) -> SchedulingWindow:
+    """Load every scheduling input for ``doctor_ids`` over a date range.
+
+    Costs at most seven queries regardless of the number of days or doctors:
+    absences, appointments, breaks, - only when ``resources`` is given -
+    resource bookings, room operations and device operations, and - with
+    ``include_operations`` - the doctors' operations. Practice and doctor hours
+    come from the configuration cache.
+    """
+    doctor_ids = list(dict.fromkeys(doctor_ids))
+    window = SchedulingWindow(start_date=start_date, end_date=end_date)
+    if end_date < start_date:
+        return window
+
+    tz = timezone.get_current_timezone()
+    range_start, _ = _day_bounds(start_date, tz)
+    _, range_end = _day_bounds(end_date, tz)
+
+    window.practice_hours = dict(get_practice_hours())
+
+    if doctor_ids:
+        all_doctor_hours = get_doctor_hours()
+        window.doctor_hours = {
+            doctor_id: all_doctor_hours[doctor_id]
+            for doctor_id in doctor_ids
+            if doctor_id in all_doctor_hours
+        }
+
+        for doctor_id, abs_start, abs_end in (
+            DoctorAbsence.objects.using("default")
+            .filter(
+                doctor_id__in=doctor_ids,
+                active=True,
+                start_date__lte=end_date,
+                end_date__gte=start_date,
+            )
+            .values_list("doctor_id", "start_date", "end_date")
+        ):
+            window.absences.setdefault(doctor_id, []).append((abs_start, abs_end))
+
+        appts_by_doctor: dict[int, list[tuple[datetime, datetime]]] = defaultdict(list)
+        for doctor_id, appt_start, appt_end in (
+            Appointment.objects.using("default")
+            .filter(
+                doctor_id__in=doctor_ids,
+                start_time__lt=range_end,
+                end_time__gt=range_start,
+            )
+            .order_by("start_time", "id")
+            .values_list("doctor_id", "start_time", "end_time")
+        ):
+            appts_by_doctor[doctor_id].append((appt_start, appt_end))
+        for doctor_id, intervals in appts_by_doctor.items():
+            window.appointments[doctor_id] = _bucket_by_day(
+                intervals, start_date=start_date, end_date=end_date, tz=tz
+            )
+
+    if doctor_ids and include_operations:
+        ops_by_doctor: dict[int, list[tuple[datetime, datetime]]] = defaultdict(list)
+        for op_start, op_end, *team in (
+            Operation.objects.using("default")
+            .filter(
+                Q(primary_surgeon_id__in=doctor_ids)
+                | Q(assistant_id__in=doctor_ids)
+                | Q(anesthesist_id__in=doctor_ids),
+                start_time__lt=range_end,
+                end_time__gt=range_start,
+            )
+            .order_by("start_time", "id")
+            .values_list(
+                "start_time", "end_time", "primary_surgeon_id", "assistant_id", "anesthesist_id"
+            )
+        ):
+            for doctor_id in set(team) & set(doctor_ids):
+                ops_by_doctor[doctor_id].append((op_start, op_end))
+        for doctor_id, intervals in ops_by_doctor.items():
+            window.operations[doctor_id] = _bucket_by_day(
+                intervals, start_date=start_date, end_date=end_date, tz=tz
+            )
+
+    for br_date, br_doctor_id, br_start, br_end in (
+        DoctorBreak.objects.using("default")
+        .filter(active=True, date__gte=start_date, date__lte=end_date)
+        .filter(Q(doctor__isnull=True) | Q(doctor_id__in=doctor_ids))
+        .order_by("date", "start_time", "doctor_id", "id")
+        .values_list("date", "doctor_id", "start_time", "end_time")
+    ):
+        window.breaks.setdefault(br_date, []).append((br_doctor_id, br_start, br_end))
+
+    if resources:
+        resource_ids = [r.id for r in resources]
+        resource_intervals: list[tuple[datetime, datetime]] = list(
+            AppointmentResource.objects.using("default")
+            .filter(
+                resource_id__in=resource_ids,
+                appointment__start_time__lt=range_end,
+                appointment__end_time__gt=range_start,
+            )
+            .order_by("appointment__start_time", "appointment_id", "resource_id", "id")
+            .values_list("appointment__start_time", "appointment__end_time")
+        )
+
+        # Also block intervals where operations use any of the requested resources.
+        room_ids = [r.id for r in resources if getattr(r, "type", None) == "room"]
+        if room_ids:
+            resource_intervals.extend(
+                Operation.objects.using("default")
+                .filter(
+                    op_room_id__in=room_ids,
+                    start_time__lt=range_end,
+                    end_time__gt=range_start,
+                )
+                .order_by("start_time", "id")
+                .values_list("start_time", "end_time")
+            )
+
+        device_ids = [r.id for r in resources if getattr(r, "type", None) == "device"]
+        if device_ids:
+            resource_intervals.extend(
+                OperationDevice.objects.using("default")
+                .filter(
+                    resource_id__in=device_ids,
+                    operation__start_time__lt=range_end,
+                    operation__end_time__gt=range_start,
+                )
+                .order_by("operation__start_time", "operation_id", "resource_id", "id")
+                .values_list("operation__start_time", "operation__end_time")
+            )
+
+        window.resource_busy = _bucket_by_day(
+            resource_intervals, start_date=start_date, end_date=end_date, tz=tz
+        )
+
+    return window
+
+
+def _first_free_start(
+    *,
+    origin: datetime,
+    latest_start: datetime,
+    step: timedelta,
+    duration: timedelta,
+    busy: list[tuple[datetime, datetime]],
+    breaks: list[tuple[datetime, datetime]],
+    resource_busy: list[tuple[datetime, datetime]],
+    diagnostics: dict,
+) -> datetime | None:
+    """Return the first start ``origin + k*step <= latest_start`` that is free.
+
+    Equivalent to testing every candidate in turn against appointments, breaks
+    and resource bookings, but works on merged ranges of blocked candidate
+    indices. Sets the ``blocked_by_*`` diagnostics for every rejected candidate
+    before the hit, attributed to the first check (busy, break, resource) that
+    would have rejected it.
+    """
+    if origin > latest_start:
+        return None
+    last = (latest_start - origin) // step
+
+    busy_idx = blocked_start_indices(busy, origin=origin, step=step, duration=duration)
+    break_idx = blocked_start_indices(breaks, origin=origin, step=step, duration=duration)
+    resource_idx = blocked_start_indices(resource_busy, origin=origin, step=step, duration=duration)
+    busy_or_break = merge_intervals(busy_idx + break_idx)
+
+    found = first_free_index(merge_intervals(busy_or_break + resource_idx), last)
+    tested_end = last + 1 if found is None else found
+
+    if intersects(busy_idx, 0, tested_end):
+        diagnostics["blocked_by_busy"] = True
+    if intersects(subtract_intervals(break_idx, busy_idx), 0, tested_end):
+        diagnostics["blocked_by_break"] = True
+    if intersects(subtract_intervals(resource_idx, busy_or_break), 0, tested_end):
+        diagnostics["blocked_by_resource"] = True
+
+    return None if found is None else origin + found * step
+
+
 def _scan_day_for_slot(
     *,
     doctor: User,
@@ -83,26 +357,31 @@ def _scan_day_for_slot(
     type_obj: AppointmentType | None,
     resources: list[Resource] | None = None,
     limit: int,
+    window: SchedulingWindow | None = None,
 ) -> tuple[list[dict], dict]:
     """Return (suggestions, diagnostics) for a single day.
 
+    Reads all inputs from ``window``; when no window (or one not covering
+    ``current_date``) is given, a single-day window is loaded on the fly.
+
     diagnostics keys:
     - has_hours
     - absent
     - blocked_by_break
     - blocked_by_busy
+    - blocked_by_resource
     """
+    if window is None or not window.covers(current_date):
+        window = load_scheduling_window(
+            doctor_ids=[doctor.id],
+            start_date=current_date,
+            end_date=current_date,
+            resources=resources,
+        )
+
     weekday = current_date.weekday()  # 0=Mon .. 6=Sun
-    practice_hours = list(
-        PracticeHours.objects.using("default")
-        .filter(weekday=weekday, active=True)
-        .order_by("start_time", "id")
-    )
-    doctor_hours = list(
-        DoctorHours.objects.using("default")
-        .filter(doctor=doctor, weekday=weekday, active=True)
-        .order_by("start_time", "id")
-    )
+    practice_hours = window.practice_hours.get(weekday, [])
+    doctor_hours = window.doctor_hours.get(doctor.id, {}).get(weekday, [])
 
     diagnostics = {
         "has_hours": bool(practice_hours and doctor_hours),
@@ -114,127 +393,40 @@ def _scan_day_for_slot(
     if not diagnostics["has_hours"]:
         return [], diagnostics
 
-    absent = (
-        DoctorAbsence.objects.using("default")
-        .filter(
-            doctor=doctor,
-            active=True,
-            start_date__lte=current_date,
-            end_date__gte=current_date,
-        )
-        .exists()
-    )
+    absent = window.is_absent(doctor.id, current_date)
     diagnostics["absent"] = bool(absent)
     if absent:
         return [], diagnostics
 
     tz = timezone.get_current_timezone()
-    day_start = timezone.make_aware(datetime.combine(current_date, time.min), tz)
-    day_end_inclusive = timezone.make_aware(datetime.combine(current_date, time.max), tz)
-    day_end_for_query = day_end_inclusive + timedelta(microseconds=1)
-
-    existing = list(
-        Appointment.objects.using("default")
-        .filter(
-            doctor=doctor,
-            start_time__lt=day_end_for_query,
-            end_time__gt=day_start,
-        )
-        .only("start_time", "end_time")
-        .order_by("start_time", "id")
-    )
 
-    break_rows = list(
-        DoctorBreak.objects.using("default")
-        .filter(active=True, date=current_date)
-        .filter(Q(doctor__isnull=True) | Q(doctor=doctor))
-        .only("start_time", "end_time", "doctor_id")
-        .order_by("start_time", "doctor_id", "id")
-    )
+    existing = window.appointments.get(doctor.id, {}).get(current_date, [])
     break_intervals = [
         (
-            timezone.make_aware(datetime.combine(current_date, br.start_time), tz),
-            timezone.make_aware(datetime.combine(current_date, br.end_time), tz),
+            timezone.make_aware(datetime.combine(current_date, br_start), tz),
+            timezone.make_aware(datetime.combine(current_date, br_end), tz),
         )
-        for br in break_rows
+        for br_start, br_end in window.breaks_for(doctor.id, current_date)
     ]
 
-    resource_intervals: list[tuple[datetime, datetime]] = []
     resource_ids: list[int] = []
     resource_colors: list[str] = []
+    resource_intervals: list[tuple[datetime, datetime]] = []
     if resources:
         resource_ids = [r.id for r in resources]
         resource_colors = [r.color for r in resources]
-
-        resource_rows = list(
-            AppointmentResource.objects.using("default")
-            .filter(resource_id__in=resource_ids)
-            .filter(
-                appointment__start_time__lt=day_end_for_query,
-                appointment__end_time__gt=day_start,
-            )
-            .select_related("appointment")
-            .order_by("appointment__start_time", "appointment_id", "resource_id", "id")
-        )
-        for ar in resource_rows:
-            appt = ar.appointment
-            resource_intervals.append((appt.start_time, appt.end_time))
-
-        # Also block intervals where operations use any of the requested resources.
-        room_ids = [r.id for r in resources if getattr(r, "type", None) == "room"]
-        if room_ids:
-            op_rows = list(
-                Operation.objects.using("default")
-                .filter(
-                    op_room_id__in=room_ids,
-                    start_time__lt=day_end_for_query,
-                    end_time__gt=day_start,
-                )
-                .only("start_time", "end_time")
-                .order_by("start_time", "id")
-            )
-            for op in op_rows:
-                resource_intervals.append((op.start_time, op.end_time))
-
-        device_ids = [r.id for r in resources if getattr(r, "type", None) == "device"]
-        if device_ids:
-            od_rows = list(
-                OperationDevice.objects.using("default")
-                .filter(
-                    resource_id__in=device_ids,
-                    operation__start_time__lt=day_end_for_query,
-                    operation__end_time__gt=day_start,
-                )
-                .select_related("operation")
-                .order_by("operation__start_time", "operation_id", "resource_id", "id")
-            )
-            for od in od_rows:
-                op = od.operation
-                resource_intervals.append((op.start_time, op.end_time))
-
-    def overlaps_any(candidate_start: datetime, candidate_end: datetime) -> bool:
-        for appt in existing:
-            if appt.start_time < candidate_end and appt.end_time > candidate_start:
-                diagnostics["blocked_by_busy"] = True
-                return True
-        for br_start, br_end in break_intervals:
-            if br_start < candidate_end and br_end > candidate_start:
-                diagnostics["blocked_by_break"] = True
-                return True
-        for r_start, r_end in resource_intervals:
-            if r_start < candidate_end and r_end > candidate_start:
-                diagnostics["blocked_by_resource"] = True
-                return True
-        return False
+        resource_intervals = window.resource_busy.get(current_date, [])
 
     suggestions: list[dict] = []
+    if limit <= 0:
+        return suggestions, diagnostics
     step = timedelta(minutes=5)
     duration = timedelta(minutes=duration_minutes)
 
-    for ph in practice_hours:
-        for dh in doctor_hours:
-            window_start_t = max(ph.start_time, dh.start_time)
-            window_end_t = min(ph.end_time, dh.end_time)
+    for ph_start, ph_end in practice_hours:
+        for dh_start, dh_end in doctor_hours:
+            window_start_t = max(ph_start, dh_start)
+            window_end_t = min(ph_end, dh_end)
             if window_start_t >= window_end_t:
                 continue
 
@@ -248,32 +440,37 @@ def _scan_day_for_slot(
             if start_date == now_local.date() and current_date == start_date:
                 candidate_base = max(window_start_dt, now_local)
 
-            candidate = ceil_dt_to_minutes(candidate_base, 5)
-            latest_start = window_end_dt - duration
-
-            while candidate <= latest_start and len(suggestions) < limit:
+            origin = ceil_dt_to_minutes(candidate_base, 5)
+            candidate = _first_free_start(
+                origin=origin,
+                latest_start=window_end_dt - duration,
+                step=step,
+                duration=duration,
+                busy=existing,
+                breaks=break_intervals,
+                resource_busy=resource_intervals,
+                diagnostics=diagnostics,
+            )
+            if candidate is not None:
                 candidate_end = candidate + duration
-                if not overlaps_any(candidate, candidate_end):
-                    type_payload = (
-                        None
-                        if type_obj is None
-                        else {"id": type_obj.id, "name": type_obj.name, "color": type_obj.color}
-                    )
-                    suggestions.append(
-                        {
-                            "start_time": iso_z(candidate),
-                            "end_time": iso_z(candidate_end),
-                            "type": type_payload,
-                            "doctor_color": getattr(doctor, "calendar_color", None),
-                            "type_color": (
-                                getattr(type_obj, "color", None) if type_obj is not None else None
-                            ),
-                            "resource_ids": resource_ids,
-                            "resource_colors": resource_colors,
-                        }
-                    )
-                    break
-                candidate = candidate + step
+                type_payload = (
+                    None
+                    if type_obj is None
+                    else {"id": type_obj.id, "name": type_obj.name, "color": type_obj.color}
+                )
+                suggestions.append(
+                    {
+                        "start_time": iso_z(candidate),
+                        "end_time": iso_z(candidate_end),
+                        "type": type_payload,
+                        "doctor_color": getattr(doctor, "calendar_color", None),
+                        "type_color": (
+                            getattr(type_obj, "color", None) if type_obj is not None else None
+                        ),
+                        "resource_ids": resource_ids,
+                        "resource_colors": resource_colors,
+                    }
+                )
 
             if len(suggestions) >= limit:
                 break
@@ -307,41 +504,119 @@ def compute_suggestions_for_doctor(
         limit,
     )
     with timed_block("scheduling.compute_suggestions_for_doctor", log=logger, level="debug"):
-        if duration_minutes <= 0 or limit <= 0:
-            return []
+        suggestions = compute_suggestions_for_doctors(
+            doctors=[doctor],
+            start_date=start_date,
+            duration_minutes=duration_minutes,
+            limit=limit,
+            type_obj=type_obj,
+            resources=resources,
+            end_date=end_date,
+            now=now,
+            max_days=max_days,
+        ).get(doctor.id, [])
+
+        logger.debug(
+            "scheduling.compute_suggestions_for_doctor end (doctor_id=%s, suggestions=%s)",
+            getattr(doctor, "id", None),
+            len(suggestions),
+        )
+        return suggestions
+
+
+def compute_suggestions_for_doctors(
+    *,
+    doctors: list[User],
+    start_date: date,
+    duration_minutes: int,
+    limit: int,
+    type_obj: AppointmentType | None,
+    resources: list[Resource] | None = None,
+    end_date: date | None = None,
+    now: datetime | None = None,
+    max_days: int = 366,
+    max_doctors: int | None = None,
+) -> dict[int, list[dict]]:
+    """Compute time-slot suggestions for several doctors in one pass.
+
+    Scheduling inputs are loaded once per date batch for all doctors still
+    searching, and days are scanned in order for every doctor. Each doctor gets
+    the same suggestions compute_suggestions_for_doctor would return.
+
+    With ``max_doctors``, the scan stops as soon as that many doctors have at
+    least one suggestion (doctors are scanned in ``doctors`` order within each
+    day); every doctor then only carries what was found up to that point.
+
+    Returns ``{doctor_id: suggestions}`` in ``doctors`` order, omitting doctors
+    without any suggestion.
+    """
+    with timed_block("scheduling.compute_suggestions_for_doctors", log=logger, level="debug"):
+        if duration_minutes <= 0 or limit <= 0 or not doctors:
+            return {}
 
         tz = timezone.get_current_timezone()
         now_local = timezone.localtime(now or timezone.now(), tz)
 
-        suggestions: list[dict] = []
+        found: dict[int, list[dict]] = {d.id: [] for d in doctors}
+        pending = list(doctors)
+        with_suggestions = 0
         days_checked = 0
         current_date = start_date
+        last_date = start_date + timedelta(days=max_days - 1)
+        if end_date is not None:
+            last_date = min(last_date, end_date)
 
-        while len(suggestions) < limit and days_checked < max_days:
+        window: SchedulingWindow | None = None
+        batch_days = WINDOW_BATCH_DAYS
+
+        while pending and days_checked < max_days:
             if end_date is not None and current_date > end_date:
                 break
 
-            day_suggestions, _diag = _scan_day_for_slot(
-                doctor=doctor,
-                current_date=current_date,
-                duration_minutes=duration_minutes,
-                now_local=now_local,
-                start_date=start_date,
-                type_obj=type_obj,
-                resources=resources,
-                limit=limit - len(suggestions),
-            )
-            suggestions.extend(day_suggestions)
+            if window is None or not window.covers(current_date):
+                # A bounded search loads its whole range at once; an open-ended
+                # one grows geometrically so early hits stay cheap.
+                if end_date is not None:
+                    batch_end = last_date
+                else:
+                    batch_end = min(last_date, current_date + timedelta(days=batch_days - 1))
+                    batch_days *= 2
+                window = load_scheduling_window(
+                    doctor_ids=[d.id for d in pending],
+                    start_date=current_date,
+                    end_date=batch_end,
+                    resources=resources,
+                )
+
+            enough = False
+            for doctor in pending:
+                had_suggestions = bool(found[doctor.id])
+                day_suggestions, _diag = _scan_day_for_slot(
+                    doctor=doctor,
+                    current_date=current_date,
+                    duration_minutes=duration_minutes,
+                    now_local=now_local,
+                    start_date=start_date,
+                    type_obj=type_obj,
+                    resources=resources,
+                    limit=limit - len(found[doctor.id]),
+                    window=window,
+                )
+                found[doctor.id].extend(day_suggestions)
+                if max_doctors is not None and day_suggestions and not had_suggestions:
+                    with_suggestions += 1
+                    if with_suggestions >= max_doctors:
+                        enough = True
+                        break
+
+            if enough:
+                break
+            pending = [d for d in pending if len(found[d.id]) < limit]
 
             current_date = current_date + timedelta(days=1)
             days_checked += 1
 
-        logger.debug(
-            "scheduling.compute_suggestions_for_doctor end (doctor_id=%s, suggestions=%s)",
-            getattr(doctor, "id", None),
-            len(suggestions),
-        )
-        return suggestions
+        return {doctor_id: items for doctor_id, items in found.items() if items}
 
 
 def availability_for_range(
@@ -365,58 +640,266 @@ def availability_for_range(
         duration_minutes,
     )
     with timed_block("scheduling.availability_for_range", log=logger, level="debug"):
+        result = availability_for_doctors(
+            doctors=[doctor],
+            start_date=start_date,
+            end_date=end_date,
+            duration_minutes=duration_minutes,
+            max_days=max_days,
+        )[doctor.id]
+
+        logger.debug(
+            "scheduling.availability_for_range end (doctor_id=%s, available=%s, reason=%s)",
+            getattr(doctor, "id", None),
+            result.available,
+            result.reason,
+        )
+        return result
+
+
+def availability_for_doctors(
+    *,
+    doctors: list[User],
+    start_date: date,
+    end_date: date,
+    duration_minutes: int,
+    max_days: int | None = None,
+) -> dict[int, Availability]:
+    """Compute availability_for_range for several doctors from one data load.
+
+    Returns ``{doctor_id: Availability}`` for every doctor in ``doctors``.
+    """
+    with timed_block("scheduling.availability_for_doctors", log=logger, level="debug"):
         if end_date < start_date:
-            return Availability(available=False, reason="no_hours")
+            return {d.id: Availability(available=False, reason="no_hours") for d in doctors}
 
         tz = timezone.get_current_timezone()
         now_local = timezone.localtime(timezone.now(), tz)
-
-        days_checked = 0
         max_days = max_days if max_days is not None else (end_date - start_date).days + 1
 
-        seen_hours_any = False
-        seen_absence_on_hours_day = False
-        seen_break_block = False
-        seen_busy_block = False
-
-        current_date = start_date
-        while current_date <= end_date and days_checked < max_days:
-            suggestions, diag = _scan_day_for_slot(
-                doctor=doctor,
-                current_date=current_date,
+        window = load_scheduling_window(
+            doctor_ids=[d.id for d in doctors],
+            start_date=start_date,
+            end_date=min(end_date, start_date + timedelta(days=max(max_days, 1) - 1)),
+        )
+        return {
+            d.id: _availability_from_window(
+                doctor=d,
+                window=window,
+                start_date=start_date,
+                end_date=end_date,
                 duration_minutes=duration_minutes,
                 now_local=now_local,
-                start_date=start_date,
-                type_obj=None,
-                limit=1,
+                max_days=max_days,
             )
-            if diag["has_hours"]:
-                seen_hours_any = True
-                if diag["absent"]:
-                    seen_absence_on_hours_day = True
-                else:
-                    seen_break_block = seen_break_block or diag["blocked_by_break"]
-                    seen_busy_block = seen_busy_block or diag["blocked_by_busy"]
+            for d in doctors
+        }
 
-            if suggestions:
-                return Availability(available=True, reason=None)
 
-            current_date = current_date + timedelta(days=1)
-            days_checked += 1
+def _availability_from_window(
+    *,
+    doctor: User,
+    window: SchedulingWindow,
+    start_date: date,
+    end_date: date,
+    duration_minutes: int,
+    now_local: datetime,
+    max_days: int,
+) -> Availability:
+    days_checked = 0
 
-        if not seen_hours_any:
-            result = Availability(available=False, reason="no_hours")
-        elif seen_absence_on_hours_day and not (seen_break_block or seen_busy_block):
-            result = Availability(available=False, reason="absence")
-        elif seen_break_block and not seen_busy_block:
-            result = Availability(available=False, reason="break")
-        else:
-            result = Availability(available=False, reason="busy")
+    seen_hours_any = False
+    seen_absence_on_hours_day = False
+    seen_break_block = False
+    seen_busy_block = False
 
-        logger.debug(
-            "scheduling.availability_for_range end (doctor_id=%s, available=%s, reason=%s)",
-            getattr(doctor, "id", None),
-            result.available,
-            result.reason,
+    current_date = start_date
+    while current_date <= end_date and days_checked < max_days:
+        suggestions, diag = _scan_day_for_slot(
+            doctor=doctor,
+            current_date=current_date,
+            duration_minutes=duration_minutes,
+            now_local=now_local,
+            start_date=start_date,
+            type_obj=None,
+            limit=1,
+            window=window,
         )
-        return result
+        if diag["has_hours"]:
+            seen_hours_any = True
+            if diag["absent"]:
+                seen_absence_on_hours_day = True
+            else:
+                seen_break_block = seen_break_block or diag["blocked_by_break"]
+                seen_busy_block = seen_busy_block or diag["blocked_by_busy"]
+
+        if suggestions:
+            return Availability(available=True, reason=None)
+
+        current_date = current_date + timedelta(days=1)
+        days_checked += 1
+
+    if not seen_hours_any:
+        return Availability(available=False, reason="no_hours")
+    if seen_absence_on_hours_day and not (seen_break_block or seen_busy_block):
+        return Availability(available=False, reason="absence")
+    if seen_break_block and not seen_busy_block:
+        return Availability(available=False, reason="break")
+    return Availability(available=False, reason="busy")
+
+
+# ---------------------------------------------------------------------------
+# Operation slot finder
+# ---------------------------------------------------------------------------
+
+
+def _hours_cover(hours: list[tuple[time, time]], start_t: time, end_t: time) -> bool:
+    return any(h_start <= start_t and h_end >= end_t for h_start, h_end in hours)
+
+
+def _team_member_free(
+    window: SchedulingWindow,
+    doctor_id: int,
+    *,
+    local_start: datetime,
+    local_end: datetime,
+    busy: list[tuple[datetime, datetime]],
+    tz,
+) -> bool:
+    """Hours/absence check for one team member; ``busy`` holds their merged busy time.
+
+    Mirrors OperationCreateUpdateSerializer: practice and doctor hours must each
+    cover the per-day segment with a single row, and any absence in the date
+    range blocks the slot.
+    """
+    start_date = local_start.date()
+    end_date = local_end.date()
+    day = start_date
+    while day <= end_date:
+        day_start, next_day_start = _day_bounds(day, tz)
+        seg_start = max(local_start, day_start)
+        seg_end = min(local_end, next_day_start - timedelta(microseconds=1))
+        seg_start_t = seg_start.time().replace(tzinfo=None)
+        seg_end_t = seg_end.time().replace(tzinfo=None)
+        weekday = day.weekday()
+        if not _hours_cover(window.practice_hours.get(weekday, []), seg_start_t, seg_end_t):
+            return False
+        doctor_hours = window.doctor_hours.get(doctor_id, {}).get(weekday, [])
+        if not _hours_cover(doctor_hours, seg_start_t, seg_end_t):
+            return False
+        day = day + timedelta(days=1)
+
+    if any(
+        abs_start <= end_date and abs_end >= start_date
+        for abs_start, abs_end in window.absences.get(doctor_id, ())
+    ):
+        return False
+    return not intersects(busy, local_start, local_end)
+
+
+def suggest_operation_slots(
+    *,
+    primary_surgeon_id: int,
+    assistant_id: int | None = None,
+    anesthesist_id: int | None = None,
+    room: Resource,
+    devices: list[Resource] | None = None,
+    day: date,
+    duration_minutes: int,
+    limit: int,
+    now: datetime | None = None,
+) -> list[tuple[datetime, datetime]]:
+    """Return up to ``limit`` operation slots on ``day`` as ``(start, end)``.
+
+    For every (practice hours x surgeon hours) window of the day, in order, the
+    earliest 5-minute aligned start where the room, devices and all team
+    members are free is proposed - the same slots the per-candidate
+    OperationCreateUpdateSerializer validation used to find. Everything is
+    preloaded with one :func:`load_scheduling_window` call, so the cost is a
+    fixed number of queries.
+    """
+    if limit <= 0 or duration_minutes <= 0:
+        return []
+
+    tz = timezone.get_current_timezone()
+    duration = timedelta(minutes=duration_minutes)
+    team_ids = [primary_surgeon_id]
+    team_ids += [doctor_id for doctor_id in (assistant_id, anesthesist_id) if doctor_id]
+
+    _, next_day_start = _day_bounds(day, tz)
+    last_day = timezone.localtime(next_day_start + duration, tz).date()
+    window = load_scheduling_window(
+        doctor_ids=team_ids,
+        start_date=day,
+        end_date=last_day,
+        resources=[room, *(devices or [])],
+        include_operations=True,
+    )
+
+    def bucketed(buckets: dict[date, list[tuple[datetime, datetime]]]):
+        for intervals in buckets.values():
+            yield from intervals
+
+    resource_busy = list(bucketed(window.resource_busy))
+    busy_by_member: dict[int, list[tuple[datetime, datetime]]] = {}
+    for doctor_id in dict.fromkeys(team_ids):
+        intervals = list(resource_busy)
+        intervals += bucketed(window.appointments.get(doctor_id, {}))
+        intervals += bucketed(window.operations.get(doctor_id, {}))
+        d = day
+        while d <= last_day:
+            for br_start, br_end in window.breaks_for(doctor_id, d):
+                intervals.append(
+                    (
+                        timezone.make_aware(datetime.combine(d, br_start), tz),
+                        timezone.make_aware(datetime.combine(d, br_end), tz),
+                    )
+                )
+            d = d + timedelta(days=1)
+        busy_by_member[doctor_id] = merge_intervals(intervals)
+
+    def slot_free(start: datetime) -> bool:
+        local_start = timezone.localtime(start, tz)
+        local_end = timezone.localtime(start + duration, tz)
+        return all(
+            _team_member_free(
+                window,
+                doctor_id,
+                local_start=local_start,
+                local_end=local_end,
+                busy=busy_by_member[doctor_id],
+                tz=tz,
+            )
+            for doctor_id in team_ids
+        )
+
+    now_local = timezone.localtime(now or timezone.now(), tz)
+    step = timedelta(minutes=5)
+    weekday = day.weekday()
+    slots: list[tuple[datetime, datetime]] = []
+    for ph_start, ph_end in window.practice_hours.get(weekday, []):
+        for dh_start, dh_end in window.doctor_hours.get(primary_surgeon_id, {}).get(weekday, []):
+            window_start_t = max(ph_start, dh_start)
+            window_end_t = min(ph_end, dh_end)
+            if window_start_t >= window_end_t:
+                continue
+            window_start = timezone.make_aware(datetime.combine(day, window_start_t), tz)
+            window_end = timezone.make_aware(datetime.combine(day, window_end_t), tz)
+
+            candidate = window_start
+            if day == now_local.date():
+                candidate = max(candidate, now_local)
+            candidate = candidate.replace(second=0, microsecond=0)
+            mod = candidate.minute % 5
+            if mod:
+                candidate = candidate + timedelta(minutes=5 - mod)
+
+            while candidate < window_end:
+                if slot_free(candidate):
+                    slots.append((candidate, candidate + duration))
+                    break
+                candidate = candidate + step
+
+            if len(slots) >= limit:
+                return slots
+    return slots
@@ -22,22 +22,32 @@ routing/adapter work.
 from __future__ import annotations
 
 # Suggestion engine + availability (legacy module)
-from .scheduling import availability_for_range  # noqa: F401
+from .scheduling import availability_for_doctors, availability_for_range  # noqa: F401
 from .scheduling import (  # noqa: F401
     ceil_dt_to_minutes,
     compute_suggestions_for_doctor,
+    compute_suggestions_for_doctors,
     doctor_display_name,
     get_active_doctors,
     iso_z,
     resolve_doctor,
     resolve_type,
+    suggest_operation_slots,
 )
 
 # Conflict / planning engine (service module)
 from .services.scheduling import filter_available_patients  # noqa: F401
 from .services.scheduling import (  # noqa: F401
+    exclude_busy_patients,
     get_available_doctors,
     get_available_rooms,
     plan_appointment,
     plan_operation,
 )
+
+# Optional database-enforced overlap exclusion
+from .services.scheduling_constraints import (  # noqa: F401
+    conflict_error_from_integrity_error,
+    db_constraints_enabled,
+    violated_overlap_constraint,
+)
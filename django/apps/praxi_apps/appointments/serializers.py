@@ -1,11 +1,15 @@
 from datetime import datetime, timedelta
 
+from django.db import IntegrityError, transaction
 from django.db.models import Q
 from django.utils import timezone
-from praxi_backend.core.models import AuditLog, User
+from praxi_backend.core.models import User
 from praxi_backend.patients.utils import get_patient_display_name
 from rest_framework import serializers
 
+from .change_tracking import mark_booking_changed
+from .config_cache import get_doctor_hours, get_practice_hours, hours_cover
+from .kpi.rollups import mark_rollups_dirty
 from .models import (
     Appointment,
     AppointmentResource,
@@ -20,7 +24,12 @@ from .models import (
     PracticeHours,
     Resource,
 )
-from .scheduling_facade import doctor_display_name
+from .scheduling_facade import (
+    conflict_error_from_integrity_error,
+    db_constraints_enabled,
+    doctor_display_name,
+    violated_overlap_constraint,
+)
 from .validators import (
     dedupe_int_list,
     resolve_active_devices,
@@ -449,7 +458,45 @@ class AppointmentCreateUpdateSerializer(serializers.ModelSerializer):
 
     # Resource conflicts are validated via praxi_backend.appointments.validators.
 
+    def _save_with_doctor_constraint(self, instance, validated_data, save):
+        """Run ``save`` in a savepoint; report doctor overlap violations as conflicts.
+
+        The overlap pre-check in validate() cannot see a concurrent write; in
+        constraint mode the database rejects it and the view reports the
+        ``SchedulingConflictError`` like the scheduling service's create path.
+        """
+        if not db_constraints_enabled():
+            return save()
+
+        def current(field):
+            return validated_data.get(field, getattr(instance, field, None))
+
+        try:
+            with transaction.atomic(using="default"):
+                return save()
+        except IntegrityError as exc:
+            error = conflict_error_from_integrity_error(
+                exc,
+                start_time=current("start_time"),
+                end_time=current("end_time"),
+                doctor_id=getattr(current("doctor"), "id", None),
+                exclude_id=getattr(instance, "id", None),
+            )
+            if error is None:
+                raise
+            raise error from exc
+
     def create(self, validated_data):
+        return self._save_with_doctor_constraint(
+            None, validated_data, lambda: self._create(validated_data)
+        )
+
+    def update(self, instance, validated_data):
+        return self._save_with_doctor_constraint(
+            instance, validated_data, lambda: self._update(instance, validated_data)
+        )
+
+    def _create(self, validated_data):
         resource_ids = validated_data.pop("resource_ids", None)
         resource_objs = validated_data.pop("_resource_objs", None)
 
@@ -465,10 +512,13 @@ class AppointmentCreateUpdateSerializer(serializers.ModelSerializer):
                 [AppointmentResource(appointment=obj, resource=r) for r in resource_objs],
                 ignore_conflicts=True,
             )
+            # bulk_create sends no signals; the room is part of the rollup key.
+            mark_rollups_dirty(obj.start_time)
+            mark_booking_changed(obj)
 
         return obj
 
-    def update(self, instance, validated_data):
+    def _update(self, instance, validated_data):
         resource_ids = validated_data.pop("resource_ids", None)
         resource_objs = validated_data.pop("_resource_objs", None)
 
@@ -485,6 +535,9 @@ class AppointmentCreateUpdateSerializer(serializers.ModelSerializer):
                 [AppointmentResource(appointment=obj, resource=r) for r in resource_objs],
                 ignore_conflicts=True,
             )
+            # bulk_create sends no signals; the room is part of the rollup key.
+            mark_rollups_dirty(obj.start_time)
+            mark_booking_changed(obj)
 
         return obj
 
@@ -771,23 +824,12 @@ class PatientFlowSerializer(serializers.ModelSerializer):
         ]
 
     def _status_change_timestamps(self, obj):
-        # Based on required audits: patient_flow_status_update.
-        # We store flow_id + to-status in meta, then compute durations.
-        qs = (
-            AuditLog.objects.using("default")
-            .filter(
-                action="patient_flow_status_update",
-                meta__flow_id=int(getattr(obj, "id", 0) or 0),
-            )
-            .order_by("timestamp", "id")
-        )
+        # Transitions are written next to the patient_flow_status_update audit
+        # entry; list/detail views prefetch them, so this needs no query per row.
         ts_by_to: dict[str, list] = {}
-        for a in qs:
-            meta = getattr(a, "meta", None) or {}
-            to_status = meta.get("to")
-            if not to_status:
-                continue
-            ts_by_to.setdefault(str(to_status), []).append(a.timestamp)
+        transitions = sorted(obj.transitions.all(), key=lambda t: (t.changed_at, t.id))
+        for transition in transitions:
+            ts_by_to.setdefault(str(transition.to_status), []).append(transition.changed_at)
         return ts_by_to
 
     def get_wait_time_minutes(self, obj):
@@ -1059,16 +1101,18 @@ class OperationCreateUpdateSerializer(serializers.ModelSerializer):
             # Audit is triggered by the view/use-case layer when returning the 400.
             raise serializers.ValidationError({"detail": "Operation conflict", "reason": reason})
 
-        # Room conflicts against other operations
-        room_ops = Operation.objects.using("default").filter(
-            op_room=room,
-            start_time__lt=end_time,
-            end_time__gt=start_time,
-        )
-        if instance is not None and getattr(instance, "id", None) is not None:
-            room_ops = room_ops.exclude(id=instance.id)
-        if room_ops.exists():
-            _raise_conflict("room_conflict", {"room_id": room.id})
+        # Room conflicts against other operations (enforced by the database in
+        # constraint mode, see _save_with_room_constraint)
+        if not db_constraints_enabled():
+            room_ops = Operation.objects.using("default").filter(
+                op_room=room,
+                start_time__lt=end_time,
+                end_time__gt=start_time,
+            )
+            if instance is not None and getattr(instance, "id", None) is not None:
+                room_ops = room_ops.exclude(id=instance.id)
+            if room_ops.exists():
+                _raise_conflict("room_conflict", {"room_id": room.id})
 
         # Room conflicts against appointments that booked the same resource
         appt_room = AppointmentResource.objects.using("default").filter(
@@ -1114,6 +1158,8 @@ class OperationCreateUpdateSerializer(serializers.ModelSerializer):
 
             # Hours must cover entire block within each day
             tz = timezone.get_current_timezone()
+            practice_hours = get_practice_hours()
+            doctor_hours = get_doctor_hours()
             day = start_date
             while day <= end_date:
                 day_start_dt = timezone.make_aware(datetime.combine(day, datetime.min.time()), tz)
@@ -1124,28 +1170,11 @@ class OperationCreateUpdateSerializer(serializers.ModelSerializer):
                 seg_start_t = seg_start.time().replace(tzinfo=None)
                 seg_end_t = seg_end.time().replace(tzinfo=None)
 
-                if (
-                    not PracticeHours.objects.using("default")
-                    .filter(
-                        weekday=weekday,
-                        active=True,
-                        start_time__lte=seg_start_t,
-                        end_time__gte=seg_end_t,
-                    )
-                    .exists()
-                ):
+                if not hours_cover(practice_hours.get(weekday, []), seg_start_t, seg_end_t):
                     _raise_conflict("hours_conflict", {"who": role_key})
 
-                if (
-                    not DoctorHours.objects.using("default")
-                    .filter(
-                        doctor=user_obj,
-                        weekday=weekday,
-                        active=True,
-                        start_time__lte=seg_start_t,
-                        end_time__gte=seg_end_t,
-                    )
-                    .exists()
+                if not hours_cover(
+                    doctor_hours.get(user_obj.id, {}).get(weekday, []), seg_start_t, seg_end_t
                 ):
                     _raise_conflict("hours_conflict", {"who": role_key})
 
@@ -1227,7 +1256,27 @@ class OperationCreateUpdateSerializer(serializers.ModelSerializer):
 
         return attrs
 
+    def _save_with_room_constraint(self, save):
+        """Run ``save`` in a savepoint; report room overlap violations as conflicts."""
+        if not db_constraints_enabled():
+            return save()
+        try:
+            with transaction.atomic(using="default"):
+                return save()
+        except IntegrityError as exc:
+            if violated_overlap_constraint(exc) is None:
+                raise
+            raise serializers.ValidationError(
+                {"detail": "Operation conflict", "reason": "room_conflict"}
+            ) from exc
+
     def create(self, validated_data):
+        return self._save_with_room_constraint(lambda: self._create(validated_data))
+
+    def update(self, instance, validated_data):
+        return self._save_with_room_constraint(lambda: self._update(instance, validated_data))
+
+    def _create(self, validated_data):
         device_ids = validated_data.pop("op_device_ids", None)
         device_objs = validated_data.pop("_device_objs", None)
         obj = super().create(validated_data)
@@ -1243,9 +1292,11 @@ class OperationCreateUpdateSerializer(serializers.ModelSerializer):
                 [OperationDevice(operation=obj, resource=r) for r in device_objs],
                 ignore_conflicts=True,
             )
+            # bulk_create sends no signals.
+            mark_booking_changed(obj)
         return obj
 
-    def update(self, instance, validated_data):
+    def _update(self, instance, validated_data):
         device_ids = validated_data.pop("op_device_ids", None)
         device_objs = validated_data.pop("_device_objs", None)
         obj = super().update(instance, validated_data)
@@ -1262,4 +1313,6 @@ class OperationCreateUpdateSerializer(serializers.ModelSerializer):
                 [OperationDevice(operation=obj, resource=r) for r in device_objs],
                 ignore_conflicts=True,
             )
+            # bulk_create sends no signals.
+            mark_booking_changed(obj)
         return obj
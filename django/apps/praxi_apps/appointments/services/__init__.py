@@ -5,10 +5,17 @@ This package contains service-layer logic for the appointments app:
 - scheduling: Core scheduling logic (conflict detection, validation)
 - scheduling_simulation: Simulation of scheduling conflicts for testing
 - scheduling_benchmark: Performance benchmarks for the scheduling engine
+- index_benchmark: Before/after benchmark of the scheduling indexes
+- scheduling_constraints: Optional database-enforced overlap exclusion
 - scheduling_conflict_report: Conflict report generation and analysis
 - scheduling_visualization: Text-based visualization of conflicts
 """
 
+from praxi_backend.appointments.services.index_benchmark import (
+    IndexBenchmarkReport,
+    QueryPlanResult,
+    run_index_benchmark,
+)
 from praxi_backend.appointments.services.scheduling_benchmark import (
     BenchmarkContext,
     BenchmarkReport,
@@ -21,6 +28,7 @@ from praxi_backend.appointments.services.scheduling_benchmark import (
     benchmark_randomized,
     benchmark_room_conflicts,
     benchmark_single_day_load,
+    benchmark_slot_suggestions,
     benchmark_working_hours_validation,
     generate_report,
     print_benchmark_report,
@@ -122,9 +130,14 @@ __all__ = [
     "benchmark_working_hours_validation",
     "benchmark_room_conflicts",
     "benchmark_randomized",
+    "benchmark_slot_suggestions",
     "benchmark_full_engine",
     "generate_report",
     "print_benchmark_report",
+    # Index Benchmark
+    "IndexBenchmarkReport",
+    "QueryPlanResult",
+    "run_index_benchmark",
     # Conflict Report Classes
     "ConflictCategory",
     "ConflictDetail",
@@ -0,0 +1,257 @@
+"""
+Calendar Payload Benchmark for PraxiApp.
+
+Compares the two ways of rendering calendar events for a month view:
+
+- ``serializer``: ``AppointmentSerializer`` / ``OperationSerializer`` over
+  querysets with ``select_related``/``prefetch_related`` and a prebuilt
+  patient name map (the best case for the DRF path)
+- ``projection``: ``calendar_payload.appointment_events`` /
+  ``operation_events`` over ``.values()`` rows
+
+Both payloads are rendered with DRF's ``JSONRenderer``; the report records
+whether the bytes are identical, the latency of each path and its query count.
+
+Everything runs in one transaction that is always rolled back.
+
+Architecture rules as in scheduling_benchmark:
+- All DB access uses .using('default')
+- Deterministic via the seed
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any
+
+from django.db import connections, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from praxi_backend.appointments.calendar_payload import appointment_events, operation_events
+from praxi_backend.appointments.models import (
+    Appointment,
+    AppointmentResource,
+    Operation,
+    OperationDevice,
+)
+from praxi_backend.appointments.serializers import AppointmentSerializer, OperationSerializer
+from praxi_backend.appointments.services.scheduling_benchmark import (
+    DEFAULT_SEED,
+    BenchmarkContext,
+    TimingStats,
+)
+from praxi_backend.patients.models import Patient
+from praxi_backend.patients.utils import get_patient_display_name_map
+from rest_framework.renderers import JSONRenderer
+
+CALENDAR_DAYS = 31
+
+
+class _Rollback(Exception):
+    """Raised to roll back the benchmark transaction."""
+
+
+@dataclass
+class PathResult:
+    """Timing and query count of one rendering path."""
+
+    path: str
+    timing: TimingStats = field(default_factory=TimingStats)
+    queries: int = 0
+    payload_bytes: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "path": self.path,
+            "timing": self.timing.to_dict(),
+            "queries": self.queries,
+            "payload_bytes": self.payload_bytes,
+        }
+
+
+@dataclass
+class CalendarBenchmarkReport:
+    """Serializer vs. projection comparison for one seeded month."""
+
+    appointments: int = 0
+    operations: int = 0
+    identical: bool = False
+    results: dict[str, PathResult] = field(default_factory=dict)
+
+    @property
+    def speedup(self) -> float:
+        if "serializer" not in self.results or "projection" not in self.results:
+            return 0.0
+        after = self.results["projection"].timing.median_ms
+        return self.results["serializer"].timing.median_ms / after if after else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "appointments": self.appointments,
+            "operations": self.operations,
+            "identical": self.identical,
+            "speedup": round(self.speedup, 2),
+            "results": {name: r.to_dict() for name, r in self.results.items()},
+        }
+
+
+def _seed_month(
+    ctx: BenchmarkContext, rng: random.Random, *, n_appointments: int, n_operations: int
+) -> tuple[datetime, datetime]:
+    """Create bookings in the next ``CALENDAR_DAYS`` days; return the range."""
+    start = timezone.make_aware(datetime.combine(ctx.today, datetime.min.time()), ctx.tz)
+    end = start + timedelta(days=CALENDAR_DAYS)
+
+    patient_ids = [ctx.next_patient_id() for _ in range(max(1, n_appointments // 5))]
+    Patient.objects.using("default").bulk_create(
+        [Patient(id=pid, first_name=f"Vor{pid}", last_name=f"Nach{pid}") for pid in patient_ids],
+        ignore_conflicts=True,
+    )
+
+    def slot() -> datetime:
+        return start + timedelta(
+            days=rng.randrange(CALENDAR_DAYS),
+            hours=rng.randrange(8, 17),
+            minutes=15 * rng.randrange(4),
+        )
+
+    appointments = []
+    for _ in range(n_appointments):
+        begin = slot()
+        appointments.append(
+            Appointment(
+                patient_id=rng.choice(patient_ids),
+                doctor=rng.choice(ctx.doctors),
+                type=rng.choice(ctx.appt_types + [None]),
+                start_time=begin,
+                end_time=begin + timedelta(minutes=rng.choice((15, 30, 45))),
+                status=rng.choice(("scheduled", "confirmed", "completed", "cancelled")),
+                notes=rng.choice(("", "Kontrolle", None)),
+            )
+        )
+    appointments = Appointment.objects.using("default").bulk_create(appointments)
+
+    links = []
+    for appt in appointments:
+        resources = rng.sample(ctx.rooms, 1) if rng.random() < 0.7 else []
+        resources += rng.sample(ctx.devices, rng.randrange(0, 3))
+        links += [AppointmentResource(appointment=appt, resource=r) for r in resources]
+    AppointmentResource.objects.using("default").bulk_create(links)
+
+    operations = []
+    for _ in range(n_operations):
+        begin = slot()
+        operations.append(
+            Operation(
+                patient_id=rng.choice(patient_ids),
+                primary_surgeon=rng.choice(ctx.doctors),
+                assistant=rng.choice(ctx.doctors + [None]),
+                anesthesist=rng.choice(ctx.doctors + [None]),
+                op_room=rng.choice(ctx.rooms),
+                op_type=rng.choice(ctx.op_types),
+                start_time=begin,
+                end_time=begin + timedelta(minutes=90),
+                status=rng.choice(("planned", "confirmed", "done")),
+            )
+        )
+    operations = Operation.objects.using("default").bulk_create(operations)
+    OperationDevice.objects.using("default").bulk_create(
+        [
+            OperationDevice(operation=op, resource=device)
+            for op in operations
+            for device in rng.sample(ctx.devices, rng.randrange(0, 3))
+        ]
+    )
+    return start, end
+
+
+def _serializer_payload(start: datetime, end: datetime) -> dict[str, Any]:
+    appts = (
+        Appointment.objects.using("default")
+        .filter(start_time__lt=end, end_time__gt=start)
+        .select_related("doctor", "type")
+        .prefetch_related("resources")
+        .order_by("start_time", "id")
+    )
+    ops = (
+        Operation.objects.using("default")
+        .filter(start_time__lt=end, end_time__gt=start)
+        .select_related("op_type", "op_room", "primary_surgeon", "assistant", "anesthesist")
+        .prefetch_related("op_devices")
+        .order_by("start_time", "id")
+    )
+    appts, ops = list(appts), list(ops)
+    names = get_patient_display_name_map(
+        [a.patient_id for a in appts] + [o.patient_id for o in ops]
+    )
+    context = {"patient_name_map": names}
+    return {
+        "appointments": AppointmentSerializer(appts, many=True, context=context).data,
+        "operations": OperationSerializer(ops, many=True, context=context).data,
+    }
+
+
+def _projection_payload(start: datetime, end: datetime) -> dict[str, Any]:
+    appts = Appointment.objects.using("default").filter(start_time__lt=end, end_time__gt=start)
+    ops = Operation.objects.using("default").filter(start_time__lt=end, end_time__gt=start)
+    return {
+        "appointments": appointment_events(appts.order_by("start_time", "id")),
+        "operations": operation_events(ops.order_by("start_time", "id")),
+    }
+
+
+def _measure(path: str, build, *, iterations: int) -> tuple[PathResult, bytes]:
+    renderer = JSONRenderer()
+    samples = []
+    rendered = b""
+    with CaptureQueriesContext(connections["default"]) as ctx:
+        rendered = renderer.render(build())
+    queries = len(ctx.captured_queries)
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        rendered = renderer.render(build())
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    result = PathResult(
+        path=path,
+        timing=TimingStats.from_samples(samples),
+        queries=queries,
+        payload_bytes=len(rendered),
+    )
+    return result, rendered
+
+
+def run_calendar_benchmark(
+    *,
+    n_appointments: int = 3000,
+    n_operations: int = 300,
+    iterations: int = 10,
+    seed: int = DEFAULT_SEED,
+) -> CalendarBenchmarkReport:
+    """Seed one month of bookings, render it through both paths, then roll back."""
+    report = CalendarBenchmarkReport(appointments=n_appointments, operations=n_operations)
+    try:
+        with transaction.atomic(using="default"):
+            ctx = BenchmarkContext(seed=seed)
+            ctx.setup()
+            start, end = _seed_month(
+                ctx,
+                random.Random(seed),
+                n_appointments=n_appointments,
+                n_operations=n_operations,
+            )
+
+            serializer, expected = _measure(
+                "serializer", lambda: _serializer_payload(start, end), iterations=iterations
+            )
+            projection, actual = _measure(
+                "projection", lambda: _projection_payload(start, end), iterations=iterations
+            )
+            report.results = {"serializer": serializer, "projection": projection}
+            report.identical = expected == actual
+            raise _Rollback
+    except _Rollback:
+        pass
+    return report
@@ -0,0 +1,444 @@
+"""
+Index Benchmark for the scheduling hot paths.
+
+Seeds a large synthetic appointment/operation dataset with server-side
+``generate_series`` inserts, then runs the query shapes used by conflict
+checks, availability and dashboards twice:
+
+- WITHOUT the composite/partial indexes from migration 0015 (dropped inside the
+  benchmark transaction)
+- WITH those indexes
+
+For each shape the EXPLAIN (ANALYZE, BUFFERS) plan and latency statistics are
+collected. A GiST index on ``tstzrange(start_time, end_time)`` is evaluated as a
+third variant for range-overlap lookups.
+
+Everything runs in one transaction that is always rolled back: seeded rows,
+dropped indexes and the experimental GiST index never persist.
+
+Architecture rules as in scheduling_benchmark:
+- All DB access uses .using('default')
+- Deterministic via the seed
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any
+
+from django.db import connections, transaction
+from django.utils import timezone
+from praxi_backend.appointments.models import (
+    Appointment,
+    AppointmentResource,
+    DoctorAbsence,
+    DoctorBreak,
+    Operation,
+    OperationDevice,
+)
+from praxi_backend.appointments.services.scheduling_benchmark import (
+    DEFAULT_SEED,
+    BenchmarkContext,
+    TimingStats,
+)
+
+INDEXED_MODELS = (
+    Appointment,
+    AppointmentResource,
+    DoctorAbsence,
+    DoctorBreak,
+    Operation,
+    OperationDevice,
+)
+
+GIST_INDEX_NAME = "bench_appt_tstzrange_gist"
+
+
+class _Rollback(Exception):
+    """Raised to roll back the benchmark transaction."""
+
+
+# ==============================================================================
+# Result Data Classes
+# ==============================================================================
+
+
+@dataclass
+class QueryPlanResult:
+    """Plan and timing of one query shape under one index variant."""
+
+    variant: str
+    timing: TimingStats = field(default_factory=TimingStats)
+    plan: str = ""
+    uses_index: bool = False
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "variant": self.variant,
+            "timing": self.timing.to_dict(),
+            "plan": self.plan,
+            "uses_index": self.uses_index,
+        }
+
+
+@dataclass
+class IndexBenchmarkReport:
+    """Before/after comparison for every query shape."""
+
+    appointments: int = 0
+    operations: int = 0
+    seed_duration_sec: float = 0.0
+    shapes: dict[str, list[QueryPlanResult]] = field(default_factory=dict)
+
+    def speedup(self, shape: str, *, before: str = "without", after: str = "with") -> float:
+        by_variant = {r.variant: r for r in self.shapes.get(shape, [])}
+        if before not in by_variant or after not in by_variant:
+            return 0.0
+        after_ms = by_variant[after].timing.median_ms
+        return by_variant[before].timing.median_ms / after_ms if after_ms else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "appointments": self.appointments,
+            "operations": self.operations,
+            "seed_duration_sec": round(self.seed_duration_sec, 3),
+            "shapes": {
+                name: {
+                    "results": [r.to_dict() for r in results],
+                    "speedup": round(self.speedup(name), 2),
+                }
+                for name, results in self.shapes.items()
+            },
+        }
+
+
+# ==============================================================================
+# Seeding
+# ==============================================================================
+
+
+def seed_dataset(
+    ctx: BenchmarkContext,
+    *,
+    n_appointments: int,
+    n_operations: int,
+    days: int = 730,
+) -> None:
+    """Bulk-insert synthetic appointments, operations, absences and breaks.
+
+    Rows are spread over ``days`` days starting one year ago, across all
+    doctors/rooms of ``ctx``, with ~10% cancelled appointments.
+    """
+    doctor_ids = [d.id for d in ctx.doctors]
+    room_ids = [r.id for r in ctx.rooms]
+    base = timezone.make_aware(
+        datetime.combine(ctx.today - timedelta(days=365), datetime.min.time()), ctx.tz
+    ) + timedelta(hours=8)
+    now = timezone.now()
+
+    with connections["default"].cursor() as cursor:
+        # g -> doctor (g mod doctors), day ((g / doctors) mod days) and
+        # 15-minute slot (g / (doctors * days)), so rows fill the calendar evenly.
+        cursor.execute(
+            f"""
+            INSERT INTO {Appointment._meta.db_table}
+                (patient_id, doctor_id, start_time, end_time, status, is_no_show,
+                 created_at, updated_at)
+            SELECT
+                100000 + (g %% 40000),
+                (%(doctors)s::int[])[1 + (g %% %(n_doctors)s)],
+                %(base)s + ((g / %(n_doctors)s) %% %(days)s) * interval '1 day'
+                    + ((g / %(per_cycle)s) %% 40) * interval '15 minutes',
+                %(base)s + ((g / %(n_doctors)s) %% %(days)s) * interval '1 day'
+                    + ((g / %(per_cycle)s) %% 40) * interval '15 minutes'
+                    + interval '15 minutes',
+                CASE WHEN g %% 10 = 0 THEN 'cancelled'
+                     WHEN g %% 3 = 0 THEN 'completed'
+                     ELSE 'scheduled' END,
+                false, %(now)s, %(now)s
+            FROM generate_series(0, %(count)s - 1) AS g
+            """,
+            {
+                "doctors": doctor_ids,
+                "n_doctors": len(doctor_ids),
+                "days": days,
+                "per_cycle": len(doctor_ids) * days,
+                "base": base,
+                "now": now,
+                "count": n_appointments,
+            },
+        )
+        cursor.execute(
+            f"""
+            INSERT INTO {Operation._meta.db_table}
+                (patient_id, primary_surgeon_id, op_room_id, op_type_id, start_time, end_time,
+                 status, created_at, updated_at)
+            SELECT
+                100000 + (g %% 40000),
+                (%(doctors)s::int[])[1 + (g %% %(n_doctors)s)],
+                (%(rooms)s::int[])[1 + (g %% %(n_rooms)s)],
+                %(op_type)s,
+                %(base)s + ((g / %(n_rooms)s) %% %(days)s) * interval '1 day'
+                    + ((g / (%(n_rooms)s * %(days)s)) %% 8) * interval '1 hour',
+                %(base)s + ((g / %(n_rooms)s) %% %(days)s) * interval '1 day'
+                    + ((g / (%(n_rooms)s * %(days)s)) %% 8) * interval '1 hour'
+                    + interval '1 hour',
+                CASE WHEN g %% 12 = 0 THEN 'cancelled' ELSE 'planned' END,
+                %(now)s, %(now)s
+            FROM generate_series(0, %(count)s - 1) AS g
+            """,
+            {
+                "doctors": doctor_ids,
+                "n_doctors": len(doctor_ids),
+                "rooms": room_ids,
+                "n_rooms": len(room_ids),
+                "op_type": ctx.op_types[0].id,
+                "days": days,
+                "base": base,
+                "now": now,
+                "count": n_operations,
+            },
+        )
+        cursor.execute(
+            f"""
+            INSERT INTO {DoctorAbsence._meta.db_table}
+                (doctor_id, start_date, end_date, active, created_at, updated_at)
+            SELECT
+                (%(doctors)s::int[])[1 + (g %% %(n_doctors)s)],
+                %(base_date)s::date + (g * 7) %% %(days)s,
+                %(base_date)s::date + (g * 7) %% %(days)s + 4,
+                g %% 5 <> 0, %(now)s, %(now)s
+            FROM generate_series(0, %(count)s - 1) AS g
+            """,
+            {
+                "doctors": doctor_ids,
+                "n_doctors": len(doctor_ids),
+                "base_date": base.date(),
+                "days": days,
+                "now": now,
+                "count": len(doctor_ids) * 20,
+            },
+        )
+        # Fire the deferred FK checks now; pending trigger events block the DDL
+        # that drops and recreates indexes later in the same transaction.
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        cursor.execute(f"ANALYZE {Appointment._meta.db_table}")
+        cursor.execute(f"ANALYZE {Operation._meta.db_table}")
+        cursor.execute(f"ANALYZE {DoctorAbsence._meta.db_table}")
+
+
+# ==============================================================================
+# Query Shapes
+# ==============================================================================
+
+
+def _query_shapes(ctx: BenchmarkContext, rng: random.Random) -> dict[str, Callable]:
+    """Return ``name -> factory`` where each factory builds a fresh queryset/SQL."""
+    tz = ctx.tz
+
+    def random_window() -> tuple[datetime, datetime]:
+        day = ctx.today + timedelta(days=rng.randrange(-300, 300))
+        start = timezone.make_aware(datetime.combine(day, datetime.min.time()), tz) + timedelta(
+            hours=rng.randrange(8, 17)
+        )
+        return start, start + timedelta(minutes=30)
+
+    def doctor_overlap():
+        start, end = random_window()
+        return Appointment.objects.using("default").filter(
+            doctor_id=rng.choice(ctx.doctors).id, start_time__lt=end, end_time__gt=start
+        )
+
+    def patient_overlap():
+        start, end = random_window()
+        return Appointment.objects.using("default").filter(
+            patient_id=100000 + rng.randrange(40000), start_time__lt=end, end_time__gt=start
+        )
+
+    def room_operations():
+        start, end = random_window()
+        return Operation.objects.using("default").filter(
+            op_room_id=rng.choice(ctx.rooms).id, start_time__lt=end, end_time__gt=start
+        )
+
+    def status_day():
+        start, _ = random_window()
+        day_start = start.replace(hour=0)
+        return Appointment.objects.using("default").filter(
+            status="scheduled",
+            start_time__gte=day_start,
+            start_time__lt=day_start + timedelta(days=1),
+        )
+
+    def live_calendar_week():
+        start, _ = random_window()
+        return (
+            Appointment.objects.using("default")
+            .exclude(status="cancelled")
+            .filter(start_time__gte=start, start_time__lt=start + timedelta(days=7))
+        )
+
+    def doctor_absence():
+        start, _ = random_window()
+        return DoctorAbsence.objects.using("default").filter(
+            doctor_id=rng.choice(ctx.doctors).id,
+            active=True,
+            start_date__lte=start.date(),
+            end_date__gte=start.date(),
+        )
+
+    return {
+        "doctor_overlap": doctor_overlap,
+        "patient_overlap": patient_overlap,
+        "room_operations": room_operations,
+        "status_day": status_day,
+        "live_calendar_week": live_calendar_week,
+        "doctor_absence": doctor_absence,
+    }
+
+
+def _range_overlap_sql(rng: random.Random, ctx: BenchmarkContext) -> tuple[str, list]:
+    day = ctx.today + timedelta(days=rng.randrange(-300, 300))
+    start = timezone.make_aware(datetime.combine(day, datetime.min.time()), ctx.tz) + timedelta(
+        hours=rng.randrange(8, 17)
+    )
+    sql = (
+        f"SELECT id FROM {Appointment._meta.db_table} "
+        "WHERE tstzrange(start_time, end_time) && tstzrange(%s, %s)"
+    )
+    return sql, [start, start + timedelta(minutes=30)]
+
+
+def _measure_queryset(factory: Callable, *, iterations: int, variant: str) -> QueryPlanResult:
+    samples = []
+    for _ in range(iterations):
+        qs = factory()
+        t0 = time.perf_counter()
+        list(qs.values_list("id", flat=True))
+        samples.append((time.perf_counter() - t0) * 1000)
+    plan = factory().explain(analyze=True, buffers=True)
+    return QueryPlanResult(
+        variant=variant,
+        timing=TimingStats.from_samples(samples),
+        plan=plan,
+        uses_index="Index" in plan,
+    )
+
+
+def _measure_sql(sql_factory: Callable, *, iterations: int, variant: str) -> QueryPlanResult:
+    samples = []
+    with connections["default"].cursor() as cursor:
+        for _ in range(iterations):
+            sql, params = sql_factory()
+            t0 = time.perf_counter()
+            cursor.execute(sql, params)
+            cursor.fetchall()
+            samples.append((time.perf_counter() - t0) * 1000)
+        sql, params = sql_factory()
+        cursor.execute("EXPLAIN (ANALYZE, BUFFERS) " + sql, params)
+        plan = "\n".join(row[0] for row in cursor.fetchall())
+    return QueryPlanResult(
+        variant=variant,
+        timing=TimingStats.from_samples(samples),
+        plan=plan,
+        uses_index="Index" in plan,
+    )
+
+
+# ==============================================================================
+# Index Toggling
+# ==============================================================================
+
+
+def _drop_model_indexes() -> None:
+    conn = connections["default"]
+    with conn.schema_editor(atomic=False) as editor:
+        for model in INDEXED_MODELS:
+            for index in model._meta.indexes:
+                editor.remove_index(model, index)
+
+
+def _create_model_indexes() -> None:
+    conn = connections["default"]
+    with conn.schema_editor(atomic=False) as editor:
+        for model in INDEXED_MODELS:
+            for index in model._meta.indexes:
+                editor.add_index(model, index)
+
+
+# ==============================================================================
+# Entry Point
+# ==============================================================================
+
+
+def run_index_benchmark(
+    *,
+    n_appointments: int = 1_000_000,
+    n_operations: int | None = None,
+    iterations: int = 20,
+    seed: int = DEFAULT_SEED,
+    num_doctors: int = 20,
+    num_rooms: int = 6,
+) -> IndexBenchmarkReport:
+    """Seed, measure without/with the scheduling indexes, then roll back.
+
+    Assumes migration 0015 is applied (the indexes exist when called).
+    """
+    n_operations = n_appointments // 10 if n_operations is None else n_operations
+    report = IndexBenchmarkReport(appointments=n_appointments, operations=n_operations)
+
+    try:
+        with transaction.atomic(using="default"):
+            ctx = BenchmarkContext(seed=seed)
+            ctx.setup(num_doctors=num_doctors, num_rooms=num_rooms)
+
+            t0 = time.perf_counter()
+            seed_dataset(ctx, n_appointments=n_appointments, n_operations=n_operations)
+            report.seed_duration_sec = time.perf_counter() - t0
+
+            def measure(variant: str) -> None:
+                # Fresh RNGs per variant so every variant runs identical queries.
+                shapes = _query_shapes(ctx, random.Random(seed))
+                for name, factory in shapes.items():
+                    report.shapes.setdefault(name, []).append(
+                        _measure_queryset(factory, iterations=iterations, variant=variant)
+                    )
+                range_rng = random.Random(seed)
+                report.shapes.setdefault("range_overlap", []).append(
+                    _measure_sql(
+                        lambda: _range_overlap_sql(range_rng, ctx),
+                        iterations=iterations,
+                        variant=variant,
+                    )
+                )
+
+            _drop_model_indexes()
+            measure("without")
+
+            _create_model_indexes()
+            measure("with")
+
+            with connections["default"].cursor() as cursor:
+                cursor.execute(
+                    f"CREATE INDEX {GIST_INDEX_NAME} ON {Appointment._meta.db_table} "
+                    "USING gist (tstzrange(start_time, end_time))"
+                )
+                cursor.execute(f"ANALYZE {Appointment._meta.db_table}")
+            range_rng = random.Random(seed)
+            report.shapes["range_overlap"].append(
+                _measure_sql(
+                    lambda: _range_overlap_sql(range_rng, ctx),
+                    iterations=iterations,
+                    variant="gist",
+                )
+            )
+
+            raise _Rollback
+    except _Rollback:
+        pass
+
+    return report
@@ -22,11 +22,23 @@ Audit logging:
 
 from __future__ import annotations
 
+from dataclasses import dataclass, field
 from datetime import date, datetime, timedelta
+from functools import reduce
+from operator import or_
 from typing import TYPE_CHECKING
 
-from django.db.models import Q
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef, Q, QuerySet
 from django.utils import timezone
+from praxi_backend.appointments.config_cache import (
+    get_appointment_type,
+    get_doctor_hours,
+    get_operation_type,
+    get_practice_hours,
+    hours_cover,
+)
 from praxi_backend.appointments.exceptions import (
     Conflict,
     DoctorAbsentError,
@@ -46,6 +58,10 @@ from praxi_backend.appointments.models import (
     PracticeHours,
     Resource,
 )
+from praxi_backend.appointments.services.scheduling_constraints import (
+    conflict_error_from_integrity_error,
+    db_constraints_enabled,
+)
 from praxi_backend.core.models import User
 
 if TYPE_CHECKING:
@@ -90,163 +106,441 @@ def _get_active_doctors(*, exclude_doctor_id: int | None = None) -> list[User]:
 # ---------------------------------------------------------------------------
 
 
-def check_appointment_conflicts(
+@dataclass
+class _Overlaps:
+    """Appointments and operations overlapping one time window.
+
+    Appointment rows carry the matched resource ids (``resource_hits``),
+    operation rows the matched device ids (``device_hits``). Rows keep the
+    model ordering (``-start_time, -id``), so classifying them yields the same
+    conflict order as querying each check separately.
+    """
+
+    appointments: list[dict] = field(default_factory=list)
+    operations: list[dict] = field(default_factory=list)
+
+    def appointment_resource_pairs(self, resource_ids) -> list[tuple[int, int]]:
+        """(appointment_id, resource_id) pairs in AppointmentResource ordering."""
+        return sorted(
+            (row["id"], rid)
+            for row in self.appointments
+            for rid in row["resource_hits"]
+            if rid in resource_ids
+        )
+
+    def operation_device_pairs(self, device_ids) -> list[tuple[int, int]]:
+        """(operation_id, resource_id) pairs in OperationDevice ordering."""
+        return sorted(
+            (row["id"], rid)
+            for row in self.operations
+            for rid in row["device_hits"]
+            if rid in device_ids
+        )
+
+
+def _load_overlaps(
     *,
-    date: date,
     start_time: datetime,
     end_time: datetime,
-    doctor_id: int,
-    room_id: int | None = None,
+    doctor_ids: list[int] | None = None,
+    patient_id: int | None = None,
     resource_ids: list[int] | None = None,
+    room_ids: list[int] | None = None,
+    device_ids: list[int] | None = None,
     exclude_appointment_id: int | None = None,
-) -> list[Conflict]:
-    """
-    Check for conflicts when scheduling an appointment.
-
-    Checks:
-    - Overlapping appointments for the same doctor
-    - Overlapping operations for the same doctor (as primary_surgeon, assistant, or anesthesist)
-    - Room conflicts (if room_id or resource_ids with rooms provided)
-    - Device conflicts (if resource_ids with devices provided)
-
-    Args:
-        date: The date of the appointment
-        start_time: Start datetime of the appointment
-        end_time: End datetime of the appointment
-        doctor_id: ID of the doctor
-        room_id: Optional ID of a room resource
-        resource_ids: Optional list of resource IDs (rooms and devices)
-        exclude_appointment_id: Optional ID of appointment to exclude (for updates)
+    exclude_operation_id: int | None = None,
+) -> _Overlaps:
+    """Fetch every row any conflict check could report, in at most two queries.
 
-    Returns:
-        List of Conflict objects. Empty list means no conflicts.
+    Appointments match by doctor, patient or a booked resource in
+    ``resource_ids``; operations by team member, room in ``room_ids``, patient
+    or a device in ``device_ids``.
     """
-    conflicts: list[Conflict] = []
-
-    # 1. Doctor appointment conflicts
-    doctor_appts = Appointment.objects.using("default").filter(
-        doctor_id=doctor_id,
-        start_time__lt=end_time,
-        end_time__gt=start_time,
-    )
-    if exclude_appointment_id is not None:
-        doctor_appts = doctor_appts.exclude(id=exclude_appointment_id)
-
-    for appt in doctor_appts:
-        conflicts.append(
-            Conflict(
-                type="doctor_conflict",
-                model="Appointment",
-                id=appt.id,
-                message=f"Doctor has overlapping appointment #{appt.id}",
+    doctor_ids = list(doctor_ids or [])
+    resource_ids = list(resource_ids or [])
+    room_ids = list(room_ids or [])
+    device_ids = list(device_ids or [])
+    overlaps = _Overlaps()
+
+    appt_match = []
+    if doctor_ids:
+        appt_match.append(Q(doctor_id__in=doctor_ids))
+    if patient_id is not None:
+        appt_match.append(Q(patient_id=patient_id))
+    if resource_ids:
+        appt_match.append(
+            Q(
+                Exists(
+                    AppointmentResource.objects.using("default").filter(
+                        appointment_id=OuterRef("pk"), resource_id__in=resource_ids
+                    )
+                )
             )
         )
-
-    # 2. Doctor operation conflicts (doctor might be involved in an operation)
-    doctor_ops = Operation.objects.using("default").filter(
-        Q(primary_surgeon_id=doctor_id) | Q(assistant_id=doctor_id) | Q(anesthesist_id=doctor_id),
-        start_time__lt=end_time,
-        end_time__gt=start_time,
-    )
-    for op in doctor_ops:
-        conflicts.append(
-            Conflict(
-                type="doctor_conflict",
-                model="Operation",
-                id=op.id,
-                message=f"Doctor is involved in operation #{op.id}",
+    if appt_match:
+        appts = Appointment.objects.using("default").filter(
+            reduce(or_, appt_match), start_time__lt=end_time, end_time__gt=start_time
+        )
+        if exclude_appointment_id is not None:
+            appts = appts.exclude(id=exclude_appointment_id)
+        if resource_ids:
+            appts = appts.annotate(
+                resource_hits=ArraySubquery(
+                    AppointmentResource.objects.using("default")
+                    .filter(appointment_id=OuterRef("pk"), resource_id__in=resource_ids)
+                    .values("resource_id")
+                )
+            )
+        fields = ["id", "doctor_id", "patient_id"] + (["resource_hits"] if resource_ids else [])
+        for row in appts.order_by("-start_time", "-id").values(*fields):
+            row.setdefault("resource_hits", [])
+            overlaps.appointments.append(row)
+
+    op_match = []
+    if doctor_ids:
+        op_match += [
+            Q(primary_surgeon_id__in=doctor_ids),
+            Q(assistant_id__in=doctor_ids),
+            Q(anesthesist_id__in=doctor_ids),
+        ]
+    if room_ids:
+        op_match.append(Q(op_room_id__in=room_ids))
+    if patient_id is not None:
+        op_match.append(Q(patient_id=patient_id))
+    if device_ids:
+        op_match.append(
+            Q(
+                Exists(
+                    OperationDevice.objects.using("default").filter(
+                        operation_id=OuterRef("pk"), resource_id__in=device_ids
+                    )
+                )
             )
         )
+    if op_match:
+        ops = Operation.objects.using("default").filter(
+            reduce(or_, op_match), start_time__lt=end_time, end_time__gt=start_time
+        )
+        if exclude_operation_id is not None:
+            ops = ops.exclude(id=exclude_operation_id)
+        if device_ids:
+            ops = ops.annotate(
+                device_hits=ArraySubquery(
+                    OperationDevice.objects.using("default")
+                    .filter(operation_id=OuterRef("pk"), resource_id__in=device_ids)
+                    .values("resource_id")
+                )
+            )
+        fields = [
+            "id",
+            "primary_surgeon_id",
+            "assistant_id",
+            "anesthesist_id",
+            "op_room_id",
+            "patient_id",
+        ] + (["device_hits"] if device_ids else [])
+        for row in ops.order_by("-start_time", "-id").values(*fields):
+            row.setdefault("device_hits", [])
+            overlaps.operations.append(row)
+
+    return overlaps
+
+
+def _involves_doctor(op_row: dict, doctor_id: int) -> bool:
+    return doctor_id in (
+        op_row["primary_surgeon_id"],
+        op_row["assistant_id"],
+        op_row["anesthesist_id"],
+    )
 
-    # 3. Room/Resource conflicts
+
+def _split_resource_ids(
+    resource_ids: list[int] | None, room_id: int | None
+) -> tuple[list[int], dict[int, Resource]]:
+    """Return all requested resource ids (room included) and their Resource rows."""
     all_resource_ids = list(resource_ids or [])
     if room_id is not None and room_id not in all_resource_ids:
         all_resource_ids.append(room_id)
+    resources = (
+        Resource.objects.using("default").in_bulk(all_resource_ids) if all_resource_ids else {}
+    )
+    return all_resource_ids, resources
 
-    if all_resource_ids:
-        # Get resource types to differentiate rooms and devices
-        resources = {
-            r.id: r for r in Resource.objects.using("default").filter(id__in=all_resource_ids)
-        }
-        room_ids = [
-            rid for rid in all_resource_ids if resources.get(rid) and resources[rid].type == "room"
-        ]
-        device_ids = [
-            rid
-            for rid in all_resource_ids
-            if resources.get(rid) and resources[rid].type == "device"
-        ]
 
-        # Check appointment resource conflicts
-        ar_conflicts = (
-            AppointmentResource.objects.using("default")
-            .filter(
-                resource_id__in=all_resource_ids,
-                appointment__start_time__lt=end_time,
-                appointment__end_time__gt=start_time,
+def _classify_appointment_conflicts(
+    overlaps: _Overlaps,
+    *,
+    doctor_id: int,
+    all_resource_ids: list[int],
+    resources: dict[int, Resource],
+    skip_db_enforced: bool = False,
+) -> list[Conflict]:
+    doctor_id = int(doctor_id)
+    conflicts: list[Conflict] = []
+
+    # 1. Doctor appointment conflicts
+    if not skip_db_enforced:
+        for row in overlaps.appointments:
+            if row["doctor_id"] == doctor_id:
+                conflicts.append(
+                    Conflict(
+                        type="doctor_conflict",
+                        model="Appointment",
+                        id=row["id"],
+                        message=f"Doctor has overlapping appointment #{row['id']}",
+                    )
+                )
+
+    # 2. Doctor operation conflicts (doctor might be involved in an operation)
+    for row in overlaps.operations:
+        if _involves_doctor(row, doctor_id):
+            conflicts.append(
+                Conflict(
+                    type="doctor_conflict",
+                    model="Operation",
+                    id=row["id"],
+                    message=f"Doctor is involved in operation #{row['id']}",
+                )
             )
-            .select_related("resource", "appointment")
-        )
 
-        if exclude_appointment_id is not None:
-            ar_conflicts = ar_conflicts.exclude(appointment_id=exclude_appointment_id)
+    # 3. Room/Resource conflicts
+    if all_resource_ids:
+        room_ids = {
+            rid for rid in all_resource_ids if rid in resources and resources[rid].type == "room"
+        }
+        device_ids = {
+            rid for rid in all_resource_ids if rid in resources and resources[rid].type == "device"
+        }
 
-        for ar in ar_conflicts:
-            conflict_type = "room_conflict" if ar.resource.type == "room" else "device_conflict"
+        pairs = overlaps.appointment_resource_pairs(set(all_resource_ids))
+        missing = {rid for _, rid in pairs if rid not in resources}
+        if missing:
+            # Booked resources the caller did not load still have to be reported.
+            resources = {**resources, **Resource.objects.using("default").in_bulk(missing)}
+        for appointment_id, resource_id in pairs:
+            resource = resources.get(resource_id)
+            if resource is None:
+                # Deleted since the overlap query; its bookings went with it.
+                continue
+            conflict_type = "room_conflict" if resource.type == "room" else "device_conflict"
             conflicts.append(
                 Conflict(
                     type=conflict_type,
                     model="Appointment",
-                    id=ar.appointment_id,
-                    resource_id=ar.resource_id,
-                    message=f"Resource {ar.resource.name} is booked by appointment #{ar.appointment_id}",
+                    id=appointment_id,
+                    resource_id=resource_id,
+                    message=f"Resource {resource.name} is booked by appointment #{appointment_id}",
                 )
             )
 
-        # Check operation room conflicts
-        if room_ids:
-            op_room_conflicts = Operation.objects.using("default").filter(
-                op_room_id__in=room_ids,
-                start_time__lt=end_time,
-                end_time__gt=start_time,
+        for row in overlaps.operations:
+            if row["op_room_id"] in room_ids:
+                conflicts.append(
+                    Conflict(
+                        type="room_conflict",
+                        model="Operation",
+                        id=row["id"],
+                        resource_id=row["op_room_id"],
+                        message=f"Room is used by operation #{row['id']}",
+                    )
+                )
+
+        for operation_id, resource_id in overlaps.operation_device_pairs(device_ids):
+            conflicts.append(
+                Conflict(
+                    type="device_conflict",
+                    model="Operation",
+                    id=operation_id,
+                    resource_id=resource_id,
+                    message=f"Device is used by operation #{operation_id}",
+                )
             )
-            for op in op_room_conflicts:
+
+    return conflicts
+
+
+def _classify_operation_conflicts(
+    overlaps: _Overlaps,
+    *,
+    team_ids: list[int],
+    room_id: int,
+    device_ids: list[int] | None,
+    skip_db_enforced: bool = False,
+) -> list[Conflict]:
+    room_id = int(room_id)
+    conflicts: list[Conflict] = []
+
+    # 1. Room conflicts - other operations
+    if not skip_db_enforced:
+        for row in overlaps.operations:
+            if row["op_room_id"] == room_id:
                 conflicts.append(
                     Conflict(
                         type="room_conflict",
                         model="Operation",
-                        id=op.id,
-                        resource_id=op.op_room_id,
-                        message=f"Room is used by operation #{op.id}",
+                        id=row["id"],
+                        resource_id=room_id,
+                        message=f"Room is already booked by operation #{row['id']}",
                     )
                 )
 
-        # Check operation device conflicts
-        if device_ids:
-            od_conflicts = (
-                OperationDevice.objects.using("default")
-                .filter(
-                    resource_id__in=device_ids,
-                    operation__start_time__lt=end_time,
-                    operation__end_time__gt=start_time,
+    # 2. Room conflicts - appointments that booked this room as resource
+    for appointment_id, _resource_id in overlaps.appointment_resource_pairs({room_id}):
+        conflicts.append(
+            Conflict(
+                type="room_conflict",
+                model="Appointment",
+                id=appointment_id,
+                resource_id=room_id,
+                message=f"Room is booked by appointment #{appointment_id}",
+            )
+        )
+
+    # 3. Device conflicts (other operations, then appointments)
+    if device_ids:
+        wanted = set(device_ids)
+        for operation_id, resource_id in overlaps.operation_device_pairs(wanted):
+            conflicts.append(
+                Conflict(
+                    type="device_conflict",
+                    model="Operation",
+                    id=operation_id,
+                    resource_id=resource_id,
+                    message=f"Device is already used by operation #{operation_id}",
+                )
+            )
+        for appointment_id, resource_id in overlaps.appointment_resource_pairs(wanted):
+            conflicts.append(
+                Conflict(
+                    type="device_conflict",
+                    model="Appointment",
+                    id=appointment_id,
+                    resource_id=resource_id,
+                    message=f"Device is booked by appointment #{appointment_id}",
                 )
-                .select_related("operation", "resource")
             )
 
-            for od in od_conflicts:
+    # 4. Doctor conflicts (all team members)
+    for doctor_id in team_ids:
+        for row in overlaps.appointments:
+            if row["doctor_id"] == doctor_id:
+                conflicts.append(
+                    Conflict(
+                        type="doctor_conflict",
+                        model="Appointment",
+                        id=row["id"],
+                        meta={"doctor_id": doctor_id},
+                        message=f"Doctor {doctor_id} has overlapping appointment #{row['id']}",
+                    )
+                )
+        for row in overlaps.operations:
+            if _involves_doctor(row, doctor_id):
                 conflicts.append(
                     Conflict(
-                        type="device_conflict",
+                        type="doctor_conflict",
                         model="Operation",
-                        id=od.operation_id,
-                        resource_id=od.resource_id,
-                        message=f"Device is used by operation #{od.operation_id}",
+                        id=row["id"],
+                        meta={"doctor_id": doctor_id},
+                        message=f"Doctor {doctor_id} is involved in operation #{row['id']}",
                     )
                 )
 
     return conflicts
 
 
+def _classify_patient_conflicts(overlaps: _Overlaps, *, patient_id: int) -> list[Conflict]:
+    patient_id = int(patient_id)
+    conflicts: list[Conflict] = []
+    for row in overlaps.appointments:
+        if row["patient_id"] == patient_id:
+            conflicts.append(
+                Conflict(
+                    type="patient_conflict",
+                    model="Appointment",
+                    id=row["id"],
+                    message=f"Patient already has appointment #{row['id']} in this time range",
+                )
+            )
+    for row in overlaps.operations:
+        if row["patient_id"] == patient_id:
+            conflicts.append(
+                Conflict(
+                    type="patient_conflict",
+                    model="Operation",
+                    id=row["id"],
+                    message=f"Patient already has operation #{row['id']} in this time range",
+                )
+            )
+    return conflicts
+
+
+def _operation_team_ids(
+    primary_surgeon_id: int, assistant_id: int | None, anesthesist_id: int | None
+) -> list[int]:
+    team_ids = [int(primary_surgeon_id)]
+    if assistant_id:
+        team_ids.append(int(assistant_id))
+    if anesthesist_id:
+        team_ids.append(int(anesthesist_id))
+    return team_ids
+
+
+def check_appointment_conflicts(
+    *,
+    date: date,
+    start_time: datetime,
+    end_time: datetime,
+    doctor_id: int,
+    room_id: int | None = None,
+    resource_ids: list[int] | None = None,
+    exclude_appointment_id: int | None = None,
+    skip_db_enforced: bool = False,
+) -> list[Conflict]:
+    """
+    Check for conflicts when scheduling an appointment.
+
+    Checks:
+    - Overlapping appointments for the same doctor
+    - Overlapping operations for the same doctor (as primary_surgeon, assistant, or anesthesist)
+    - Room conflicts (if room_id or resource_ids with rooms provided)
+    - Device conflicts (if resource_ids with devices provided)
+
+    All overlapping rows are fetched in at most three queries and classified
+    in memory.
+
+    Args:
+        date: The date of the appointment
+        start_time: Start datetime of the appointment
+        end_time: End datetime of the appointment
+        doctor_id: ID of the doctor
+        room_id: Optional ID of a room resource
+        resource_ids: Optional list of resource IDs (rooms and devices)
+        exclude_appointment_id: Optional ID of appointment to exclude (for updates)
+        skip_db_enforced: Skip the doctor appointment overlap check, which the
+            database enforces when the overlap constraints are installed
+
+    Returns:
+        List of Conflict objects. Empty list means no conflicts.
+    """
+    all_resource_ids, resources = _split_resource_ids(resource_ids, room_id)
+    overlaps = _load_overlaps(
+        start_time=start_time,
+        end_time=end_time,
+        doctor_ids=[doctor_id],
+        resource_ids=all_resource_ids,
+        room_ids=[rid for rid, r in resources.items() if r.type == "room"],
+        device_ids=[rid for rid, r in resources.items() if r.type == "device"],
+        exclude_appointment_id=exclude_appointment_id,
+    )
+    return _classify_appointment_conflicts(
+        overlaps,
+        doctor_id=doctor_id,
+        all_resource_ids=all_resource_ids,
+        resources=resources,
+        skip_db_enforced=skip_db_enforced,
+    )
+
+
 def check_operation_conflicts(
     *,
     date: date,
@@ -258,6 +552,7 @@ def check_operation_conflicts(
     room_id: int,
     device_ids: list[int] | None = None,
     exclude_operation_id: int | None = None,
+    skip_db_enforced: bool = False,
 ) -> list[Conflict]:
     """
     Check for conflicts when scheduling an operation.
@@ -271,6 +566,8 @@ def check_operation_conflicts(
     - Assistant conflicts (if specified)
     - Anesthesist conflicts (if specified)
 
+    All overlapping rows are fetched in two queries and classified in memory.
+
     Args:
         date: The date of the operation
         start_time: Start datetime of the operation
@@ -281,152 +578,30 @@ def check_operation_conflicts(
         room_id: ID of the operation room
         device_ids: Optional list of device resource IDs
         exclude_operation_id: Optional ID of operation to exclude (for updates)
+        skip_db_enforced: Skip the room/operation overlap check, which the
+            database enforces when the overlap constraints are installed
 
     Returns:
         List of Conflict objects. Empty list means no conflicts.
     """
-    conflicts: list[Conflict] = []
-
-    # 1. Room conflicts - other operations
-    room_op_conflicts = Operation.objects.using("default").filter(
-        op_room_id=room_id,
-        start_time__lt=end_time,
-        end_time__gt=start_time,
+    team_ids = _operation_team_ids(primary_surgeon_id, assistant_id, anesthesist_id)
+    overlaps = _load_overlaps(
+        start_time=start_time,
+        end_time=end_time,
+        doctor_ids=team_ids,
+        resource_ids=[room_id, *(device_ids or [])],
+        room_ids=[room_id],
+        device_ids=device_ids,
+        exclude_operation_id=exclude_operation_id,
     )
-    if exclude_operation_id is not None:
-        room_op_conflicts = room_op_conflicts.exclude(id=exclude_operation_id)
-
-    for op in room_op_conflicts:
-        conflicts.append(
-            Conflict(
-                type="room_conflict",
-                model="Operation",
-                id=op.id,
-                resource_id=room_id,
-                message=f"Room is already booked by operation #{op.id}",
-            )
-        )
-
-    # 2. Room conflicts - appointments that booked this room as resource
-    room_appt_conflicts = (
-        AppointmentResource.objects.using("default")
-        .filter(
-            resource_id=room_id,
-            appointment__start_time__lt=end_time,
-            appointment__end_time__gt=start_time,
-        )
-        .select_related("appointment")
+    return _classify_operation_conflicts(
+        overlaps,
+        team_ids=team_ids,
+        room_id=room_id,
+        device_ids=device_ids,
+        skip_db_enforced=skip_db_enforced,
     )
 
-    for ar in room_appt_conflicts:
-        conflicts.append(
-            Conflict(
-                type="room_conflict",
-                model="Appointment",
-                id=ar.appointment_id,
-                resource_id=room_id,
-                message=f"Room is booked by appointment #{ar.appointment_id}",
-            )
-        )
-
-    # 3. Device conflicts
-    if device_ids:
-        # Device conflicts with other operations
-        od_conflicts = (
-            OperationDevice.objects.using("default")
-            .filter(
-                resource_id__in=device_ids,
-                operation__start_time__lt=end_time,
-                operation__end_time__gt=start_time,
-            )
-            .select_related("operation")
-        )
-
-        if exclude_operation_id is not None:
-            od_conflicts = od_conflicts.exclude(operation_id=exclude_operation_id)
-
-        for od in od_conflicts:
-            conflicts.append(
-                Conflict(
-                    type="device_conflict",
-                    model="Operation",
-                    id=od.operation_id,
-                    resource_id=od.resource_id,
-                    message=f"Device is already used by operation #{od.operation_id}",
-                )
-            )
-
-        # Device conflicts with appointments
-        device_appt_conflicts = (
-            AppointmentResource.objects.using("default")
-            .filter(
-                resource_id__in=device_ids,
-                appointment__start_time__lt=end_time,
-                appointment__end_time__gt=start_time,
-            )
-            .select_related("appointment")
-        )
-
-        for ar in device_appt_conflicts:
-            conflicts.append(
-                Conflict(
-                    type="device_conflict",
-                    model="Appointment",
-                    id=ar.appointment_id,
-                    resource_id=ar.resource_id,
-                    message=f"Device is booked by appointment #{ar.appointment_id}",
-                )
-            )
-
-    # 4. Doctor conflicts (all team members)
-    doctor_ids = [primary_surgeon_id]
-    if assistant_id:
-        doctor_ids.append(assistant_id)
-    if anesthesist_id:
-        doctor_ids.append(anesthesist_id)
-
-    for doctor_id in doctor_ids:
-        # Check appointments
-        doctor_appts = Appointment.objects.using("default").filter(
-            doctor_id=doctor_id,
-            start_time__lt=end_time,
-            end_time__gt=start_time,
-        )
-        for appt in doctor_appts:
-            conflicts.append(
-                Conflict(
-                    type="doctor_conflict",
-                    model="Appointment",
-                    id=appt.id,
-                    meta={"doctor_id": doctor_id},
-                    message=f"Doctor {doctor_id} has overlapping appointment #{appt.id}",
-                )
-            )
-
-        # Check other operations
-        doctor_ops = Operation.objects.using("default").filter(
-            Q(primary_surgeon_id=doctor_id)
-            | Q(assistant_id=doctor_id)
-            | Q(anesthesist_id=doctor_id),
-            start_time__lt=end_time,
-            end_time__gt=start_time,
-        )
-        if exclude_operation_id is not None:
-            doctor_ops = doctor_ops.exclude(id=exclude_operation_id)
-
-        for op in doctor_ops:
-            conflicts.append(
-                Conflict(
-                    type="doctor_conflict",
-                    model="Operation",
-                    id=op.id,
-                    meta={"doctor_id": doctor_id},
-                    message=f"Doctor {doctor_id} is involved in operation #{op.id}",
-                )
-            )
-
-    return conflicts
-
 
 def check_patient_conflicts(
     *,
@@ -449,47 +624,14 @@ def check_patient_conflicts(
     Returns:
         List of Conflict objects.
     """
-    conflicts: list[Conflict] = []
-
-    # Check appointment conflicts
-    patient_appts = Appointment.objects.using("default").filter(
+    overlaps = _load_overlaps(
+        start_time=start_time,
+        end_time=end_time,
         patient_id=patient_id,
-        start_time__lt=end_time,
-        end_time__gt=start_time,
+        exclude_appointment_id=exclude_appointment_id,
+        exclude_operation_id=exclude_operation_id,
     )
-    if exclude_appointment_id is not None:
-        patient_appts = patient_appts.exclude(id=exclude_appointment_id)
-
-    for appt in patient_appts:
-        conflicts.append(
-            Conflict(
-                type="patient_conflict",
-                model="Appointment",
-                id=appt.id,
-                message=f"Patient already has appointment #{appt.id} in this time range",
-            )
-        )
-
-    # Check operation conflicts
-    patient_ops = Operation.objects.using("default").filter(
-        patient_id=patient_id,
-        start_time__lt=end_time,
-        end_time__gt=start_time,
-    )
-    if exclude_operation_id is not None:
-        patient_ops = patient_ops.exclude(id=exclude_operation_id)
-
-    for op in patient_ops:
-        conflicts.append(
-            Conflict(
-                type="patient_conflict",
-                model="Operation",
-                id=op.id,
-                message=f"Patient already has operation #{op.id} in this time range",
-            )
-        )
-
-    return conflicts
+    return _classify_patient_conflicts(overlaps, patient_id=patient_id)
 
 
 # ---------------------------------------------------------------------------
@@ -529,12 +671,9 @@ def validate_working_hours(
     end_t = local_end.time()
 
     # Check practice hours
-    practice_hours = PracticeHours.objects.using("default").filter(
-        weekday=weekday,
-        active=True,
-    )
+    practice_hours = get_practice_hours().get(weekday, [])
 
-    if not practice_hours.exists():
+    if not practice_hours:
         raise WorkingHoursViolation(
             doctor_id=doctor_id,
             date=date.isoformat(),
@@ -545,12 +684,7 @@ def validate_working_hours(
         )
 
     # Check if appointment fits within any practice hours window
-    practice_ok = practice_hours.filter(
-        start_time__lte=start_t,
-        end_time__gte=end_t,
-    ).exists()
-
-    if not practice_ok:
+    if not hours_cover(practice_hours, start_t, end_t):
         raise WorkingHoursViolation(
             doctor_id=doctor_id,
             date=date.isoformat(),
@@ -561,13 +695,9 @@ def validate_working_hours(
         )
 
     # Check doctor hours
-    doctor_hours = DoctorHours.objects.using("default").filter(
-        doctor_id=doctor_id,
-        weekday=weekday,
-        active=True,
-    )
+    doctor_hours = get_doctor_hours().get(doctor_id, {}).get(weekday, [])
 
-    if not doctor_hours.exists():
+    if not doctor_hours:
         raise WorkingHoursViolation(
             doctor_id=doctor_id,
             date=date.isoformat(),
@@ -578,12 +708,7 @@ def validate_working_hours(
         )
 
     # Check if appointment fits within any doctor hours window
-    doctor_ok = doctor_hours.filter(
-        start_time__lte=start_t,
-        end_time__gte=end_t,
-    ).exists()
-
-    if not doctor_ok:
+    if not hours_cover(doctor_hours, start_t, end_t):
         raise WorkingHoursViolation(
             doctor_id=doctor_id,
             date=date.isoformat(),
@@ -808,22 +933,27 @@ def plan_appointment(
     )
 
     # Check conflicts unless skipped
+    db_enforced = db_constraints_enabled()
     if not skip_conflict_check:
-        conflicts = check_appointment_conflicts(
-            date=appt_date,
+        # Doctor, resource and patient conflicts from one overlap snapshot
+        all_resource_ids, resources = _split_resource_ids(data.get("resource_ids"), None)
+        overlaps = _load_overlaps(
             start_time=start_time,
             end_time=end_time,
-            doctor_id=doctor_id,
-            resource_ids=data.get("resource_ids"),
-        )
-
-        # Also check patient conflicts
-        patient_conflicts = check_patient_conflicts(
+            doctor_ids=[doctor_id],
             patient_id=patient_id,
-            start_time=start_time,
-            end_time=end_time,
+            resource_ids=all_resource_ids,
+            room_ids=[rid for rid, r in resources.items() if r.type == "room"],
+            device_ids=[rid for rid, r in resources.items() if r.type == "device"],
+        )
+        conflicts = _classify_appointment_conflicts(
+            overlaps,
+            doctor_id=doctor_id,
+            all_resource_ids=all_resource_ids,
+            resources=resources,
+            skip_db_enforced=db_enforced,
         )
-        conflicts.extend(patient_conflicts)
+        conflicts.extend(_classify_patient_conflicts(overlaps, patient_id=patient_id))
 
         if conflicts:
             raise SchedulingConflictError(conflicts)
@@ -832,34 +962,46 @@ def plan_appointment(
     type_id = data.get("type_id")
     appointment_type = None
     if type_id:
-        from praxi_backend.appointments.models import AppointmentType
+        appointment_type = get_appointment_type(type_id, active_only=True)
 
-        appointment_type = (
-            AppointmentType.objects.using("default").filter(id=type_id, active=True).first()
+    # Create the appointment (plus resources)
+    def create() -> Appointment:
+        appointment = Appointment.objects.using("default").create(
+            patient_id=patient_id,
+            doctor=doctor,
+            type=appointment_type,
+            start_time=start_time,
+            end_time=end_time,
+            status=data.get("status", Appointment.STATUS_SCHEDULED),
+            notes=data.get("notes", ""),
         )
 
-    # Create the appointment
-    appointment = Appointment.objects.using("default").create(
-        patient_id=patient_id,
-        doctor=doctor,
-        type=appointment_type,
-        start_time=start_time,
-        end_time=end_time,
-        status=data.get("status", Appointment.STATUS_SCHEDULED),
-        notes=data.get("notes", ""),
-    )
+        # Handle resources
+        resource_ids = data.get("resource_ids")
+        if resource_ids:
+            resources = Resource.objects.using("default").filter(id__in=resource_ids, active=True)
+            for resource in resources:
+                AppointmentResource.objects.using("default").create(
+                    appointment=appointment,
+                    resource=resource,
+                )
+        return appointment
 
-    # Handle resources
-    resource_ids = data.get("resource_ids")
-    if resource_ids:
-        resources = Resource.objects.using("default").filter(id__in=resource_ids, active=True)
-        for resource in resources:
-            AppointmentResource.objects.using("default").create(
-                appointment=appointment,
-                resource=resource,
-            )
+    if not db_enforced:
+        return create()
 
-    return appointment
+    # The doctor overlap check is left to the database; a violation rolls back
+    # the savepoint and is reported like a pre-check conflict.
+    try:
+        with transaction.atomic(using="default"):
+            return create()
+    except IntegrityError as exc:
+        error = conflict_error_from_integrity_error(
+            exc, start_time=start_time, end_time=end_time, doctor_id=doctor_id
+        )
+        if error is None:
+            raise
+        raise error from exc
 
 
 def plan_operation(
@@ -905,8 +1047,6 @@ def plan_operation(
         DoctorBreakConflict: If time overlaps with a break
         SchedulingConflictError: If conflicts are detected
     """
-    from praxi_backend.appointments.models import OperationType
-
     # Extract and validate required fields
     patient_id = data.get("patient_id")
     primary_surgeon_id = data.get("primary_surgeon_id")
@@ -926,7 +1066,7 @@ def plan_operation(
         raise InvalidSchedulingData("start_time is required", field="start_time")
 
     # Resolve operation type and calculate end_time
-    op_type = OperationType.objects.using("default").filter(id=op_type_id, active=True).first()
+    op_type = get_operation_type(op_type_id, active_only=True)
     if op_type is None:
         raise InvalidSchedulingData(
             f"OperationType with ID {op_type_id} not found or inactive", field="op_type_id"
@@ -1039,51 +1179,68 @@ def plan_operation(
                 raise
 
     # Check conflicts unless skipped
+    db_enforced = db_constraints_enabled()
     if not skip_conflict_check:
-        conflicts = check_operation_conflicts(
-            date=op_date,
+        # Room, device, team and patient conflicts from one overlap snapshot
+        team_ids = _operation_team_ids(primary_surgeon_id, assistant_id, anesthesist_id)
+        overlaps = _load_overlaps(
             start_time=start_time,
             end_time=end_time,
-            primary_surgeon_id=primary_surgeon_id,
-            assistant_id=assistant_id,
-            anesthesist_id=anesthesist_id,
+            doctor_ids=team_ids,
+            patient_id=patient_id,
+            resource_ids=[op_room_id, *op_device_ids],
+            room_ids=[op_room_id],
+            device_ids=op_device_ids,
+        )
+        conflicts = _classify_operation_conflicts(
+            overlaps,
+            team_ids=team_ids,
             room_id=op_room_id,
             device_ids=op_device_ids,
+            skip_db_enforced=db_enforced,
         )
+        conflicts.extend(_classify_patient_conflicts(overlaps, patient_id=patient_id))
+
+        if conflicts:
+            raise SchedulingConflictError(conflicts)
 
-        # Also check patient conflicts
-        patient_conflicts = check_patient_conflicts(
+    # Create the operation (plus devices)
+    def create() -> Operation:
+        operation = Operation.objects.using("default").create(
             patient_id=patient_id,
+            primary_surgeon=primary_surgeon,
+            assistant=assistant,
+            anesthesist=anesthesist,
+            op_room=room,
+            op_type=op_type,
             start_time=start_time,
             end_time=end_time,
+            status=data.get("status", Operation.STATUS_PLANNED),
+            notes=data.get("notes", ""),
         )
-        conflicts.extend(patient_conflicts)
 
-        if conflicts:
-            raise SchedulingConflictError(conflicts)
+        # Handle devices
+        for device in device_objs:
+            OperationDevice.objects.using("default").create(
+                operation=operation,
+                resource=device,
+            )
+        return operation
 
-    # Create the operation
-    operation = Operation.objects.using("default").create(
-        patient_id=patient_id,
-        primary_surgeon=primary_surgeon,
-        assistant=assistant,
-        anesthesist=anesthesist,
-        op_room=room,
-        op_type=op_type,
-        start_time=start_time,
-        end_time=end_time,
-        status=data.get("status", Operation.STATUS_PLANNED),
-        notes=data.get("notes", ""),
-    )
+    if not db_enforced:
+        return create()
 
-    # Handle devices
-    for device in device_objs:
-        OperationDevice.objects.using("default").create(
-            operation=operation,
-            resource=device,
+    # The room overlap check is left to the database (see plan_appointment).
+    try:
+        with transaction.atomic(using="default"):
+            return create()
+    except IntegrityError as exc:
+        error = conflict_error_from_integrity_error(
+            exc, start_time=start_time, end_time=end_time, room_id=op_room_id
         )
-
-    return operation
+        if error is None:
+            raise
+        raise error from exc
 
 
 # ---------------------------------------------------------------------------
@@ -1237,6 +1394,23 @@ def check_patient_availability(
     return len(conflicts) == 0
 
 
+def _break_overlap_q(local_start: datetime, local_end: datetime) -> Q:
+    """Q for DoctorBreak rows overlapping ``[local_start, local_end)``.
+
+    Mirrors the datetime comparison in validate_doctor_breaks, expressed on
+    the break's date/start_time/end_time columns.
+    """
+    start_date, start_t = local_start.date(), local_start.time()
+    end_date, end_t = local_end.date(), local_end.time()
+    if start_date == end_date:
+        return Q(date=start_date, start_time__lt=end_t, end_time__gt=start_t)
+    return (
+        Q(date=start_date, end_time__gt=start_t)
+        | Q(date__gt=start_date, date__lt=end_date)
+        | Q(date=end_date, start_time__lt=end_t)
+    )
+
+
 def get_available_doctors(
     *,
     start_time: datetime,
@@ -1246,21 +1420,68 @@ def get_available_doctors(
     """
     Get all doctors that are available for the given time range.
 
+    Applies the same checks as check_doctor_availability (working hours,
+    absences, breaks, appointment and operation overlaps) for all active
+    doctors at once, as EXISTS subqueries of a single query.
+
     Returns list of User objects (doctors) that are available.
     """
-    all_doctors = _get_active_doctors()
-    available = []
+    local_start = _localize_datetime(start_time)
+    local_end = _localize_datetime(end_time)
+    weekday = local_start.weekday()
+    start_t = local_start.time()
+    end_t = local_end.time()
 
-    for doctor in all_doctors:
-        if check_doctor_availability(
-            start_time=start_time,
-            end_time=end_time,
-            doctor_id=doctor.id,
-            exclude_appointment_id=exclude_appointment_id,
-        ):
-            available.append(doctor)
+    practice_ok = PracticeHours.objects.using("default").filter(
+        weekday=weekday,
+        active=True,
+        start_time__lte=start_t,
+        end_time__gte=end_t,
+    )
+    doctor_hours_ok = DoctorHours.objects.using("default").filter(
+        doctor_id=OuterRef("pk"),
+        weekday=weekday,
+        active=True,
+        start_time__lte=start_t,
+        end_time__gte=end_t,
+    )
+    absences = DoctorAbsence.objects.using("default").filter(
+        doctor_id=OuterRef("pk"),
+        active=True,
+        start_date__lte=local_end.date(),
+        end_date__gte=local_start.date(),
+    )
+    breaks = (
+        DoctorBreak.objects.using("default")
+        .filter(active=True)
+        .filter(Q(doctor__isnull=True) | Q(doctor_id=OuterRef("pk")))
+        .filter(_break_overlap_q(local_start, local_end))
+    )
+    appointments = Appointment.objects.using("default").filter(
+        doctor_id=OuterRef("pk"),
+        start_time__lt=end_time,
+        end_time__gt=start_time,
+    )
+    if exclude_appointment_id is not None:
+        appointments = appointments.exclude(id=exclude_appointment_id)
+    operations = Operation.objects.using("default").filter(
+        Q(primary_surgeon_id=OuterRef("pk"))
+        | Q(assistant_id=OuterRef("pk"))
+        | Q(anesthesist_id=OuterRef("pk")),
+        start_time__lt=end_time,
+        end_time__gt=start_time,
+    )
 
-    return available
+    return list(
+        User.objects.using("default")
+        .filter(is_active=True, role__name="doctor")
+        .filter(Exists(practice_ok), Exists(doctor_hours_ok))
+        .exclude(Exists(absences))
+        .exclude(Exists(breaks))
+        .exclude(Exists(appointments))
+        .exclude(Exists(operations))
+        .order_by("id")
+    )
 
 
 def get_available_rooms(
@@ -1273,30 +1494,68 @@ def get_available_rooms(
     """
     Get all rooms that are available for the given time range.
 
+    Applies the checks of check_room_availability to all active rooms in a
+    single query.
+
     Returns list of Resource objects (type='room') that are available.
     """
-    all_rooms = list(
+    appt_bookings = AppointmentResource.objects.using("default").filter(
+        resource_id=OuterRef("pk"),
+        appointment__start_time__lt=end_time,
+        appointment__end_time__gt=start_time,
+    )
+    if exclude_appointment_id is not None:
+        appt_bookings = appt_bookings.exclude(appointment_id=exclude_appointment_id)
+
+    operations = Operation.objects.using("default").filter(
+        op_room_id=OuterRef("pk"),
+        start_time__lt=end_time,
+        end_time__gt=start_time,
+    )
+    if exclude_operation_id is not None:
+        operations = operations.exclude(id=exclude_operation_id)
+
+    return list(
         Resource.objects.using("default")
-        .filter(
-            type="room",
-            active=True,
-        )
+        .filter(type="room", active=True)
+        .exclude(Exists(appt_bookings))
+        .exclude(Exists(operations))
         .order_by("name", "id")
     )
 
-    available = []
 
-    for room in all_rooms:
-        if check_room_availability(
-            start_time=start_time,
-            end_time=end_time,
-            room_id=room.id,
-            exclude_appointment_id=exclude_appointment_id,
-            exclude_operation_id=exclude_operation_id,
-        ):
-            available.append(room)
+def exclude_busy_patients(
+    queryset: QuerySet,
+    *,
+    start_time: datetime,
+    end_time: datetime,
+    exclude_appointment_id: int | None = None,
+    exclude_operation_id: int | None = None,
+) -> QuerySet:
+    """
+    Drop patients with an overlapping appointment or operation from a queryset.
+
+    ``queryset`` is any queryset whose primary key is the patient ID (e.g. the
+    patients master table); the checks match check_patient_availability and
+    are applied as NOT EXISTS subqueries, so no rows are loaded here.
+    """
+    appointments = Appointment.objects.using("default").filter(
+        patient_id=OuterRef("pk"),
+        start_time__lt=end_time,
+        end_time__gt=start_time,
+    )
+    if exclude_appointment_id is not None:
+        appointments = appointments.exclude(id=exclude_appointment_id)
 
-    return available
+    operations = Operation.objects.using("default").filter(
+        patient_id=OuterRef("pk"),
+        start_time__lt=end_time,
+        end_time__gt=start_time,
+    )
+    if exclude_operation_id is not None:
+        operations = operations.exclude(id=exclude_operation_id)
+
+    return queryset.exclude(Exists(appointments)).exclude(Exists(operations))
 
 
 def filter_available_patients(
@@ -1313,6 +1572,9 @@ def filter_available_patients(
     NOTE: This function does not query patient master data.
     It expects a candidate list of patient IDs (e.g. from the patients endpoint/UI).
 
+    Runs two queries regardless of the number of IDs. To page through the
+    patients table itself, use exclude_busy_patients instead.
+
     Args:
         patient_ids: List of patient IDs to check
         start_time: Start datetime
@@ -1323,16 +1585,26 @@ def filter_available_patients(
     Returns:
         List of patient IDs that are available (no conflicts)
     """
-    available = []
+    if not patient_ids:
+        return []
 
-    for patient_id in patient_ids:
-        if check_patient_availability(
-            start_time=start_time,
-            end_time=end_time,
-            patient_id=patient_id,
-            exclude_appointment_id=exclude_appointment_id,
-            exclude_operation_id=exclude_operation_id,
-        ):
-            available.append(patient_id)
+    busy_appts = Appointment.objects.using("default").filter(
+        patient_id__in=patient_ids,
+        start_time__lt=end_time,
+        end_time__gt=start_time,
+    )
+    if exclude_appointment_id is not None:
+        busy_appts = busy_appts.exclude(id=exclude_appointment_id)
+
+    busy_ops = Operation.objects.using("default").filter(
+        patient_id__in=patient_ids,
+        start_time__lt=end_time,
+        end_time__gt=start_time,
+    )
+    if exclude_operation_id is not None:
+        busy_ops = busy_ops.exclude(id=exclude_operation_id)
+
+    busy = set(busy_appts.values_list("patient_id", flat=True))
+    busy.update(busy_ops.values_list("patient_id", flat=True))
 
-    return available
+    return [patient_id for patient_id in patient_ids if patient_id not in busy]
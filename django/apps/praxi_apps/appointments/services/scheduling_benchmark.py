@@ -33,6 +33,10 @@ BENCHMARK CATEGORIES
    - Realistic mix of appointments and operations
    - Reproducible for regression testing
 
+6. SLOT SUGGESTIONS
+   - Runs suggestion requests against a fully booked multi-week calendar
+   - Reports queries per request (the range-batched engine keeps this constant)
+
 ==============================================================================
 METRICS COLLECTED
 ==============================================================================
@@ -79,6 +83,7 @@ from praxi_backend.appointments.models import (
     PracticeHours,
     Resource,
 )
+from praxi_backend.appointments.scheduling import compute_suggestions_for_doctor
 from praxi_backend.appointments.services.scheduling import (
     check_appointment_conflicts,
     check_operation_conflicts,
@@ -950,6 +955,77 @@ def benchmark_randomized(
     )
 
 
+def benchmark_slot_suggestions(
+    ctx: BenchmarkContext,
+    n_requests: int = 20,
+    busy_days: int = 14,
+) -> BenchmarkResult:
+    """
+    Benchmark slot suggestions on a calendar that is fully booked for ``busy_days``.
+
+    Every request has to scan past the booked days, which is the worst case for
+    a per-day scanner. Query counts are recorded per request.
+    """
+    doctor = ctx.doctors[0]
+    start_date = ctx.get_next_weekday(0)
+
+    # Book the doctor's full working hours (08:00-18:00) on every weekday.
+    day = start_date
+    for _ in range(busy_days):
+        if day.weekday() < 5:
+            Appointment.objects.using("default").create(
+                patient_id=ctx.next_patient_id(),
+                doctor=doctor,
+                type=ctx.appt_types[0],
+                start_time=ctx.make_datetime(day, dt_time(8, 0)),
+                end_time=ctx.make_datetime(day, dt_time(18, 0)),
+                status="scheduled",
+            )
+        day += timedelta(days=1)
+
+    samples: list[float] = []
+    queries_per_request: list[int] = []
+    suggestions_found = 0
+
+    start_query_tracking()
+    total_start = time.perf_counter()
+
+    for i in range(n_requests):
+        before = len(connection.queries)
+        op_start = time.perf_counter()
+
+        suggestions = compute_suggestions_for_doctor(
+            doctor=doctor,
+            start_date=start_date,
+            duration_minutes=ctx.appt_types[i % len(ctx.appt_types)].duration_minutes,
+            limit=1,
+            type_obj=None,
+        )
+
+        op_end = time.perf_counter()
+        samples.append((op_end - op_start) * 1000)
+        queries_per_request.append(len(connection.queries) - before)
+        suggestions_found += len(suggestions)
+
+    total_end = time.perf_counter()
+    queries = stop_query_tracking()
+
+    return BenchmarkResult(
+        name="slot_suggestions",
+        description=f"{n_requests} suggestion requests past {busy_days} fully booked days",
+        timing=TimingStats.from_samples(samples),
+        queries=analyze_queries(queries, n_requests),
+        throughput_ops_sec=n_requests / (total_end - total_start),
+        metadata={
+            "n_requests": n_requests,
+            "busy_days": busy_days,
+            "suggestions_found": suggestions_found,
+            "queries_per_request": queries_per_request,
+            "max_queries_per_request": max(queries_per_request, default=0),
+        },
+    )
+
+
 def benchmark_full_engine(seed: int = DEFAULT_SEED) -> BenchmarkReport:
     """
     Run all benchmarks and generate comprehensive report.
@@ -976,6 +1052,7 @@ def benchmark_full_engine(seed: int = DEFAULT_SEED) -> BenchmarkReport:
     report.results.append(benchmark_working_hours_validation(ctx, 200))
     report.results.append(benchmark_room_conflicts(ctx, 200))
     report.results.append(benchmark_randomized(ctx, seed=seed, n=100))
+    report.results.append(benchmark_slot_suggestions(ctx, n_requests=20))
 
     total_end = time.perf_counter()
     report.total_duration_sec = total_end - total_start
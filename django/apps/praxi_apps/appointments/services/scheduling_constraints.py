@@ -0,0 +1,226 @@
+"""praxi_backend.appointments.services.scheduling_constraints
+
+Optional database-enforced overlap exclusion for the scheduling write path.
+
+Two PostgreSQL ``EXCLUDE USING gist`` constraints make overlapping bookings
+impossible at the database level:
+
+- no two appointments of the same doctor overlap
+- no two operations in the same room overlap
+
+When ``settings.PRAXI_SCHEDULING_DB_CONSTRAINTS`` is enabled and both
+constraints exist, the planning functions skip the matching Python pre-check
+queries and translate the resulting ``IntegrityError`` into the usual
+``SchedulingConflictError``. This removes the check-then-insert race between
+concurrent bookings. Without the constraints the pre-checks keep running, so a
+database that was never set up does not accept double bookings.
+
+Whether the constraints exist is checked once per process; restart the
+workers after ``manage.py scheduling_constraints --install`` or ``--remove``.
+
+The constraints are not part of the migrations because existing data may
+contain overlaps; install them with ``manage.py scheduling_constraints``.
+Ranges are half-open (``[start, end)``), matching the Python overlap checks.
+The doctor/room id is compared as a single-point ``int8range`` so plain GiST
+range operators suffice and no ``btree_gist`` extension is required.
+
+Architecture rules:
+- All DB access uses .using('default')
+- PostgreSQL only
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from django.conf import settings
+from django.db import IntegrityError, connections
+from praxi_backend.appointments.exceptions import Conflict, SchedulingConflictError
+from praxi_backend.appointments.models import Appointment, Operation
+
+DOCTOR_OVERLAP_CONSTRAINT = "appt_doctor_no_overlap"
+ROOM_OVERLAP_CONSTRAINT = "op_room_no_overlap"
+
+# constraint name -> (model, scope column)
+OVERLAP_CONSTRAINTS: dict[str, tuple[type, str]] = {
+    DOCTOR_OVERLAP_CONSTRAINT: (Appointment, "doctor_id"),
+    ROOM_OVERLAP_CONSTRAINT: (Operation, "op_room_id"),
+}
+
+
+_installed: set[str] | None = None
+
+
+def db_constraints_requested() -> bool:
+    """True if ``PRAXI_SCHEDULING_DB_CONSTRAINTS`` asks for constraint mode."""
+    return bool(getattr(settings, "PRAXI_SCHEDULING_DB_CONSTRAINTS", False))
+
+
+def db_constraints_enabled() -> bool:
+    """True if the write path should rely on the overlap constraints.
+
+    Requires the setting and both constraints in the database; the latter is
+    looked up on first use and then cached for the process.
+    """
+    global _installed
+    if not db_constraints_requested():
+        return False
+    if _installed is None:
+        _installed = installed_overlap_constraints()
+    return _installed >= set(OVERLAP_CONSTRAINTS)
+
+
+# ---------------------------------------------------------------------------
+# Installation
+# ---------------------------------------------------------------------------
+
+
+def installed_overlap_constraints() -> set[str]:
+    """Return the names of the overlap constraints present in the database."""
+    with connections["default"].cursor() as cursor:
+        cursor.execute(
+            "SELECT conname FROM pg_constraint WHERE contype = 'x' AND conname = ANY(%s)",
+            [list(OVERLAP_CONSTRAINTS)],
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+
+def find_existing_overlaps(name: str, *, limit: int = 20) -> list[tuple[int, int]]:
+    """Return up to ``limit`` id pairs that would violate constraint ``name``."""
+    model, column = OVERLAP_CONSTRAINTS[name]
+    table = model._meta.db_table
+    with connections["default"].cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT a.id, b.id
+            FROM {table} a
+            JOIN {table} b
+              ON a.{column} = b.{column}
+             AND a.id < b.id
+             AND a.start_time < b.end_time
+             AND a.end_time > b.start_time
+            ORDER BY a.id, b.id
+            LIMIT %s
+            """,
+            [limit],
+        )
+        return [(a, b) for a, b in cursor.fetchall()]
+
+
+def install_overlap_constraints() -> list[str]:
+    """Create missing overlap constraints; return the names that were added.
+
+    Fails with ``IntegrityError`` if existing rows overlap; use
+    :func:`find_existing_overlaps` to list them first.
+    """
+    added = []
+    present = installed_overlap_constraints()
+    with connections["default"].cursor() as cursor:
+        # ALTER TABLE refuses to run while deferred FK checks are pending.
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        for name, (model, column) in OVERLAP_CONSTRAINTS.items():
+            if name in present:
+                continue
+            cursor.execute(
+                f"ALTER TABLE {model._meta.db_table} ADD CONSTRAINT {name} "
+                f"EXCLUDE USING gist (int8range({column}, {column}, '[]') WITH =, "
+                "tstzrange(start_time, end_time, '[)') WITH &&)"
+            )
+            added.append(name)
+    _forget_installed()
+    return added
+
+
+def remove_overlap_constraints() -> list[str]:
+    """Drop the overlap constraints; return the names that were removed."""
+    present = installed_overlap_constraints()
+    with connections["default"].cursor() as cursor:
+        for name, (model, _column) in OVERLAP_CONSTRAINTS.items():
+            if name in present:
+                cursor.execute(f"ALTER TABLE {model._meta.db_table} DROP CONSTRAINT {name}")
+    _forget_installed()
+    return sorted(present)
+
+
+def _forget_installed() -> None:
+    global _installed
+    _installed = None
+
+
+# ---------------------------------------------------------------------------
+# Error Translation
+# ---------------------------------------------------------------------------
+
+
+def violated_overlap_constraint(exc: IntegrityError) -> str | None:
+    """Return the overlap constraint name behind ``exc``, if any."""
+    diag = getattr(exc.__cause__, "diag", None)
+    name = getattr(diag, "constraint_name", None)
+    return name if name in OVERLAP_CONSTRAINTS else None
+
+
+def conflict_error_from_integrity_error(
+    exc: IntegrityError,
+    *,
+    start_time: datetime,
+    end_time: datetime,
+    doctor_id: int | None = None,
+    room_id: int | None = None,
+    exclude_id: int | None = None,
+) -> SchedulingConflictError | None:
+    """Translate an overlap constraint violation into ``SchedulingConflictError``.
+
+    Must be called after the failed statement's savepoint was rolled back:
+    the conflicting rows are looked up so the conflicts carry the same ids
+    and messages as the Python pre-checks. Returns None for other errors.
+    """
+    name = violated_overlap_constraint(exc)
+    if name is None:
+        return None
+
+    conflicts: list[Conflict] = []
+    if name == DOCTOR_OVERLAP_CONSTRAINT:
+        qs = Appointment.objects.using("default").filter(
+            doctor_id=doctor_id, start_time__lt=end_time, end_time__gt=start_time
+        )
+        if exclude_id is not None:
+            qs = qs.exclude(id=exclude_id)
+        for appt_id in qs.values_list("id", flat=True):
+            conflicts.append(
+                Conflict(
+                    type="doctor_conflict",
+                    model="Appointment",
+                    id=appt_id,
+                    message=f"Doctor has overlapping appointment #{appt_id}",
+                )
+            )
+    else:
+        qs = Operation.objects.using("default").filter(
+            op_room_id=room_id, start_time__lt=end_time, end_time__gt=start_time
+        )
+        if exclude_id is not None:
+            qs = qs.exclude(id=exclude_id)
+        for op_id in qs.values_list("id", flat=True):
+            conflicts.append(
+                Conflict(
+                    type="room_conflict",
+                    model="Operation",
+                    id=op_id,
+                    resource_id=room_id,
+                    message=f"Room is already booked by operation #{op_id}",
+                )
+            )
+
+    if not conflicts:
+        # The conflicting row was removed in the meantime; still report the violation.
+        model_name = "Appointment" if name == DOCTOR_OVERLAP_CONSTRAINT else "Operation"
+        conflict_type = "doctor_conflict" if name == DOCTOR_OVERLAP_CONSTRAINT else "room_conflict"
+        conflicts.append(
+            Conflict(
+                type=conflict_type,
+                model=model_name,
+                resource_id=room_id,
+                message=f"Overlapping booking rejected by constraint {name}",
+            )
+        )
+    return SchedulingConflictError(conflicts)
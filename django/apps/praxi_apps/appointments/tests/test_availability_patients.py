@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime, time, timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from praxi_backend.appointments.models import Appointment, Operation, OperationType, Resource
+from praxi_backend.appointments.services.scheduling import filter_available_patients
+from praxi_backend.core.models import Role, User
+from praxi_backend.patients.models import Patient
+from rest_framework.test import APIClient
+
+
+class AvailabilityPatientsTest(TestCase):
+    """/api/availability/ pages available patients without per-patient queries."""
+
+    databases = {"default"}
+
+    def setUp(self):
+        role_admin, _ = Role.objects.using("default").get_or_create(
+            name="admin", defaults={"label": "Administrator"}
+        )
+        self.admin = User.objects.db_manager("default").create_user(
+            username="avail_admin",
+            password="DummyPass123!",
+            email="avail_admin@example.com",
+            role=role_admin,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+        tz = timezone.get_current_timezone()
+        day = timezone.localdate() + timedelta(days=7)
+        self.start = timezone.make_aware(datetime.combine(day, time(10, 0)), tz)
+        self.end = self.start + timedelta(minutes=30)
+
+        names = [
+            ("Becker", "Anna"),
+            ("Becker", "Jonas"),
+            ("Meyer", "Lea"),
+            ("Müller", "Paul"),
+            ("Schmidt", "Eva"),
+            ("Schneider", "Tim"),
+        ]
+        self.patients = [
+            Patient.objects.using("default").create(id=5000 + i, first_name=fn, last_name=ln)
+            for i, (ln, fn) in enumerate(names)
+        ]
+
+        # Meyer has an overlapping appointment, Schmidt an overlapping operation.
+        self.appt = Appointment.objects.using("default").create(
+            patient_id=self.patients[2].id,
+            doctor=self.admin,
+            start_time=self.start,
+            end_time=self.end,
+            status="scheduled",
+        )
+        op_type = OperationType.objects.using("default").create(
+            name="Avail OP", prep_duration=0, op_duration=30, post_duration=0
+        )
+        room = Resource.objects.using("default").create(name="Avail OP 1", type="room")
+        Operation.objects.using("default").create(
+            patient_id=self.patients[4].id,
+            primary_surgeon=self.admin,
+            op_room=room,
+            op_type=op_type,
+            start_time=self.start - timedelta(minutes=15),
+            end_time=self.start + timedelta(minutes=15),
+            status="planned",
+        )
+
+    def _get(self, **params):
+        params = {"start": self.start.isoformat(), "end": self.end.isoformat(), **params}
+        return self.client.get("/api/availability/", params)
+
+    def _ids(self, response):
+        return [p["id"] for p in response.data["available_patients"]]
+
+    def test_busy_patients_are_excluded(self):
+        response = self._get()
+
+        self.assertEqual(response.status_code, 200)
+        expected = [self.patients[i].id for i in (0, 1, 3, 5)]
+        self.assertEqual(self._ids(response), expected)
+        self.assertIsNone(response.data["patients_next_cursor"])
+
+    def test_exclude_appointment_id(self):
+        response = self._get(exclude_appointment_id=self.appt.id)
+
+        self.assertIn(self.patients[2].id, self._ids(response))
+
+    def test_cursor_pages_through_all_available_patients(self):
+        seen = []
+        cursor = None
+        for _ in range(5):
+            params = {"limit": 3}
+            if cursor:
+                params["cursor"] = cursor
+            response = self._get(**params)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data["available_patients"]), 3)
+            seen.extend(self._ids(response))
+            cursor = response.data["patients_next_cursor"]
+            if not cursor:
+                break
+
+        self.assertEqual(seen, [self.patients[i].id for i in (0, 1, 3, 5)])
+
+    def test_search_prefix(self):
+        response = self._get(q="bec")
+        self.assertEqual(self._ids(response), [self.patients[0].id, self.patients[1].id])
+
+        response = self._get(q="Schm")
+        self.assertEqual(self._ids(response), [])
+
+        response = self._get(q=str(self.patients[5].id))
+        self.assertEqual(self._ids(response), [self.patients[5].id])
+
+    def test_invalid_cursor_400(self):
+        response = self._get(cursor="not-a-cursor")
+        self.assertEqual(response.status_code, 400)
+        for values in (["a", "b", None], ["a", "b", [1]], ["a", "b", "x"], [1, 2]):
+            cursor = base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+            self.assertEqual(self._get(cursor=cursor).status_code, 400, values)
+
+    def test_patient_query_count_is_constant(self):
+        for i in range(30):
+            Patient.objects.using("default").create(id=6000 + i, first_name="X", last_name="Zeta")
+
+        patient_ids = list(Patient.objects.using("default").values_list("id", flat=True))
+        with self.assertNumQueries(2):
+            available = filter_available_patients(
+                patient_ids=patient_ids, start_time=self.start, end_time=self.end
+            )
+        self.assertNotIn(self.patients[2].id, available)
+        self.assertNotIn(self.patients[4].id, available)
+        self.assertEqual(len(available), len(patient_ids) - 2)
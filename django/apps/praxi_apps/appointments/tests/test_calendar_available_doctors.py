@@ -2,7 +2,9 @@ from __future__ import annotations
 
 from datetime import date, datetime, time, timedelta
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from praxi_backend.appointments.models import (
     Appointment,
@@ -11,6 +13,7 @@ from praxi_backend.appointments.models import (
     DoctorHours,
     PracticeHours,
 )
+from praxi_backend.appointments.scheduling import availability_for_doctors, availability_for_range
 from praxi_backend.core.models import AuditLog, Role, User
 from rest_framework.test import APIClient
 
@@ -225,3 +228,40 @@ class CalendarAvailableDoctorsMiniTest(TestCase):
         # RBAC: assistant can access
         r2 = self.client_assistant.get(f"/api/calendar/day/?date={self.day.isoformat()}")
         self.assertEqual(r2.status_code, 200)
+
+    def test_bulk_availability_matches_per_doctor(self):
+        doctors = [self.dr_a, self.dr_b, self.dr_c, self.dr_d, self.dr_e]
+        for start, end in (
+            (self.day, self.day),
+            (self.day - timedelta(days=9), self.day + timedelta(days=20)),
+        ):
+            bulk = availability_for_doctors(
+                doctors=doctors, start_date=start, end_date=end, duration_minutes=30
+            )
+            for d in doctors:
+                single = availability_for_range(
+                    doctor=d, start_date=start, end_date=end, duration_minutes=30
+                )
+                self.assertEqual(bulk[d.id], single, (d.username, start, end))
+
+    def test_calendar_month_queries_do_not_grow_with_doctors(self):
+        url = f"/api/calendar/month/?date={self.day.isoformat()}"
+        with CaptureQueriesContext(connection) as before:
+            r = self.client_admin.get(url)
+        self.assertEqual(r.status_code, 200)
+
+        role_doctor = Role.objects.using("default").get(name="doctor")
+        for i in range(5):
+            User.objects.db_manager("default").create_user(
+                username=f"dr_extra_{i}",
+                email=f"dr_extra_{i}@example.com",
+                password="DummyPass123!",
+                role=role_doctor,
+            )
+
+        with CaptureQueriesContext(connection) as after:
+            r = self.client_admin.get(url)
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(len(r.data["available_doctors"]), 10)
+        self.assertEqual(len(before), len(after))
+        self.assertLess(len(after), 40)
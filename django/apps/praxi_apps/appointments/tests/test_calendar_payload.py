@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from datetime import datetime, time, timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from praxi_backend.appointments.calendar_payload import appointment_events, operation_events
+from praxi_backend.appointments.models import (
+    Appointment,
+    AppointmentResource,
+    AppointmentType,
+    Operation,
+    OperationDevice,
+    OperationType,
+    Resource,
+)
+from praxi_backend.appointments.serializers import AppointmentSerializer, OperationSerializer
+from praxi_backend.appointments.services.calendar_benchmark import run_calendar_benchmark
+from praxi_backend.core.models import Role, User
+from praxi_backend.patients.models import Patient
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+
+class CalendarPayloadTest(TestCase):
+    """values()-based calendar payloads render the same JSON as the serializers."""
+
+    databases = {"default"}
+
+    def setUp(self):
+        role_admin, _ = Role.objects.using("default").get_or_create(
+            name="admin", defaults={"label": "Administrator"}
+        )
+        role_doctor, _ = Role.objects.using("default").get_or_create(
+            name="doctor", defaults={"label": "Arzt"}
+        )
+        self.admin = User.objects.db_manager("default").create_user(
+            username="payload_admin",
+            email="payload_admin@example.com",
+            password="DummyPass123!",
+            role=role_admin,
+        )
+        self.doctor = User.objects.db_manager("default").create_user(
+            username="payload_doc",
+            email="payload_doc@example.com",
+            password="DummyPass123!",
+            role=role_doctor,
+            first_name="Eva",
+            last_name="Brandt",
+            calendar_color="#112233",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+        Patient.objects.using("default").create(id=8101, first_name="Ida", last_name="Kern")
+        appt_type = AppointmentType.objects.using("default").create(
+            name="Payload Kontrolle", duration_minutes=30, color="#ABCDEF"
+        )
+        room = Resource.objects.using("default").create(name="Raum P", type="room")
+        old_room = Resource.objects.using("default").create(
+            name="Raum Alt", type="room", active=False
+        )
+        device = Resource.objects.using("default").create(name="EKG P", type="device")
+        self.op_room = Resource.objects.using("default").create(name="OP P", type="room")
+
+        self.day = timezone.localdate() + timedelta(days=4)
+        start = timezone.make_aware(datetime.combine(self.day, time(9, 0)))
+        specs = [
+            (8101, appt_type, [room, device], "Kontrolle"),
+            (8101, None, [old_room, device], None),
+            # No patient record: falls back to the "Patient #ID" name
+            (8999, appt_type, [], ""),
+        ]
+        for i, (patient_id, type_, resources, notes) in enumerate(specs):
+            appointment = Appointment.objects.using("default").create(
+                patient_id=patient_id,
+                type=type_,
+                doctor=self.doctor,
+                start_time=start + timedelta(hours=i),
+                end_time=start + timedelta(hours=i, minutes=30),
+                status="scheduled",
+                notes=notes,
+            )
+            for resource in resources:
+                AppointmentResource.objects.using("default").create(
+                    appointment=appointment, resource=resource
+                )
+
+        op_type = OperationType.objects.using("default").create(
+            name="Payload OP", prep_duration=10, op_duration=60, post_duration=10, color="#445566"
+        )
+        for i, assistant in enumerate((self.doctor, None)):
+            op = Operation.objects.using("default").create(
+                patient_id=8101,
+                primary_surgeon=self.doctor,
+                assistant=assistant,
+                op_room=self.op_room,
+                op_type=op_type,
+                start_time=start + timedelta(hours=i + 4),
+                end_time=start + timedelta(hours=i + 5),
+                status="planned",
+            )
+            if assistant is not None:
+                OperationDevice.objects.using("default").create(operation=op, resource=device)
+
+    def _render(self, data):
+        return JSONRenderer().render(data)
+
+    def test_appointments_match_serializer(self):
+        qs = Appointment.objects.using("default").order_by("start_time", "id")
+        expected = self._render(AppointmentSerializer(qs, many=True).data)
+        self.assertEqual(self._render(appointment_events(qs)), expected)
+
+    def test_operations_match_serializer(self):
+        qs = Operation.objects.using("default").order_by("start_time", "id")
+        expected = self._render(OperationSerializer(qs, many=True).data)
+        self.assertEqual(self._render(operation_events(qs)), expected)
+
+    def test_query_count_does_not_grow_with_events(self):
+        qs = Appointment.objects.using("default").order_by("start_time", "id")
+        with CaptureQueriesContext(connection) as ctx:
+            appointment_events(qs)
+        few = len(ctx.captured_queries)
+
+        template = Appointment.objects.using("default").first()
+        for i in range(10):
+            Appointment.objects.using("default").create(
+                patient_id=8101 + i,
+                type=template.type,
+                doctor=self.doctor,
+                start_time=template.start_time + timedelta(minutes=i),
+                end_time=template.end_time + timedelta(minutes=i),
+                status="scheduled",
+            )
+        with CaptureQueriesContext(connection) as ctx:
+            appointment_events(qs)
+        self.assertEqual(len(ctx.captured_queries), few)
+
+    def test_calendar_day_endpoint(self):
+        response = self.client.get("/api/calendar/day/", {"date": self.day.isoformat()})
+        self.assertEqual(response.status_code, 200)
+        names = [a["patient_name"] for a in response.data["appointments"]]
+        self.assertIn("Kern", names[0])
+        self.assertEqual(response.data["appointments"][0]["room_name"], "Raum P")
+        self.assertIsNone(response.data["appointments"][1]["room_name"])
+        self.assertEqual(len(response.data["operations"]), 2)
+
+    def test_benchmark_reports_identical_payloads(self):
+        report = run_calendar_benchmark(n_appointments=60, n_operations=10, iterations=1)
+        self.assertTrue(report.identical)
+        self.assertEqual(set(report.results), {"serializer", "projection"})
+        self.assertGreater(report.results["projection"].payload_bytes, 0)
+        # Rolled back
+        self.assertEqual(Appointment.objects.using("default").count(), 3)
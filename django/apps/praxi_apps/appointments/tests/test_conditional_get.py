@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+from datetime import datetime, time, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import update_last_login
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from praxi_backend.appointments import change_tracking
+from praxi_backend.appointments.models import (
+    Appointment,
+    DoctorAbsence,
+    Operation,
+    OperationType,
+    PatientFlow,
+    Resource,
+)
+from praxi_backend.core.models import Role, User
+from rest_framework.test import APIClient
+
+AUDIT = "praxi_backend.appointments.views.log_patient_action"
+
+
+@override_settings(PRAXI_CONDITIONAL_GET=True)
+class ConditionalGetTest(TestCase):
+    """ETag/304 for the polled calendar and live endpoints."""
+
+    databases = {"default"}
+
+    def setUp(self):
+        caches["default"].clear()
+        self.addCleanup(caches["default"].clear)
+        # Keep the live time bucket fixed for the duration of a test.
+        patcher = mock.patch.object(change_tracking, "LIVE_REFRESH_SECONDS", 10**9)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        role_admin, _ = Role.objects.using("default").get_or_create(
+            name="admin", defaults={"label": "Administrator"}
+        )
+        role_doctor, _ = Role.objects.using("default").get_or_create(
+            name="doctor", defaults={"label": "Arzt"}
+        )
+        self.admin = User.objects.db_manager("default").create_user(
+            username="etag_admin",
+            email="etag_admin@example.com",
+            password="DummyPass123!",
+            role=role_admin,
+        )
+        self.doctor = User.objects.db_manager("default").create_user(
+            username="etag_doc",
+            email="etag_doc@example.com",
+            password="DummyPass123!",
+            role=role_doctor,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+        self.day = timezone.localdate() + timedelta(days=10)
+        self.url = f"/api/calendar/day/?date={self.day.isoformat()}"
+
+    def _book(self, day, hour=9):
+        start = timezone.make_aware(datetime.combine(day, time(hour, 0)))
+        return Appointment.objects.using("default").create(
+            patient_id=1,
+            doctor=self.doctor,
+            start_time=start,
+            end_time=start + timedelta(minutes=30),
+            status="scheduled",
+        )
+
+    def _get(self, url, etag=None, client=None):
+        headers = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+        return (client or self.client).get(url, **headers)
+
+    def test_calendar_not_modified_without_queries(self):
+        self._book(self.day)
+        first = self._get(self.url)
+        self.assertEqual(first.status_code, 200)
+        etag = first["ETag"]
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertIn("no-cache", first["Cache-Control"])
+
+        # Only the access audit runs (mocked here); no data is read.
+        with mock.patch(AUDIT) as audit, self.assertNumQueries(0):
+            second = self._get(self.url, etag)
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second["ETag"], etag)
+        self.assertEqual(
+            [c.args[1] for c in audit.call_args_list],
+            ["calendar_day", "doctor_substitution_list"],
+        )
+
+        # Another query string is another resource.
+        self.assertEqual(self._get(self.url + "&doctor_id=1", etag).status_code, 200)
+
+    def test_if_modified_since_alone_is_not_trusted(self):
+        first = self._get(self.url)
+        # Same-second writes would be invisible at Last-Modified's resolution.
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(
+            self.url,
+            HTTP_IF_NONE_MATCH=first["ETag"],
+            HTTP_IF_MODIFIED_SINCE=first["Last-Modified"],
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_writes_in_range_invalidate(self):
+        appointment = self._book(self.day)
+        etag = self._get(self.url)["ETag"]
+
+        # Other days do not touch this day's validator.
+        self._book(self.day + timedelta(days=3))
+        self.assertEqual(self._get(self.url, etag).status_code, 304)
+
+        appointment.notes = "geändert"
+        appointment.save()
+        response = self._get(self.url, etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+
+        # Moving an appointment away still changes the day it left.
+        appointment.start_time += timedelta(days=5)
+        appointment.end_time += timedelta(days=5)
+        appointment.save()
+        response = self._get(self.url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["appointments"], [])
+        etag = response["ETag"]
+
+        DoctorAbsence.objects.using("default").create(
+            doctor=self.doctor,
+            start_date=self.day - timedelta(days=2),
+            end_date=self.day + timedelta(days=2),
+        )
+        self.assertEqual(self._get(self.url, etag).status_code, 200)
+
+    def test_validators_are_per_user_and_ignore_logins(self):
+        etag = self._get(self.url)["ETag"]
+        doctor_client = APIClient()
+        doctor_client.force_authenticate(user=self.doctor)
+        self.assertEqual(self._get(self.url, etag, client=doctor_client).status_code, 200)
+
+        update_last_login(None, self.doctor)
+        self.assertEqual(self._get(self.url, etag).status_code, 304)
+
+        self.doctor.first_name = "Eva"
+        self.doctor.save()
+        self.assertEqual(self._get(self.url, etag).status_code, 200)
+
+    def test_live_endpoints(self):
+        op_type = OperationType.objects.using("default").create(
+            name="ETag OP", prep_duration=0, op_duration=60, post_duration=0
+        )
+        room = Resource.objects.using("default").create(name="ETag OP 1", type="room")
+        now = timezone.now()
+        operation = Operation.objects.using("default").create(
+            patient_id=1,
+            primary_surgeon=self.doctor,
+            op_room=room,
+            op_type=op_type,
+            start_time=now - timedelta(minutes=10),
+            end_time=now + timedelta(minutes=50),
+            status=Operation.STATUS_RUNNING,
+        )
+        appointment = self._book(timezone.localdate())
+
+        urls = ["/api/op-dashboard/live/", "/api/op-timeline/live/", "/api/patient-flow/live/"]
+        etags = {url: self._get(url)["ETag"] for url in urls}
+        with mock.patch(AUDIT) as audit:
+            for url in urls:
+                self.assertEqual(self._get(url, etags[url]).status_code, 304, url)
+        # Revalidated polls are still audited.
+        self.assertEqual(
+            [c.args[1] for c in audit.call_args_list],
+            ["op_dashboard_view", "op_timeline_view", "patient_flow_view"],
+        )
+
+        operation.status = Operation.STATUS_DONE
+        operation.save()
+        for url in urls:
+            self.assertEqual(self._get(url, etags[url]).status_code, 200, url)
+
+        etag = self._get("/api/patient-flow/live/")["ETag"]
+        PatientFlow.objects.using("default").create(appointment=appointment)
+        response = self._get("/api/patient-flow/live/", etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+
+    def test_live_bucket_expires(self):
+        first = self._get("/api/op-dashboard/live/")
+        with mock.patch.object(change_tracking, "LIVE_REFRESH_SECONDS", 60):
+            etag = self._get("/api/op-dashboard/live/")["ETag"]
+            self.assertNotEqual(etag, first["ETag"])
+            later = change_tracking.time_module.time() + 60
+            with mock.patch.object(change_tracking.time_module, "time", return_value=later):
+                self.assertEqual(self._get("/api/op-dashboard/live/", etag).status_code, 200)
+
+    @override_settings(PRAXI_CONDITIONAL_GET=False)
+    def test_disabled_by_default(self):
+        response = self._get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("ETag"))
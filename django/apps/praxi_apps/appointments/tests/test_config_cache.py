@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from datetime import datetime, time, timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from praxi_backend.appointments import config_cache
+from praxi_backend.appointments.config_cache import (
+    config_version,
+    get_doctor_hours,
+    get_operation_type,
+    get_practice_hours,
+    invalidate_config_cache,
+)
+from praxi_backend.appointments.exceptions import WorkingHoursViolation
+from praxi_backend.appointments.models import (
+    DoctorHours,
+    OperationType,
+    PracticeHours,
+    Resource,
+)
+from praxi_backend.appointments.services.scheduling import validate_working_hours
+from praxi_backend.appointments.validators import resolve_active_resources
+from praxi_backend.core.models import Role, User
+from rest_framework.exceptions import ValidationError
+
+
+class ConfigCacheTest(TestCase):
+    """Versioned cache for hours and types.
+
+    Writes are wrapped in captureOnCommitCallbacks(execute=True) to simulate a
+    committed transaction; without it the cache is bypassed.
+    """
+
+    databases = {"default"}
+
+    def setUp(self):
+        self.addCleanup(invalidate_config_cache)
+        role_doctor, _ = Role.objects.using("default").get_or_create(
+            name="doctor", defaults={"label": "Arzt"}
+        )
+        base = timezone.localdate() + timedelta(days=7)
+        self.monday = base - timedelta(days=base.weekday())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.doctor = User.objects.db_manager("default").create_user(
+                username="config_cache_doc",
+                email="config_cache_doc@example.com",
+                password="DummyPass123!",
+                role=role_doctor,
+            )
+            PracticeHours.objects.using("default").create(
+                weekday=0, start_time=time(8, 0), end_time=time(12, 0), active=True
+            )
+            DoctorHours.objects.using("default").create(
+                doctor=self.doctor, weekday=0, start_time=time(8, 0), end_time=time(12, 0)
+            )
+            self.room = Resource.objects.using("default").create(name="R1", type="room")
+            self.op_type = OperationType.objects.using("default").create(
+                name="OP", prep_duration=5, op_duration=20, post_duration=5
+            )
+
+    def _dt(self, hour: int, minute: int = 0) -> datetime:
+        return timezone.make_aware(
+            datetime.combine(self.monday, time(hour, minute)), timezone.get_current_timezone()
+        )
+
+    def test_warm_reads_do_not_query(self):
+        get_practice_hours()
+        get_doctor_hours()
+        get_operation_type(self.op_type.id)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_practice_hours()[0], [(time(8, 0), time(12, 0))])
+            self.assertEqual(get_doctor_hours()[self.doctor.id][0], [(time(8, 0), time(12, 0))])
+            self.assertEqual(get_operation_type(self.op_type.id).op_duration, 20)
+            validate_working_hours(
+                date=self.monday,
+                start_time=self._dt(9),
+                end_time=self._dt(9, 30),
+                doctor_id=self.doctor.id,
+            )
+
+    def test_save_and_delete_invalidate(self):
+        get_practice_hours()
+        version = config_version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            extra = PracticeHours.objects.using("default").create(
+                weekday=0, start_time=time(14, 0), end_time=time(18, 0), active=True
+            )
+        self.assertGreater(config_version(), version)
+        self.assertEqual(len(get_practice_hours()[0]), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            extra.delete()
+        self.assertEqual(len(get_practice_hours()[0]), 1)
+
+    def test_resources_are_read_from_the_database(self):
+        self.assertEqual(resolve_active_resources([self.room.id]), [self.room])
+
+        # No signal, as when another worker deactivated it.
+        Resource.objects.using("default").filter(id=self.room.id).update(active=False)
+        with self.assertRaises(ValidationError):
+            resolve_active_resources([self.room.id])
+
+    def test_uncommitted_changes_bypass_the_cache(self):
+        get_doctor_hours()
+
+        DoctorHours.objects.using("default").filter(doctor=self.doctor).first().delete()
+
+        # The transaction has not committed: read through, publish nothing.
+        self.assertNotIn(self.doctor.id, get_doctor_hours())
+        with self.assertRaises(WorkingHoursViolation):
+            validate_working_hours(
+                date=self.monday,
+                start_time=self._dt(9),
+                end_time=self._dt(9, 30),
+                doctor_id=self.doctor.id,
+            )
+        self.assertNotIn("doctor_hours", config_cache._snapshots)
+
+    def test_returned_instances_are_copies(self):
+        first = get_operation_type(self.op_type.id)
+        first.name = "changed"
+        self.assertEqual(get_operation_type(self.op_type.id).name, "OP")
+
+    @override_settings(PRAXI_CONFIG_CACHE_ALIAS="default")
+    def test_shared_copy_survives_local_reset(self):
+        invalidate_config_cache()
+        self.assertEqual(get_practice_hours()[0], [(time(8, 0), time(12, 0))])
+
+        # A fresh process only has the shared cache.
+        config_cache._snapshots.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_practice_hours()[0], [(time(8, 0), time(12, 0))])
+
+        version = config_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            PracticeHours.objects.using("default").create(
+                weekday=0, start_time=time(14, 0), end_time=time(18, 0), active=True
+            )
+        self.assertGreater(config_version(), version)
+        self.assertEqual(len(get_practice_hours()[0]), 2)
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 from datetime import timedelta
+from unittest.mock import patch
 
 from django.test import TestCase
 from django.utils import timezone
+from praxi_backend.appointments import scheduling
 from praxi_backend.appointments.models import DoctorAbsence, DoctorHours, PracticeHours
 from praxi_backend.core.models import AuditLog, Role, User
 from rest_framework.test import APIClient
@@ -115,3 +117,43 @@ class DoctorSubstitutionSuggestMiniTest(TestCase):
         new_actions = actions[len(before) :]
         self.assertIn("appointment_suggest", new_actions)
         self.assertIn("doctor_substitution_suggest", new_actions)
+
+    def test_fallback_limit_truncates_and_stops_early(self):
+        role_doctor = Role.objects.using("default").get(name="doctor")
+        for name in ("doctor_c", "doctor_d"):
+            other = User.objects.db_manager("default").create_user(
+                username=name,
+                email=f"{name}@example.com",
+                password="DummyPass123!",
+                role=role_doctor,
+            )
+            DoctorHours.objects.using("default").create(
+                doctor=other,
+                weekday=0,
+                start_time="09:00:00",
+                end_time="17:00:00",
+                active=True,
+            )
+        params = {
+            "doctor_id": self.doctor_a.id,
+            "duration_minutes": 30,
+            "start_date": self.monday.isoformat(),
+            "limit": 1,
+        }
+
+        def suggest(**extra):
+            with patch(
+                "praxi_backend.appointments.scheduling._scan_day_for_slot",
+                wraps=scheduling._scan_day_for_slot,
+            ) as scan:
+                r = self.client.get("/api/appointments/suggest/", {**params, **extra})
+            self.assertEqual(r.status_code, 200)
+            return r.data["fallback_suggestions"], scan.call_count
+
+        fallback, scans = suggest()
+        self.assertEqual(len(fallback), 3)
+
+        fallback, limited_scans = suggest(fallback_limit=1)
+        self.assertEqual([item["doctor"]["id"] for item in fallback], [self.doctor_b.id])
+        # Doctors C and D are not scanned once Dr. B has a slot.
+        self.assertEqual(scans - limited_scans, 2)
@@ -0,0 +1,117 @@
+"""Tests for the interval algebra behind the slot engine."""
+
+from __future__ import annotations
+
+import random
+from datetime import UTC, datetime, timedelta
+
+from django.test import SimpleTestCase
+from praxi_backend.appointments.intervals import (
+    blocked_start_indices,
+    first_free_index,
+    intersects,
+    merge_intervals,
+    subtract_intervals,
+)
+from praxi_backend.appointments.scheduling import _first_free_start
+
+
+class IntervalAlgebraTest(SimpleTestCase):
+    def test_merge_joins_overlapping_and_touching(self):
+        self.assertEqual(
+            merge_intervals([(5, 7), (1, 3), (3, 4), (6, 9), (10, 10), (12, 11)]),
+            [(1, 4), (5, 9)],
+        )
+
+    def test_subtract(self):
+        self.assertEqual(
+            subtract_intervals([(0, 10), (20, 30)], [(2, 4), (8, 22), (25, 26)]),
+            [(0, 2), (4, 8), (22, 25), (26, 30)],
+        )
+        self.assertEqual(subtract_intervals([(0, 5)], []), [(0, 5)])
+        self.assertEqual(subtract_intervals([(0, 5)], [(0, 5)]), [])
+
+    def test_intersects(self):
+        intervals = [(2, 4), (8, 10)]
+        self.assertTrue(intersects(intervals, 3, 5))
+        self.assertTrue(intersects(intervals, 0, 3))
+        self.assertTrue(intersects(intervals, 9, 20))
+        self.assertFalse(intersects(intervals, 4, 8))
+        self.assertFalse(intersects(intervals, 0, 2))
+        self.assertFalse(intersects(intervals, 3, 3))
+
+    def test_first_free_index(self):
+        self.assertEqual(first_free_index([], 3), 0)
+        self.assertEqual(first_free_index([(0, 2), (2, 5), (7, 9)], 10), 5)
+        self.assertIsNone(first_free_index([(0, 11)], 10))
+
+    def test_blocked_start_indices(self):
+        origin = datetime(2026, 1, 5, 9, 0, tzinfo=UTC)
+        step = timedelta(minutes=5)
+        busy = [(origin + timedelta(minutes=12), origin + timedelta(minutes=20))]
+        # A 10-minute slot collides with [09:12, 09:20) for starts 09:05 .. 09:15.
+        self.assertEqual(
+            blocked_start_indices(busy, origin=origin, step=step, duration=timedelta(minutes=10)),
+            [(1, 4)],
+        )
+
+
+class FirstFreeStartTest(SimpleTestCase):
+    """Compare the sweep against the plain 5-minute stepping it replaces."""
+
+    step = timedelta(minutes=5)
+
+    def _reference(self, *, origin, latest_start, duration, busy, breaks, resource_busy):
+        diagnostics = {
+            "blocked_by_busy": False,
+            "blocked_by_break": False,
+            "blocked_by_resource": False,
+        }
+        candidate = origin
+        while candidate <= latest_start:
+            candidate_end = candidate + duration
+            for key, intervals in (
+                ("blocked_by_busy", busy),
+                ("blocked_by_break", breaks),
+                ("blocked_by_resource", resource_busy),
+            ):
+                if any(s < candidate_end and e > candidate for s, e in intervals):
+                    diagnostics[key] = True
+                    break
+            else:
+                return candidate, diagnostics
+            candidate = candidate + self.step
+        return None, diagnostics
+
+    def _random_intervals(self, rng, day_start, count):
+        intervals = []
+        for _ in range(count):
+            start = day_start + timedelta(minutes=rng.randrange(0, 600))
+            intervals.append((start, start + timedelta(minutes=rng.randrange(1, 90))))
+        return intervals
+
+    def test_matches_stepping_reference(self):
+        rng = random.Random(4242)
+        day_start = datetime(2026, 3, 2, 7, 0, tzinfo=UTC)
+        for _ in range(500):
+            origin = day_start + timedelta(minutes=5 * rng.randrange(0, 36))
+            duration = timedelta(minutes=rng.choice([5, 10, 15, 20, 30, 45, 60, 90]))
+            latest_start = origin + timedelta(minutes=rng.randrange(-30, 480)) - duration
+            kwargs = {
+                "origin": origin,
+                "latest_start": latest_start,
+                "duration": duration,
+                "busy": self._random_intervals(rng, day_start, rng.randrange(0, 8)),
+                "breaks": self._random_intervals(rng, day_start, rng.randrange(0, 3)),
+                "resource_busy": self._random_intervals(rng, day_start, rng.randrange(0, 6)),
+            }
+            expected = self._reference(**kwargs)
+
+            diagnostics = {
+                "blocked_by_busy": False,
+                "blocked_by_break": False,
+                "blocked_by_resource": False,
+            }
+            found = _first_free_start(step=self.step, diagnostics=diagnostics, **kwargs)
+
+            self.assertEqual((found, diagnostics), expected, kwargs)
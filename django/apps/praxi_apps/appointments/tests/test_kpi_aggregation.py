@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from praxi_backend.appointments.kpi.aggregation import (
+    BookedTime,
+    appointment_minutes,
+    appointment_minutes_by_period,
+    operation_minutes,
+    resource_minutes,
+)
+from praxi_backend.appointments.kpi.operations_kpis import calculate_resource_utilization
+from praxi_backend.appointments.models import (
+    Appointment,
+    AppointmentResource,
+    Operation,
+    OperationDevice,
+    OperationType,
+    PracticeHours,
+    Resource,
+)
+from praxi_backend.core.models import Role, User
+
+
+class KpiAggregationTest(TestCase):
+    databases = {"default"}
+
+    def setUp(self):
+        role_doctor, _ = Role.objects.using("default").get_or_create(
+            name="doctor", defaults={"label": "Arzt"}
+        )
+        self.doc_a = User.objects.db_manager("default").create_user(
+            username="agg_doc_a",
+            email="agg_doc_a@example.com",
+            password="DummyPass123!",
+            role=role_doctor,
+        )
+        self.doc_b = User.objects.db_manager("default").create_user(
+            username="agg_doc_b",
+            email="agg_doc_b@example.com",
+            password="DummyPass123!",
+            role=role_doctor,
+        )
+        self.room = Resource.objects.using("default").create(name="Agg Raum", type="room")
+        self.device = Resource.objects.using("default").create(name="Agg Gerät", type="device")
+        self.op_type = OperationType.objects.using("default").create(
+            name="Agg-OP", prep_duration=0, op_duration=60, post_duration=0
+        )
+        PracticeHours.objects.using("default").create(
+            weekday=0, start_time=time(8, 0), end_time=time(16, 0), active=True
+        )
+
+        self.day = date(2030, 1, 7)  # Monday
+        self.range = (self._dt(self.day, 0), self._dt(self.day, 23, 59))
+
+        # doc_a: 30 + 45 min, doc_b: 20 min, one cancelled 60 min (ignored by default).
+        a1 = self._appointment(self.doc_a, 8, 0, 30)
+        self._appointment(self.doc_a, 9, 0, 45)
+        self._appointment(self.doc_b, 9, 15, 20)
+        cancelled = self._appointment(self.doc_b, 11, 0, 60, status="cancelled")
+        for appt in (a1, cancelled):
+            AppointmentResource.objects.using("default").create(
+                appointment=appt, resource=self.room
+            )
+        AppointmentResource.objects.using("default").create(appointment=a1, resource=self.device)
+
+        op = Operation.objects.using("default").create(
+            patient_id=1,
+            primary_surgeon=self.doc_a,
+            op_room=self.room,
+            op_type=self.op_type,
+            start_time=self._dt(self.day, 12),
+            end_time=self._dt(self.day, 13, 30),
+            status="planned",
+        )
+        OperationDevice.objects.using("default").create(operation=op, resource=self.device)
+
+    def _dt(self, day: date, hour: int, minute: int = 0) -> datetime:
+        return timezone.make_aware(datetime.combine(day, time(hour, minute)))
+
+    def _appointment(self, doctor, hour, minute, duration, status="scheduled"):
+        start = self._dt(self.day, hour, minute)
+        return Appointment.objects.using("default").create(
+            patient_id=1,
+            doctor=doctor,
+            start_time=start,
+            end_time=start + timedelta(minutes=duration),
+            status=status,
+        )
+
+    def test_totals_match_python_sums(self):
+        start, end = self.range
+        rows = Appointment.objects.using("default").filter(
+            start_time__gte=start,
+            start_time__lte=end,
+            status__in=["scheduled", "confirmed", "completed"],
+        )
+        expected = sum((a.end_time - a.start_time).total_seconds() / 60 for a in rows)
+
+        with self.assertNumQueries(1):
+            booked = appointment_minutes(start, end)
+        self.assertEqual(booked, BookedTime(expected, 3))
+        self.assertEqual(appointment_minutes(start, end, statuses=None), BookedTime(155, 4))
+        self.assertEqual(operation_minutes(start, end), BookedTime(90, 1))
+
+    def test_groupings(self):
+        start, end = self.range
+        with self.assertNumQueries(1):
+            by_doctor = appointment_minutes(start, end, by="doctor")
+        self.assertEqual(
+            by_doctor, {self.doc_a.id: BookedTime(75, 2), self.doc_b.id: BookedTime(20, 1)}
+        )
+        self.assertEqual(appointment_minutes(start, end, by="day"), {self.day: BookedTime(95, 3)})
+        self.assertEqual(
+            appointment_minutes(start, end, by="hour"),
+            {8: BookedTime(30, 1), 9: BookedTime(65, 2)},
+        )
+        self.assertEqual(
+            operation_minutes(start, end, by="room"), {self.room.id: BookedTime(90, 1)}
+        )
+        with self.assertRaises(ValueError):
+            appointment_minutes(start, end, by="room")
+
+    def test_periods_use_one_conditional_aggregate(self):
+        start, end = self.range
+        with self.assertNumQueries(1):
+            booked = appointment_minutes_by_period(
+                {"morning": (start, self._dt(self.day, 9)), "day": (start, end)}
+            )
+        self.assertEqual(booked, {"morning": BookedTime(75, 2), "day": BookedTime(95, 3)})
+
+    def test_resource_minutes(self):
+        start, end = self.range
+        with self.assertNumQueries(3):
+            booked = resource_minutes(start, end)
+        # Room: appointment a1 (30) + operation (90); device: a1 (30) + operation device (90).
+        self.assertEqual(booked[self.room.id], BookedTime(120, 2))
+        self.assertEqual(booked[self.device.id], BookedTime(120, 2))
+
+        rooms = resource_minutes(
+            start, end, resource_type="room", appointment_statuses=None, include_operations=False
+        )
+        self.assertEqual(rooms, {self.room.id: BookedTime(90, 2)})
+
+    def test_resource_utilization_payload(self):
+        start, end = self.range
+        stats = calculate_resource_utilization(start, end, 1)
+        room = next(r for r in stats["rooms"] if r["id"] == self.room.id)
+        device = next(r for r in stats["devices"] if r["id"] == self.device.id)
+        self.assertEqual((room["booked_hours"], room["available_hours"]), (2.0, 8.0))
+        self.assertEqual(room["utilization"], 25.0)
+        self.assertEqual(device["booked_hours"], 2.0)
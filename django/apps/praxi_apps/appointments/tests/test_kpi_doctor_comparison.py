@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from datetime import date, time, timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from praxi_backend.appointments.kpi.doctor_kpis import (
+    calculate_appointment_volume,
+    calculate_cancellation_rate,
+    calculate_doctor_activity,
+    calculate_doctor_utilization,
+    calculate_new_patient_rate,
+    calculate_no_show_rate,
+    get_doctor_comparison_data,
+)
+from praxi_backend.appointments.models import Appointment, DoctorAbsence, DoctorHours
+from praxi_backend.core.models import Role, User
+
+
+class DoctorComparisonTest(TestCase):
+    databases = {"default"}
+
+    def setUp(self):
+        self.role_doctor, _ = Role.objects.using("default").get_or_create(
+            name="doctor", defaults={"label": "Arzt"}
+        )
+        self.now = timezone.now()
+        self.end_date = date.today()
+        self.start_date = self.end_date - timedelta(days=30)
+
+    def _doctor(self, index):
+        doctor = User.objects.db_manager("default").create_user(
+            username=f"compare_doc_{index}",
+            email=f"compare_doc_{index}@example.com",
+            password="DummyPass123!",
+            role=self.role_doctor,
+            last_name=f"Vergleich {index:02d}",
+        )
+        for weekday in range(5):
+            DoctorHours.objects.using("default").create(
+                doctor=doctor, weekday=weekday, start_time=time(8), end_time=time(12), active=True
+            )
+        statuses = ["completed", "completed", "cancelled", "scheduled", "confirmed"]
+        for i, status in enumerate(statuses):
+            start = self.now - timedelta(days=i * 3 + 1, hours=index)
+            Appointment.objects.using("default").create(
+                patient_id=1000 + index * 10 + i % 3,
+                doctor=doctor,
+                start_time=start,
+                end_time=start + timedelta(minutes=20 + 5 * i),
+                status=status,
+                is_no_show=(i == 1),
+            )
+        return doctor
+
+    def test_matches_per_doctor_functions(self):
+        doctors = [self._doctor(i) for i in range(3)]
+        DoctorAbsence.objects.using("default").create(
+            doctor=doctors[0],
+            start_date=self.end_date - timedelta(days=7),
+            end_date=self.end_date - timedelta(days=3),
+            active=True,
+        )
+
+        data = get_doctor_comparison_data(days=30)
+        rows = {row["doctor_id"]: row for row in data["doctors"]}
+        activity = calculate_doctor_activity(
+            [d.id for d in doctors], self.start_date, self.end_date
+        )
+
+        for doctor in doctors:
+            row = rows[doctor.id]
+            volume = calculate_appointment_volume(doctor, self.start_date, self.end_date)
+            no_show = calculate_no_show_rate(doctor, self.start_date, self.end_date)
+            cancellation = calculate_cancellation_rate(doctor, self.start_date, self.end_date)
+            self.assertEqual(
+                row["utilization"],
+                calculate_doctor_utilization(doctor, self.start_date, self.end_date)["utilization"],
+            )
+            self.assertEqual(row["appointments"], volume["total"])
+            self.assertEqual(row["completed"], volume["completed"])
+            self.assertEqual(row["avg_per_day"], volume["avg_per_day"])
+            self.assertEqual(row["no_show_rate"], no_show["no_show_rate"])
+            self.assertEqual(row["cancellation_rate"], cancellation["cancellation_rate"])
+            self.assertEqual(
+                row["new_patient_rate"],
+                calculate_new_patient_rate(doctor, self.start_date, self.end_date)[
+                    "new_patient_rate"
+                ],
+            )
+            self.assertEqual(activity[doctor.id]["completion_rate"], volume["completion_rate"])
+            self.assertEqual(activity[doctor.id]["show_rate"], no_show["show_rate"])
+
+        self.assertEqual(data["aggregates"]["doctor_count"], 3)
+        self.assertEqual(data["aggregates"]["total_appointments"], 15)
+
+    def test_query_count_does_not_grow_with_doctors(self):
+        def queries_for(doctor_count):
+            for i in range(doctor_count):
+                self._doctor(len(self.created) + i)
+            self.created.extend(range(doctor_count))
+            with CaptureQueriesContext(connection) as ctx:
+                data = get_doctor_comparison_data(days=30)
+            return len(ctx.captured_queries), data
+
+        self.created: list[int] = []
+        few, _ = queries_for(1)
+        many, data = queries_for(5)
+        self.assertEqual(few, many)
+        self.assertEqual(len(data["doctors"]), 6)
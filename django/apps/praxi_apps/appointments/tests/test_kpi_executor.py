@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from praxi_backend.appointments.kpi.executor import (
+    STATUS_OK,
+    STATUS_TIMEOUT,
+    collect_timeouts,
+    get_kpi_section_timings,
+    run_kpi_sections,
+)
+
+
+@override_settings(PRAXI_KPI_PARALLEL_WORKERS=4, PRAXI_KPI_SECTION_TIMEOUT=2)
+class KpiExecutorTest(SimpleTestCase):
+    def setUp(self):
+        caches["default"].clear()
+        self.addCleanup(caches["default"].clear)
+
+    def test_sections_run_concurrently_in_order(self):
+        def section(value):
+            def run():
+                time.sleep(0.3)
+                return value
+
+            return run
+
+        started = time.perf_counter()
+        run = run_kpi_sections("test", {"b": section(2), "a": section(1), "c": lambda: 3})
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(run.values, {"b": 2, "a": 1, "c": 3})
+        self.assertEqual(list(run.values), ["b", "a", "c"])
+        self.assertLess(elapsed, 0.55)
+        self.assertEqual(set(run.status.values()), {STATUS_OK})
+
+        timings = get_kpi_section_timings()["test"]
+        self.assertEqual(set(timings), {"a", "b", "c"})
+        self.assertGreaterEqual(timings["a"]["ms"], 300)
+
+    def test_sections_use_callers_timezone(self):
+        with timezone.override("America/New_York"):
+            run = run_kpi_sections("test", {"tz": lambda: str(timezone.get_current_timezone())})
+        self.assertEqual(run.values["tz"], "America/New_York")
+
+    @override_settings(PRAXI_KPI_SECTION_TIMEOUT=0.2)
+    def test_timed_out_section_serves_last_value(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        slow = {"value": False}
+
+        def section():
+            if slow["value"]:
+                release.wait(5)
+            return {"count": 7}
+
+        first = run_kpi_sections("test", {"s": section}, empty={"s": {}}, variant="30")
+        self.assertEqual(first.values["s"], {"count": 7})
+
+        slow["value"] = True
+        with collect_timeouts() as timed_out:
+            again = run_kpi_sections("test", {"s": section}, empty={"s": {}}, variant="30")
+        self.assertEqual(again.values["s"], {"count": 7})
+        self.assertEqual(again.status["s"], STATUS_TIMEOUT)
+        self.assertEqual(timed_out, ["test.s"])
+
+        other = run_kpi_sections("test", {"s": section}, empty={"s": {}}, variant="7")
+        self.assertEqual(other.values["s"], {})
+        self.assertEqual(get_kpi_section_timings()["test"]["s"]["status"], STATUS_TIMEOUT)
+
+    @override_settings(PRAXI_KPI_CACHE_STALE_TTL=120)
+    def test_fallback_values_expire(self):
+        cache = caches["default"]
+        with mock.patch.object(cache, "set", wraps=cache.set) as cache_set:
+            run_kpi_sections("test", {"a": lambda: 1}, variant="30")
+        timeouts = {call.args[0]: call.kwargs["timeout"] for call in cache_set.call_args_list}
+        self.assertEqual(timeouts["praxi:kpi_section:test:30:a"], 120)
+
+    @override_settings(PRAXI_KPI_PARALLEL_WORKERS=0)
+    def test_sequential_runs_record_no_timings(self):
+        run = run_kpi_sections("test", {"a": lambda: 1})
+        self.assertEqual(run.status, {"a": STATUS_OK})
+        self.assertEqual(get_kpi_section_timings(), {})
+
+    def test_exceptions_propagate(self):
+        def broken():
+            raise ValueError("boom")
+
+        with self.assertRaisesMessage(ValueError, "boom"):
+            run_kpi_sections("test", {"ok": lambda: 1, "broken": broken})
+
+
+@override_settings(PRAXI_KPI_PARALLEL_WORKERS=4)
+class KpiExecutorTransactionTest(TestCase):
+    databases = {"default"}
+
+    def test_runs_sequentially_inside_transaction(self):
+        caller = threading.current_thread()
+        run = run_kpi_sections("test", {"same": lambda: threading.current_thread() is caller})
+        self.assertIs(run.values["same"], True)
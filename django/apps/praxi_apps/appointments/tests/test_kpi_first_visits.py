@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from praxi_backend.appointments.kpi.doctor_kpis import (
+    calculate_new_patient_rate,
+    calculate_new_patient_rates,
+)
+from praxi_backend.appointments.kpi.first_visits import first_visits
+from praxi_backend.appointments.kpi.scheduling_kpis import calculate_new_patient_conversion
+from praxi_backend.appointments.models import Appointment
+from praxi_backend.core.models import Role, User
+
+
+class FirstVisitsTest(TestCase):
+    databases = {"default"}
+
+    def setUp(self):
+        role_doctor, _ = Role.objects.using("default").get_or_create(
+            name="doctor", defaults={"label": "Arzt"}
+        )
+        self.doc_a = User.objects.db_manager("default").create_user(
+            username="first_visit_a",
+            email="first_visit_a@example.com",
+            password="DummyPass123!",
+            role=role_doctor,
+        )
+        self.doc_b = User.objects.db_manager("default").create_user(
+            username="first_visit_b",
+            email="first_visit_b@example.com",
+            password="DummyPass123!",
+            role=role_doctor,
+        )
+        self.today = timezone.localdate()
+        self.now = timezone.now()
+
+    def _appointment(self, patient_id, doctor, days_ago, status="scheduled"):
+        start = self.now - timedelta(days=days_ago)
+        return Appointment.objects.using("default").create(
+            patient_id=patient_id,
+            doctor=doctor,
+            start_time=start,
+            end_time=start + timedelta(minutes=30),
+            status=status,
+        )
+
+    def test_first_visit_per_patient_and_doctor(self):
+        early = self._appointment(1, self.doc_a, 60, status="cancelled")
+        self._appointment(1, self.doc_a, 5)
+        late_b = self._appointment(1, self.doc_b, 3)
+        only = self._appointment(2, self.doc_b, 10)
+
+        self.assertEqual(first_visits([1, 2, 99]), {1: early.start_time, 2: only.start_time})
+        self.assertEqual(
+            first_visits([1], per_doctor=True),
+            {(1, self.doc_a.id): early.start_time, (1, self.doc_b.id): late_b.start_time},
+        )
+        self.assertEqual(
+            first_visits([1, 2], doctor_ids=[self.doc_b.id]),
+            {1: late_b.start_time, 2: only.start_time},
+        )
+        self.assertEqual(first_visits([]), {})
+
+    def test_new_patient_rate_matches_previous_semantics(self):
+        # Patient 1 returns to doctor A, patient 2 is new for A but known to B.
+        self._appointment(1, self.doc_a, 90, status="completed")
+        self._appointment(1, self.doc_a, 5)
+        self._appointment(2, self.doc_b, 90, status="completed")
+        self._appointment(2, self.doc_a, 4)
+        self._appointment(3, self.doc_b, 2)
+
+        start_date = self.today - timedelta(days=30)
+        rate_a = calculate_new_patient_rate(self.doc_a, start_date, self.today)
+        self.assertEqual(
+            rate_a,
+            {
+                "new_patient_rate": 50.0,
+                "new_patients": 1,
+                "returning_patients": 1,
+                "total_patients": 2,
+            },
+        )
+
+        rates = calculate_new_patient_rates([self.doc_a, self.doc_b], start_date, self.today)
+        self.assertEqual(rates[self.doc_a.id], rate_a)
+        self.assertEqual(rates[self.doc_b.id]["new_patients"], 1)
+        self.assertEqual(rates[self.doc_b.id]["total_patients"], 1)
+
+    def test_query_count_does_not_grow_with_patients(self):
+        def queries_for(patients):
+            for pid in range(100, 100 + patients):
+                self._appointment(pid, self.doc_a, 2)
+            with CaptureQueriesContext(connection) as ctx:
+                calculate_new_patient_rate(self.doc_a, self.today - timedelta(days=7), self.today)
+                conversion = calculate_new_patient_conversion()
+            return len(ctx.captured_queries), conversion
+
+        few, _ = queries_for(2)
+        many, conversion = queries_for(20)
+        self.assertEqual(few, many)
+        self.assertEqual(conversion["new_patients"], 22)
+        self.assertEqual(conversion["returning_patients"], 0)
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from praxi_backend.appointments.kpi.doctor_kpis import calculate_peak_times
+from praxi_backend.appointments.kpi.heatmap import get_heatmap_cube, get_last_30_days_cube
+from praxi_backend.appointments.kpi.main_charts import get_hourly_heatmap
+from praxi_backend.appointments.kpi.main_kpis import get_peak_days, get_peak_hours
+from praxi_backend.appointments.kpi.rollups import flush_rollups
+from praxi_backend.appointments.kpi.scheduling_charts import (
+    get_hourly_load_chart,
+    get_weekday_load_chart,
+)
+from praxi_backend.appointments.kpi.scheduling_kpis import calculate_peak_load_heatmap
+from praxi_backend.appointments.models import Appointment, AppointmentResource, Resource
+from praxi_backend.core.models import Role, User
+
+
+class HeatmapCubeTest(TestCase):
+    databases = {"default"}
+
+    def setUp(self):
+        role_doctor, _ = Role.objects.using("default").get_or_create(
+            name="doctor", defaults={"label": "Arzt"}
+        )
+        self.doc_a = User.objects.db_manager("default").create_user(
+            username="heatmap_a",
+            email="heatmap_a@example.com",
+            password="DummyPass123!",
+            role=role_doctor,
+        )
+        self.doc_b = User.objects.db_manager("default").create_user(
+            username="heatmap_b",
+            email="heatmap_b@example.com",
+            password="DummyPass123!",
+            role=role_doctor,
+        )
+        self.room = Resource.objects.using("default").create(name="Heatmap Raum", type="room")
+        self.today = timezone.localdate()
+
+    def _appointment(self, doctor, days_ago, hour, status="scheduled", room=None):
+        day = self.today - timedelta(days=days_ago)
+        start = timezone.make_aware(datetime.combine(day, time(hour, 15)))
+        appointment = Appointment.objects.using("default").create(
+            patient_id=1,
+            doctor=doctor,
+            start_time=start,
+            end_time=start + timedelta(minutes=30),
+            status=status,
+        )
+        if room is not None:
+            AppointmentResource.objects.using("default").create(
+                appointment=appointment, resource=room
+            )
+        return day
+
+    def _fill(self):
+        days = [
+            self._appointment(self.doc_a, 1, 9, room=self.room),
+            self._appointment(self.doc_a, 1, 9, status="cancelled"),
+            self._appointment(self.doc_b, 2, 14),
+            self._appointment(self.doc_a, 8, 9, status="completed"),
+        ]
+        # Outside the 30-day window
+        self._appointment(self.doc_a, 40, 9)
+        return days
+
+    def test_views_share_one_cube_query(self):
+        days = self._fill()
+
+        with CaptureQueriesContext(connection) as ctx:
+            cube = get_last_30_days_cube()
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+        matrix = cube.matrix()
+        # One and eight days ago fall on the same weekday
+        self.assertEqual(matrix[days[0].weekday()][9], 3)
+        self.assertEqual(sum(map(sum, matrix)), 4)
+        self.assertEqual(cube.matrix(room_id=self.room.id)[days[0].weekday()][9], 1)
+        self.assertEqual(cube.by_hour(), {9: 3, 14: 1})
+        self.assertEqual(cube.by_hour(doctor_id=self.doc_b.id), {14: 1})
+        self.assertEqual(cube.by_hour(statuses=["cancelled"]), {9: 1})
+
+        self.assertEqual(
+            get_peak_hours(), {"hourly": {9: 3, 14: 1}, "peak_hour": 9, "peak_count": 3}
+        )
+        self.assertEqual(sum(get_peak_days()["daily"].values()), 4)
+        self.assertEqual(get_hourly_heatmap()["matrix"], matrix)
+        self.assertEqual(calculate_peak_load_heatmap()["peak_hour"], 9)
+        self.assertEqual(get_hourly_load_chart()["datasets"][0]["data"][9 - 7], 3)
+        self.assertEqual(get_weekday_load_chart()["datasets"][0]["data"], cube.by_weekday())
+
+        peak = calculate_peak_times(self.doc_a, self.today - timedelta(days=29), self.today)
+        expected = cube.matrix(
+            doctor_id=self.doc_a.id, statuses=["scheduled", "confirmed", "completed"]
+        )
+        self.assertEqual(peak["matrix"], expected)
+        self.assertEqual(sum(map(sum, peak["matrix"])), 2)
+
+    def test_hours_and_weekdays_are_local_time(self):
+        with timezone.override(ZoneInfo("Europe/Berlin")):
+            today = timezone.localdate()
+            # 00:30 local is still the previous day in UTC
+            start = timezone.make_aware(datetime.combine(today, time(0, 30)))
+            Appointment.objects.using("default").create(
+                patient_id=1,
+                doctor=self.doc_a,
+                start_time=start,
+                end_time=start + timedelta(minutes=30),
+                status="scheduled",
+            )
+            cube = get_heatmap_cube(today, today)
+        self.assertEqual(cube.matrix()[today.weekday()][0], 1)
+
+    @override_settings(PRAXI_KPI_ROLLUPS=True)
+    def test_rollups_give_the_same_cube(self):
+        flush_rollups()
+        self._fill()
+        start, end = self.today - timedelta(days=29), self.today
+
+        from_rollups = get_heatmap_cube(start, end)
+        with override_settings(PRAXI_KPI_ROLLUPS=False):
+            from_bookings = get_heatmap_cube(start, end)
+        self.assertEqual(from_rollups.cells, from_bookings.cells)
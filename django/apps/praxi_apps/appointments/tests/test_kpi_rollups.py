@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from datetime import datetime, time, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from praxi_backend.appointments.kpi import rollups
+from praxi_backend.appointments.kpi.aggregation import BookedTime
+from praxi_backend.appointments.kpi.operations_charts import get_daily_trend_chart
+from praxi_backend.appointments.kpi.rollups import (
+    flush_rollups,
+    rebuild_rollups,
+    rollup_totals,
+)
+from praxi_backend.appointments.models import (
+    Appointment,
+    AppointmentResource,
+    DailyBookingRollup,
+    Operation,
+    OperationType,
+    Resource,
+)
+from praxi_backend.core.models import Role, User
+
+
+@override_settings(PRAXI_KPI_ROLLUPS=True)
+class DailyBookingRollupTest(TestCase):
+    databases = {"default"}
+
+    def setUp(self):
+        flush_rollups()
+        role_doctor, _ = Role.objects.using("default").get_or_create(
+            name="doctor", defaults={"label": "Arzt"}
+        )
+        self.doctor = User.objects.db_manager("default").create_user(
+            username="rollup_doc",
+            email="rollup_doc@example.com",
+            password="DummyPass123!",
+            role=role_doctor,
+        )
+        self.room = Resource.objects.using("default").create(name="Rollup Raum", type="room")
+        self.op_type = OperationType.objects.using("default").create(
+            name="Rollup-OP", prep_duration=0, op_duration=60, post_duration=0
+        )
+        self.today = timezone.localdate()
+
+    def _dt(self, day, hour, minute=0):
+        return timezone.make_aware(datetime.combine(day, time(hour, minute)))
+
+    def _appointment(self, day, hour, minutes=30, status="scheduled"):
+        start = self._dt(day, hour)
+        return Appointment.objects.using("default").create(
+            patient_id=1,
+            doctor=self.doctor,
+            start_time=start,
+            end_time=start + timedelta(minutes=minutes),
+            status=status,
+        )
+
+    def test_writes_keep_rollups_current(self):
+        yesterday = self.today - timedelta(days=1)
+        appt = self._appointment(self.today, 9)
+        self._appointment(self.today, 9, minutes=15, status="cancelled")
+        self._appointment(yesterday, 14, minutes=45)
+
+        by_day = rollup_totals(yesterday, self.today, by="day")
+        self.assertEqual(by_day, {yesterday: BookedTime(45, 1), self.today: BookedTime(45, 2)})
+        self.assertEqual(
+            rollup_totals(self.today, self.today, by="status"),
+            {"scheduled": BookedTime(30, 1), "cancelled": BookedTime(15, 1)},
+        )
+
+        # Moving a booking refreshes both the old and the new date.
+        appt.start_time -= timedelta(days=1)
+        appt.end_time -= timedelta(days=1)
+        appt.save()
+        self.assertEqual(
+            rollup_totals(yesterday, self.today, by="day"),
+            {yesterday: BookedTime(75, 2), self.today: BookedTime(15, 1)},
+        )
+
+        appt.delete()
+        self.assertEqual(rollup_totals(yesterday, yesterday), BookedTime(45, 1))
+
+    def test_rooms_and_operations(self):
+        appt = self._appointment(self.today, 10)
+        AppointmentResource.objects.using("default").create(appointment=appt, resource=self.room)
+        Operation.objects.using("default").create(
+            patient_id=1,
+            primary_surgeon=self.doctor,
+            op_room=self.room,
+            op_type=self.op_type,
+            start_time=self._dt(self.today, 12),
+            end_time=self._dt(self.today, 13),
+            status="planned",
+        )
+
+        self.assertEqual(
+            rollup_totals(self.today, self.today, by="room"), {self.room.id: BookedTime(30, 1)}
+        )
+        self.assertEqual(
+            rollup_totals(self.today, self.today, kind="operation", by="hour"),
+            {12: BookedTime(60, 1)},
+        )
+
+    def test_rebuild_matches_incremental_rows(self):
+        for offset in range(3):
+            self._appointment(self.today - timedelta(days=offset), 8 + offset)
+        flush_rollups()
+        incremental = list(
+            DailyBookingRollup.objects.using("default").values_list(
+                "date", "hour", "doctor_id", "status", "count", "booked_seconds"
+            )
+        )
+
+        DailyBookingRollup.objects.using("default").all().delete()
+        out = StringIO()
+        call_command("rebuild_rollups", "--days", "7", "--chunk-days", "2", stdout=out)
+        self.assertIn("3 rollup rows", out.getvalue())
+        rebuilt = list(
+            DailyBookingRollup.objects.using("default").values_list(
+                "date", "hour", "doctor_id", "status", "count", "booked_seconds"
+            )
+        )
+        self.assertEqual(sorted(rebuilt), sorted(incremental))
+
+        # Recomputing is idempotent.
+        rebuild_rollups(self.today - timedelta(days=6), self.today)
+        self.assertEqual(DailyBookingRollup.objects.using("default").count(), 3)
+
+    def test_daily_trend_chart_matches_raw_queries(self):
+        self._appointment(self.today, 9)
+        self._appointment(self.today - timedelta(days=2), 11)
+
+        from_rollups = get_daily_trend_chart(days=7)
+        with override_settings(PRAXI_KPI_ROLLUPS=False):
+            from_rows = get_daily_trend_chart(days=7)
+        self.assertEqual(from_rollups, from_rows)
+        self.assertEqual(sum(from_rollups["datasets"][0]["data"]), 2)
+
+    def test_disabled_rollups_are_not_maintained(self):
+        with override_settings(PRAXI_KPI_ROLLUPS=False):
+            self._appointment(self.today, 9)
+        self.assertEqual(rollups._pending_dates(), set())
+        self.assertFalse(DailyBookingRollup.objects.using("default").exists())
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import threading
+from datetime import datetime, time, timedelta
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+from praxi_backend.appointments.kpi import snapshots
+from praxi_backend.appointments.kpi.executor import run_kpi_sections
+from praxi_backend.appointments.kpi.snapshots import (
+    get_kpi_cache_stats,
+    get_kpi_snapshot,
+    invalidate_kpi_snapshots,
+    register_kpi_snapshot,
+)
+from praxi_backend.appointments.models import Appointment
+from praxi_backend.core.models import Role, User
+
+
+@override_settings(PRAXI_KPI_CACHE_TTL=60, PRAXI_KPI_CACHE_STALE_TTL=300)
+class KpiSnapshotTest(TransactionTestCase):
+    """Snapshots are only stored outside transactions, hence TransactionTestCase."""
+
+    databases = {"default"}
+
+    def setUp(self):
+        caches["default"].clear()
+        self.addCleanup(caches["default"].clear)
+        self.addCleanup(snapshots._registry.pop, "test_counter", None)
+
+        self.calls = 0
+
+        def compute():
+            self.calls += 1
+            return {"calls": self.calls}
+
+        self.today = timezone.localdate()
+        register_kpi_snapshot("test_counter", compute, covers=lambda: self.today)
+
+        role_doctor, _ = Role.objects.using("default").get_or_create(
+            name="doctor", defaults={"label": "Arzt"}
+        )
+        self.doctor = User.objects.db_manager("default").create_user(
+            username="kpi_snapshot_doc",
+            email="kpi_snapshot_doc@example.com",
+            password="DummyPass123!",
+            role=role_doctor,
+        )
+
+    def _book(self, day):
+        start = timezone.make_aware(datetime.combine(day, time(9, 0)))
+        return Appointment.objects.using("default").create(
+            patient_id=1,
+            doctor=self.doctor,
+            start_time=start,
+            end_time=start + timedelta(minutes=30),
+        )
+
+    def test_fresh_snapshot_is_shared(self):
+        self.assertEqual(get_kpi_snapshot("test_counter"), {"calls": 1})
+        self.assertEqual(get_kpi_snapshot("test_counter"), {"calls": 1})
+        stats = get_kpi_cache_stats()["test_counter"]
+        self.assertEqual((stats["miss"], stats["hit"]), (1, 1))
+
+    def test_stale_snapshot_is_served_while_one_caller_refreshes(self):
+        get_kpi_snapshot("test_counter")
+        later = snapshots.time.time() + 120
+        with mock.patch.object(snapshots.time, "time", return_value=later):
+            # Another caller holds the refresh lock: the stale payload is returned.
+            caches["default"].add(f"{snapshots._key('test_counter')}:refreshing", 1)
+            self.assertEqual(get_kpi_snapshot("test_counter"), {"calls": 1})
+            caches["default"].delete(f"{snapshots._key('test_counter')}:refreshing")
+
+            self.assertEqual(get_kpi_snapshot("test_counter"), {"calls": 2})
+        stats = get_kpi_cache_stats()["test_counter"]
+        self.assertEqual((stats["stale"], stats["refresh"]), (1, 1))
+
+    @override_settings(PRAXI_KPI_PARALLEL_WORKERS=2, PRAXI_KPI_SECTION_TIMEOUT=0.2)
+    def test_payload_with_timed_out_section_is_not_stored(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        self.addCleanup(snapshots._registry.pop, "test_timeout", None)
+        slow = {"value": True}
+
+        def section():
+            if slow["value"]:
+                release.wait(5)
+            return 1
+
+        def compute():
+            self.calls += 1
+            run = run_kpi_sections("test", {"s": section}, empty={"s": 0}, variant="snap")
+            return {"calls": self.calls, "s": run.values["s"]}
+
+        register_kpi_snapshot("test_timeout", compute, covers=lambda: self.today)
+        self.assertEqual(get_kpi_snapshot("test_timeout"), {"calls": 1, "s": 0})
+
+        release.set()
+        slow["value"] = False
+        self.assertEqual(get_kpi_snapshot("test_timeout"), {"calls": 2, "s": 1})
+        self.assertEqual(get_kpi_snapshot("test_timeout"), {"calls": 2, "s": 1})
+
+    def test_writes_in_covered_range_invalidate(self):
+        get_kpi_snapshot("test_counter")
+
+        self._book(self.today - timedelta(days=3))
+        self.assertEqual(get_kpi_snapshot("test_counter"), {"calls": 1})
+
+        appt = self._book(self.today + timedelta(days=1))
+        self.assertEqual(get_kpi_snapshot("test_counter"), {"calls": 2})
+
+        # Moving a booking out of the range also touches its old date.
+        appt.start_time -= timedelta(days=10)
+        appt.end_time -= timedelta(days=10)
+        appt.save()
+        self.assertEqual(get_kpi_snapshot("test_counter"), {"calls": 3})
+
+        appt.delete()
+        self.assertEqual(get_kpi_snapshot("test_counter"), {"calls": 3})
+        self.assertEqual(get_kpi_cache_stats()["test_counter"]["invalidation"], 2)
+
+    def test_main_dashboard_kpis_follow_bookings(self):
+        self.assertEqual(get_kpi_snapshot("main_kpis")["appointments"]["today"], 0)
+        self._book(self.today)
+        self.assertEqual(get_kpi_snapshot("main_kpis")["appointments"]["today"], 1)
+
+        self.assertEqual(invalidate_kpi_snapshots(), ["main_kpis"])
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import random
+import statistics
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from praxi_backend.appointments.kpi.streaming import DurationStats, iter_bookings
+from praxi_backend.appointments.models import Appointment, Operation, OperationType, Resource
+from praxi_backend.core.models import Role, User
+
+
+class DurationStatsTest(TestCase):
+    def test_matches_statistics_module(self):
+        rnd = random.Random(7)
+        for size in (1, 2, 5, 40, 41):
+            values = [rnd.choice([10.0, 15.0, 20.0, 30.0, 45.0, 62.5]) for _ in range(size)]
+            stats = DurationStats()
+            for value in values:
+                stats.add(value)
+            self.assertEqual(stats.count, size)
+            self.assertEqual(stats.mean, statistics.mean(values))
+            self.assertEqual(stats.median, statistics.median(values))
+            self.assertEqual((stats.min, stats.max), (min(values), max(values)))
+        self.assertFalse(DurationStats())
+
+
+class StreamingReportCommandsTest(TestCase):
+    databases = {"default"}
+
+    def setUp(self):
+        role_doctor, _ = Role.objects.using("default").get_or_create(
+            name="doctor", defaults={"label": "Arzt"}
+        )
+        self.doctors = [
+            User.objects.db_manager("default").create_user(
+                username=f"stream_doc_{i}",
+                email=f"stream_doc_{i}@example.com",
+                password="DummyPass123!",
+                role=role_doctor,
+            )
+            for i in range(2)
+        ]
+        self.room = Resource.objects.using("default").create(name="Stream Raum", type="room")
+        self.op_type = OperationType.objects.using("default").create(
+            name="Stream-OP", prep_duration=0, op_duration=60, post_duration=0
+        )
+        self.base = timezone.now().replace(hour=9, minute=0, second=0, microsecond=0)
+
+    def _appointment(self, doctor, offset_minutes, minutes, days=0):
+        start = self.base + timedelta(days=days, minutes=offset_minutes)
+        return Appointment.objects.using("default").create(
+            patient_id=1,
+            doctor=doctor,
+            start_time=start,
+            end_time=start + timedelta(minutes=minutes),
+        )
+
+    def _operation(self, doctor, offset_minutes, minutes):
+        start = self.base + timedelta(minutes=offset_minutes)
+        return Operation.objects.using("default").create(
+            patient_id=1,
+            primary_surgeon=doctor,
+            op_room=self.room,
+            op_type=self.op_type,
+            start_time=start,
+            end_time=start + timedelta(minutes=minutes),
+            status="planned",
+        )
+
+    def test_iter_bookings_merges_in_doctor_order(self):
+        doc_a, doc_b = sorted(self.doctors, key=lambda d: d.id)
+        self._appointment(doc_b, 0, 30)
+        self._operation(doc_a, 30, 60)
+        self._appointment(doc_a, 0, 30)
+        self._appointment(doc_a, 0, 30, days=-40)
+
+        bookings = list(iter_bookings(chunk_size=2))
+        self.assertEqual(
+            [(b.kind, b.doctor_id) for b in bookings],
+            [
+                ("appointment", doc_a.id),
+                ("appointment", doc_a.id),
+                ("operation", doc_a.id),
+                ("appointment", doc_b.id),
+            ],
+        )
+        self.assertEqual(bookings[2].room_id, self.room.id)
+        self.assertEqual(bookings[2].duration_minutes, 60)
+
+        recent = list(iter_bookings(since=self.base - timedelta(days=1)))
+        self.assertEqual(len(recent), 3)
+
+    def test_calculate_kpis_counts_overlaps_and_window(self):
+        doc = self.doctors[0]
+        # Three mutually overlapping bookings -> three pairs; the fourth is free.
+        self._appointment(doc, 0, 60)
+        self._appointment(doc, 15, 30)
+        self._operation(doc, 30, 60)
+        self._appointment(doc, 120, 30)
+        self._appointment(doc, 0, 30, days=-40)
+
+        out = StringIO()
+        call_command("calculate_kpis", "--part", "3", stdout=out)
+        self.assertRegex(out.getvalue(), r"Arzt-Doppelbelegungen\s+│\s+3\s+│")
+
+        since = timezone.localdate(self.base - timedelta(days=1)).isoformat()
+        out = StringIO()
+        call_command("calculate_kpis", "--part", "4", "--since", since, stdout=out)
+        self.assertIn("Gesamtzahl Termine             │ 3 ", out.getvalue())
+        self.assertIn("Gesamtzahl Operationen         │ 1 ", out.getvalue())
+
+    def test_efficiency_kpis_reports_conflicts(self):
+        doc = self.doctors[0]
+        self._appointment(doc, 0, 60)
+        self._appointment(doc, 30, 30)
+        self._operation(doc, 120, 60)
+        self._operation(self.doctors[1], 150, 60)
+
+        out = StringIO()
+        call_command("efficiency_kpis", stdout=out)
+        report = out.getvalue()
+        self.assertIn("Gesamte Planungen:            4", report)
+        self.assertRegex(report, r"doctor_overlap\s+1 ")
+        self.assertRegex(report, r"room_overlap\s+1 ")
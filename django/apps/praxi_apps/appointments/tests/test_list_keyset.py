@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, time, timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from praxi_backend.appointments.models import Appointment, Operation, OperationType, Resource
+from praxi_backend.core import pagination
+from praxi_backend.core.models import Role, User
+from praxi_backend.patients.models import Patient
+from rest_framework.test import APIClient
+
+
+class ListKeysetTest(TestCase):
+    """Appointment/operation lists: keyset pages and streaming export."""
+
+    databases = {"default"}
+
+    def setUp(self):
+        role_admin, _ = Role.objects.using("default").get_or_create(
+            name="admin", defaults={"label": "Administrator"}
+        )
+        self.admin = User.objects.db_manager("default").create_user(
+            username="keyset_admin",
+            password="DummyPass123!",
+            email="keyset_admin@example.com",
+            role=role_admin,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+        for pid in (7001, 7002, 7003):
+            Patient.objects.using("default").create(id=pid, first_name="Kim", last_name=f"P{pid}")
+
+        day = timezone.localdate() + timedelta(days=3)
+        base = timezone.make_aware(datetime.combine(day, time(8, 0)))
+        # Same start times on purpose: the id breaks ties, microseconds must survive.
+        starts = [base, base, base + timedelta(microseconds=1500), base + timedelta(hours=1)]
+        starts += [base + timedelta(hours=h) for h in range(2, 7)]
+        self.appointments = [
+            Appointment.objects.using("default").create(
+                patient_id=7001 + i % 3,
+                doctor=self.admin,
+                start_time=start,
+                end_time=start + timedelta(minutes=30),
+                status="scheduled",
+            )
+            for i, start in enumerate(starts)
+        ]
+        self.expected_ids = [
+            a.id for a in sorted(self.appointments, key=lambda a: (a.start_time, a.id))
+        ]
+
+    def _pages(self, url, limit):
+        ids, cursor, pages = [], None, 0
+        while True:
+            params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            ids += [row["id"] for row in response.data["results"]]
+            pages += 1
+            cursor = response.data["next_cursor"]
+            if cursor is None:
+                return ids, pages
+
+    def test_keyset_pages_cover_all_rows_once(self):
+        ids, pages = self._pages("/api/appointments/", 2)
+        self.assertEqual(ids, self.expected_ids)
+        self.assertEqual(pages, 5)
+
+    def test_default_list_is_unchanged(self):
+        response = self.client.get("/api/appointments/")
+        self.assertEqual([row["id"] for row in response.data], self.expected_ids)
+        self.assertIn("P7001", response.data[0]["patient_name"])
+
+    def test_invalid_cursor_and_stream_format(self):
+        for params in (
+            {"cursor": "nope"},
+            {"cursor": pagination.encode_cursor(["x", 1])},
+            {"cursor": pagination.encode_cursor([[1], 1])},
+        ):
+            response = self.client.get("/api/appointments/", params)
+            self.assertEqual(response.status_code, 400)
+        response = self.client.get("/api/appointments/", {"stream": "xml"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_stream_json_and_ndjson(self):
+        default = self.client.get("/api/appointments/").json()
+
+        original = pagination.STREAM_CHUNK_SIZE
+        self.addCleanup(setattr, pagination, "STREAM_CHUNK_SIZE", original)
+        pagination.STREAM_CHUNK_SIZE = 4
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/api/appointments/", {"stream": "json"})
+            body = b"".join(response.streaming_content)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(json.loads(body), default)
+        # Three chunks, each with its own patient name lookup.
+        patient_queries = [q for q in ctx.captured_queries if '"patients"' in q["sql"]]
+        self.assertEqual(len(patient_queries), 3)
+
+        response = self.client.get("/api/appointments/", {"stream": "ndjson"})
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual([json.loads(line) for line in lines], default)
+
+    def test_operations_keyset(self):
+        op_type = OperationType.objects.using("default").create(
+            name="Keyset OP", prep_duration=0, op_duration=30, post_duration=0
+        )
+        room = Resource.objects.using("default").create(name="Keyset OP 1", type="room")
+        start = self.appointments[0].start_time
+        ops = [
+            Operation.objects.using("default").create(
+                patient_id=7001,
+                primary_surgeon=self.admin,
+                op_room=room,
+                op_type=op_type,
+                start_time=start + timedelta(hours=h),
+                end_time=start + timedelta(hours=h, minutes=30),
+                status="planned",
+            )
+            for h in range(3)
+        ]
+        ids, _ = self._pages("/api/operations/", 2)
+        self.assertEqual(ids, [op.id for op in ops])
+
+        response = self.client.get("/api/operations/", {"stream": "ndjson"})
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)["id"] for line in lines], ids)
@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from praxi_backend.appointments import live_events
+from praxi_backend.appointments.live_events import (
+    OPERATIONS,
+    PATIENT_FLOW,
+    RESET,
+    LiveEvent,
+    LiveEventBroadcaster,
+)
+from praxi_backend.appointments.models import (
+    Appointment,
+    Operation,
+    OperationType,
+    PatientFlow,
+    Resource,
+)
+from praxi_backend.core.models import Role, User
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+def _event(broadcaster, channel=OPERATIONS, doctor_ids=()):
+    return LiveEvent(
+        id=broadcaster.next_id(),
+        channel=channel,
+        type="operation.updated",
+        data={},
+        doctor_ids=tuple(doctor_ids),
+    )
+
+
+class LiveEventBroadcasterTest(SimpleTestCase):
+    def test_delivers_across_threads_and_replays(self):
+        broadcaster = LiveEventBroadcaster()
+        first = _event(broadcaster)
+        broadcaster.deliver(first)
+
+        async def scenario():
+            sub, backlog, head = broadcaster.subscribe([OPERATIONS])
+            self.assertEqual(backlog, [])
+            self.assertEqual(head, first.id)
+
+            # Resume after the first event: nothing missed yet.
+            _, resumed, _ = broadcaster.subscribe([OPERATIONS], first.id - 1)
+            self.assertEqual(resumed, [first])
+
+            second = _event(broadcaster)
+            thread = threading.Thread(target=broadcaster.deliver, args=(second,))
+            thread.start()
+            received = await asyncio.wait_for(sub.queue.get(), timeout=5)
+            thread.join()
+            self.assertEqual(received, second)
+
+            # Other channels are not delivered.
+            broadcaster.deliver(_event(broadcaster, channel=PATIENT_FLOW))
+            await asyncio.sleep(0)
+            self.assertTrue(sub.queue.empty())
+
+        asyncio.run(scenario())
+
+    def test_reset_when_events_are_gone(self):
+        broadcaster = LiveEventBroadcaster(buffer_size=2)
+        events = [_event(broadcaster) for _ in range(3)]
+        for event in events:
+            broadcaster.deliver(event)
+
+        async def scenario():
+            _, backlog, _ = broadcaster.subscribe([OPERATIONS], events[1].id)
+            self.assertEqual(backlog, [events[2]])
+            _, backlog, _ = broadcaster.subscribe([OPERATIONS], events[0].id - 1)
+            self.assertIsNone(backlog)
+
+            sub, _, _ = broadcaster.subscribe([OPERATIONS])
+            with mock.patch.object(live_events, "SUBSCRIBER_QUEUE_SIZE", 1):
+                for _ in range(3):
+                    broadcaster.deliver(_event(broadcaster))
+                await asyncio.sleep(0)
+            self.assertEqual(sub.queue.qsize(), 2)
+            sub.queue.get_nowait()
+            self.assertIs(sub.queue.get_nowait(), RESET)
+
+        asyncio.run(scenario())
+
+    def test_out_of_order_ids_reset_resuming_streams(self):
+        broadcaster = LiveEventBroadcaster()
+        early, late = _event(broadcaster), _event(broadcaster)
+        broadcaster.deliver(late)
+        broadcaster.deliver(early)
+
+        async def scenario():
+            # A stream that stopped after "late" never saw "early".
+            _, backlog, head = broadcaster.subscribe([OPERATIONS], late.id)
+            self.assertIsNone(backlog)
+            _, backlog, _ = broadcaster.subscribe([OPERATIONS], head)
+            self.assertEqual(backlog, [])
+            self.assertGreater(broadcaster.next_id(), late.id)
+
+        asyncio.run(scenario())
+
+    def test_redis_ids_come_from_one_sequence(self):
+        client = mock.Mock()
+        client.eval.return_value = b"42"
+        with (
+            override_settings(PRAXI_LIVE_EVENTS_REDIS_URL="redis://example"),
+            mock.patch.object(live_events, "_redis_client", return_value=client),
+        ):
+            event = live_events.publish(OPERATIONS, "operation.updated", {}, [3, None])
+        self.assertEqual(event.id, 42)
+        self.assertEqual(event.doctor_ids, (3,))
+        client.eval.assert_called_once_with(
+            live_events.REDIS_NEXT_ID_SCRIPT, 1, live_events.REDIS_ID_KEY
+        )
+        client.publish.assert_called_once_with(live_events.REDIS_CHANNEL, event.to_json())
+
+    def test_visibility(self):
+        event = LiveEvent(id=1, channel=OPERATIONS, type="x", data={}, doctor_ids=(5,))
+        self.assertTrue(event.visible_to(1, "assistant"))
+        self.assertTrue(event.visible_to(5, "doctor"))
+        self.assertFalse(event.visible_to(6, "doctor"))
+        self.assertEqual(LiveEvent.from_json(event.to_json()), event)
+
+
+@override_settings(
+    PRAXI_LIVE_EVENTS=True, PRAXI_LIVE_EVENTS_HEARTBEAT=1, PRAXI_LIVE_EVENTS_MAX_SECONDS=5
+)
+class LiveEventSignalsTest(TestCase):
+    databases = {"default"}
+
+    def setUp(self):
+        self.broadcaster = LiveEventBroadcaster()
+        patcher = mock.patch.object(live_events, "broadcaster", self.broadcaster)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        role_admin, _ = Role.objects.using("default").get_or_create(
+            name="admin", defaults={"label": "Administrator"}
+        )
+        role_doctor, _ = Role.objects.using("default").get_or_create(
+            name="doctor", defaults={"label": "Arzt"}
+        )
+        self.admin = User.objects.db_manager("default").create_user(
+            username="live_admin",
+            email="live_admin@example.com",
+            password="DummyPass123!",
+            role=role_admin,
+        )
+        self.doctor = User.objects.db_manager("default").create_user(
+            username="live_doc",
+            email="live_doc@example.com",
+            password="DummyPass123!",
+            role=role_doctor,
+        )
+        self.other_doctor = User.objects.db_manager("default").create_user(
+            username="live_doc2",
+            email="live_doc2@example.com",
+            password="DummyPass123!",
+            role=role_doctor,
+        )
+        self.op_type = OperationType.objects.using("default").create(
+            name="Live OP", prep_duration=0, op_duration=60, post_duration=0
+        )
+        self.room = Resource.objects.using("default").create(name="Live OP 1", type="room")
+        self.room2 = Resource.objects.using("default").create(name="Live OP 2", type="room")
+
+    def _events(self):
+        return list(self.broadcaster._buffer)
+
+    def _asgi_get(self, user, path, **headers):
+        headers["Authorization"] = f"Bearer {AccessToken.for_user(user)}"
+        return async_to_sync(AsyncClient().get)(path, headers=headers)
+
+    def _operation(self):
+        start = timezone.now() + timedelta(hours=1)
+        return Operation.objects.using("default").create(
+            patient_id=1,
+            primary_surgeon=self.doctor,
+            op_room=self.room,
+            op_type=self.op_type,
+            start_time=start,
+            end_time=start + timedelta(hours=1),
+            status=Operation.STATUS_PLANNED,
+        )
+
+    def test_operation_and_flow_events(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            op = self._operation()
+        with self.captureOnCommitCallbacks(execute=True):
+            op = Operation.objects.using("default").get(pk=op.pk)
+            op.status = Operation.STATUS_RUNNING
+            op.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            op.op_room = self.room2
+            op.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            op.notes = "Notiz"
+            op.save()
+
+        start = timezone.now()
+        appointment = Appointment.objects.using("default").create(
+            patient_id=1,
+            doctor=self.other_doctor,
+            start_time=start,
+            end_time=start + timedelta(minutes=30),
+            status="scheduled",
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            flow = PatientFlow.objects.using("default").create(appointment=appointment)
+        with self.captureOnCommitCallbacks(execute=True):
+            op.delete()
+
+        events = self._events()
+        self.assertEqual(
+            [e.type for e in events],
+            [
+                "operation.created",
+                "operation.status",
+                "operation.moved",
+                "operation.updated",
+                "patient_flow.created",
+                "operation.deleted",
+            ],
+        )
+        self.assertEqual(events[1].data["previous"], {"status": Operation.STATUS_PLANNED})
+        self.assertEqual(events[2].data["previous"], {"op_room_id": self.room.id})
+        self.assertEqual(events[0].doctor_ids, (self.doctor.id,))
+        self.assertEqual(events[4].data["id"], flow.id)
+        self.assertEqual(events[4].doctor_ids, (self.other_doctor.id,))
+        self.assertEqual([e.id for e in events], sorted(e.id for e in events))
+
+    def test_flow_doctors_resolved_after_commit(self):
+        start = timezone.now()
+        appointment = Appointment.objects.using("default").create(
+            patient_id=1,
+            doctor=self.other_doctor,
+            start_time=start,
+            end_time=start + timedelta(minutes=30),
+            status="scheduled",
+        )
+        with mock.patch.object(
+            live_events, "_flow_doctors", wraps=live_events._flow_doctors
+        ) as flow_doctors:
+            with self.captureOnCommitCallbacks() as callbacks:
+                PatientFlow.objects.using("default").create(appointment=appointment)
+            flow_doctors.assert_not_called()
+            for callback in callbacks:
+                callback()
+            flow_doctors.assert_called_once_with(None, appointment.id)
+        self.assertEqual(self._events()[-1].doctor_ids, (self.other_doctor.id,))
+
+    @override_settings(PRAXI_LIVE_EVENTS=False)
+    def test_disabled(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self._operation()
+        self.assertEqual(self._events(), [])
+        client = APIClient()
+        client.force_authenticate(user=self.admin)
+        self.assertEqual(client.get("/api/live/events/").status_code, 404)
+
+    def test_wsgi_requests_are_refused(self):
+        client = APIClient()
+        client.force_authenticate(user=self.admin)
+        response = client.get("/api/live/events/", HTTP_ACCEPT="text/event-stream")
+        self.assertEqual(response.status_code, 501)
+
+    def test_stream_endpoint(self):
+        self.assertEqual(
+            self._asgi_get(self.admin, "/api/live/events/?channels=rooms").status_code, 400
+        )
+
+        response = self._asgi_get(self.admin, "/api/live/events/", Accept="text/event-stream")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+        doctor_response = self._asgi_get(self.other_doctor, "/api/live/events/?channels=operations")
+
+        async def read():
+            admin_stream = response.streaming_content
+            doctor_stream = doctor_response.streaming_content
+            chunks = [await anext(admin_stream), await anext(admin_stream)]
+            doctor_chunks = [await anext(doctor_stream), await anext(doctor_stream)]
+
+            live_events.publish(OPERATIONS, "operation.status", {"id": 7}, [self.doctor.id])
+            chunks.append(await anext(admin_stream))
+            # Not on the team: the doctor's stream only sees the heartbeat.
+            doctor_chunks.append(await anext(doctor_stream))
+            await admin_stream.aclose()
+            await doctor_stream.aclose()
+            return chunks, doctor_chunks
+
+        chunks, doctor_chunks = asyncio.run(read())
+        chunks = [c.decode() if isinstance(c, bytes) else c for c in chunks]
+        doctor_chunks = [c.decode() if isinstance(c, bytes) else c for c in doctor_chunks]
+        self.assertTrue(chunks[0].startswith("retry:"))
+        self.assertIn("event: ready", chunks[1])
+        self.assertIn("event: operation.status", chunks[2])
+        self.assertEqual(json.loads(chunks[2].split("data: ", 1)[1]), {"id": 7})
+        self.assertEqual(doctor_chunks[2], ": keepalive\n\n")
+        self.assertEqual(self.broadcaster.subscriber_count(), 0)
+
+        # Resume from the ready id: the missed event is replayed.
+        ready_id = chunks[1].split("\n")[0].removeprefix("id: ")
+        resumed = self._asgi_get(self.admin, "/api/live/events/", **{"Last-Event-ID": ready_id})
+
+        async def read_resumed():
+            stream = resumed.streaming_content
+            chunks = [await anext(stream), await anext(stream)]
+            await stream.aclose()
+            return chunks
+
+        replayed = asyncio.run(read_resumed())[1]
+        replayed = replayed.decode() if isinstance(replayed, bytes) else replayed
+        self.assertIn("event: operation.status", replayed)
@@ -2,9 +2,21 @@ from __future__ import annotations
 
 from datetime import datetime, time, timedelta
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
-from praxi_backend.appointments.models import DoctorHours, OperationType, PracticeHours, Resource
+from praxi_backend.appointments.models import (
+    Appointment,
+    AppointmentType,
+    DoctorBreak,
+    DoctorHours,
+    Operation,
+    OperationType,
+    PracticeHours,
+    Resource,
+)
+from praxi_backend.appointments.serializers import OperationCreateUpdateSerializer
 from praxi_backend.core.models import AuditLog, Role, User
 from rest_framework.test import APIClient
 
@@ -183,3 +195,132 @@ class OperationPlanningMiniTest(TestCase):
         self.assertIn("operations", r_cal.data)
         ops = r_cal.data.get("operations") or []
         self.assertGreaterEqual(len(ops), 1)
+
+
+class OperationSuggestSlotFinderTest(OperationPlanningMiniTest):
+    """Suggest-Endpoint: Slot-Finder liefert dieselben Slots wie die Serializer-Prüfung."""
+
+    def setUp(self):
+        super().setUp()
+        tz = timezone.get_current_timezone()
+        self.doctor_c = User.objects.db_manager("default").create_user(
+            username="doctor_operation_c",
+            email="doctor_operation_c@example.com",
+            password="DummyPass123!",
+            role=Role.objects.using("default").get(name="doctor"),
+        )
+        weekday = self.monday.weekday()
+        PracticeHours.objects.using("default").create(
+            weekday=weekday, start_time=time(13, 0), end_time=time(17, 0), active=True
+        )
+        for doctor in (self.doctor_a, self.doctor_b, self.doctor_c):
+            DoctorHours.objects.using("default").create(
+                doctor=doctor, weekday=weekday, start_time=time(13, 0), end_time=time(17, 0)
+            )
+        DoctorBreak.objects.using("default").create(
+            doctor=self.doctor_b, date=self.monday, start_time=time(13, 0), end_time=time(13, 40)
+        )
+        appt_type = AppointmentType.objects.using("default").create(name="Kontrolle")
+        Appointment.objects.using("default").create(
+            patient_id=1,
+            doctor=self.doctor_c,
+            type=appt_type,
+            start_time=timezone.make_aware(datetime.combine(self.monday, time(10, 0)), tz),
+            end_time=timezone.make_aware(datetime.combine(self.monday, time(11, 15)), tz),
+        )
+        Operation.objects.using("default").create(
+            patient_id=2,
+            primary_surgeon=self.doctor_a,
+            op_room=Resource.objects.using("default").create(name="OP 2", type="room"),
+            op_type=self.op_type,
+            start_time=timezone.make_aware(datetime.combine(self.monday, time(13, 30)), tz),
+            end_time=timezone.make_aware(datetime.combine(self.monday, time(14, 20)), tz),
+        )
+
+    # test_operation_conflict_suggest_and_calendar also runs on the extended fixture.
+
+    def _params(self, **overrides):
+        params = {
+            "patient_id": self.patient_id,
+            "primary_surgeon_id": self.doctor_a.id,
+            "assistant_id": self.doctor_b.id,
+            "anesthesist_id": self.doctor_c.id,
+            "op_type_id": self.op_type.id,
+            "op_room_id": self.op_room.id,
+            "op_device_ids": str(self.device.id),
+            "start_date": self.monday.isoformat(),
+            "limit": 5,
+        }
+        params.update(overrides)
+        return params
+
+    def test_matches_serializer_scan(self):
+        # Referenz: jeden 5-Minuten-Kandidaten einzeln mit dem Serializer prüfen.
+        tz = timezone.get_current_timezone()
+        expected = []
+        for window_start, window_end in ((time(10, 0), time(12, 0)), (time(13, 0), time(17, 0))):
+            candidate = timezone.make_aware(datetime.combine(self.monday, window_start), tz)
+            end = timezone.make_aware(datetime.combine(self.monday, window_end), tz)
+            while candidate < end:
+                ser = OperationCreateUpdateSerializer(
+                    data={
+                        "patient_id": self.patient_id,
+                        "primary_surgeon": self.doctor_a.id,
+                        "assistant": self.doctor_b.id,
+                        "anesthesist": self.doctor_c.id,
+                        "op_room": self.op_room.id,
+                        "op_device_ids": [self.device.id],
+                        "op_type": self.op_type.id,
+                        "start_time": self._iso_z(candidate),
+                        "status": "planned",
+                        "notes": "",
+                    }
+                )
+                if ser.is_valid():
+                    expected.append(candidate)
+                    break
+                candidate = candidate + timedelta(minutes=5)
+
+        r = self.client.get("/api/operations/suggest/", self._params())
+        self.assertEqual(r.status_code, 200)
+        starts = [s["start_time"] for s in r.data["suggestions"]]
+        self.assertEqual(starts, [self._iso_z(c) for c in expected])
+        # Anästhesist bis 11:15 belegt, Assistent bis 13:40 in Pause, Operateur bis 14:20 im OP.
+        self.assertEqual(len(starts), 1)
+        self.assertIn("T14:20:00", starts[0])
+
+    def test_query_count_is_bounded(self):
+        with CaptureQueriesContext(connection) as short_search:
+            r = self.client.get("/api/operations/suggest/", self._params(limit=1))
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(len(r.data["suggestions"]), 1)
+
+        # Anästhesist am Nachmittag mit vielen Terminen belegt: deutlich mehr
+        # Kandidaten werden verworfen, die Query-Anzahl bleibt gleich.
+        tz = timezone.get_current_timezone()
+        appt_type = AppointmentType.objects.using("default").get(name="Kontrolle")
+        for i in range(8):
+            start = timezone.make_aware(datetime.combine(self.monday, time(14, 0)), tz)
+            start = start + timedelta(minutes=15 * i)
+            Appointment.objects.using("default").create(
+                patient_id=100 + i,
+                doctor=self.doctor_c,
+                type=appt_type,
+                start_time=start,
+                end_time=start + timedelta(minutes=10),
+            )
+        with CaptureQueriesContext(connection) as long_search:
+            r = self.client.get("/api/operations/suggest/", self._params())
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(len(r.data["suggestions"]), 1)
+        self.assertIn("T15:55:00", r.data["suggestions"][0]["start_time"])
+        self.assertEqual(len(long_search), len(short_search))
+
+    def test_invalid_team_member_yields_no_suggestions(self):
+        r = self.client.get("/api/operations/suggest/", self._params(assistant_id=self.admin.id))
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.data["suggestions"], [])
+
+        r = self.client.get("/api/operations/suggest/", self._params(op_device_ids="999999"))
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.data["suggestions"], [])
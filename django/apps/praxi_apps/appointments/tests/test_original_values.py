@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.db.models.signals import post_init
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from praxi_backend.appointments.models import Appointment, PatientFlow
+from praxi_backend.appointments.original_values import original_values
+from praxi_backend.core.models import Role, User
+
+
+@override_settings(PRAXI_CONDITIONAL_GET=False, PRAXI_KPI_ROLLUPS=False, PRAXI_LIVE_EVENTS=False)
+class OriginalValuesTest(TestCase):
+    """One shared post_init snapshot, limited to the fields of enabled features."""
+
+    databases = {"default"}
+
+    def setUp(self):
+        role_doctor, _ = Role.objects.using("default").get_or_create(
+            name="doctor", defaults={"label": "Arzt"}
+        )
+        self.doctor = User.objects.db_manager("default").create_user(
+            username="orig_doc",
+            email="orig_doc@example.com",
+            password="DummyPass123!",
+            role=role_doctor,
+        )
+        start = timezone.now().replace(microsecond=0)
+        self.appointment = Appointment.objects.using("default").create(
+            patient_id=1,
+            doctor=self.doctor,
+            start_time=start,
+            end_time=start + timedelta(minutes=30),
+            status="scheduled",
+        )
+        self.flow = PatientFlow.objects.using("default").create(appointment=self.appointment)
+
+    def test_one_receiver_per_model(self):
+        self.assertEqual(len(post_init._live_receivers(Appointment)[0]), 1)
+
+    def test_only_enabled_fields_are_kept(self):
+        appointment = Appointment.objects.using("default").get(pk=self.appointment.pk)
+        # KPI snapshot invalidation is always on.
+        self.assertEqual(set(original_values(appointment)), {"start_time", "end_time"})
+        self.assertEqual(original_values(PatientFlow.objects.using("default").get()), {})
+
+        with self.settings(PRAXI_LIVE_EVENTS=True, PRAXI_CONDITIONAL_GET=True):
+            flow = PatientFlow.objects.using("default").get()
+            self.assertEqual(original_values(flow)["status"], PatientFlow.STATUS_REGISTERED)
+            appointment = Appointment.objects.using("default").get(pk=self.appointment.pk)
+            self.assertEqual(set(original_values(appointment)), {"start_time", "end_time"})
+
+    def test_refreshed_after_save(self):
+        appointment = Appointment.objects.using("default").get(pk=self.appointment.pk)
+        moved = appointment.start_time + timedelta(days=1)
+        appointment.start_time = moved
+        self.assertEqual(original_values(appointment)["start_time"], self.appointment.start_time)
+        appointment.save()
+        self.assertEqual(original_values(appointment)["start_time"], moved)
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from datetime import datetime, time, timedelta
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from praxi_backend.appointments.models import (
+    Appointment,
+    PatientFlow,
+    PatientFlowTransition,
+)
+from praxi_backend.core.models import Role, User
+from rest_framework.test import APIClient
+
+
+class PatientFlowTransitionTest(TestCase):
+    """Wait/treatment times come from prefetched status transitions."""
+
+    databases = {"default"}
+
+    def setUp(self):
+        role_admin, _ = Role.objects.using("default").get_or_create(
+            name="admin", defaults={"label": "Administrator"}
+        )
+        role_doctor, _ = Role.objects.using("default").get_or_create(
+            name="doctor", defaults={"label": "Arzt"}
+        )
+        self.admin = User.objects.db_manager("default").create_user(
+            username="flow_tx_admin",
+            email="flow_tx_admin@example.com",
+            password="DummyPass123!",
+            role=role_admin,
+        )
+        self.doctor = User.objects.db_manager("default").create_user(
+            username="flow_tx_doc",
+            email="flow_tx_doc@example.com",
+            password="DummyPass123!",
+            role=role_doctor,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+        self.tz = timezone.get_current_timezone()
+        self.day = timezone.localdate() - timedelta(days=1)
+
+    def _at(self, hour, minute=0):
+        return timezone.make_aware(datetime.combine(self.day, time(hour, minute)), self.tz)
+
+    def _flow(self, patient_id):
+        start = self._at(8)
+        appointment = Appointment.objects.using("default").create(
+            patient_id=patient_id,
+            doctor=self.doctor,
+            start_time=start,
+            end_time=start + timedelta(minutes=30),
+            status="scheduled",
+        )
+        return PatientFlow.objects.using("default").create(
+            appointment=appointment, arrival_time=start
+        )
+
+    def _set_status(self, flow, new_status, at, via_detail=False):
+        url = (
+            f"/api/patient-flow/{flow.id}/"
+            if via_detail
+            else f"/api/patient-flow/{flow.id}/status/"
+        )
+        with patch("django.utils.timezone.now", return_value=at):
+            response = self.client.patch(url, {"status": new_status}, format="json")
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def _treat(self, flow):
+        self._set_status(flow, PatientFlow.STATUS_WAITING, self._at(8, 5))
+        self._set_status(flow, PatientFlow.STATUS_PREPARING, self._at(8, 10))
+        response = self._set_status(flow, PatientFlow.STATUS_IN_TREATMENT, self._at(8, 20))
+        self._set_status(flow, PatientFlow.STATUS_POST_TREATMENT, self._at(8, 50))
+        self._set_status(flow, PatientFlow.STATUS_DONE, self._at(9, 0), via_detail=True)
+        return response
+
+    def _list_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/api/patient-flow/")
+        self.assertEqual(response.status_code, 200)
+        return response, len(ctx.captured_queries)
+
+    def test_transitions_recorded_and_times_computed(self):
+        flow = self._flow(1)
+        response = self._treat(flow)
+        # The status response already sees the new transition.
+        self.assertEqual(response.data["wait_time_minutes"], 20)
+
+        self.assertEqual(
+            list(
+                PatientFlowTransition.objects.using("default")
+                .filter(flow=flow)
+                .values_list("from_status", "to_status", "changed_at")
+            ),
+            [
+                (PatientFlow.STATUS_REGISTERED, PatientFlow.STATUS_WAITING, self._at(8, 5)),
+                (PatientFlow.STATUS_WAITING, PatientFlow.STATUS_PREPARING, self._at(8, 10)),
+                (PatientFlow.STATUS_PREPARING, PatientFlow.STATUS_IN_TREATMENT, self._at(8, 20)),
+                (
+                    PatientFlow.STATUS_IN_TREATMENT,
+                    PatientFlow.STATUS_POST_TREATMENT,
+                    self._at(8, 50),
+                ),
+                (PatientFlow.STATUS_POST_TREATMENT, PatientFlow.STATUS_DONE, self._at(9, 0)),
+            ],
+        )
+
+        response = self.client.get(f"/api/patient-flow/{flow.id}/")
+        self.assertEqual(response.data["wait_time_minutes"], 20)
+        self.assertEqual(response.data["treatment_time_minutes"], 40)
+
+    def test_list_queries_do_not_grow_with_flows(self):
+        self._treat(self._flow(1))
+        response, few = self._list_queries()
+        self.assertEqual(len(response.data), 1)
+
+        for patient_id in range(2, 7):
+            self._treat(self._flow(patient_id))
+        response, many = self._list_queries()
+        self.assertEqual(len(response.data), 6)
+        self.assertEqual(few, many)
+        for row in response.data:
+            self.assertEqual(row["wait_time_minutes"], 20)
+            self.assertEqual(row["treatment_time_minutes"], 40)
@@ -17,7 +17,10 @@ ARCHITECTURE RULES (from copilot-instructions.md)
 ==============================================================================
 """
 
+from django.db import connections
 from django.test import TestCase
+from praxi_backend.appointments.models import Appointment
+from praxi_backend.appointments.services.index_benchmark import run_index_benchmark
 from praxi_backend.appointments.services.scheduling_benchmark import (
     BenchmarkContext,
     BenchmarkReport,
@@ -30,6 +33,7 @@ from praxi_backend.appointments.services.scheduling_benchmark import (
     benchmark_randomized,
     benchmark_room_conflicts,
     benchmark_single_day_load,
+    benchmark_slot_suggestions,
     benchmark_working_hours_validation,
     generate_report,
 )
@@ -352,6 +356,69 @@ class BenchmarkRandomizedTest(TestCase):
         self.assertGreater(result.items_created, 0)
 
 
+class BenchmarkSlotSuggestionsTest(TestCase):
+    """Test slot suggestion benchmark."""
+
+    databases = {"default"}
+
+    def setUp(self):
+        self.ctx = BenchmarkContext(seed=6007)
+        self.ctx.setup()
+
+    def test_reports_queries_per_request(self):
+        """Every request should be counted and find a slot after the booked days."""
+        result = benchmark_slot_suggestions(self.ctx, n_requests=3, busy_days=7)
+
+        self.assertEqual(result.name, "slot_suggestions")
+        self.assertEqual(len(result.metadata["queries_per_request"]), 3)
+        self.assertEqual(result.metadata["suggestions_found"], 3)
+        self.assertGreater(result.queries.queries_per_op, 0)
+
+    def test_query_count_is_independent_of_booked_days(self):
+        """Scanning past more booked days should not cost more queries."""
+        short = benchmark_slot_suggestions(self.ctx, n_requests=1, busy_days=2)
+
+        ctx2 = BenchmarkContext(seed=6008)
+        ctx2.setup()
+        long = benchmark_slot_suggestions(ctx2, n_requests=1, busy_days=10)
+
+        self.assertEqual(
+            short.metadata["max_queries_per_request"],
+            long.metadata["max_queries_per_request"],
+        )
+
+
+class IndexBenchmarkTest(TestCase):
+    """Test the scheduling index benchmark."""
+
+    databases = {"default"}
+
+    def _appointment_indexes(self):
+        with connections["default"].cursor() as cursor:
+            constraints = connections["default"].introspection.get_constraints(
+                cursor, Appointment._meta.db_table
+            )
+        return {name for name, info in constraints.items() if info["index"]}
+
+    def test_measures_all_variants_and_rolls_back(self):
+        """Every shape is measured without/with indexes; nothing persists."""
+        before = self._appointment_indexes()
+
+        report = run_index_benchmark(n_appointments=2000, iterations=2, num_doctors=3)
+
+        self.assertIn("doctor_overlap", report.shapes)
+        for name, results in report.shapes.items():
+            variants = [r.variant for r in results]
+            self.assertEqual(variants[:2], ["without", "with"], name)
+            self.assertTrue(all(r.plan for r in results), name)
+        self.assertEqual(report.shapes["range_overlap"][-1].variant, "gist")
+        self.assertEqual(report.to_dict()["appointments"], 2000)
+
+        self.assertEqual(self._appointment_indexes(), before)
+        self.assertIn("appt_doctor_start_end_idx", before)
+        self.assertEqual(Appointment.objects.using("default").count(), 0)
+
+
 class BenchmarkFullEngineTest(TestCase):
     """Test full engine benchmark."""
 
@@ -378,6 +445,7 @@ class BenchmarkFullEngineTest(TestCase):
         self.assertIn("working_hours_validation", benchmark_names)
         self.assertIn("room_conflicts", benchmark_names)
         self.assertIn("randomized", benchmark_names)
+        self.assertIn("slot_suggestions", benchmark_names)
 
     def test_generates_summary(self):
         """Report should include summary."""
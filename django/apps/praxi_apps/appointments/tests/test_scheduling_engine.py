@@ -13,8 +13,9 @@ No patient ForeignKey access.
 """
 
 from datetime import date, datetime, time, timedelta
+from unittest import mock
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils import timezone
 from praxi_backend.appointments.exceptions import (
     DoctorAbsentError,
@@ -36,18 +37,33 @@ from praxi_backend.appointments.models import (
     PracticeHours,
     Resource,
 )
+from praxi_backend.appointments.serializers import OperationCreateUpdateSerializer
+from praxi_backend.appointments.services import scheduling_constraints
 from praxi_backend.appointments.services.scheduling import (
     check_appointment_conflicts,
+    check_doctor_availability,
     check_operation_conflicts,
     check_patient_conflicts,
+    check_room_availability,
+    get_available_doctors,
+    get_available_rooms,
     plan_appointment,
     plan_operation,
     validate_doctor_absences,
     validate_doctor_breaks,
     validate_working_hours,
 )
+from praxi_backend.appointments.services.scheduling_constraints import (
+    DOCTOR_OVERLAP_CONSTRAINT,
+    ROOM_OVERLAP_CONSTRAINT,
+    db_constraints_enabled,
+    find_existing_overlaps,
+    install_overlap_constraints,
+    installed_overlap_constraints,
+    remove_overlap_constraints,
+)
 from praxi_backend.core.models import Role, User
-from rest_framework import status
+from rest_framework import serializers, status
 from rest_framework.test import APIClient
 
 # Dummy patient_id for tests
@@ -671,6 +687,123 @@ class ValidateDoctorBreaksTestCase(SchedulingTestMixin, TestCase):
             )
 
 
+# =============================================================================
+# Set-based Availability Tests
+# =============================================================================
+
+
+class AvailableDoctorsAndRoomsTestCase(SchedulingTestMixin, TestCase):
+    """get_available_doctors/rooms must agree with the per-item checks."""
+
+    def setUp(self):
+        super().setUp()
+        self.monday = self._get_next_weekday(self.today, 0)
+        self.tuesday = self.monday + timedelta(days=1)
+        self.doctor3 = User.objects.db_manager("default").create_user(
+            username="doctor3_sched",
+            password="doc123",
+            email="doctor3_sched@test.local",
+            role=self.role_doctor,
+        )
+        DoctorHours.objects.using("default").create(
+            doctor=self.doctor3,
+            weekday=0,
+            start_time=time(8, 0),
+            end_time=time(12, 0),
+            active=True,
+        )
+
+        appt = Appointment.objects.using("default").create(
+            patient_id=DUMMY_PATIENT_ID,
+            doctor=self.doctor1,
+            type=self.appt_type,
+            start_time=self._make_datetime(self.monday, time(9, 0)),
+            end_time=self._make_datetime(self.monday, time(9, 30)),
+            status="scheduled",
+        )
+        AppointmentResource.objects.using("default").create(appointment=appt, resource=self.room1)
+        Operation.objects.using("default").create(
+            patient_id=DUMMY_PATIENT_ID,
+            primary_surgeon=self.doctor3,
+            assistant=self.doctor2,
+            op_room=self.room2,
+            op_type=self.op_type,
+            start_time=self._make_datetime(self.monday, time(10, 0)),
+            end_time=self._make_datetime(self.monday, time(11, 30)),
+            status="planned",
+        )
+        DoctorBreak.objects.using("default").create(
+            doctor=self.doctor1,
+            date=self.monday,
+            start_time=time(12, 0),
+            end_time=time(12, 30),
+            active=True,
+        )
+        DoctorBreak.objects.using("default").create(
+            doctor=None,
+            date=self.monday,
+            start_time=time(13, 0),
+            end_time=time(13, 15),
+            active=True,
+        )
+        DoctorAbsence.objects.using("default").create(
+            doctor=self.doctor2,
+            start_date=self.tuesday,
+            end_date=self.tuesday,
+            reason="Urlaub",
+            active=True,
+        )
+        self.appt = appt
+
+    def _ranges(self):
+        for day in (self.monday, self.tuesday, self.monday + timedelta(days=5)):
+            for hour, minute in ((7, 30), (8, 0), (9, 15), (10, 45), (11, 45), (12, 15), (13, 0)):
+                start = self._make_datetime(day, time(hour, minute))
+                for minutes in (15, 30, 60):
+                    yield start, start + timedelta(minutes=minutes)
+
+    def test_doctors_match_per_doctor_check(self):
+        doctors = [self.doctor1, self.doctor2, self.doctor3]
+        for start, end in self._ranges():
+            for exclude_id in (None, self.appt.id):
+                expected = [
+                    d.id
+                    for d in doctors
+                    if check_doctor_availability(
+                        start_time=start,
+                        end_time=end,
+                        doctor_id=d.id,
+                        exclude_appointment_id=exclude_id,
+                    )
+                ]
+                actual = [
+                    d.id
+                    for d in get_available_doctors(
+                        start_time=start, end_time=end, exclude_appointment_id=exclude_id
+                    )
+                ]
+                self.assertEqual(actual, expected, (start, end, exclude_id))
+
+    def test_rooms_match_per_room_check(self):
+        rooms = [self.room1, self.room2]
+        for start, end in self._ranges():
+            expected = [
+                r.id
+                for r in rooms
+                if check_room_availability(start_time=start, end_time=end, room_id=r.id)
+            ]
+            actual = [r.id for r in get_available_rooms(start_time=start, end_time=end)]
+            self.assertEqual(actual, expected, (start, end))
+
+    def test_single_query_each(self):
+        start = self._make_datetime(self.monday, time(9, 0))
+        end = start + timedelta(minutes=30)
+        with self.assertNumQueries(1):
+            get_available_doctors(start_time=start, end_time=end)
+        with self.assertNumQueries(1):
+            get_available_rooms(start_time=start, end_time=end)
+
+
 # =============================================================================
 # Plan Appointment Tests
 # =============================================================================
@@ -1052,3 +1185,348 @@ class OperationViewIntegrationTestCase(SchedulingTestMixin, TestCase):
             "conflicts" in response.data or "detail" in response.data or "reason" in response.data,
             f"Expected 'conflicts', 'detail', or 'reason' in response, got: {response.data.keys()}",
         )
+
+
+@override_settings(PRAXI_SCHEDULING_DB_CONSTRAINTS=True)
+class DbOverlapConstraintsTestCase(SchedulingTestMixin, TestCase):
+    """Constraint mode: overlaps are rejected by PostgreSQL, not by pre-checks."""
+
+    def setUp(self):
+        super().setUp()
+        self.monday = self._get_next_weekday(self.today, 0)
+        self.existing_appt = Appointment.objects.using("default").create(
+            patient_id=DUMMY_PATIENT_ID + 1,
+            doctor=self.doctor1,
+            start_time=self._make_datetime(self.monday, time(10, 0)),
+            end_time=self._make_datetime(self.monday, time(10, 30)),
+            status="scheduled",
+        )
+        self.existing_op = Operation.objects.using("default").create(
+            patient_id=DUMMY_PATIENT_ID + 2,
+            primary_surgeon=self.doctor2,
+            op_room=self.room1,
+            op_type=self.op_type,
+            start_time=self._make_datetime(self.monday, time(13, 0)),
+            end_time=self._make_datetime(self.monday, time(14, 30)),
+            status="planned",
+        )
+        # Rolled back with the test transaction, so drop the cached lookup too.
+        install_overlap_constraints()
+        self.addCleanup(scheduling_constraints._forget_installed)
+
+    def test_constraints_installed(self):
+        self.assertEqual(
+            installed_overlap_constraints(), {DOCTOR_OVERLAP_CONSTRAINT, ROOM_OVERLAP_CONSTRAINT}
+        )
+        self.assertEqual(find_existing_overlaps(DOCTOR_OVERLAP_CONSTRAINT), [])
+
+    def test_pre_checks_skip_db_enforced_overlaps(self):
+        conflicts = check_appointment_conflicts(
+            date=self.monday,
+            start_time=self._make_datetime(self.monday, time(10, 15)),
+            end_time=self._make_datetime(self.monday, time(10, 45)),
+            doctor_id=self.doctor1.id,
+            skip_db_enforced=True,
+        )
+        self.assertEqual(conflicts, [])
+
+        conflicts = check_operation_conflicts(
+            date=self.monday,
+            start_time=self._make_datetime(self.monday, time(14, 0)),
+            end_time=self._make_datetime(self.monday, time(15, 0)),
+            primary_surgeon_id=self.doctor1.id,
+            room_id=self.room1.id,
+            skip_db_enforced=True,
+        )
+        self.assertEqual(conflicts, [])
+
+    def test_plan_appointment_translates_doctor_overlap(self):
+        with self.assertRaises(SchedulingConflictError) as ctx:
+            plan_appointment(
+                data={
+                    "patient_id": DUMMY_PATIENT_ID,
+                    "doctor_id": self.doctor1.id,
+                    "start_time": self._make_datetime(self.monday, time(10, 15)),
+                    "end_time": self._make_datetime(self.monday, time(10, 45)),
+                },
+                user=self.admin,
+            )
+
+        conflicts = ctx.exception.conflicts
+        self.assertEqual(
+            [(c.type, c.model, c.id) for c in conflicts],
+            [("doctor_conflict", "Appointment", self.existing_appt.id)],
+        )
+        # The transaction is still usable after the rolled-back savepoint.
+        self.assertEqual(Appointment.objects.using("default").count(), 1)
+
+    def test_missing_constraints_keep_pre_checks(self):
+        self.assertTrue(db_constraints_enabled())
+        remove_overlap_constraints()
+        self.assertFalse(db_constraints_enabled())
+
+        # Nothing in the database rejects the overlap: the pre-check has to.
+        with self.assertRaises(SchedulingConflictError) as ctx:
+            plan_appointment(
+                data={
+                    "patient_id": DUMMY_PATIENT_ID,
+                    "doctor_id": self.doctor1.id,
+                    "start_time": self._make_datetime(self.monday, time(10, 15)),
+                    "end_time": self._make_datetime(self.monday, time(10, 45)),
+                },
+                user=self.admin,
+            )
+        self.assertEqual(
+            [(c.type, c.id) for c in ctx.exception.conflicts],
+            [("doctor_conflict", self.existing_appt.id)],
+        )
+
+    def test_plan_appointment_adjacent_slot_is_allowed(self):
+        appointment = plan_appointment(
+            data={
+                "patient_id": DUMMY_PATIENT_ID,
+                "doctor_id": self.doctor1.id,
+                "start_time": self._make_datetime(self.monday, time(10, 30)),
+                "end_time": self._make_datetime(self.monday, time(11, 0)),
+            },
+            user=self.admin,
+        )
+        self.assertIsNotNone(appointment.id)
+
+    def test_plan_operation_translates_room_overlap(self):
+        with self.assertRaises(SchedulingConflictError) as ctx:
+            plan_operation(
+                data={
+                    "patient_id": DUMMY_PATIENT_ID,
+                    "primary_surgeon_id": self.doctor1.id,
+                    "op_room_id": self.room1.id,
+                    "op_type_id": self.op_type.id,
+                    "start_time": self._make_datetime(self.monday, time(14, 0)),
+                },
+                user=self.admin,
+            )
+
+        conflict = ctx.exception.conflicts[0]
+        self.assertEqual(conflict.type, "room_conflict")
+        self.assertEqual(conflict.id, self.existing_op.id)
+        self.assertEqual(conflict.resource_id, self.room1.id)
+        self.assertEqual(Operation.objects.using("default").count(), 1)
+
+    def test_operation_serializer_reports_room_conflict_on_save(self):
+        operation = Operation.objects.using("default").create(
+            patient_id=DUMMY_PATIENT_ID,
+            primary_surgeon=self.doctor1,
+            op_room=self.room2,
+            op_type=self.op_type,
+            start_time=self._make_datetime(self.monday, time(14, 0)),
+            end_time=self._make_datetime(self.monday, time(15, 30)),
+            status="planned",
+        )
+        serializer = OperationCreateUpdateSerializer(
+            operation, data={"op_room": self.room1.id}, partial=True
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+        with self.assertRaises(serializers.ValidationError) as ctx:
+            serializer.save()
+
+        self.assertEqual(ctx.exception.detail["reason"], "room_conflict")
+        operation.refresh_from_db()
+        self.assertEqual(operation.op_room_id, self.room2.id)
+
+    def test_appointment_update_reports_doctor_conflict_on_save(self):
+        appointment = Appointment.objects.using("default").create(
+            patient_id=DUMMY_PATIENT_ID,
+            doctor=self.doctor1,
+            start_time=self._make_datetime(self.monday, time(11, 0)),
+            end_time=self._make_datetime(self.monday, time(11, 30)),
+            status="scheduled",
+        )
+        client = APIClient()
+        client.force_authenticate(user=self.admin)
+
+        # Simulate a concurrent booking the pre-check could not see yet.
+        with mock.patch(
+            "praxi_backend.appointments.serializers."
+            "validate_no_doctor_appointment_overlap_or_unavailable"
+        ):
+            response = client.patch(
+                f"/api/appointments/{appointment.id}/",
+                {
+                    "start_time": self._make_datetime(self.monday, time(10, 15)).isoformat(),
+                    "end_time": self._make_datetime(self.monday, time(10, 45)).isoformat(),
+                },
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            [(c["type"], c["id"]) for c in response.data["conflicts"]],
+            [("doctor_conflict", self.existing_appt.id)],
+        )
+        appointment.refresh_from_db()
+        self.assertEqual(appointment.start_time, self._make_datetime(self.monday, time(11, 0)))
+
+
+class ConsolidatedConflictQueriesTestCase(SchedulingTestMixin, TestCase):
+    """Conflict checks fetch all overlapping rows at once and keep the old order."""
+
+    def setUp(self):
+        super().setUp()
+        monday = self._get_next_weekday(self.today, 0)
+        self.start = self._make_datetime(monday, time(10, 0))
+        self.end = self._make_datetime(monday, time(11, 30))
+
+        def appt(doctor, minutes, patient_id=DUMMY_PATIENT_ID + 1):
+            return Appointment.objects.using("default").create(
+                patient_id=patient_id,
+                doctor=doctor,
+                start_time=self.start + timedelta(minutes=minutes),
+                end_time=self.start + timedelta(minutes=minutes + 30),
+                status="scheduled",
+            )
+
+        def op(surgeon, room, minutes, assistant=None, patient_id=DUMMY_PATIENT_ID + 2):
+            return Operation.objects.using("default").create(
+                patient_id=patient_id,
+                primary_surgeon=surgeon,
+                assistant=assistant,
+                op_room=room,
+                op_type=self.op_type,
+                start_time=self.start + timedelta(minutes=minutes),
+                end_time=self.start + timedelta(minutes=minutes + 30),
+                status="planned",
+            )
+
+        self.appt_early = appt(self.doctor1, 0)
+        self.appt_late = appt(self.doctor1, 60, patient_id=DUMMY_PATIENT_ID)
+        self.appt_room = appt(self.doctor2, 30)
+        AppointmentResource.objects.using("default").create(
+            appointment=self.appt_room, resource=self.room1
+        )
+        AppointmentResource.objects.using("default").create(
+            appointment=self.appt_room, resource=self.device1
+        )
+        self.op_room = op(self.doctor2, self.room1, 15, assistant=self.doctor1)
+        self.op_device = op(self.doctor2, self.room2, 45, patient_id=DUMMY_PATIENT_ID)
+        OperationDevice.objects.using("default").create(
+            operation=self.op_device, resource=self.device1
+        )
+        # Outside the window: never reported.
+        appt(self.doctor1, 120)
+
+    def _summary(self, conflicts):
+        return [(c.type, c.model, c.id, c.resource_id) for c in conflicts]
+
+    def test_operation_conflicts_in_two_queries(self):
+        with self.assertNumQueries(2):
+            conflicts = check_operation_conflicts(
+                date=self.start.date(),
+                start_time=self.start,
+                end_time=self.end,
+                primary_surgeon_id=self.doctor1.id,
+                assistant_id=self.doctor2.id,
+                room_id=self.room1.id,
+                device_ids=[self.device1.id],
+            )
+
+        self.assertEqual(
+            self._summary(conflicts),
+            [
+                ("room_conflict", "Operation", self.op_room.id, self.room1.id),
+                ("room_conflict", "Appointment", self.appt_room.id, self.room1.id),
+                ("device_conflict", "Operation", self.op_device.id, self.device1.id),
+                ("device_conflict", "Appointment", self.appt_room.id, self.device1.id),
+                # doctor1: appointments newest first, then operations
+                ("doctor_conflict", "Appointment", self.appt_late.id, None),
+                ("doctor_conflict", "Appointment", self.appt_early.id, None),
+                ("doctor_conflict", "Operation", self.op_room.id, None),
+                # doctor2
+                ("doctor_conflict", "Appointment", self.appt_room.id, None),
+                ("doctor_conflict", "Operation", self.op_device.id, None),
+                ("doctor_conflict", "Operation", self.op_room.id, None),
+            ],
+        )
+        self.assertEqual(conflicts[4].meta, {"doctor_id": self.doctor1.id})
+
+    def test_appointment_conflicts_in_three_queries(self):
+        with self.assertNumQueries(3):
+            conflicts = check_appointment_conflicts(
+                date=self.start.date(),
+                start_time=self.start,
+                end_time=self.end,
+                doctor_id=self.doctor1.id,
+                resource_ids=[self.room1.id, self.device1.id],
+                exclude_appointment_id=self.appt_early.id,
+            )
+
+        self.assertEqual(
+            self._summary(conflicts),
+            [
+                ("doctor_conflict", "Appointment", self.appt_late.id, None),
+                ("doctor_conflict", "Operation", self.op_room.id, None),
+                ("room_conflict", "Appointment", self.appt_room.id, self.room1.id),
+                ("device_conflict", "Appointment", self.appt_room.id, self.device1.id),
+                ("room_conflict", "Operation", self.op_room.id, self.room1.id),
+                ("device_conflict", "Operation", self.op_device.id, self.device1.id),
+            ],
+        )
+        self.assertEqual(
+            conflicts[2].message,
+            f"Resource Room 1 is booked by appointment #{self.appt_room.id}",
+        )
+
+    def test_booked_resource_missing_from_lookup_is_still_reported(self):
+        # As with a stale resource snapshot: ids requested, rows not loaded.
+        requested = [self.room1.id, self.device1.id]
+        with mock.patch(
+            "praxi_backend.appointments.services.scheduling._split_resource_ids",
+            return_value=(requested, {}),
+        ):
+            conflicts = check_appointment_conflicts(
+                date=self.start.date(),
+                start_time=self.start,
+                end_time=self.end,
+                doctor_id=self.doctor2.id,
+                resource_ids=requested,
+            )
+
+        self.assertIn(
+            ("room_conflict", "Appointment", self.appt_room.id, self.room1.id),
+            self._summary(conflicts),
+        )
+        self.assertIn(
+            ("device_conflict", "Appointment", self.appt_room.id, self.device1.id),
+            self._summary(conflicts),
+        )
+
+    def test_patient_conflicts(self):
+        with self.assertNumQueries(2):
+            conflicts = check_patient_conflicts(
+                patient_id=DUMMY_PATIENT_ID,
+                start_time=self.start,
+                end_time=self.end,
+                exclude_operation_id=self.op_device.id,
+            )
+
+        self.assertEqual(
+            self._summary(conflicts),
+            [("patient_conflict", "Appointment", self.appt_late.id, None)],
+        )
+
+    def test_plan_operation_shares_one_snapshot(self):
+        with self.assertRaises(SchedulingConflictError) as ctx:
+            plan_operation(
+                data={
+                    "patient_id": DUMMY_PATIENT_ID,
+                    "primary_surgeon_id": self.doctor1.id,
+                    "op_room_id": self.room1.id,
+                    "op_type_id": self.op_type.id,
+                    "start_time": self.start,
+                },
+                user=self.admin,
+            )
+
+        types = [c.type for c in ctx.exception.conflicts]
+        self.assertIn("room_conflict", types)
+        self.assertEqual(types[-2:], ["patient_conflict", "patient_conflict"])
@@ -0,0 +1,341 @@
+"""Tests for the range-batched slot engine in praxi_backend.appointments.scheduling.
+
+All inputs for a search window are preloaded with a fixed number of queries;
+these tests pin down both the suggestions and the query budget.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, time, timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from praxi_backend.appointments.models import (
+    Appointment,
+    AppointmentResource,
+    DoctorAbsence,
+    DoctorBreak,
+    DoctorHours,
+    Operation,
+    OperationType,
+    PracticeHours,
+    Resource,
+)
+from praxi_backend.appointments.scheduling import (
+    _scan_day_for_slot,
+    availability_for_range,
+    compute_suggestions_for_doctor,
+    compute_suggestions_for_doctors,
+    load_scheduling_window,
+)
+from praxi_backend.core.models import Role, User
+
+
+class SlotEngineTestBase(TestCase):
+    databases = {"default"}
+
+    def setUp(self):
+        role_doctor, _ = Role.objects.using("default").get_or_create(
+            name="doctor", defaults={"label": "Arzt"}
+        )
+        self.doctor = User.objects.db_manager("default").create_user(
+            username="slot_engine_doc",
+            email="slot_engine_doc@example.com",
+            password="DummyPass123!",
+            role=role_doctor,
+        )
+        self.tz = timezone.get_current_timezone()
+
+        today = timezone.localdate()
+        days_ahead = (7 - today.weekday()) % 7 or 7
+        self.monday = today + timedelta(days=days_ahead)
+
+        for weekday in range(5):
+            PracticeHours.objects.using("default").create(
+                weekday=weekday, start_time=time(8, 0), end_time=time(16, 0), active=True
+            )
+            DoctorHours.objects.using("default").create(
+                doctor=self.doctor,
+                weekday=weekday,
+                start_time=time(9, 0),
+                end_time=time(12, 0),
+                active=True,
+            )
+
+    def _dt(self, day, hour, minute=0):
+        return timezone.make_aware(datetime.combine(day, time(hour, minute)), self.tz)
+
+    def _book_full_day(self, day):
+        Appointment.objects.using("default").create(
+            patient_id=1,
+            doctor=self.doctor,
+            start_time=self._dt(day, 9),
+            end_time=self._dt(day, 12),
+            status="scheduled",
+        )
+
+    def _suggest(self, **kwargs):
+        params = {
+            "doctor": self.doctor,
+            "start_date": self.monday,
+            "duration_minutes": 30,
+            "limit": 1,
+            "type_obj": None,
+            "max_days": 60,
+        }
+        params.update(kwargs)
+        return compute_suggestions_for_doctor(**params)
+
+
+class SlotEngineTest(SlotEngineTestBase):
+    def test_skips_booked_absent_and_weekend_days(self):
+        self._book_full_day(self.monday)
+        DoctorAbsence.objects.using("default").create(
+            doctor=self.doctor,
+            start_date=self.monday + timedelta(days=1),
+            end_date=self.monday + timedelta(days=4),
+            reason="Kongress",
+            active=True,
+        )
+
+        suggestions = self._suggest()
+
+        next_monday = self.monday + timedelta(days=7)
+        self.assertEqual(len(suggestions), 1)
+        self.assertEqual(
+            timezone.localtime(datetime.fromisoformat(suggestions[0]["start_time"])),
+            self._dt(next_monday, 9),
+        )
+
+    def test_query_count_does_not_grow_with_scanned_days(self):
+        self._book_full_day(self.monday)
+
+        end_date = self.monday + timedelta(days=59)
+
+        with CaptureQueriesContext(connection) as short_scan:
+            self._suggest(end_date=end_date)
+
+        for offset in range(1, 12):
+            self._book_full_day(self.monday + timedelta(days=offset))
+
+        with CaptureQueriesContext(connection) as long_scan:
+            suggestions = self._suggest(end_date=end_date)
+
+        self.assertEqual(len(suggestions), 1)
+        self.assertEqual(len(short_scan), len(long_scan))
+        self.assertLessEqual(len(long_scan), 5)
+
+    def test_open_ended_search_loads_in_growing_batches(self):
+        # Fully booked for five weeks: an open-ended search needs several batches,
+        # but far fewer than one round trip per day.
+        for offset in range(35):
+            self._book_full_day(self.monday + timedelta(days=offset))
+
+        with CaptureQueriesContext(connection) as ctx:
+            suggestions = self._suggest(max_days=366)
+
+        self.assertEqual(len(suggestions), 1)
+        self.assertEqual(
+            timezone.localtime(datetime.fromisoformat(suggestions[0]["start_time"])),
+            self._dt(self.monday + timedelta(days=35), 9),
+        )
+        self.assertLessEqual(len(ctx), 5 * 3)
+
+    def test_breaks_and_resource_bookings_block_slots(self):
+        DoctorBreak.objects.using("default").create(
+            doctor=None,
+            date=self.monday,
+            start_time=time(9, 0),
+            end_time=time(10, 0),
+            active=True,
+        )
+        room = Resource.objects.using("default").create(name="Raum 1", type="room", active=True)
+        other_doctor = User.objects.db_manager("default").create_user(
+            username="slot_engine_other",
+            email="slot_engine_other@example.com",
+            password="DummyPass123!",
+        )
+        appt = Appointment.objects.using("default").create(
+            patient_id=2,
+            doctor=other_doctor,
+            start_time=self._dt(self.monday, 10),
+            end_time=self._dt(self.monday, 10, 30),
+            status="scheduled",
+        )
+        AppointmentResource.objects.using("default").create(appointment=appt, resource=room)
+        op_type = OperationType.objects.using("default").create(
+            name="Eingriff", prep_duration=0, op_duration=30, post_duration=0
+        )
+        Operation.objects.using("default").create(
+            patient_id=3,
+            primary_surgeon=other_doctor,
+            op_room=room,
+            op_type=op_type,
+            start_time=self._dt(self.monday, 10, 30),
+            end_time=self._dt(self.monday, 11),
+            status="planned",
+        )
+
+        suggestions = self._suggest(end_date=self.monday, max_days=1, resources=[room])
+
+        self.assertEqual(len(suggestions), 1)
+        self.assertEqual(
+            timezone.localtime(datetime.fromisoformat(suggestions[0]["start_time"])),
+            self._dt(self.monday, 11),
+        )
+        self.assertEqual(suggestions[0]["resource_ids"], [room.id])
+
+        now_local = timezone.localtime(timezone.now(), self.tz)
+        _, diag = _scan_day_for_slot(
+            doctor=self.doctor,
+            current_date=self.monday,
+            duration_minutes=30,
+            now_local=now_local,
+            start_date=self.monday,
+            type_obj=None,
+            resources=[room],
+            limit=1,
+        )
+        self.assertTrue(diag["blocked_by_break"])
+        self.assertTrue(diag["blocked_by_resource"])
+        self.assertFalse(diag["blocked_by_busy"])
+
+    def test_window_buckets_intervals_per_local_day(self):
+        Appointment.objects.using("default").create(
+            patient_id=4,
+            doctor=self.doctor,
+            start_time=self._dt(self.monday, 23),
+            end_time=self._dt(self.monday + timedelta(days=1), 1),
+            status="scheduled",
+        )
+
+        window = load_scheduling_window(
+            doctor_ids=[self.doctor.id],
+            start_date=self.monday,
+            end_date=self.monday + timedelta(days=2),
+        )
+
+        by_day = window.appointments[self.doctor.id]
+        self.assertEqual(len(by_day[self.monday]), 1)
+        self.assertEqual(len(by_day[self.monday + timedelta(days=1)]), 1)
+        self.assertNotIn(self.monday + timedelta(days=2), by_day)
+
+    def test_availability_for_range_uses_single_batch(self):
+        for offset in range(5):
+            self._book_full_day(self.monday + timedelta(days=offset))
+
+        with CaptureQueriesContext(connection) as ctx:
+            av = availability_for_range(
+                doctor=self.doctor,
+                start_date=self.monday,
+                end_date=self.monday + timedelta(days=6),
+                duration_minutes=30,
+            )
+
+        self.assertFalse(av.available)
+        self.assertEqual(av.reason, "busy")
+        self.assertLessEqual(len(ctx), 5)
+
+
+class MultiDoctorSuggestionsTest(SlotEngineTestBase):
+    """compute_suggestions_for_doctors against per-doctor searches."""
+
+    def setUp(self):
+        super().setUp()
+        self.doctors = [self.doctor]
+        for i in range(4):
+            doc = User.objects.db_manager("default").create_user(
+                username=f"slot_engine_sub{i}",
+                email=f"slot_engine_sub{i}@example.com",
+                password="DummyPass123!",
+            )
+            for weekday in range(5):
+                DoctorHours.objects.using("default").create(
+                    doctor=doc,
+                    weekday=weekday,
+                    start_time=time(9, 15 * i),
+                    end_time=time(12, 0),
+                    active=True,
+                )
+            self.doctors.append(doc)
+
+        # Doctor 1 is booked for a week, doctor 2 absent for a week, doctor 3
+        # has no hours at all.
+        for offset in range(5):
+            Appointment.objects.using("default").create(
+                patient_id=10,
+                doctor=self.doctors[1],
+                start_time=self._dt(self.monday + timedelta(days=offset), 9),
+                end_time=self._dt(self.monday + timedelta(days=offset), 12),
+                status="scheduled",
+            )
+        DoctorAbsence.objects.using("default").create(
+            doctor=self.doctors[2],
+            start_date=self.monday,
+            end_date=self.monday + timedelta(days=6),
+            reason="Urlaub",
+            active=True,
+        )
+        DoctorHours.objects.using("default").filter(doctor=self.doctors[3]).delete()
+
+    def test_matches_single_doctor_results(self):
+        for kwargs in ({"max_days": 31}, {"end_date": self.monday, "max_days": 1}):
+            results = compute_suggestions_for_doctors(
+                doctors=self.doctors,
+                start_date=self.monday,
+                duration_minutes=30,
+                limit=2,
+                type_obj=None,
+                **kwargs,
+            )
+            expected = {}
+            for doc in self.doctors:
+                single = compute_suggestions_for_doctor(
+                    doctor=doc,
+                    start_date=self.monday,
+                    duration_minutes=30,
+                    limit=2,
+                    type_obj=None,
+                    **kwargs,
+                )
+                if single:
+                    expected[doc.id] = single
+            self.assertEqual(results, expected)
+            self.assertNotIn(self.doctors[3].id, results)
+
+    def test_queries_do_not_scale_with_doctors(self):
+        with CaptureQueriesContext(connection) as two:
+            compute_suggestions_for_doctors(
+                doctors=self.doctors[:2],
+                start_date=self.monday,
+                end_date=self.monday + timedelta(days=13),
+                duration_minutes=30,
+                limit=1,
+                type_obj=None,
+            )
+        with CaptureQueriesContext(connection) as five:
+            compute_suggestions_for_doctors(
+                doctors=self.doctors,
+                start_date=self.monday,
+                end_date=self.monday + timedelta(days=13),
+                duration_minutes=30,
+                limit=1,
+                type_obj=None,
+            )
+        self.assertEqual(len(two), len(five))
+
+    def test_max_doctors_stops_early(self):
+        results = compute_suggestions_for_doctors(
+            doctors=self.doctors,
+            start_date=self.monday,
+            duration_minutes=30,
+            limit=1,
+            type_obj=None,
+            max_days=31,
+            max_doctors=2,
+        )
+        # Doctors 0 and 4 have slots on the first day; doctors 1 and 2 would
+        # only be found a week later.
+        self.assertEqual(list(results), [self.doctors[0].id, self.doctors[4].id])
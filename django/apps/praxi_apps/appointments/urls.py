@@ -14,6 +14,7 @@ Routes:
     /api/op-dashboard/         - OP-Dashboard
     /api/op-timeline/          - OP-Timeline
     /api/op-stats/             - OP-Statistiken
+    /api/live/events/          - Live-Events (SSE) für OP- und Wartezimmer-Boards
 """
 
 from django.urls import path
@@ -36,6 +37,7 @@ from praxi_backend.appointments.views import (  # Appointments; Calendar; Doctor
     DoctorHoursDetailView,
     DoctorHoursListCreateView,
     DoctorListView,
+    LiveEventStreamView,
     OpDashboardLiveView,
     OpDashboardStatusUpdateView,
     OpDashboardView,
@@ -102,6 +104,7 @@ urlpatterns = [
     path("op-timeline/", OpTimelineView.as_view(), name="op_timeline"),
     path("op-timeline/rooms/", OpTimelineRoomsView.as_view(), name="op_timeline_rooms"),
     path("op-timeline/live/", OpTimelineLiveView.as_view(), name="op_timeline_live"),
+    path("live/events/", LiveEventStreamView.as_view(), name="live_events"),
     path("resource-calendar/", ResourceCalendarView.as_view(), name="resource_calendar"),
     path(
         "resource-calendar/resources/",
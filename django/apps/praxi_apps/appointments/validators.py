@@ -18,19 +18,22 @@ from django.utils import timezone
 from praxi_backend.core.models import User
 from rest_framework import serializers
 
+from .config_cache import (
+    get_doctor_hours,
+    get_practice_hours,
+    hours_cover,
+)
 from .models import (
     Appointment,
     AppointmentResource,
     DoctorAbsence,
     DoctorBreak,
-    DoctorHours,
     Operation,
     OperationDevice,
-    PracticeHours,
     Resource,
 )
 from .scheduling_facade import (
-    compute_suggestions_for_doctor,
+    compute_suggestions_for_doctors,
     doctor_display_name,
     get_active_doctors,
 )
@@ -150,15 +153,17 @@ def doctor_unavailable_payload(
     """Build the legacy payload used by AppointmentCreateUpdateSerializer."""
     duration_min = _duration_minutes(local_start_dt, local_end_dt)
     alts: list[dict] = []
-    for rep in get_active_doctors(exclude_doctor_id=getattr(doctor, "id", None)):
-        sug = compute_suggestions_for_doctor(
-            doctor=rep,
-            start_date=local_start_dt.date(),
-            duration_minutes=duration_min,
-            limit=1,
-            type_obj=None,
-            max_days=31,
-        )
+    reps = get_active_doctors(exclude_doctor_id=getattr(doctor, "id", None))
+    suggestions = compute_suggestions_for_doctors(
+        doctors=reps,
+        start_date=local_start_dt.date(),
+        duration_minutes=duration_min,
+        limit=1,
+        type_obj=None,
+        max_days=31,
+    )
+    for rep in reps:
+        sug = suggestions.get(rep.id)
         if sug:
             alts.append(
                 {
@@ -189,16 +194,9 @@ def validate_within_working_hours_or_unavailable(
     start_t = local_start.time().replace(tzinfo=None)
     end_t = local_end.time().replace(tzinfo=None)
 
-    practice_qs = PracticeHours.objects.using("default").filter(weekday=weekday, active=True)
-    if not practice_qs.exists():
-        raise_doctor_unavailable(doctor=doctor, start_time=start_time, end_time=end_time)
-    if not practice_qs.filter(start_time__lte=start_t, end_time__gte=end_t).exists():
-        raise_doctor_unavailable(doctor=doctor, start_time=start_time, end_time=end_time)
-
-    dh_qs = DoctorHours.objects.using("default").filter(doctor=doctor, weekday=weekday, active=True)
-    if not dh_qs.exists():
+    if not hours_cover(get_practice_hours().get(weekday, []), start_t, end_t):
         raise_doctor_unavailable(doctor=doctor, start_time=start_time, end_time=end_time)
-    if not dh_qs.filter(start_time__lte=start_t, end_time__gte=end_t).exists():
+    if not hours_cover(get_doctor_hours().get(doctor.id, {}).get(weekday, []), start_t, end_t):
         raise_doctor_unavailable(doctor=doctor, start_time=start_time, end_time=end_time)
 
     # Absences
@@ -61,6 +61,9 @@ from .hours_absences_breaks import (
     PracticeHoursListCreateView,
 )
 
+# Live event stream (SSE)
+from .live_events_api import LiveEventStreamView
+
 # OP stats
 from .op_stats import (
     OpStatsDevicesView,
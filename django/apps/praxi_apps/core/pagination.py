@@ -0,0 +1,181 @@
+"""Keyset pagination and streaming JSON for large list endpoints.
+
+List views (appointments, operations, patients) offer two opt-in modes next
+to their default response:
+
+- Keyset pages: ``?limit=N`` and/or ``?cursor=...`` return
+  ``{"results": [...], "next_cursor": "..." | null}``. Rows are ordered by
+  the view's key fields (e.g. ``start_time, id``); the cursor encodes the
+  key of the last row, so every page is one bounded, index-friendly query
+  regardless of how deep the client pages.
+- Streaming export: ``?stream=json`` (one JSON array) or ``?stream=ndjson``
+  (one object per line) serializes the whole result in keyset chunks of
+  ``STREAM_CHUNK_SIZE`` rows. Memory stays flat; each chunk runs its own
+  queries (including per-chunk lookups such as patient names).
+
+Key fields must be non-null and sorted ascending.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from collections.abc import Callable, Iterator, Sequence
+from datetime import date, time
+from typing import Any
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q, QuerySet
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+KEYSET_PAGE_SIZE = 100
+KEYSET_PAGE_SIZE_MAX = 500
+STREAM_CHUNK_SIZE = 500
+
+STREAM_FORMATS = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _cursor_value(value: Any) -> Any:
+    # Full isoformat: DRF's encoder drops microseconds, which would skip rows.
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    return str(value)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(list(values), default=_cursor_value).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str, qs: QuerySet, fields: Sequence[str]) -> list[Any]:
+    """Decode a cursor for ``fields`` of ``qs.model``; raises ValueError."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor))
+    except (binascii.Error, TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list) or len(values) != len(fields):
+        raise ValueError("Invalid cursor")
+    opts = qs.model._meta
+    try:
+        return [opts.get_field(f).to_python(v) for f, v in zip(fields, values, strict=True)]
+    except (TypeError, ValidationError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def parse_page_size(raw: str | None) -> int:
+    try:
+        value = int(raw) if raw else KEYSET_PAGE_SIZE
+    except (TypeError, ValueError):
+        value = KEYSET_PAGE_SIZE
+    return max(1, min(value, KEYSET_PAGE_SIZE_MAX))
+
+
+def _after(fields: Sequence[str], values: Sequence[Any]) -> Q:
+    """Rows whose ``fields`` tuple sorts after ``values``."""
+    q = Q()
+    for i, field in enumerate(fields):
+        q |= Q(**dict(zip(fields[:i], values[:i], strict=True)), **{f"{field}__gt": values[i]})
+    return q
+
+
+def _key(obj: Any, fields: Sequence[str]) -> list[Any]:
+    return [getattr(obj, f) for f in fields]
+
+
+def keyset_page(
+    qs: QuerySet, fields: Sequence[str], *, after: Sequence[Any] | None, limit: int
+) -> tuple[list[Any], str | None]:
+    """Return up to ``limit`` rows after the key ``after`` and the next cursor."""
+    if after is not None:
+        qs = qs.filter(_after(fields, after))
+    rows = list(qs.order_by(*fields)[: limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(_key(rows[-1], fields))
+
+
+def iter_keyset_chunks(
+    qs: QuerySet, fields: Sequence[str], *, chunk_size: int = STREAM_CHUNK_SIZE
+) -> Iterator[list[Any]]:
+    """Yield all rows of ``qs`` in ``fields`` order, ``chunk_size`` rows at a time."""
+    after = None
+    while True:
+        if after is not None:
+            chunk = list(qs.filter(_after(fields, after)).order_by(*fields)[:chunk_size])
+        else:
+            chunk = list(qs.order_by(*fields)[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        if len(chunk) < chunk_size:
+            return
+        after = _key(chunk[-1], fields)
+
+
+def stream_response(
+    qs: QuerySet,
+    fields: Sequence[str],
+    serialize: Callable[[list[Any]], list[dict[str, Any]]],
+    *,
+    fmt: str,
+    chunk_size: int | None = None,
+) -> StreamingHttpResponse:
+    """Stream ``qs`` as a JSON array or NDJSON; ``serialize`` renders one chunk."""
+    encoder = JSONEncoder(ensure_ascii=False)
+    chunk_size = chunk_size or STREAM_CHUNK_SIZE
+
+    def generate() -> Iterator[str]:
+        first = True
+        if fmt == "json":
+            yield "["
+        for chunk in iter_keyset_chunks(qs, fields, chunk_size=chunk_size):
+            for item in serialize(chunk):
+                if fmt == "ndjson":
+                    yield encoder.encode(item) + "\n"
+                else:
+                    yield ("" if first else ",") + encoder.encode(item)
+                first = False
+        if fmt == "json":
+            yield "]"
+
+    return StreamingHttpResponse(generate(), content_type=STREAM_FORMATS[fmt])
+
+
+def keyset_list_response(
+    request,
+    qs: QuerySet,
+    fields: Sequence[str],
+    serialize: Callable[[list[Any]], list[dict[str, Any]]],
+) -> Response | StreamingHttpResponse | None:
+    """Keyset page or stream for ``request``; None if the client asked for neither."""
+    fmt = request.query_params.get("stream")
+    if fmt:
+        if fmt not in STREAM_FORMATS:
+            return Response(
+                {"detail": f"stream must be one of: {', '.join(STREAM_FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return stream_response(qs, fields, serialize, fmt=fmt)
+
+    cursor = request.query_params.get("cursor")
+    limit = request.query_params.get("limit")
+    if cursor is None and limit is None:
+        return None
+
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, qs, fields)
+        except ValueError:
+            return Response({"detail": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST)
+
+    rows, next_cursor = keyset_page(qs, fields, after=after, limit=parse_page_size(limit))
+    return Response({"results": serialize(rows), "next_cursor": next_cursor})
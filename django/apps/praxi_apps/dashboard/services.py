@@ -16,13 +16,11 @@ from django.db.models import Count, Q
 from django.db.models.functions import TruncDate
 from django.utils import timezone
 from praxi_backend.appointments.kpi import (
-    calculate_patient_risk_score,
-    calculate_patient_status,
+    calculate_patient_risk_score_bulk,
+    calculate_patient_status_bulk,
     get_active_doctors,
-    get_all_charts,
     get_all_doctor_charts,
     get_all_doctor_kpis,
-    get_all_kpis,
     get_all_operations_charts,
     get_all_operations_kpis,
     get_all_patient_charts,
@@ -31,8 +29,9 @@ from praxi_backend.appointments.kpi import (
     get_all_scheduling_kpis,
     get_doctor_comparison_data,
     get_doctor_profile,
+    get_kpi_snapshot,
     get_patient_overview_stats,
-    get_patient_profile,
+    get_patient_profiles_bulk,
     get_realtime_operations_kpis,
 )
 from praxi_backend.appointments.models import Appointment, DoctorHours, Operation, Resource
@@ -47,8 +46,8 @@ from .widgets import build_kpi_cards, build_status_badges, build_utilization_bar
 
 def build_main_dashboard_context() -> dict:
     """Build the context dict for the main dashboard HTML page."""
-    kpis = get_all_kpis()
-    charts = get_all_charts()
+    kpis = get_kpi_snapshot("main_kpis")
+    charts = get_kpi_snapshot("main_charts")
     return {
         "title": "PraxiApp Dashboard",
         "kpis": kpis,
@@ -62,8 +61,8 @@ def build_main_dashboard_context() -> dict:
 
 def build_main_dashboard_api_payload() -> dict:
     """Build JSON payload for dashboard AJAX refresh."""
-    kpis = get_all_kpis()
-    charts = get_all_charts()
+    kpis = get_kpi_snapshot("main_kpis")
+    charts = get_kpi_snapshot("main_charts")
     return {
         "kpis": kpis,
         "kpi_cards": build_kpi_cards(kpis),
@@ -553,6 +552,21 @@ def parse_patient_id(*, query_params, kwargs) -> int | None:
     return patient_id
 
 
+def _bulk_patient_kpis(patient_ids: list[int]) -> tuple[dict, dict, dict]:
+    """Profiles, risk scores and statuses for a patient list in a handful of queries.
+
+    Each risk score is computed once and reused for the status. On failure the
+    maps stay empty and the overview falls back to its defaults.
+    """
+    try:
+        profiles = get_patient_profiles_bulk(patient_ids)
+        risks = calculate_patient_risk_score_bulk(patient_ids, profiles=profiles)
+        statuses = calculate_patient_status_bulk(patient_ids, risk_scores=risks)
+    except Exception:
+        return {}, {}, {}
+    return profiles, risks, statuses
+
+
 def build_patients_overview_context() -> dict:
     """Build context for `dashboard/patients_overview.html`."""
     stats = get_patient_overview_stats()
@@ -561,7 +575,10 @@ def build_patients_overview_context() -> dict:
 
     # Primary source: managed Patient table.
     try:
-        patients = Patient.objects.using("default").all().order_by("last_name", "first_name")[:100]
+        patients = list(
+            Patient.objects.using("default").all().order_by("last_name", "first_name")[:100]
+        )
+        profiles, risks, statuses = _bulk_patient_kpis([p.id for p in patients])
         for patient in patients:
             try:
                 display_name = f"{patient.last_name}, {patient.first_name}"
@@ -580,32 +597,29 @@ def build_patients_overview_context() -> dict:
                         )
                     )
 
-                try:
-                    status = calculate_patient_status(patient.id)
+                status = statuses.get(patient.id)
+                if status is not None:
                     status_dict = {
                         "label": status.label,
                         "color": status.color,
                         "icon": status.icon,
                     }
-                except Exception:
+                else:
                     status_dict = {"label": "Unbekannt", "color": "#7A8A99", "icon": "○"}
 
-                try:
-                    risk = calculate_patient_risk_score(patient.id)
+                risk = risks.get(patient.id)
+                if risk is not None:
                     risk_dict = {
                         "score": risk["score"],
                         "level": risk["level"],
                         "color": risk["level_color"],
                     }
-                except Exception:
+                else:
                     risk_dict = {"score": 0, "level": "low", "color": "#6FCF97"}
 
-                try:
-                    profile = get_patient_profile(patient.id)
-                    if profile and profile.get("age") and not age:
-                        age = profile["age"]
-                except Exception:
-                    profile = None
+                profile = profiles.get(patient.id)
+                if profile and profile.get("age") and not age:
+                    age = profile["age"]
 
                 gender_normalized = patient.gender
                 if gender_normalized:
@@ -636,18 +650,19 @@ def build_patients_overview_context() -> dict:
     # Fallback: derive patient IDs from appointments.
     if not patient_list:
         try:
-            patient_ids = (
-                Appointment.objects.using("default")
+            patient_ids = [
+                pid
+                for pid in Appointment.objects.using("default")
                 .values_list("patient_id", flat=True)
                 .distinct()[:100]
-            )
+                if pid
+            ]
+            profiles, risks, statuses = _bulk_patient_kpis(patient_ids)
             for patient_id in patient_ids:
-                if not patient_id:
-                    continue
                 try:
-                    status = calculate_patient_status(patient_id)
-                    risk = calculate_patient_risk_score(patient_id)
-                    profile = get_patient_profile(patient_id)
+                    status = statuses[patient_id]
+                    risk = risks[patient_id]
+                    profile = profiles[patient_id]
                     age = profile.get("age") if profile else None
                     patient_list.append(
                         {
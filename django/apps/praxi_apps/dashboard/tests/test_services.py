@@ -1,8 +1,20 @@
 from __future__ import annotations
 
+from datetime import date, timedelta
+
+from django.db import connections
 from django.test import TestCase
-from praxi_backend.appointments.models import Resource
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from praxi_backend.appointments.kpi import (
+    calculate_patient_risk_score,
+    calculate_patient_status,
+    calculate_patient_status_bulk,
+)
+from praxi_backend.appointments.models import Appointment, Resource
+from praxi_backend.core.models import Role, User
 from praxi_backend.dashboard.services import (
+    build_patients_overview_context,
     build_resources_dashboard_context,
     build_scheduling_api_payload,
 )
@@ -41,3 +53,64 @@ class DashboardServicesTest(TestCase):
         payload = build_scheduling_api_payload()
         self.assertIn("kpis", payload)
         self.assertIn("charts", payload)
+
+
+class PatientsOverviewBulkTest(TestCase):
+    databases = {"default"}
+
+    def setUp(self):
+        role_doctor, _ = Role.objects.using("default").get_or_create(
+            name="doctor", defaults={"label": "Arzt"}
+        )
+        self.doctor = User.objects.db_manager("default").create_user(
+            username="overview_doc",
+            email="overview_doc@example.com",
+            password="DummyPass123!",
+            role=role_doctor,
+        )
+
+    def _add_patients(self, first_id: int, count: int) -> list[int]:
+        now = timezone.now()
+        ids = []
+        for pid in range(first_id, first_id + count):
+            Patient.objects.using("default").create(
+                id=pid, first_name=f"P{pid}", last_name="Overview", birth_date=date(1950, 1, 1)
+            )
+            # A mix of recent, older and missed appointments per patient.
+            for days_ago in range(pid % 4):
+                start = now - timedelta(days=days_ago * 20 + 1)
+                Appointment.objects.using("default").create(
+                    patient_id=pid,
+                    doctor=self.doctor,
+                    start_time=start,
+                    end_time=start + timedelta(minutes=20),
+                    status="scheduled" if days_ago % 2 else "completed",
+                    is_no_show=days_ago == 2,
+                )
+            ids.append(pid)
+        return ids
+
+    def test_bulk_status_matches_single_patient_functions(self):
+        ids = self._add_patients(100, 6) + [999]  # 999: appointments only, no Patient row
+        statuses = calculate_patient_status_bulk(ids)
+        for pid in ids:
+            self.assertEqual(statuses[pid], calculate_patient_status(pid))
+
+        context = build_patients_overview_context()
+        by_id = {p["id"]: p for p in context["patients"]}
+        for pid in ids[:-1]:
+            risk = calculate_patient_risk_score(pid)
+            self.assertEqual(by_id[pid]["risk"]["score"], risk["score"])
+            self.assertEqual(by_id[pid]["status"]["label"], statuses[pid].label)
+
+    def test_overview_query_count_does_not_grow_with_patients(self):
+        self._add_patients(200, 2)
+        with CaptureQueriesContext(connections["default"]) as few:
+            build_patients_overview_context()
+
+        self._add_patients(300, 8)
+        with CaptureQueriesContext(connections["default"]) as many:
+            context = build_patients_overview_context()
+
+        self.assertEqual(len(context["patients"]), 10)
+        self.assertEqual(len(many), len(few))
@@ -4,7 +4,6 @@ from django.http import JsonResponse
 from django.shortcuts import render
 from django.utils.decorators import method_decorator
 from django.views import View
-from django.views.decorators.cache import cache_page
 
 from .permissions import staff_required
 from .services import build_main_dashboard_api_payload, build_main_dashboard_context
@@ -23,6 +22,6 @@ class DashboardAPIView(View):
     """API Endpoint für Dashboard-Daten (für AJAX-Refresh)"""
 
     @method_decorator(staff_required)
-    @method_decorator(cache_page(60))  # 1 Minute Cache
     def get(self, request):
+        # KPIs/charts are cached as snapshots (praxi_backend.appointments.kpi.snapshots)
         return JsonResponse(build_main_dashboard_api_payload())
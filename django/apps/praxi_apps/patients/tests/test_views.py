@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 from datetime import date
 
 from django.test import TestCase
@@ -54,3 +55,25 @@ class PatientViewsMiniTest(TestCase):
             Patient.objects.using("default").filter(id=payload["id"]).exists(),
             "Patient row with explicit ID was not created.",
         )
+
+    def test_list_keyset_pages_and_stream(self):
+        for pid, (last, first) in enumerate(
+            [("Becker", "Anna"), ("Becker", "Anna"), ("Adam", "Eva"), ("Zeller", "Tom")], 3001
+        ):
+            Patient.objects.using("default").create(id=pid, first_name=first, last_name=last)
+        expected = [3003, 3001, 3002, 1001, 3004]
+
+        ids, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            r = self.client.get("/api/patients/", params)
+            self.assertEqual(r.status_code, 200)
+            ids += [p["id"] for p in r.data["results"]]
+            cursor = r.data["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(ids, expected)
+
+        r = self.client.get("/api/patients/", {"stream": "ndjson"})
+        lines = b"".join(r.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)["id"] for line in lines], expected)
@@ -1,4 +1,5 @@
 from praxi_backend.core import audit as core_audit
+from praxi_backend.core.pagination import keyset_list_response
 from praxi_backend.patients.models import Patient
 from praxi_backend.patients.permissions import PatientPermission
 from praxi_backend.patients.serializers import PatientReadSerializer, PatientWriteSerializer
@@ -29,9 +30,15 @@ class PatientSearchView(APIView):
 
 
 class PatientListCreateView(generics.ListCreateAPIView):
-    """List all patients or create a new patient."""
+    """List all patients or create a new patient.
+
+    GET additionally supports keyset pages ordered by (last_name, first_name,
+    id) via ``limit``/``cursor`` and a chunked export via ``stream=json|ndjson``
+    (see ``praxi_backend.core.pagination``).
+    """
 
     permission_classes = [PatientPermission]
+    keyset_fields = ("last_name", "first_name", "id")
 
     def get_queryset(self):
         return Patient.objects.using("default").all()
@@ -41,6 +48,16 @@ class PatientListCreateView(generics.ListCreateAPIView):
             return PatientWriteSerializer
         return PatientReadSerializer
 
+    def list(self, request, *args, **kwargs):
+        qs = self.filter_queryset(self.get_queryset())
+        response = keyset_list_response(request, qs, self.keyset_fields, self._serialize_rows)
+        if response is not None:
+            return response
+        return super().list(request, *args, **kwargs)
+
+    def _serialize_rows(self, rows):
+        return PatientReadSerializer(rows, many=True).data
+
     def create(self, request, *args, **kwargs):
         """Create a patient and return the read representation.
 
@@ -3,6 +3,10 @@ ASGI config for praxi_backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve the app through ASGI when ``PRAXI_LIVE_EVENTS`` is enabled: the
+``/api/live/events/`` stream is an async iterator, which only ASGI serves
+without blocking a worker per open connection.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -231,6 +231,53 @@ CSRF_TRUSTED_ORIGINS = [
 ]
 
 
+# ------------------------------------------------------------
+# Scheduling
+# ------------------------------------------------------------
+
+# Rely on the PostgreSQL EXCLUDE constraints (doctor appointments, operation rooms)
+# instead of Python pre-checks. Install them first: manage.py scheduling_constraints --install
+# (the pre-checks stay on while the constraints are missing).
+PRAXI_SCHEDULING_DB_CONSTRAINTS = _env_bool("PRAXI_SCHEDULING_DB_CONSTRAINTS", default=False)
+
+# Static scheduling configuration (hours, types, resources) is cached per process;
+# set a cache alias to share the snapshots between processes.
+PRAXI_CONFIG_CACHE_ALIAS = _env("PRAXI_CONFIG_CACHE_ALIAS") or None
+PRAXI_CONFIG_CACHE_TIMEOUT = _env_int("PRAXI_CONFIG_CACHE_TIMEOUT", 300)
+
+# Dashboard KPI snapshots: served fresh for TTL seconds, then served stale for up
+# to STALE_TTL seconds while one request recomputes them.
+PRAXI_KPI_CACHE_ALIAS = _env("PRAXI_KPI_CACHE_ALIAS", "default")
+PRAXI_KPI_CACHE_TTL = _env_int("PRAXI_KPI_CACHE_TTL", 60)
+PRAXI_KPI_CACHE_STALE_TTL = _env_int("PRAXI_KPI_CACHE_STALE_TTL", 300)
+
+# Daily booking rollups: maintain the DailyBookingRollup fact table from signals and
+# let trend charts read it. Enable, then backfill with `manage.py rebuild_rollups`.
+PRAXI_KPI_ROLLUPS = _env_bool("PRAXI_KPI_ROLLUPS", False)
+
+# Run the independent sections of the get_all_* KPI aggregators on a thread pool
+# (one DB connection per busy worker); 0/1 runs them sequentially. Sections slower
+# than SECTION_TIMEOUT seconds are served from their last value (kept for the KPI
+# STALE_TTL).
+PRAXI_KPI_PARALLEL_WORKERS = _env_int("PRAXI_KPI_PARALLEL_WORKERS", 0)
+PRAXI_KPI_SECTION_TIMEOUT = _env_int("PRAXI_KPI_SECTION_TIMEOUT", 10)
+
+# Conditional GET (ETag/Last-Modified, 304 Not Modified) for the calendar and live
+# endpoints, driven by per-table/per-day change watermarks. The watermark cache must be
+# shared by all worker processes, otherwise writes served by another process go unseen.
+PRAXI_CONDITIONAL_GET = _env_bool("PRAXI_CONDITIONAL_GET", False)
+PRAXI_CHANGE_TRACKING_CACHE_ALIAS = _env("PRAXI_CHANGE_TRACKING_CACHE_ALIAS", "default")
+
+# Server-sent change events for the live OP and patient-flow boards (/api/live/events/).
+# Needs an ASGI server (WSGI requests get 501). Streams end after MAX_SECONDS and clients
+# resume with Last-Event-ID; set PRAXI_LIVE_EVENTS_REDIS_URL to fan events out across
+# worker processes.
+PRAXI_LIVE_EVENTS = _env_bool("PRAXI_LIVE_EVENTS", False)
+PRAXI_LIVE_EVENTS_REDIS_URL = _env("PRAXI_LIVE_EVENTS_REDIS_URL") or None
+PRAXI_LIVE_EVENTS_HEARTBEAT = _env_int("PRAXI_LIVE_EVENTS_HEARTBEAT", 15)
+PRAXI_LIVE_EVENTS_MAX_SECONDS = _env_int("PRAXI_LIVE_EVENTS_MAX_SECONDS", 300)
+
+
 # ------------------------------------------------------------
 # Celery
 # ------------------------------------------------------------
@@ -111,6 +111,7 @@ if os.getenv("REDIS_HOST"):
             "LOCATION": f"redis://{REDIS_HOST}:{REDIS_PORT}/1",
         }
     }
+    PRAXI_CONFIG_CACHE_ALIAS = os.getenv("PRAXI_CONFIG_CACHE_ALIAS", "default")
 
 # Email
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"